@@ -7,6 +7,17 @@ DROP DATABASE IF EXISTS `myems_system_db` ;
 CREATE DATABASE IF NOT EXISTS `myems_system_db` CHARACTER SET 'utf8mb4' COLLATE 'utf8mb4_unicode_ci' ;
 
 
+-- ---------------------------------------------------------------------------------------------------------------------
+-- Table `myems_system_db`.`tbl_change_counters`
+-- ---------------------------------------------------------------------------------------------------------------------
+DROP TABLE IF EXISTS `myems_system_db`.`tbl_change_counters` ;
+
+CREATE TABLE IF NOT EXISTS `myems_system_db`.`tbl_change_counters` (
+  `table_name` VARCHAR(64) NOT NULL,
+  `counter` BIGINT NOT NULL COMMENT 'Incremented by the API on every change of the table',
+  `last_modified_datetime_utc` DATETIME NOT NULL,
+  PRIMARY KEY (`table_name`));
+
 -- ---------------------------------------------------------------------------------------------------------------------
 -- Table `myems_system_db`.`tbl_charging_stations`
 -- ---------------------------------------------------------------------------------------------------------------------
@@ -1021,6 +1032,8 @@ CREATE TABLE IF NOT EXISTS `myems_system_db`.`tbl_meters` (
 CREATE INDEX `tbl_meters_index_1` ON `myems_system_db`.`tbl_meters` (`name`);
 CREATE INDEX `tbl_meters_index_2` ON `myems_system_db`.`tbl_meters` (`energy_category_id`);
 CREATE INDEX `tbl_meters_index_3` ON `myems_system_db`.`tbl_meters` (`energy_item_id`);
+CREATE INDEX `tbl_meters_index_4` ON `myems_system_db`.`tbl_meters` (`cost_center_id`);
+CREATE INDEX `tbl_meters_index_5` ON `myems_system_db`.`tbl_meters` (`master_meter_id`);
 
 -- ---------------------------------------------------------------------------------------------------------------------
 -- Table `myems_system_db`.`tbl_meters_points`
@@ -1639,6 +1652,7 @@ CREATE TABLE IF NOT EXISTS `myems_system_db`.`tbl_points` (
 CREATE INDEX `tbl_points_index_1` ON `myems_system_db`.`tbl_points` (`name`);
 CREATE INDEX `tbl_points_index_2` ON `myems_system_db`.`tbl_points` (`data_source_id`);
 CREATE INDEX `tbl_points_index_3` ON `myems_system_db`.`tbl_points` (`id`, `object_type`);
+CREATE INDEX `tbl_points_index_4` ON `myems_system_db`.`tbl_points` (`object_type`);
 
 -- ---------------------------------------------------------------------------------------------------------------------
 -- Table `myems_system_db`.`tbl_power_integrators`
@@ -2603,7 +2617,7 @@ CREATE TABLE IF NOT EXISTS `myems_system_db`.`tbl_versions` (
 INSERT INTO `myems_system_db`.`tbl_versions`
 (`id`, `version`, `release_date`)
 VALUES
-(1, '5.5.0', '2025-05-29');
+(1, '5.6.0', '2025-06-30');
 
 -- ---------------------------------------------------------------------------------------------------------------------
 -- Table `myems_system_db`.`tbl_wind_farms`
@@ -0,0 +1,25 @@
+-- ---------------------------------------------------------------------------------------------------------------------
+-- 警告：升级前备份数据库
+-- WARNING: BACKUP YOUR DATABASE BEFORE UPGRADING
+-- 此脚本仅用于将5.5.0升级到5.6.0
+-- THIS SCRIPT IS ONLY FOR UPGRADING 5.5.0 TO 5.6.0
+-- 当前版本号在`myems_system_db`.`tbl_versions`中查看
+-- THE CURRENT VERSION CAN BE FOUND AT `myems_system_db`.`tbl_versions`
+-- ---------------------------------------------------------------------------------------------------------------------
+
+START TRANSACTION;
+
+CREATE TABLE IF NOT EXISTS `myems_system_db`.`tbl_change_counters` (
+  `table_name` VARCHAR(64) NOT NULL,
+  `counter` BIGINT NOT NULL COMMENT 'Incremented by the API on every change of the table',
+  `last_modified_datetime_utc` DATETIME NOT NULL,
+  PRIMARY KEY (`table_name`));
+
+CREATE INDEX `tbl_meters_index_4` ON `myems_system_db`.`tbl_meters` (`cost_center_id`);
+CREATE INDEX `tbl_meters_index_5` ON `myems_system_db`.`tbl_meters` (`master_meter_id`);
+CREATE INDEX `tbl_points_index_4` ON `myems_system_db`.`tbl_points` (`object_type`);
+
+-- UPDATE VERSION NUMBER
+UPDATE `myems_system_db`.`tbl_versions` SET version='5.6.0', release_date='2025-06-30' WHERE id=1;
+
+COMMIT;
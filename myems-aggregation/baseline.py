@@ -0,0 +1,182 @@
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+
+import mysql.connector
+import numpy as np
+
+import config
+import profiles
+
+
+########################################################################################################################
+# Baselines of the hourly energy data, read by the saving reports from myems_energy_baseline_db
+# The baseline of an entity is its profile (see profiles.py) fitted on its energy data in the reference period, which
+# starts at config.baseline_start_datetime_utc and lasts config.baseline_weeks weeks.
+# Only the periods after the latest baseline row of each entity are inserted, so every run only projects the new hours.
+########################################################################################################################
+
+# entities fitted and projected together
+_ENTITY_BATCH_SIZE = 200
+
+# rows per multi-row insert
+_INSERT_BATCH_SIZE = 5000
+
+
+def _get_latest_datetimes(cursor, table, key_columns):
+    cursor.execute(" SELECT " + ', '.join(key_columns) + ", MAX(start_datetime_utc) "
+                   " FROM " + table +
+                   " GROUP BY " + ', '.join(key_columns))
+    return {tuple(row[:-1]): row[-1] for row in cursor.fetchall()}
+
+
+########################################################################################################################
+# PROCEDURES
+# Step 1: get the baseline tables
+# Step 2: Create multiprocessing pool to call worker in parallel
+########################################################################################################################
+
+
+def main(logger):
+
+    while True:
+        # the outermost while loop
+        p = Pool(processes=config.pool_size)
+        error_list = p.map(worker, profiles.HOURLY_TABLES)
+        p.close()
+        p.join()
+
+        for error in error_list:
+            if error is not None and len(error) > 0:
+                logger.error(error)
+
+        print("go to sleep 300 seconds...")
+        time.sleep(300)
+        print("wake from sleep, and continue to work...")
+    # end of outer while
+
+
+########################################################################################################################
+# PROCEDURES:
+#   Step 1: get the latest energy data and baseline datetime of every entity, select the entities with new periods
+#   Step 2: get the non-working days of the entities
+#   Step 3: for each batch of entities, get the energy data of the reference period and fit the profiles
+#   Step 4: project the profiles on the new periods and save them to the energy baseline database
+#
+# NOTE: returns None or the error string because that the logger object cannot be passed in as parameter
+########################################################################################################################
+
+def worker(baseline_table):
+    table, key_columns, calendar_table = baseline_table
+    print("Start to calculate baseline of " + table)
+
+    cnx_system_db = None
+    cursor_system_db = None
+    cnx_energy_db = None
+    cursor_energy_db = None
+    cnx_baseline_db = None
+    cursor_baseline_db = None
+    try:
+        cnx_system_db = mysql.connector.connect(**config.myems_system_db)
+        cursor_system_db = cnx_system_db.cursor()
+        cnx_energy_db = mysql.connector.connect(**config.myems_energy_db)
+        cursor_energy_db = cnx_energy_db.cursor()
+        cnx_baseline_db = mysql.connector.connect(**config.myems_energy_baseline_db)
+        cursor_baseline_db = cnx_baseline_db.cursor()
+
+        ################################################################################################################
+        # Step 1: get the latest energy data and baseline datetime of every entity
+        ################################################################################################################
+        reference_start_datetime_utc = datetime.strptime(config.baseline_start_datetime_utc, '%Y-%m-%d %H:%M:%S')
+        reference_end_datetime_utc = reference_start_datetime_utc + timedelta(weeks=config.baseline_weeks)
+        step = timedelta(minutes=config.minutes_to_count)
+
+        latest_energy_datetimes = _get_latest_datetimes(cursor_energy_db, table, key_columns)
+        latest_baseline_datetimes = _get_latest_datetimes(cursor_baseline_db, table, key_columns)
+        entity_keys = list()
+        start_datetimes_utc = list()
+        end_datetimes_utc = list()
+        for entity_key, latest_energy_datetime in sorted(latest_energy_datetimes.items()):
+            latest_baseline_datetime = latest_baseline_datetimes.get(entity_key)
+            start_datetime_utc = reference_start_datetime_utc if latest_baseline_datetime is None \
+                else max(latest_baseline_datetime + step, reference_start_datetime_utc)
+            if start_datetime_utc <= latest_energy_datetime:
+                entity_keys.append(entity_key)
+                start_datetimes_utc.append(start_datetime_utc)
+                end_datetimes_utc.append(latest_energy_datetime)
+        if len(entity_keys) == 0:
+            print("The baseline of " + table + " is up to date")
+            return None
+
+        ################################################################################################################
+        # Step 2: get the non-working days of the entities
+        ################################################################################################################
+        all_non_working_day_codes = profiles.get_non_working_day_codes(cursor_system_db, calendar_table,
+                                                                       key_columns[0], entity_keys)
+
+        for batch_start in range(0, len(entity_keys), _ENTITY_BATCH_SIZE):
+            batch_keys = entity_keys[batch_start:batch_start + _ENTITY_BATCH_SIZE]
+            batch_indexes = {entity_key: i for i, entity_key in enumerate(batch_keys)}
+            # codes of the batch, with the entity indexes of the batch
+            batch_codes = all_non_working_day_codes[
+                (all_non_working_day_codes >= batch_start * profiles.DAY_CODE) &
+                (all_non_working_day_codes < (batch_start + len(batch_keys)) * profiles.DAY_CODE)] - \
+                batch_start * profiles.DAY_CODE
+
+            ############################################################################################################
+            # Step 3: get the energy data of the reference period and fit the profiles
+            ############################################################################################################
+            first_ids = sorted({entity_key[0] for entity_key in batch_keys})
+            cursor_energy_db.execute(" SELECT " + ', '.join(key_columns) + ", start_datetime_utc, actual_value "
+                                     " FROM " + table +
+                                     " WHERE " + key_columns[0] + " IN (" + ', '.join(['%s'] * len(first_ids)) + ") "
+                                     "       AND start_datetime_utc >= %s AND start_datetime_utc < %s ",
+                                     tuple(first_ids) + (reference_start_datetime_utc, reference_end_datetime_utc))
+            entity_indexes = list()
+            datetimes_utc = list()
+            values = list()
+            for row in cursor_energy_db.fetchall():
+                entity_index = batch_indexes.get(tuple(row[:-2]))
+                if entity_index is not None:
+                    entity_indexes.append(entity_index)
+                    datetimes_utc.append(row[-2])
+                    values.append(float(row[-1]))
+            entity_indexes = np.array(entity_indexes, dtype=np.int64)
+            slots = profiles.get_slots(np.array(datetimes_utc, dtype='datetime64[m]'), entity_indexes, batch_codes)
+            fitted_profiles = profiles.fit_profiles(entity_indexes, slots, np.array(values, dtype=np.float64),
+                                                    len(batch_keys))
+
+            ############################################################################################################
+            # Step 4: project the profiles on the new periods and save them to the energy baseline database
+            ############################################################################################################
+            projected_indexes, projected_datetimes, projected_values = \
+                profiles.project(fitted_profiles,
+                                 np.array(start_datetimes_utc[batch_start:batch_start + len(batch_keys)],
+                                          dtype='datetime64[m]'),
+                                 np.array(end_datetimes_utc[batch_start:batch_start + len(batch_keys)],
+                                          dtype='datetime64[m]'),
+                                 batch_codes)
+            rows = [batch_keys[entity_index] + (datetime_utc, round(value, 6))
+                    for entity_index, datetime_utc, value in zip(projected_indexes.tolist(),
+                                                                 projected_datetimes.astype(datetime).tolist(),
+                                                                 projected_values.tolist())]
+            add_values = (" INSERT INTO " + table + " (" + ', '.join(key_columns) + ", "
+                          "                          start_datetime_utc, actual_value) "
+                          " VALUES (" + ', '.join(['%s'] * (len(key_columns) + 2)) + ") ")
+            for i in range(0, len(rows), _INSERT_BATCH_SIZE):
+                cursor_baseline_db.executemany(add_values, rows[i:i + _INSERT_BATCH_SIZE])
+            cnx_baseline_db.commit()
+            print("Saved " + str(len(rows)) + " baseline rows of " + str(len(batch_keys)) + " entities in " + table)
+
+    except Exception as e:
+        return "Error in baseline worker of " + table + " " + str(e)
+    finally:
+        for cursor, cnx in ((cursor_system_db, cnx_system_db),
+                            (cursor_energy_db, cnx_energy_db),
+                            (cursor_baseline_db, cnx_baseline_db)):
+            if cursor:
+                cursor.close()
+            if cnx:
+                cnx.close()
+
+    return None
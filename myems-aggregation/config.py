@@ -41,6 +41,22 @@ myems_carbon_db = {
     'password': config('MYEMS_CARBON_DB_PASSWORD', default='!MyEMS1'),
 }
 
+myems_energy_baseline_db = {
+    'host': config('MYEMS_ENERGY_BASELINE_DB_HOST', default='127.0.0.1'),
+    'port': config('MYEMS_ENERGY_BASELINE_DB_PORT', default=3306, cast=int),
+    'database': config('MYEMS_ENERGY_BASELINE_DB_DATABASE', default='myems_energy_baseline_db'),
+    'user': config('MYEMS_ENERGY_BASELINE_DB_USER', default='root'),
+    'password': config('MYEMS_ENERGY_BASELINE_DB_PASSWORD', default='!MyEMS1'),
+}
+
+myems_energy_prediction_db = {
+    'host': config('MYEMS_ENERGY_PREDICTION_DB_HOST', default='127.0.0.1'),
+    'port': config('MYEMS_ENERGY_PREDICTION_DB_PORT', default=3306, cast=int),
+    'database': config('MYEMS_ENERGY_PREDICTION_DB_DATABASE', default='myems_energy_prediction_db'),
+    'user': config('MYEMS_ENERGY_PREDICTION_DB_USER', default='root'),
+    'password': config('MYEMS_ENERGY_PREDICTION_DB_PASSWORD', default='!MyEMS1'),
+}
+
 # indicates how long in minutes energy data will be aggregated
 # 30 for half hourly
 # 60 for hourly
@@ -57,3 +73,12 @@ utc_offset = config('UTC_OFFSET', default='+08:00')
 # the pool size depends on the computing performance of the database server and the analysis server
 pool_size = config('POOL_SIZE', default=5, cast=int)
 
+# indicates from when (in UTC timezone) the reference period of baselines starts
+# format string: '%Y-%m-%d %H:%M:%S'
+baseline_start_datetime_utc = config('BASELINE_START_DATETIME_UTC', default='2023-12-31 16:00:00')
+
+# the length in weeks of the reference period of baselines
+baseline_weeks = config('BASELINE_WEEKS', default=52, cast=int)
+
+# the length in weeks of the energy data the predictions are fitted on
+prediction_weeks = config('PREDICTION_WEEKS', default=4, cast=int)
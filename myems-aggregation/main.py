@@ -2,6 +2,7 @@ import logging
 from logging.handlers import RotatingFileHandler
 from multiprocessing import Process
 
+import baseline
 import combined_equipment_billing_input_category
 import combined_equipment_billing_input_item
 import combined_equipment_billing_output_category
@@ -20,6 +21,7 @@ import meter_billing
 import meter_carbon
 import offline_meter_billing
 import offline_meter_carbon
+import prediction
 import shopfloor_billing_input_category
 import shopfloor_billing_input_item
 import shopfloor_carbon_input_category
@@ -32,6 +34,7 @@ import space_carbon_input_category
 import space_energy_input_category
 import space_energy_input_item
 import space_energy_output_category
+import stations
 import store_billing_input_category
 import store_billing_input_item
 import store_carbon_input_category
@@ -131,6 +134,10 @@ def main():
     # space energy output by energy categories
     Process(target=space_energy_output_category.main, args=(logger,)).start()
 
+    # energy, billing and carbon dioxide emissions of energy storage containers, energy storage power stations,
+    # microgrids and photovoltaic power stations
+    Process(target=stations.main, args=(logger,)).start()
+
     # store billing input by energy categories
     Process(target=store_billing_input_category.main, args=(logger,)).start()
     # store billing input by energy items
@@ -158,6 +165,11 @@ def main():
     # virtual meter billing (cost or income)
     Process(target=virtual_meter_billing.main, args=(logger,)).start()
 
+    # baselines of meters, virtual meters, offline meters and energy input by energy categories
+    Process(target=baseline.main, args=(logger,)).start()
+    # day-ahead predictions of meters, virtual meters, offline meters and energy input by energy categories
+    Process(target=prediction.main, args=(logger,)).start()
+
 
 if __name__ == '__main__':
     main()
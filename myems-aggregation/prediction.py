@@ -0,0 +1,242 @@
+import time
+from datetime import datetime, timedelta, timezone
+from multiprocessing import Pool
+
+import mysql.connector
+import numpy as np
+
+import config
+import profiles
+
+
+########################################################################################################################
+# Day-ahead predictions of the hourly energy data, read by the prediction reports from myems_energy_prediction_db
+# The prediction of an entity for the next local day is its profile (see profiles.py) fitted on its energy data in the
+# last config.prediction_weeks weeks, the values are weighted by their age with a half-life of one week.
+# The hourly rows of the prediction window are kept in memory by the prediction process, every run only reads the rows
+# written since the previous run by their ids, and the profiles of the tables are fitted in parallel by the workers.
+########################################################################################################################
+
+# rows per query of the energy tables
+_FETCH_BATCH_SIZE = 100000
+
+# rows per multi-row insert
+_INSERT_BATCH_SIZE = 5000
+
+# ids per IN list
+_DELETE_BATCH_SIZE = 1000
+
+# the age of the values weighted by one half
+_HALF_LIFE_IN_MINUTES = 7 * 24 * 60
+
+
+class HourlySeries:
+    """
+    The hourly rows of an energy table in the prediction window
+    """
+    def __init__(self, table, key_columns):
+        self.table = table
+        self.key_columns = key_columns
+        self.entity_keys = list()
+        self.entity_indexes_by_key = dict()
+        self.entity_indexes = np.array([], dtype=np.int64)
+        self.datetimes_utc = np.array([], dtype='datetime64[m]')
+        self.values = np.array([], dtype=np.float64)
+        # the largest id read from the table
+        self.watermark = 0
+
+    def update(self, cursor, window_start_datetime_utc):
+        """
+        Read the rows written since the last update, and drop the rows before the window
+        :param cursor: cursor of myems_energy_db
+        :param window_start_datetime_utc: the start of the prediction window
+        """
+        entity_indexes = [self.entity_indexes]
+        datetimes_utc = [self.datetimes_utc]
+        values = [self.values]
+        while True:
+            cursor.execute(" SELECT id, " + ', '.join(self.key_columns) + ", start_datetime_utc, actual_value "
+                           " FROM " + self.table +
+                           " WHERE id > %s AND start_datetime_utc >= %s "
+                           " ORDER BY id "
+                           " LIMIT %s ", (self.watermark, window_start_datetime_utc, _FETCH_BATCH_SIZE))
+            rows = cursor.fetchall()
+            if len(rows) == 0:
+                break
+            self.watermark = rows[-1][0]
+            batch_indexes = list()
+            for row in rows:
+                entity_key = tuple(row[1:-2])
+                entity_index = self.entity_indexes_by_key.get(entity_key)
+                if entity_index is None:
+                    entity_index = len(self.entity_keys)
+                    self.entity_keys.append(entity_key)
+                    self.entity_indexes_by_key[entity_key] = entity_index
+                batch_indexes.append(entity_index)
+            entity_indexes.append(np.array(batch_indexes, dtype=np.int64))
+            datetimes_utc.append(np.array([row[-2] for row in rows], dtype='datetime64[m]'))
+            values.append(np.array([float(row[-1]) for row in rows], dtype=np.float64))
+            if len(rows) < _FETCH_BATCH_SIZE:
+                break
+
+        entity_indexes = np.concatenate(entity_indexes)
+        datetimes_utc = np.concatenate(datetimes_utc)
+        values = np.concatenate(values)
+        # recalculated rows replace the earlier rows of the same entity and period, the rows are in id order
+        codes = entity_indexes * (1 << 32) + datetimes_utc.astype(np.int64)
+        _, last_indexes = np.unique(codes[::-1], return_index=True)
+        keep = np.sort(len(codes) - 1 - last_indexes)
+        keep = keep[datetimes_utc[keep] >= np.datetime64(window_start_datetime_utc, 'm')]
+        self.entity_indexes = entity_indexes[keep]
+        self.datetimes_utc = datetimes_utc[keep]
+        self.values = values[keep]
+
+
+########################################################################################################################
+# PROCEDURES
+# Step 1: read the new hourly rows of the energy tables into the series
+# Step 2: Create multiprocessing pool to call worker in parallel
+########################################################################################################################
+
+
+def main(logger):
+
+    series_list = [HourlySeries(table, key_columns) for table, key_columns, _ in profiles.HOURLY_TABLES]
+    while True:
+        # the outermost while loop
+        now_utc = datetime.now(timezone.utc).replace(tzinfo=None)
+        window_start_datetime_utc = now_utc - timedelta(weeks=config.prediction_weeks)
+
+        ################################################################################################################
+        # Step 1: read the new hourly rows of the energy tables into the series
+        ################################################################################################################
+        cnx_energy_db = None
+        cursor_energy_db = None
+        try:
+            cnx_energy_db = mysql.connector.connect(**config.myems_energy_db)
+            cursor_energy_db = cnx_energy_db.cursor()
+            for series in series_list:
+                series.update(cursor_energy_db, window_start_datetime_utc)
+        except Exception as e:
+            logger.error("Error in step 1 of prediction " + str(e))
+            # sleep and continue the outer loop to reconnect the database
+            time.sleep(60)
+            continue
+        finally:
+            if cursor_energy_db:
+                cursor_energy_db.close()
+            if cnx_energy_db:
+                cnx_energy_db.close()
+
+        ################################################################################################################
+        # Step 2: Create multiprocessing pool to call worker in parallel
+        ################################################################################################################
+        # the next local day in UTC
+        timezone_offset = profiles.get_timezone_offset()
+        now_local = now_utc + timedelta(minutes=timezone_offset)
+        start_datetime_utc = datetime(now_local.year, now_local.month, now_local.day) + \
+            timedelta(days=1) - timedelta(minutes=timezone_offset)
+
+        parameters = list()
+        for (table, key_columns, calendar_table), series in zip(profiles.HOURLY_TABLES, series_list):
+            if len(series.values) > 0:
+                parameters.append((table, key_columns, calendar_table, series.entity_keys, series.entity_indexes,
+                                   series.datetimes_utc, series.values, start_datetime_utc, now_utc))
+
+        p = Pool(processes=config.pool_size)
+        error_list = p.map(worker, parameters)
+        p.close()
+        p.join()
+
+        for error in error_list:
+            if error is not None and len(error) > 0:
+                logger.error(error)
+
+        print("go to sleep 3600 seconds...")
+        time.sleep(3600)
+        print("wake from sleep, and continue to work...")
+    # end of outer while
+
+
+########################################################################################################################
+# PROCEDURES:
+#   Step 1: get the non-working days of the entities
+#   Step 2: fit the profiles of the entities and project them on the next local day
+#   Step 3: replace the predictions of the next local day in the energy prediction database
+#
+# NOTE: returns None or the error string because that the logger object cannot be passed in as parameter
+########################################################################################################################
+
+def worker(parameters):
+    table, key_columns, calendar_table, all_entity_keys, all_entity_indexes, datetimes_utc, values, \
+        start_datetime_utc, now_utc = parameters
+    print("Start to predict " + table)
+
+    cnx_system_db = None
+    cursor_system_db = None
+    cnx_prediction_db = None
+    cursor_prediction_db = None
+    try:
+        cnx_system_db = mysql.connector.connect(**config.myems_system_db)
+        cursor_system_db = cnx_system_db.cursor()
+        cnx_prediction_db = mysql.connector.connect(**config.myems_energy_prediction_db)
+        cursor_prediction_db = cnx_prediction_db.cursor()
+
+        ################################################################################################################
+        # Step 1: get the non-working days of the entities
+        ################################################################################################################
+        # only the entities with rows in the prediction window, numbered from 0
+        present_indexes, entity_indexes = np.unique(all_entity_indexes, return_inverse=True)
+        entity_keys = [all_entity_keys[i] for i in present_indexes.tolist()]
+        non_working_day_codes = profiles.get_non_working_day_codes(cursor_system_db, calendar_table,
+                                                                   key_columns[0], entity_keys)
+
+        ################################################################################################################
+        # Step 2: fit the profiles of the entities and project them on the next local day
+        ################################################################################################################
+        slots = profiles.get_slots(datetimes_utc, entity_indexes, non_working_day_codes)
+        ages = (np.datetime64(now_utc, 'm') - datetimes_utc).astype(np.float64)
+        weights = np.power(0.5, np.maximum(ages, 0.0) / _HALF_LIFE_IN_MINUTES)
+        fitted_profiles = profiles.fit_profiles(entity_indexes, slots, values, len(entity_keys), weights)
+        end_datetime_utc = start_datetime_utc + timedelta(days=1)
+        projected_indexes, projected_datetimes, projected_values = \
+            profiles.project(fitted_profiles,
+                             np.full(len(entity_keys), np.datetime64(start_datetime_utc, 'm')),
+                             np.full(len(entity_keys),
+                                     np.datetime64(end_datetime_utc - timedelta(minutes=config.minutes_to_count),
+                                                   'm')),
+                             non_working_day_codes)
+
+        ################################################################################################################
+        # Step 3: replace the predictions of the next local day in the energy prediction database
+        ################################################################################################################
+        first_ids = sorted({entity_key[0] for entity_key in entity_keys})
+        for i in range(0, len(first_ids), _DELETE_BATCH_SIZE):
+            chunk = first_ids[i:i + _DELETE_BATCH_SIZE]
+            cursor_prediction_db.execute(" DELETE FROM " + table +
+                                         " WHERE " + key_columns[0] + " IN (" + ', '.join(['%s'] * len(chunk)) + ") "
+                                         "       AND start_datetime_utc >= %s AND start_datetime_utc < %s ",
+                                         tuple(chunk) + (start_datetime_utc, end_datetime_utc))
+        rows = [entity_keys[entity_index] + (datetime_utc, round(value, 6))
+                for entity_index, datetime_utc, value in zip(projected_indexes.tolist(),
+                                                             projected_datetimes.astype(datetime).tolist(),
+                                                             projected_values.tolist())]
+        add_values = (" INSERT INTO " + table + " (" + ', '.join(key_columns) + ", "
+                      "                          start_datetime_utc, actual_value) "
+                      " VALUES (" + ', '.join(['%s'] * (len(key_columns) + 2)) + ") ")
+        for i in range(0, len(rows), _INSERT_BATCH_SIZE):
+            cursor_prediction_db.executemany(add_values, rows[i:i + _INSERT_BATCH_SIZE])
+        cnx_prediction_db.commit()
+        print("Saved " + str(len(rows)) + " prediction rows of " + str(len(entity_keys)) + " entities in " + table)
+
+    except Exception as e:
+        return "Error in prediction worker of " + table + " " + str(e)
+    finally:
+        for cursor, cnx in ((cursor_system_db, cnx_system_db),
+                            (cursor_prediction_db, cnx_prediction_db)):
+            if cursor:
+                cursor.close()
+            if cnx:
+                cnx.close()
+
+    return None
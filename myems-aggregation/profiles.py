@@ -0,0 +1,143 @@
+from datetime import datetime
+
+import numpy as np
+
+import config
+
+
+########################################################################################################################
+# Profiles of hourly energy data, shared by the baseline and prediction stages
+# A profile is the mean value of every period of the week on working days, and of every period of the day on the
+# non-working days of the working calendars of spaces, shopfloors, stores and tenants. Empty periods of a profile fall
+# back to the mean of the same period of the day, then to the mean of the entity.
+# The profiles of many entities are fitted and projected together with NumPy.
+# The API classifies non-working days the same way in core/calendarindex.py of myems-api. The services are deployed
+# separately and share no package, so a change of the classification rules must be made in both modules.
+########################################################################################################################
+
+# table, key columns, and the working calendars table of the first key column
+HOURLY_TABLES = [
+    ('tbl_meter_hourly', ('meter_id',), None),
+    ('tbl_offline_meter_hourly', ('offline_meter_id',), None),
+    ('tbl_virtual_meter_hourly', ('virtual_meter_id',), None),
+    ('tbl_combined_equipment_input_category_hourly', ('combined_equipment_id', 'energy_category_id'), None),
+    ('tbl_equipment_input_category_hourly', ('equipment_id', 'energy_category_id'), None),
+    ('tbl_shopfloor_input_category_hourly', ('shopfloor_id', 'energy_category_id'),
+     'tbl_shopfloors_working_calendars'),
+    ('tbl_space_input_category_hourly', ('space_id', 'energy_category_id'), 'tbl_spaces_working_calendars'),
+    ('tbl_store_input_category_hourly', ('store_id', 'energy_category_id'), 'tbl_stores_working_calendars'),
+    ('tbl_tenant_input_category_hourly', ('tenant_id', 'energy_category_id'), 'tbl_tenants_working_calendars'),
+]
+
+# encodes (entity index, local day number) in one integer
+DAY_CODE = 1 << 20
+
+
+def get_timezone_offset():
+    timezone_offset = int(config.utc_offset[1:3]) * 60 + int(config.utc_offset[4:6])
+    if config.utc_offset[0] == '-':
+        timezone_offset = -timezone_offset
+    return timezone_offset
+
+
+def _get_periods_per_day():
+    return 1440 // config.minutes_to_count
+
+
+def get_slots(datetimes_utc, entity_indexes, non_working_day_codes):
+    """
+    Get the profile slot of every period, the period of the week on working days or the period of the day on
+    non-working days
+    :param datetimes_utc: array of datetime64[m] in UTC
+    :param entity_indexes: array of the entity index of every period
+    :param non_working_day_codes: array of entity index * DAY_CODE + local day number of the non-working days
+    :return: array of slots in range(8 * periods per day)
+    """
+    periods_per_day = _get_periods_per_day()
+    local_datetimes = datetimes_utc + np.timedelta64(get_timezone_offset(), 'm')
+    days = local_datetimes.astype('datetime64[D]')
+    day_numbers = days.astype(np.int64)
+    periods = (local_datetimes - days).astype('timedelta64[m]').astype(np.int64) // config.minutes_to_count
+    # 1970-01-01 is a Thursday, Monday is 0
+    weekdays = (day_numbers + 3) % 7
+    slots = weekdays * periods_per_day + periods
+    if len(non_working_day_codes) > 0:
+        is_non_working = np.isin(entity_indexes * DAY_CODE + day_numbers, non_working_day_codes)
+        slots = np.where(is_non_working, 7 * periods_per_day + periods, slots)
+    return slots
+
+
+def fit_profiles(entity_indexes, slots, values, entity_count, weights=None):
+    """
+    Fit the profiles of many entities at once
+    :param entity_indexes: array of the entity index of every value
+    :param slots: array of the slot of every value
+    :param values: array of values
+    :param entity_count: number of entities
+    :param weights: array of the weight of every value, or None for equal weights
+    :return: array of shape (entity_count, 8 * periods per day)
+    """
+    periods_per_day = _get_periods_per_day()
+    slot_count = 8 * periods_per_day
+    flat_indexes = entity_indexes * slot_count + slots
+    sums = np.bincount(flat_indexes, weights=values if weights is None else values * weights,
+                       minlength=entity_count * slot_count).reshape(entity_count, slot_count)
+    counts = np.bincount(flat_indexes, weights=weights,
+                         minlength=entity_count * slot_count).reshape(entity_count, slot_count)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        profiles = sums / counts
+        period_means = sums.reshape(entity_count, 8, periods_per_day).sum(axis=1) / \
+            counts.reshape(entity_count, 8, periods_per_day).sum(axis=1)
+        entity_means = sums.sum(axis=1) / counts.sum(axis=1)
+    fallbacks = np.where(np.isnan(period_means), entity_means[:, np.newaxis], period_means)
+    fallbacks = np.nan_to_num(fallbacks, nan=0.0)
+    return np.where(np.isnan(profiles), np.tile(fallbacks, (1, 8)), profiles)
+
+
+def project(profiles, start_datetimes_utc, end_datetimes_utc, non_working_day_codes):
+    """
+    Project the profiles on the periods from start to end of every entity, both included
+    :param profiles: array of shape (entity_count, 8 * periods per day)
+    :param start_datetimes_utc: array of datetime64[m], the first period of every entity
+    :param end_datetimes_utc: array of datetime64[m], the last period of every entity
+    :param non_working_day_codes: array of entity index * DAY_CODE + local day number of the non-working days
+    :return: tuple of arrays (entity_indexes, datetimes_utc, values)
+    """
+    step = np.timedelta64(config.minutes_to_count, 'm')
+    counts = np.maximum((end_datetimes_utc - start_datetimes_utc) // step + 1, 0)
+    entity_indexes = np.repeat(np.arange(len(counts)), counts)
+    # the offset of every period from the start of its entity
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    datetimes_utc = np.repeat(start_datetimes_utc, counts) + offsets * step
+    slots = get_slots(datetimes_utc, entity_indexes, non_working_day_codes)
+    return entity_indexes, datetimes_utc, profiles[entity_indexes, slots]
+
+
+def get_non_working_day_codes(cursor_system_db, calendar_table, key_column, entity_keys):
+    """
+    Get the non-working days of entities from their working calendars
+    :param cursor_system_db: cursor of myems_system_db
+    :param calendar_table: the working calendars table of the entities, or None
+    :param key_column: the entity column of the working calendars table
+    :param entity_keys: list of key tuples of the entities, the first item is the entity id
+    :return: sorted array of entity index * DAY_CODE + local day number of the non-working days
+    """
+    if calendar_table is None:
+        return np.array([], dtype=np.int64)
+    cursor_system_db.execute(" SELECT " + key_column + ", working_calendar_id "
+                             " FROM " + calendar_table)
+    calendar_ids = dict()
+    for row in cursor_system_db.fetchall():
+        calendar_ids.setdefault(row[0], set()).add(row[1])
+    cursor_system_db.execute(" SELECT working_calendar_id, date_local "
+                             " FROM tbl_working_calendars_non_working_days ")
+    day_numbers = dict()
+    epoch = datetime(1970, 1, 1).date()
+    for row in cursor_system_db.fetchall():
+        day_numbers.setdefault(row[0], list()).append((row[1] - epoch).days)
+    codes = list()
+    for entity_index, entity_key in enumerate(entity_keys):
+        for calendar_id in calendar_ids.get(entity_key[0], ()):
+            codes.extend(entity_index * DAY_CODE + day_number for day_number in day_numbers.get(calendar_id, ()))
+    return np.unique(np.array(codes, dtype=np.int64))
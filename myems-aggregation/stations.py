@@ -0,0 +1,206 @@
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+
+import mysql.connector
+
+import config
+
+
+########################################################################################################################
+# Hourly energy, billing and carbon dioxide emissions of energy storage containers, energy storage power stations,
+# microgrids and photovoltaic power stations
+# Each station table is the sum of the hourly rows of the meters of its batteries, grids, loads, ev chargers,
+# photovoltaics or invertors, in the energy, billing and carbon databases, which have the same tables.
+# The meter rows of each station are summed by the database with one grouped query per station, from the time slot
+# after its latest row to the latest time slot for which all its meters have data.
+########################################################################################################################
+
+# the suffix of the station table, and the table and meter column of the station devices
+_CONTAINER_DEVICES = [
+    ('charge', 'tbl_energy_storage_containers_batteries', 'charge_meter_id'),
+    ('discharge', 'tbl_energy_storage_containers_batteries', 'discharge_meter_id'),
+    ('grid_buy', 'tbl_energy_storage_containers_grids', 'buy_meter_id'),
+    ('grid_sell', 'tbl_energy_storage_containers_grids', 'sell_meter_id'),
+    ('load', 'tbl_energy_storage_containers_loads', 'meter_id'),
+]
+
+_MICROGRID_DEVICES = [
+    ('charge', 'tbl_microgrids_batteries', 'charge_meter_id'),
+    ('discharge', 'tbl_microgrids_batteries', 'discharge_meter_id'),
+    ('evcharger', 'tbl_microgrids_evchargers', 'meter_id'),
+    ('grid_buy', 'tbl_microgrids_grids', 'buy_meter_id'),
+    ('grid_sell', 'tbl_microgrids_grids', 'sell_meter_id'),
+    ('load', 'tbl_microgrids_loads', 'meter_id'),
+    ('photovoltaic', 'tbl_microgrids_photovoltaics', 'meter_id'),
+]
+
+_PHOTOVOLTAIC_POWER_STATION_DEVICES = [
+    ('generation', 'tbl_photovoltaic_power_stations_invertors', 'generation_meter_id'),
+    ('grid_buy', 'tbl_photovoltaic_power_stations_grids', 'buy_meter_id'),
+    ('grid_sell', 'tbl_photovoltaic_power_stations_grids', 'sell_meter_id'),
+    ('load', 'tbl_photovoltaic_power_stations_loads', 'meter_id'),
+]
+
+# the station table, its station column, and the query of the (station id, meter id) pairs in the system database
+STATION_TABLES = \
+    [('tbl_energy_storage_container_' + suffix + '_hourly', 'energy_storage_container_id',
+      " SELECT energy_storage_container_id, " + meter_column +
+      " FROM " + device_table)
+     for suffix, device_table, meter_column in _CONTAINER_DEVICES] + \
+    [('tbl_energy_storage_power_station_' + suffix + '_hourly', 'energy_storage_power_station_id',
+      " SELECT psc.energy_storage_power_station_id, d." + meter_column +
+      " FROM tbl_energy_storage_power_stations_containers psc, " + device_table + " d "
+      " WHERE psc.energy_storage_container_id = d.energy_storage_container_id ")
+     for suffix, device_table, meter_column in _CONTAINER_DEVICES] + \
+    [('tbl_microgrid_' + suffix + '_hourly', 'microgrid_id',
+      " SELECT microgrid_id, " + meter_column +
+      " FROM " + device_table)
+     for suffix, device_table, meter_column in _MICROGRID_DEVICES] + \
+    [('tbl_photovoltaic_power_station_' + suffix + '_hourly', 'photovoltaic_power_station_id',
+      " SELECT photovoltaic_power_station_id, " + meter_column +
+      " FROM " + device_table)
+     for suffix, device_table, meter_column in _PHOTOVOLTAIC_POWER_STATION_DEVICES]
+
+# the databases with station tables, summing the meter rows of the same database
+DATABASES = ('myems_energy_db', 'myems_billing_db', 'myems_carbon_db')
+
+# ids per IN list
+_BATCH_SIZE = 1000
+
+# rows per multi-row insert
+_INSERT_BATCH_SIZE = 5000
+
+
+########################################################################################################################
+# PROCEDURES
+# Step 1: get the station tables of all databases
+# Step 2: Create multiprocessing pool to call worker in parallel
+########################################################################################################################
+
+
+def main(logger):
+
+    while True:
+        # the outermost while loop
+        p = Pool(processes=config.pool_size)
+        error_list = p.map(worker, [(database,) + station_table
+                                    for database in DATABASES
+                                    for station_table in STATION_TABLES])
+        p.close()
+        p.join()
+
+        for error in error_list:
+            if error is not None and len(error) > 0:
+                logger.error(error)
+
+        print("go to sleep 300 seconds...")
+        time.sleep(300)
+        print("wake from sleep, and continue to work...")
+    # end of outer while
+
+
+########################################################################################################################
+# PROCEDURES:
+#   Step 1: get the meters of all stations
+#   Step 2: get the latest start datetime of every station
+#   Step 3: get the first and the latest start datetime of every meter
+#   Step 4: for each station, sum the meter rows in the common time slot and save them to the database
+#
+# NOTE: returns None or the error string because that the logger object cannot be passed in as parameter
+########################################################################################################################
+
+def worker(parameters):
+    database, table, station_column, meter_query = parameters
+    print("Start to aggregate " + table + " in " + database)
+
+    cnx_system_db = None
+    cursor_system_db = None
+    cnx = None
+    cursor = None
+    try:
+        cnx_system_db = mysql.connector.connect(**config.myems_system_db)
+        cursor_system_db = cnx_system_db.cursor()
+        cnx = mysql.connector.connect(**getattr(config, database))
+        cursor = cnx.cursor()
+
+        ################################################################################################################
+        # Step 1: get the meters of all stations
+        ################################################################################################################
+        cursor_system_db.execute(meter_query)
+        station_meters = dict()
+        for row in cursor_system_db.fetchall():
+            station_meters.setdefault(row[0], set()).add(row[1])
+        if len(station_meters) == 0:
+            return None
+
+        ################################################################################################################
+        # Step 2: get the latest start datetime of every station
+        ################################################################################################################
+        cursor.execute(" SELECT " + station_column + ", MAX(start_datetime_utc) "
+                       " FROM " + table +
+                       " GROUP BY " + station_column)
+        latest_datetimes = {row[0]: row[1] for row in cursor.fetchall()}
+
+        ################################################################################################################
+        # Step 3: get the first and the latest start datetime of every meter
+        ################################################################################################################
+        meter_ids = sorted(set().union(*station_meters.values()))
+        meter_ranges = dict()
+        for i in range(0, len(meter_ids), _BATCH_SIZE):
+            chunk = meter_ids[i:i + _BATCH_SIZE]
+            cursor.execute(" SELECT meter_id, MIN(start_datetime_utc), MAX(start_datetime_utc) "
+                           " FROM tbl_meter_hourly "
+                           " WHERE meter_id IN (" + ', '.join(['%s'] * len(chunk)) + ") "
+                           " GROUP BY meter_id ", tuple(chunk))
+            for row in cursor.fetchall():
+                meter_ranges[row[0]] = (row[1], row[2])
+
+        ################################################################################################################
+        # Step 4: for each station, sum the meter rows in the common time slot and save them to the database
+        ################################################################################################################
+        config_start_datetime_utc = datetime.strptime(config.start_datetime_utc, '%Y-%m-%d %H:%M:%S')
+        config_start_datetime_utc = config_start_datetime_utc.replace(minute=0, second=0, microsecond=0)
+        for station_id, station_meter_ids in sorted(station_meters.items()):
+            # all meters of the station need data
+            if any(meter_id not in meter_ranges for meter_id in station_meter_ids):
+                continue
+            start_datetime_utc = config_start_datetime_utc
+            if latest_datetimes.get(station_id) is not None:
+                start_datetime_utc = latest_datetimes[station_id] + timedelta(minutes=config.minutes_to_count)
+            start_datetime_utc = max([start_datetime_utc] +
+                                     [meter_ranges[meter_id][0] for meter_id in station_meter_ids])
+            end_datetime_utc = min(meter_ranges[meter_id][1] for meter_id in station_meter_ids)
+            if start_datetime_utc > end_datetime_utc:
+                continue
+
+            station_meter_ids = sorted(station_meter_ids)
+            cursor.execute(" SELECT start_datetime_utc, SUM(actual_value) "
+                           " FROM tbl_meter_hourly "
+                           " WHERE meter_id IN (" + ', '.join(['%s'] * len(station_meter_ids)) + ") "
+                           "       AND start_datetime_utc >= %s "
+                           "       AND start_datetime_utc <= %s "
+                           " GROUP BY start_datetime_utc "
+                           " ORDER BY start_datetime_utc ",
+                           tuple(station_meter_ids) + (start_datetime_utc, end_datetime_utc))
+            rows = [(station_id, row[0], row[1]) for row in cursor.fetchall()]
+            if len(rows) == 0:
+                continue
+            # executemany sends an INSERT ... VALUES statement as one multi-row insert
+            for i in range(0, len(rows), _INSERT_BATCH_SIZE):
+                cursor.executemany(" INSERT INTO " + table +
+                                   " (" + station_column + ", start_datetime_utc, actual_value) "
+                                   " VALUES (%s, %s, %s) ", rows[i:i + _INSERT_BATCH_SIZE])
+            cnx.commit()
+            print("Saved " + str(len(rows)) + " rows of station " + str(station_id) + " in " + table)
+
+    except Exception as e:
+        return "Error in stations worker of " + table + " in " + database + " " + str(e)
+    finally:
+        for cursor_db, cnx_db in ((cursor_system_db, cnx_system_db), (cursor, cnx)):
+            if cursor_db:
+                cursor_db.close()
+            if cnx_db:
+                cnx_db.close()
+
+    return None
@@ -1,173 +1,13 @@
+import threading
 import falcon
 from falcon_cors import CORS
 from falcon_multipart.middleware import MultipartMiddleware
 # for debugging this api on Linux or macOS
 from wsgiref import simple_server
+import config
 
-from core import advancedreport, apikey, command, controlmode, energyflowdiagram, \
-    privilege, textmessage, distributioncircuit, virtualmeter, \
-    costcenter, point, knowledgefile, meter, tariff, user, storetype, timezone, \
-    costfile, offlinemeterfile, version, contact, emailserver, combinedequipment, datasource, equipment, tenant, \
-    shopfloor, webmessage, distributionsystem, store, emailmessage, tenanttype, wechatmessage, space, gateway, \
-    offlinemeter, rule, energycategory, sensor, energyitem, notification, menu, datarepairfile, workingcalendar, \
-    microgrid,  virtualpowerplant, energystoragecontainer, energystoragepowerstation, photovoltaicpowerstation, \
-    windfarm, energyplanfile, svg, protocol, ticket
-
-from reports import advancedreportfile
-from reports import combinedequipmentbatch
-from reports import combinedequipmentcarbon
-from reports import combinedequipmentcost
-from reports import combinedequipmentefficiency
-from reports import combinedequipmentenergycategory
-from reports import combinedequipmentenergyitem
-from reports import combinedequipmentincome
-from reports import combinedequipmentload
-from reports import combinedequipmentoutput
-from reports import combinedequipmentplan
-from reports import combinedequipmentsaving
-from reports import combinedequipmentstatistics
-from reports import dashboard
-from reports import distributionsystem as distributionsystemreport
-from reports import energyflowdiagram as energyflowdiagramreport
-from reports import equipmentbatch
-from reports import equipmentcarbon
-from reports import equipmentcost
-from reports import equipmentefficiency
-from reports import equipmentenergycategory
-from reports import equipmentenergyitem
-from reports import equipmentincome
-from reports import equipmentload
-from reports import equipmentoutput
-from reports import equipmentplan
-from reports import equipmentsaving
-from reports import equipmentstatistics
-from reports import equipmenttracking
-from reports import energystoragepowerstationdashboard
-from reports import energystoragepowerstationitemdashboard
-from reports import energystoragepowerstationdetails
-from reports import energystoragepowerstationdetailsbms
-from reports import energystoragepowerstationdetailscommand
-from reports import energystoragepowerstationdetailsfirecontrol
-from reports import energystoragepowerstationdetailshvac
-from reports import energystoragepowerstationdetailsgrid
-from reports import energystoragepowerstationdetailsload
-from reports import energystoragepowerstationdetailsdcdc
-from reports import energystoragepowerstationdetailspcs
-from reports import energystoragepowerstationdetailssts
-from reports import energystoragepowerstationdetailsschedule
-from reports import energystoragepowerstationlist
-from reports import energystoragepowerstationreportingrevenue
-from reports import energystoragepowerstationreportingenergy
-from reports import energystoragepowerstationreportingparameters
-from reports import energystoragepowerstationcollectionenergy
-from reports import energystoragepowerstationitemenergy
-from reports import energystoragepowerstationcollectionbilling
-from reports import energystoragepowerstationitembilling
-from reports import energystoragepowerstationcollectioncarbon
-from reports import energystoragepowerstationitemcarbon
-from reports import enterproduction
-from reports import spaceproduction
-from reports import fddfault
-from reports import meterbatch
-from reports import metercarbon
-from reports import metercomparison
-from reports import metercost
-from reports import meterenergy
-from reports import meterrealtime
-from reports import meterplan
-from reports import metersaving
-from reports import metersubmetersbalance
-from reports import metertracking
-from reports import metertrend
-from reports import microgriddashboard
-from reports import microgriddetails
-from reports import microgriddetailsbms
-from reports import microgriddetailsevcharger
-from reports import microgriddetailsgenerator
-from reports import microgriddetailsgrid
-from reports import microgriddetailsheatpump
-from reports import microgriddetailsload
-from reports import microgriddetailspcs
-from reports import microgriddetailspv
-from reports import microgridlist
-from reports import microgridreportingenergy
-from reports import microgridsenergy
-from reports import microgridsbilling
-from reports import microgridscarbon
-from reports import offlinemeterbatch
-from reports import offlinemetercarbon
-from reports import offlinemetercost
-from reports import offlinemeterenergy
-from reports import offlinemeterplan
-from reports import offlinemetersaving
-from reports import offlinemeterdaily
-from reports import offlinemeterinput
-from reports import photovoltaicpowerstationdashboard
-from reports import photovoltaicpowerstationitemdashboard
-from reports import photovoltaicpowerstationdetails
-from reports import photovoltaicpowerstationdetailsmeter
-from reports import photovoltaicpowerstationdetailsinvertor
-from reports import photovoltaicpowerstationlist
-from reports import photovoltaicpowerstationreportingrevenue
-from reports import photovoltaicpowerstationreportingenergy
-from reports import photovoltaicpowerstationreportingparameters
-from reports import photovoltaicpowerstationcollectionenergy
-from reports import photovoltaicpowerstationitemenergy
-from reports import photovoltaicpowerstationcollectionbilling
-from reports import photovoltaicpowerstationitembilling
-from reports import photovoltaicpowerstationcollectioncarbon
-from reports import photovoltaicpowerstationitemcarbon
-from reports import shopfloorbatch
-from reports import shopfloorcarbon
-from reports import shopfloorcost
-from reports import shopfloordashboard
-from reports import shopfloorenergycategory
-from reports import shopfloorenergyitem
-from reports import shopfloorload
-from reports import shopfloorplan
-from reports import shopfloorsaving
-from reports import shopfloorstatistics
-from reports import spacecarbon
-from reports import spacecost
-from reports import spaceefficiency
-from reports import spaceenergycategory
-from reports import spaceenergyitem
-from reports import spaceenvironmentmonitor
-from reports import spaceincome
-from reports import spaceload
-from reports import spaceoutput
-from reports import spacesaving
-from reports import spaceplan
-from reports import spaceprediction
-from reports import spacestatistics
-from reports import storebatch
-from reports import storecarbon
-from reports import storecost
-from reports import storedashboard
-from reports import storeenergycategory
-from reports import storeenergyitem
-from reports import storeload
-from reports import storesaving
-from reports import storeplan
-from reports import storestatistics
-from reports import pointrealtime
-from reports import tenantbatch
-from reports import tenantbill
-from reports import tenantcarbon
-from reports import tenantcost
-from reports import tenantdashboard
-from reports import tenantenergycategory
-from reports import tenantenergyitem
-from reports import tenantload
-from reports import tenantsaving
-from reports import tenantplan
-from reports import tenantstatistics
-from reports import virtualmeterbatch
-from reports import virtualmetercarbon
-from reports import virtualmetercost
-from reports import virtualmeterenergy
-from reports import virtualmetersaving
-from reports import virtualmeterplan
+from core import payloadencoding, profiling
+from core.routing import LazyResource, LazyRouter, freeze
 
 ########################################################################################################################
 # BEGIN imports for Enterprise Version
@@ -183,1211 +23,1243 @@ from reports import virtualmeterplan
 cors = CORS(allow_all_origins=True,
             allow_credentials_all_origins=True,
             allow_all_headers=True,
-            allow_all_methods=True)
-api = falcon.App(middleware=[cors.middleware, MultipartMiddleware()])
+            allow_all_methods=True,
+            expose_headers_list=['ETag', 'Last-Modified', 'X-Total-Count'])
+# the resources of the routes are imported on the first request of each route, see core/routing.py
+router = LazyRouter()
+middleware = [cors.middleware, MultipartMiddleware(), payloadencoding.CompressionMiddleware()]
+# the profiling middleware is the outermost one, so that it measures the other middleware too
+if config.is_profiling_enabled:
+    profiling.install()
+    middleware.insert(0, profiling.ProfilingMiddleware())
+api = falcon.App(middleware=middleware, router=router)
+
+# start the chart renderer in background to keep the first excel export with charts fast
+if config.is_chart_renderer_warmed_up:
+    from excelexporters import chartrenderer
+    threading.Thread(target=chartrenderer.warm_up, daemon=True).start()
 
 ########################################################################################################################
 # Routes for System Core
 ########################################################################################################################
 api.add_route('/advancedreports',
-              advancedreport.AdvancedReportCollection())
+              LazyResource('core.advancedreport', 'AdvancedReportCollection'))
 api.add_route('/advancedreports/{id_}',
-              advancedreport.AdvancedReportItem())
+              LazyResource('core.advancedreport', 'AdvancedReportItem'))
 api.add_route('/advancedreports/{id_}/run',
-              advancedreport.AdvancedReportRun())
+              LazyResource('core.advancedreport', 'AdvancedReportRun'))
 api.add_route('/advancedreports/{id_}/export',
-              advancedreport.AdvancedReportExport())
+              LazyResource('core.advancedreport', 'AdvancedReportExport'))
 api.add_route('/advancedreports/import',
-              advancedreport.AdvancedReportImport())
+              LazyResource('core.advancedreport', 'AdvancedReportImport'))
 api.add_route('/advancedreports/{id_}/clone',
-              advancedreport.AdvancedReportClone())
+              LazyResource('core.advancedreport', 'AdvancedReportClone'))
 
 api.add_route('/combinedequipments',
-              combinedequipment.CombinedEquipmentCollection())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentCollection'))
 api.add_route('/combinedequipments/{id_}',
-              combinedequipment.CombinedEquipmentItem())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentItem'))
 api.add_route('/combinedequipments/{id_}/equipments',
-              combinedequipment.CombinedEquipmentEquipmentCollection())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentEquipmentCollection'))
 api.add_route('/combinedequipments/{id_}/equipments/{eid}',
-              combinedequipment.CombinedEquipmentEquipmentItem())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentEquipmentItem'))
 api.add_route('/combinedequipments/{id_}/meters',
-              combinedequipment.CombinedEquipmentMeterCollection())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentMeterCollection'))
 api.add_route('/combinedequipments/{id_}/meters/{mid}',
-              combinedequipment.CombinedEquipmentMeterItem())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentMeterItem'))
 api.add_route('/combinedequipments/{id_}/offlinemeters',
-              combinedequipment.CombinedEquipmentOfflineMeterCollection())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentOfflineMeterCollection'))
 api.add_route('/combinedequipments/{id_}/offlinemeters/{mid}',
-              combinedequipment.CombinedEquipmentOfflineMeterItem())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentOfflineMeterItem'))
 api.add_route('/combinedequipments/{id_}/parameters',
-              combinedequipment.CombinedEquipmentParameterCollection())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentParameterCollection'))
 api.add_route('/combinedequipments/{id_}/parameters/{pid}',
-              combinedequipment.CombinedEquipmentParameterItem())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentParameterItem'))
 api.add_route('/combinedequipments/{id_}/virtualmeters',
-              combinedequipment.CombinedEquipmentVirtualMeterCollection())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentVirtualMeterCollection'))
 api.add_route('/combinedequipments/{id_}/virtualmeters/{mid}',
-              combinedequipment.CombinedEquipmentVirtualMeterItem())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentVirtualMeterItem'))
 api.add_route('/combinedequipments/{id_}/commands',
-              combinedequipment.CombinedEquipmentCommandCollection())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentCommandCollection'))
 api.add_route('/combinedequipments/{id_}/commands/{cid}',
-              combinedequipment.CombinedEquipmentCommandItem())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentCommandItem'))
 api.add_route('/combinedequipments/{id_}/export',
-              combinedequipment.CombinedEquipmentExport())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentExport'))
 api.add_route('/combinedequipments/import',
-              combinedequipment.CombinedEquipmentImport())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentImport'))
 api.add_route('/combinedequipments/{id_}/clone',
-              combinedequipment.CombinedEquipmentClone())
+              LazyResource('core.combinedequipment', 'CombinedEquipmentClone'))
 
 api.add_route('/commands',
-              command.CommandCollection())
+              LazyResource('core.command', 'CommandCollection'))
 api.add_route('/commands/{id_}',
-              command.CommandItem())
+              LazyResource('core.command', 'CommandItem'))
 api.add_route('/commands/{id_}/send',
-              command.CommandSend())
+              LazyResource('core.command', 'CommandSend'))
 api.add_route('/commands/{id_}/export',
-              command.CommandExport())
+              LazyResource('core.command', 'CommandExport'))
 api.add_route('/commands/import',
-              command.CommandImport())
+              LazyResource('core.command', 'CommandImport'))
+api.add_route('/commands/send',
+              LazyResource('core.command', 'CommandBatchSend'))
 api.add_route('/commands/{id_}/clone',
-              command.CommandClone())
+              LazyResource('core.command', 'CommandClone'))
 
 api.add_route('/contacts',
-              contact.ContactCollection())
+              LazyResource('core.contact', 'ContactCollection'))
 api.add_route('/contacts/{id_}',
-              contact.ContactItem())
+              LazyResource('core.contact', 'ContactItem'))
 
 api.add_route('/controlmodes',
-              controlmode.ControlModeCollection())
+              LazyResource('core.controlmode', 'ControlModeCollection'))
 api.add_route('/controlmodes/{id_}',
-              controlmode.ControlModeItem())
+              LazyResource('core.controlmode', 'ControlModeItem'))
 api.add_route('/controlmodes/{id_}/export',
-              controlmode.ControlModeExport())
+              LazyResource('core.controlmode', 'ControlModeExport'))
 api.add_route('/controlmodes/import',
-              controlmode.ControlModeImport())
+              LazyResource('core.controlmode', 'ControlModeImport'))
 api.add_route('/controlmodes/{id_}/clone',
-              controlmode.ControlModeClone())
+              LazyResource('core.controlmode', 'ControlModeClone'))
 
 api.add_route('/costcenters',
-              costcenter.CostCenterCollection())
+              LazyResource('core.costcenter', 'CostCenterCollection'))
 api.add_route('/costcenters/{id_}',
-              costcenter.CostCenterItem())
+              LazyResource('core.costcenter', 'CostCenterItem'))
 api.add_route('/costcenters/{id_}/tariffs',
-              costcenter.CostCenterTariffCollection())
+              LazyResource('core.costcenter', 'CostCenterTariffCollection'))
 api.add_route('/costcenters/{id_}/tariffs/{tid}',
-              costcenter.CostCenterTariffItem())
+              LazyResource('core.costcenter', 'CostCenterTariffItem'))
 
 api.add_route('/costfiles',
-              costfile.CostFileCollection())
+              LazyResource('core.costfile', 'CostFileCollection'))
 api.add_route('/costfiles/{id_}',
-              costfile.CostFileItem())
+              LazyResource('core.costfile', 'CostFileItem'))
 api.add_route('/costfiles/{id_}/restore',
-              costfile.CostFileRestore())
+              LazyResource('core.costfile', 'CostFileRestore'))
 
 api.add_route('/datarepairfiles',
-              datarepairfile.DataRepairFileCollection())
+              LazyResource('core.datarepairfile', 'DataRepairFileCollection'))
 api.add_route('/datarepairfiles/{id_}',
-              datarepairfile.DataRepairFileItem())
+              LazyResource('core.datarepairfile', 'DataRepairFileItem'))
 api.add_route('/datarepairfiles/{id_}/restore',
-              datarepairfile.DataRepairFileRestore())
+              LazyResource('core.datarepairfile', 'DataRepairFileRestore'))
 
 api.add_route('/datasources',
-              datasource.DataSourceCollection())
+              LazyResource('core.datasource', 'DataSourceCollection'))
 api.add_route('/datasources/{id_}',
-              datasource.DataSourceItem())
+              LazyResource('core.datasource', 'DataSourceItem'))
 api.add_route('/datasources/{id_}/points',
-              datasource.DataSourcePointCollection())
+              LazyResource('core.datasource', 'DataSourcePointCollection'))
 api.add_route('/datasources/{id_}/export',
-              datasource.DataSourceExport())
+              LazyResource('core.datasource', 'DataSourceExport'))
 api.add_route('/datasources/import',
-              datasource.DataSourceImport())
+              LazyResource('core.datasource', 'DataSourceImport'))
 api.add_route('/datasources/{id_}/clone',
-              datasource.DataSourceClone())
+              LazyResource('core.datasource', 'DataSourceClone'))
 
 
 api.add_route('/distributioncircuits',
-              distributioncircuit.DistributionCircuitCollection())
+              LazyResource('core.distributioncircuit', 'DistributionCircuitCollection'))
 api.add_route('/distributioncircuits/{id_}',
-              distributioncircuit.DistributionCircuitItem())
+              LazyResource('core.distributioncircuit', 'DistributionCircuitItem'))
 api.add_route('/distributioncircuits/{id_}/points',
-              distributioncircuit.DistributionCircuitPointCollection())
+              LazyResource('core.distributioncircuit', 'DistributionCircuitPointCollection'))
 api.add_route('/distributioncircuits/{id_}/points/{pid}',
-              distributioncircuit.DistributionCircuitPointItem())
+              LazyResource('core.distributioncircuit', 'DistributionCircuitPointItem'))
 
 api.add_route('/distributionsystems',
-              distributionsystem.DistributionSystemCollection())
+              LazyResource('core.distributionsystem', 'DistributionSystemCollection'))
 api.add_route('/distributionsystems/{id_}',
-              distributionsystem.DistributionSystemItem())
+              LazyResource('core.distributionsystem', 'DistributionSystemItem'))
 api.add_route('/distributionsystems/{id_}/distributioncircuits',
-              distributionsystem.DistributionSystemDistributionCircuitCollection())
+              LazyResource('core.distributionsystem', 'DistributionSystemDistributionCircuitCollection'))
 api.add_route('/distributionsystems/{id_}/export',
-              distributionsystem.DistributionSystemExport())
+              LazyResource('core.distributionsystem', 'DistributionSystemExport'))
 api.add_route('/distributionsystems/import',
-              distributionsystem.DistributionSystemImport())
+              LazyResource('core.distributionsystem', 'DistributionSystemImport'))
 api.add_route('/distributionsystems/{id_}/clone',
-              distributionsystem.DistributionSystemClone())
+              LazyResource('core.distributionsystem', 'DistributionSystemClone'))
 
 api.add_route('/emailmessages',
-              emailmessage.EmailMessageCollection())
+              LazyResource('core.emailmessage', 'EmailMessageCollection'))
 api.add_route('/emailmessages/{id_}',
-              emailmessage.EmailMessageItem())
+              LazyResource('core.emailmessage', 'EmailMessageItem'))
 
 api.add_route('/emailservers',
-              emailserver.EmailServerCollection())
+              LazyResource('core.emailserver', 'EmailServerCollection'))
 api.add_route('/emailservers/{id_}',
-              emailserver.EmailServerItem())
+              LazyResource('core.emailserver', 'EmailServerItem'))
 
 api.add_route('/energycategories',
-              energycategory.EnergyCategoryCollection())
+              LazyResource('core.energycategory', 'EnergyCategoryCollection'))
 api.add_route('/energycategories/{id_}',
-              energycategory.EnergyCategoryItem())
+              LazyResource('core.energycategory', 'EnergyCategoryItem'))
 
 api.add_route('/energyflowdiagrams',
-              energyflowdiagram.EnergyFlowDiagramCollection())
+              LazyResource('core.energyflowdiagram', 'EnergyFlowDiagramCollection'))
 api.add_route('/energyflowdiagrams/{id_}',
-              energyflowdiagram.EnergyFlowDiagramItem())
+              LazyResource('core.energyflowdiagram', 'EnergyFlowDiagramItem'))
 api.add_route('/energyflowdiagrams/{id_}/links',
-              energyflowdiagram.EnergyFlowDiagramLinkCollection())
+              LazyResource('core.energyflowdiagram', 'EnergyFlowDiagramLinkCollection'))
 api.add_route('/energyflowdiagrams/{id_}/links/{lid}',
-              energyflowdiagram.EnergyFlowDiagramLinkItem())
+              LazyResource('core.energyflowdiagram', 'EnergyFlowDiagramLinkItem'))
 api.add_route('/energyflowdiagrams/{id_}/nodes',
-              energyflowdiagram.EnergyFlowDiagramNodeCollection())
+              LazyResource('core.energyflowdiagram', 'EnergyFlowDiagramNodeCollection'))
 api.add_route('/energyflowdiagrams/{id_}/nodes/{nid}',
-              energyflowdiagram.EnergyFlowDiagramNodeItem())
+              LazyResource('core.energyflowdiagram', 'EnergyFlowDiagramNodeItem'))
 api.add_route('/energyflowdiagrams/{id_}/export',
-              energyflowdiagram.EnergyFlowDiagramExport())
+              LazyResource('core.energyflowdiagram', 'EnergyFlowDiagramExport'))
 api.add_route('/energyflowdiagrams/import',
-              energyflowdiagram.EnergyFlowDiagramImport())
+              LazyResource('core.energyflowdiagram', 'EnergyFlowDiagramImport'))
 api.add_route('/energyflowdiagrams/{id_}/clone',
-              energyflowdiagram.EnergyFlowDiagramClone())
+              LazyResource('core.energyflowdiagram', 'EnergyFlowDiagramClone'))
 
 api.add_route('/energyitems',
-              energyitem.EnergyItemCollection())
+              LazyResource('core.energyitem', 'EnergyItemCollection'))
 api.add_route('/energyitems/{id_}',
-              energyitem.EnergyItemItem())
+              LazyResource('core.energyitem', 'EnergyItemItem'))
 
 api.add_route('/energyplanfiles',
-              energyplanfile.EnergyPlanFileCollection())
+              LazyResource('core.energyplanfile', 'EnergyPlanFileCollection'))
 api.add_route('/energyplanfiles/{id_}',
-              energyplanfile.EnergyPlanFileItem())
+              LazyResource('core.energyplanfile', 'EnergyPlanFileItem'))
 api.add_route('/energyplanfiles/{id_}/restore',
-              energyplanfile.EnergyPlanFileRestore())
+              LazyResource('core.energyplanfile', 'EnergyPlanFileRestore'))
 
 api.add_route('/energystoragecontainers',
-              energystoragecontainer.EnergyStorageContainerCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerCollection'))
 api.add_route('/energystoragecontainers/{id_}',
-              energystoragecontainer.EnergyStorageContainerItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerItem'))
 api.add_route('/energystoragecontainers/{id_}/batteries',
-              energystoragecontainer.EnergyStorageContainerBatteryCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerBatteryCollection'))
 api.add_route('/energystoragecontainers/{id_}/batteries/{bid}',
-              energystoragecontainer.EnergyStorageContainerBatteryItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerBatteryItem'))
 api.add_route('/energystoragecontainers/{id_}/batteries/{bid}/points',
-              energystoragecontainer.EnergyStorageContainerBatteryPointCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerBatteryPointCollection'))
 api.add_route('/energystoragecontainers/{id_}/batteries/{bid}/points/{pid}',
-              energystoragecontainer.EnergyStorageContainerBatteryPointItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerBatteryPointItem'))
 api.add_route('/energystoragecontainers/{id_}/commands',
-              energystoragecontainer.EnergyStorageContainerCommandCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerCommandCollection'))
 api.add_route('/energystoragecontainers/{id_}/commands/{cid}',
-              energystoragecontainer.EnergyStorageContainerCommandItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerCommandItem'))
 api.add_route('/energystoragecontainers/{id_}/dcdcs',
-              energystoragecontainer.EnergyStorageContainerDCDCCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerDCDCCollection'))
 api.add_route('/energystoragecontainers/{id_}/dcdcs/{did}',
-              energystoragecontainer.EnergyStorageContainerDCDCItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerDCDCItem'))
 api.add_route('/energystoragecontainers/{id_}/dcdcs/{did}/points',
-              energystoragecontainer.EnergyStorageContainerDCDCPointCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerDCDCPointCollection'))
 api.add_route('/energystoragecontainers/{id_}/dcdcs/{did}/points/{pid}',
-              energystoragecontainer.EnergyStorageContainerDCDCPointItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerDCDCPointItem'))
 api.add_route('/energystoragecontainers/{id_}/firecontrols',
-              energystoragecontainer.EnergyStorageContainerFirecontrolCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerFirecontrolCollection'))
 api.add_route('/energystoragecontainers/{id_}/firecontrols/{fid}',
-              energystoragecontainer.EnergyStorageContainerFirecontrolItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerFirecontrolItem'))
 api.add_route('/energystoragecontainers/{id_}/firecontrols/{fid}/points',
-              energystoragecontainer.EnergyStorageContainerFirecontrolPointCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerFirecontrolPointCollection'))
 api.add_route('/energystoragecontainers/{id_}/firecontrols/{fid}/points/{pid}',
-              energystoragecontainer.EnergyStorageContainerFirecontrolPointItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerFirecontrolPointItem'))
 api.add_route('/energystoragecontainers/{id_}/grids',
-              energystoragecontainer.EnergyStorageContainerGridCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerGridCollection'))
 api.add_route('/energystoragecontainers/{id_}/grids/{gid}',
-              energystoragecontainer.EnergyStorageContainerGridItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerGridItem'))
 api.add_route('/energystoragecontainers/{id_}/grids/{gid}/points',
-              energystoragecontainer.EnergyStorageContainerGridPointCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerGridPointCollection'))
 api.add_route('/energystoragecontainers/{id_}/grids/{gid}/points/{pid}',
-              energystoragecontainer.EnergyStorageContainerGridPointItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerGridPointItem'))
 api.add_route('/energystoragecontainers/{id_}/hvacs',
-              energystoragecontainer.EnergyStorageContainerHVACCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerHVACCollection'))
 api.add_route('/energystoragecontainers/{id_}/hvacs/{hid}',
-              energystoragecontainer.EnergyStorageContainerHVACItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerHVACItem'))
 api.add_route('/energystoragecontainers/{id_}/hvacs/{hid}/points',
-              energystoragecontainer.EnergyStorageContainerHVACPointCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerHVACPointCollection'))
 api.add_route('/energystoragecontainers/{id_}/hvacs/{hid}/points/{pid}',
-              energystoragecontainer.EnergyStorageContainerHVACPointItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerHVACPointItem'))
 api.add_route('/energystoragecontainers/{id_}/loads',
-              energystoragecontainer.EnergyStorageContainerLoadCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerLoadCollection'))
 api.add_route('/energystoragecontainers/{id_}/loads/{lid}',
-              energystoragecontainer.EnergyStorageContainerLoadItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerLoadItem'))
 api.add_route('/energystoragecontainers/{id_}/loads/{lid}/points',
-              energystoragecontainer.EnergyStorageContainerLoadPointCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerLoadPointCollection'))
 api.add_route('/energystoragecontainers/{id_}/loads/{lid}/points/{pid}',
-              energystoragecontainer.EnergyStorageContainerLoadPointItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerLoadPointItem'))
 api.add_route('/energystoragecontainers/{id_}/powerconversionsystems',
-              energystoragecontainer.EnergyStorageContainerPCSCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerPCSCollection'))
 api.add_route('/energystoragecontainers/{id_}/powerconversionsystems/{pcsid}',
-              energystoragecontainer.EnergyStorageContainerPCSItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerPCSItem'))
 api.add_route('/energystoragecontainers/{id_}/powerconversionsystems/{pcsid}/points',
-              energystoragecontainer.EnergyStorageContainerPCSPointCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerPCSPointCollection'))
 api.add_route('/energystoragecontainers/{id_}/powerconversionsystems/{pcsid}/points/{pid}',
-              energystoragecontainer.EnergyStorageContainerPCSPointItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerPCSPointItem'))
 api.add_route('/energystoragecontainers/{id_}/schedules',
-              energystoragecontainer.EnergyStorageContainerScheduleCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerScheduleCollection'))
 api.add_route('/energystoragecontainers/{id_}/schedules/{sid}',
-              energystoragecontainer.EnergyStorageContainerScheduleItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerScheduleItem'))
 api.add_route('/energystoragecontainers/{id_}/stses',
-              energystoragecontainer.EnergyStorageContainerSTSCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerSTSCollection'))
 api.add_route('/energystoragecontainers/{id_}/stses/{fid}',
-              energystoragecontainer.EnergyStorageContainerSTSItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerSTSItem'))
 api.add_route('/energystoragecontainers/{id_}/stses/{fid}/points',
-              energystoragecontainer.EnergyStorageContainerSTSPointCollection())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerSTSPointCollection'))
 api.add_route('/energystoragecontainers/{id_}/stses/{fid}/points/{pid}',
-              energystoragecontainer.EnergyStorageContainerSTSPointItem())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerSTSPointItem'))
 api.add_route('/energystoragecontainers/{id_}/clone',
-              energystoragecontainer.EnergyStorageContainerClone())
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerClone'))
 api.add_route('/energystoragecontainers/{id_}/export',
-              energystoragecontainer.EnergyStorageContainerExport)
+              LazyResource('core.energystoragecontainer', 'EnergyStorageContainerExport'))
 
 api.add_route('/energystoragepowerstations',
-              energystoragepowerstation.EnergyStoragePowerStationCollection())
+              LazyResource('core.energystoragepowerstation', 'EnergyStoragePowerStationCollection'))
 api.add_route('/energystoragepowerstations/{id_}',
-              energystoragepowerstation.EnergyStoragePowerStationItem())
+              LazyResource('core.energystoragepowerstation', 'EnergyStoragePowerStationItem'))
 api.add_route('/energystoragepowerstations/{id_}/containers',
-              energystoragepowerstation.EnergyStoragePowerStationContainerCollection())
+              LazyResource('core.energystoragepowerstation', 'EnergyStoragePowerStationContainerCollection'))
 api.add_route('/energystoragepowerstations/{id_}/containers/{sid}',
-              energystoragepowerstation.EnergyStoragePowerStationContainerItem())
+              LazyResource('core.energystoragepowerstation', 'EnergyStoragePowerStationContainerItem'))
 api.add_route('/energystoragepowerstations/{id_}/users',
-              energystoragepowerstation.EnergyStoragePowerStationUserCollection())
+              LazyResource('core.energystoragepowerstation', 'EnergyStoragePowerStationUserCollection'))
 api.add_route('/energystoragepowerstations/{id_}/users/{uid}',
-              energystoragepowerstation.EnergyStoragePowerStationUserItem())
+              LazyResource('core.energystoragepowerstation', 'EnergyStoragePowerStationUserItem'))
 api.add_route('/energystoragepowerstations/{id_}/export',
-              energystoragepowerstation.EnergyStoragePowerStationExport())
+              LazyResource('core.energystoragepowerstation', 'EnergyStoragePowerStationExport'))
 api.add_route('/energystoragepowerstations/import',
-              energystoragepowerstation.EnergyStoragePowerStationImport())
+              LazyResource('core.energystoragepowerstation', 'EnergyStoragePowerStationImport'))
 api.add_route('/energystoragepowerstations/{id_}/clone',
-              energystoragepowerstation.EnergyStoragePowerStationClone())
+              LazyResource('core.energystoragepowerstation', 'EnergyStoragePowerStationClone'))
 
 
 api.add_route('/equipments',
-              equipment.EquipmentCollection())
+              LazyResource('core.equipment', 'EquipmentCollection'))
 api.add_route('/equipments/{id_}',
-              equipment.EquipmentItem())
+              LazyResource('core.equipment', 'EquipmentItem'))
 api.add_route('/equipments/{id_}/meters',
-              equipment.EquipmentMeterCollection())
+              LazyResource('core.equipment', 'EquipmentMeterCollection'))
 api.add_route('/equipments/{id_}/meters/{mid}',
-              equipment.EquipmentMeterItem())
+              LazyResource('core.equipment', 'EquipmentMeterItem'))
 api.add_route('/equipments/{id_}/offlinemeters',
-              equipment.EquipmentOfflineMeterCollection())
+              LazyResource('core.equipment', 'EquipmentOfflineMeterCollection'))
 api.add_route('/equipments/{id_}/offlinemeters/{mid}',
-              equipment.EquipmentOfflineMeterItem())
+              LazyResource('core.equipment', 'EquipmentOfflineMeterItem'))
 api.add_route('/equipments/{id_}/parameters',
-              equipment.EquipmentParameterCollection())
+              LazyResource('core.equipment', 'EquipmentParameterCollection'))
 api.add_route('/equipments/{id_}/parameters/{pid}',
-              equipment.EquipmentParameterItem())
+              LazyResource('core.equipment', 'EquipmentParameterItem'))
 api.add_route('/equipments/{id_}/virtualmeters',
-              equipment.EquipmentVirtualMeterCollection())
+              LazyResource('core.equipment', 'EquipmentVirtualMeterCollection'))
 api.add_route('/equipments/{id_}/virtualmeters/{mid}',
-              equipment.EquipmentVirtualMeterItem())
+              LazyResource('core.equipment', 'EquipmentVirtualMeterItem'))
 api.add_route('/equipments/{id_}/commands',
-              equipment.EquipmentCommandCollection())
+              LazyResource('core.equipment', 'EquipmentCommandCollection'))
 api.add_route('/equipments/{id_}/commands/{cid}',
-              equipment.EquipmentCommandItem())
+              LazyResource('core.equipment', 'EquipmentCommandItem'))
 api.add_route('/equipments/{id_}/export',
-              equipment.EquipmentExport())
+              LazyResource('core.equipment', 'EquipmentExport'))
 api.add_route('/equipments/import',
-              equipment.EquipmentImport())
+              LazyResource('core.equipment', 'EquipmentImport'))
 api.add_route('/equipments/{id_}/clone',
-              equipment.EquipmentClone())
+              LazyResource('core.equipment', 'EquipmentClone'))
 
 api.add_route('/gateways',
-              gateway.GatewayCollection())
+              LazyResource('core.gateway', 'GatewayCollection'))
 api.add_route('/gateways/{id_}',
-              gateway.GatewayItem())
+              LazyResource('core.gateway', 'GatewayItem'))
 api.add_route('/gateways/{id_}/datasources',
-              gateway.GatewayDataSourceCollection())
+              LazyResource('core.gateway', 'GatewayDataSourceCollection'))
 api.add_route('/gateways/{id_}/export',
-              gateway.GatewayExport())
+              LazyResource('core.gateway', 'GatewayExport'))
 api.add_route('/gateways/import',
-              gateway.GatewayImport())
+              LazyResource('core.gateway', 'GatewayImport'))
 api.add_route('/gateways/{id_}/clone',
-              gateway.GatewayClone())
+              LazyResource('core.gateway', 'GatewayClone'))
 
 api.add_route('/knowledgefiles',
-              knowledgefile.KnowledgeFileCollection())
+              LazyResource('core.knowledgefile', 'KnowledgeFileCollection'))
 api.add_route('/knowledgefiles/{id_}',
-              knowledgefile.KnowledgeFileItem())
+              LazyResource('core.knowledgefile', 'KnowledgeFileItem'))
 api.add_route('/knowledgefiles/{id_}/restore',
-              knowledgefile.KnowledgeFileRestore())
+              LazyResource('core.knowledgefile', 'KnowledgeFileRestore'))
 
 api.add_route('/menus',
-              menu.MenuCollection())
+              LazyResource('core.menu', 'MenuCollection'))
 api.add_route('/menus/{id_}',
-              menu.MenuItem())
+              LazyResource('core.menu', 'MenuItem'))
 api.add_route('/menus/{id_}/children',
-              menu.MenuChildrenCollection())
+              LazyResource('core.menu', 'MenuChildrenCollection'))
 api.add_route('/menus/web',
-              menu.MenuWebCollection())
+              LazyResource('core.menu', 'MenuWebCollection'))
 
 api.add_route('/meters',
-              meter.MeterCollection())
+              LazyResource('core.meter', 'MeterCollection'))
 api.add_route('/meters/{id_}',
-              meter.MeterItem())
+              LazyResource('core.meter', 'MeterItem'))
 api.add_route('/meters/{id_}/submeters',
-              meter.MeterSubmeterCollection())
+              LazyResource('core.meter', 'MeterSubmeterCollection'))
 api.add_route('/meters/{id_}/points',
-              meter.MeterPointCollection())
+              LazyResource('core.meter', 'MeterPointCollection'))
 api.add_route('/meters/{id_}/points/{pid}',
-              meter.MeterPointItem())
+              LazyResource('core.meter', 'MeterPointItem'))
 api.add_route('/meters/{id_}/commands',
-              meter.MeterCommandCollection())
+              LazyResource('core.meter', 'MeterCommandCollection'))
 api.add_route('/meters/{id_}/commands/{cid}',
-              meter.MeterCommandItem())
+              LazyResource('core.meter', 'MeterCommandItem'))
 api.add_route('/meters/{id_}/export',
-              meter.MeterExport())
+              LazyResource('core.meter', 'MeterExport'))
 api.add_route('/meters/import',
-              meter.MeterImport())
+              LazyResource('core.meter', 'MeterImport'))
 api.add_route('/meters/{id_}/clone',
-              meter.MeterClone())
+              LazyResource('core.meter', 'MeterClone'))
 
 
 api.add_route('/microgrids',
-              microgrid.MicrogridCollection())
+              LazyResource('core.microgrid', 'MicrogridCollection'))
 api.add_route('/microgrids/{id_}',
-              microgrid.MicrogridItem())
+              LazyResource('core.microgrid', 'MicrogridItem'))
 api.add_route('/microgrids/{id_}/sensors',
-              microgrid.MicrogridSensorCollection())
+              LazyResource('core.microgrid', 'MicrogridSensorCollection'))
 api.add_route('/microgrids/{id_}/sensors/{sid}',
-              microgrid.MicrogridSensorItem())
+              LazyResource('core.microgrid', 'MicrogridSensorItem'))
 api.add_route('/microgrids/{id_}/batteries',
-              microgrid.MicrogridBatteryCollection())
+              LazyResource('core.microgrid', 'MicrogridBatteryCollection'))
 api.add_route('/microgrids/{id_}/batteries/{bid}',
-              microgrid.MicrogridBatteryItem())
+              LazyResource('core.microgrid', 'MicrogridBatteryItem'))
 api.add_route('/microgrids/{id_}/evchargers',
-              microgrid.MicrogridEVChargerCollection())
+              LazyResource('core.microgrid', 'MicrogridEVChargerCollection'))
 api.add_route('/microgrids/{id_}/evchargers/{eid}',
-              microgrid.MicrogridEVChargerItem())
+              LazyResource('core.microgrid', 'MicrogridEVChargerItem'))
 api.add_route('/microgrids/{id_}/generators',
-              microgrid.MicrogridGeneratorCollection())
+              LazyResource('core.microgrid', 'MicrogridGeneratorCollection'))
 api.add_route('/microgrids/{id_}/generators/{gid}',
-              microgrid.MicrogridGeneratorItem())
+              LazyResource('core.microgrid', 'MicrogridGeneratorItem'))
 api.add_route('/microgrids/{id_}/grids',
-              microgrid.MicrogridGridCollection())
+              LazyResource('core.microgrid', 'MicrogridGridCollection'))
 api.add_route('/microgrids/{id_}/grids/{gid}',
-              microgrid.MicrogridGridItem())
+              LazyResource('core.microgrid', 'MicrogridGridItem'))
 api.add_route('/microgrids/{id_}/heatpumps',
-              microgrid.MicrogridHeatpumpCollection())
+              LazyResource('core.microgrid', 'MicrogridHeatpumpCollection'))
 api.add_route('/microgrids/{id_}/heatpumps/{hid}',
-              microgrid.MicrogridHeatpumpItem())
+              LazyResource('core.microgrid', 'MicrogridHeatpumpItem'))
 api.add_route('/microgrids/{id_}/loads',
-              microgrid.MicrogridLoadCollection())
+              LazyResource('core.microgrid', 'MicrogridLoadCollection'))
 api.add_route('/microgrids/{id_}/loads/{lid}',
-              microgrid.MicrogridLoadItem())
+              LazyResource('core.microgrid', 'MicrogridLoadItem'))
 api.add_route('/microgrids/{id_}/photovoltaics',
-              microgrid.MicrogridPhotovoltaicCollection())
+              LazyResource('core.microgrid', 'MicrogridPhotovoltaicCollection'))
 api.add_route('/microgrids/{id_}/photovoltaics/{pid}',
-              microgrid.MicrogridPhotovoltaicItem())
+              LazyResource('core.microgrid', 'MicrogridPhotovoltaicItem'))
 api.add_route('/microgrids/{id_}/powerconversionsystems',
-              microgrid.MicrogridPowerconversionsystemCollection())
+              LazyResource('core.microgrid', 'MicrogridPowerconversionsystemCollection'))
 api.add_route('/microgrids/{id_}/powerconversionsystems/{pid}',
-              microgrid.MicrogridPowerconversionsystemItem())
+              LazyResource('core.microgrid', 'MicrogridPowerconversionsystemItem'))
 api.add_route('/microgrids/{id_}/schedules',
-              microgrid.MicrogridScheduleCollection())
+              LazyResource('core.microgrid', 'MicrogridScheduleCollection'))
 api.add_route('/microgrids/{id_}/schedules/{sid}',
-              microgrid.MicrogridScheduleItem())
+              LazyResource('core.microgrid', 'MicrogridScheduleItem'))
 api.add_route('/microgrids/{id_}/users',
-              microgrid.MicrogridUserCollection())
+              LazyResource('core.microgrid', 'MicrogridUserCollection'))
 api.add_route('/microgrids/{id_}/users/{uid}',
-              microgrid.MicrogridUserItem())
+              LazyResource('core.microgrid', 'MicrogridUserItem'))
 api.add_route('/microgrids/{id_}/export',
-              microgrid.MicrogridExport())
+              LazyResource('core.microgrid', 'MicrogridExport'))
 api.add_route('/microgrids/import',
-              microgrid.MicrogridImport())
+              LazyResource('core.microgrid', 'MicrogridImport'))
 api.add_route('/microgrids/{id_}/clone',
-              microgrid.MicrogridClone())
+              LazyResource('core.microgrid', 'MicrogridClone'))
 
 api.add_route('/notifications',
-              notification.NotificationCollection())
+              LazyResource('core.notification', 'NotificationCollection'))
 api.add_route('/notifications/{id_}',
-              notification.NotificationItem())
+              LazyResource('core.notification', 'NotificationItem'))
 
 api.add_route('/offlinemeters',
-              offlinemeter.OfflineMeterCollection())
+              LazyResource('core.offlinemeter', 'OfflineMeterCollection'))
 api.add_route('/offlinemeters/{id_}',
-              offlinemeter.OfflineMeterItem())
+              LazyResource('core.offlinemeter', 'OfflineMeterItem'))
 api.add_route('/offlinemeters/{id_}/export',
-              offlinemeter.OfflineMeterExport())
+              LazyResource('core.offlinemeter', 'OfflineMeterExport'))
 api.add_route('/offlinemeters/import',
-              offlinemeter.OfflineMeterImport())
+              LazyResource('core.offlinemeter', 'OfflineMeterImport'))
 api.add_route('/offlinemeters/{id_}/clone',
-              offlinemeter.OfflineMeterClone())
+              LazyResource('core.offlinemeter', 'OfflineMeterClone'))
 
 api.add_route('/offlinemeterfiles',
-              offlinemeterfile.OfflineMeterFileCollection())
+              LazyResource('core.offlinemeterfile', 'OfflineMeterFileCollection'))
 api.add_route('/offlinemeterfiles/{id_}',
-              offlinemeterfile.OfflineMeterFileItem())
+              LazyResource('core.offlinemeterfile', 'OfflineMeterFileItem'))
 api.add_route('/offlinemeterfiles/{id_}/restore',
-              offlinemeterfile.OfflineMeterFileRestore())
+              LazyResource('core.offlinemeterfile', 'OfflineMeterFileRestore'))
 
 api.add_route('/photovoltaicpowerstations',
-              photovoltaicpowerstation.PhotovoltaicPowerStationCollection())
+              LazyResource('core.photovoltaicpowerstation', 'PhotovoltaicPowerStationCollection'))
 api.add_route('/photovoltaicpowerstations/{id_}',
-              photovoltaicpowerstation.PhotovoltaicPowerStationItem())
+              LazyResource('core.photovoltaicpowerstation', 'PhotovoltaicPowerStationItem'))
 api.add_route('/photovoltaicpowerstations/{id_}/export',
-              photovoltaicpowerstation.PhotovoltaicPowerStationExport())
+              LazyResource('core.photovoltaicpowerstation', 'PhotovoltaicPowerStationExport'))
 api.add_route('/photovoltaicpowerstations/import',
-              photovoltaicpowerstation.PhotovoltaicPowerStationImport())
+              LazyResource('core.photovoltaicpowerstation', 'PhotovoltaicPowerStationImport'))
 api.add_route('/photovoltaicpowerstations/{id_}/clone',
-              photovoltaicpowerstation.PhotovoltaicPowerStationClone())
+              LazyResource('core.photovoltaicpowerstation', 'PhotovoltaicPowerStationClone'))
 api.add_route('/photovoltaicpowerstations/{id_}/grids',
-              photovoltaicpowerstation.PhotovoltaicPowerStationGridCollection())
+              LazyResource('core.photovoltaicpowerstation', 'PhotovoltaicPowerStationGridCollection'))
 api.add_route('/photovoltaicpowerstations/{id_}/grids/{gid}',
-              photovoltaicpowerstation.PhotovoltaicPowerStationGridItem())
+              LazyResource('core.photovoltaicpowerstation', 'PhotovoltaicPowerStationGridItem'))
 api.add_route('/photovoltaicpowerstations/{id_}/invertors',
-              photovoltaicpowerstation.PhotovoltaicPowerStationInvertorCollection())
+              LazyResource('core.photovoltaicpowerstation', 'PhotovoltaicPowerStationInvertorCollection'))
 api.add_route('/photovoltaicpowerstations/{id_}/invertors/{iid}',
-              photovoltaicpowerstation.PhotovoltaicPowerStationInvertorItem())
+              LazyResource('core.photovoltaicpowerstation', 'PhotovoltaicPowerStationInvertorItem'))
 api.add_route('/photovoltaicpowerstations/{id_}/loads',
-              photovoltaicpowerstation.PhotovoltaicPowerStationLoadCollection())
+              LazyResource('core.photovoltaicpowerstation', 'PhotovoltaicPowerStationLoadCollection'))
 api.add_route('/photovoltaicpowerstations/{id_}/loads/{lid}',
-              photovoltaicpowerstation.PhotovoltaicPowerStationLoadItem())
+              LazyResource('core.photovoltaicpowerstation', 'PhotovoltaicPowerStationLoadItem'))
 api.add_route('/photovoltaicpowerstations/{id_}/users',
-              photovoltaicpowerstation.PhotovoltaicPowerStationUserCollection())
+              LazyResource('core.photovoltaicpowerstation', 'PhotovoltaicPowerStationUserCollection'))
 api.add_route('/photovoltaicpowerstations/{id_}/users/{uid}',
-              photovoltaicpowerstation.PhotovoltaicPowerStationUserItem())
+              LazyResource('core.photovoltaicpowerstation', 'PhotovoltaicPowerStationUserItem'))
 
 api.add_route('/points',
-              point.PointCollection())
+              LazyResource('core.point', 'PointCollection'))
 api.add_route('/points/{id_}',
-              point.PointItem())
+              LazyResource('core.point', 'PointItem'))
 api.add_route('/pointlimits/{id_}',
-              point.PointLimit())
+              LazyResource('core.point', 'PointLimit'))
 api.add_route('/points/{id_}/export',
-              point.PointExport())
+              LazyResource('core.point', 'PointExport'))
 api.add_route('/points/import',
-              point.PointImport())
+              LazyResource('core.point', 'PointImport'))
 api.add_route('/points/{id_}/clone',
-              point.PointClone())
+              LazyResource('core.point', 'PointClone'))
 
 api.add_route('/apikeys',
-              apikey.ApiKeyCollection())
+              LazyResource('core.apikey', 'ApiKeyCollection'))
 api.add_route('/apikeys/{id_}',
-              apikey.ApiKeyItem())
+              LazyResource('core.apikey', 'ApiKeyItem'))
+
+api.add_route('/profiling/metrics',
+              LazyResource('core.profiling', 'ProfilingMetrics'))
 
 api.add_route('/privileges',
-              privilege.PrivilegeCollection())
+              LazyResource('core.privilege', 'PrivilegeCollection'))
 api.add_route('/privileges/{id_}',
-              privilege.PrivilegeItem())
+              LazyResource('core.privilege', 'PrivilegeItem'))
 
 api.add_route('/protocols',
-              protocol.ProtocolCollection())
+              LazyResource('core.protocol', 'ProtocolCollection'))
 api.add_route('/protocols/{id_}',
-              protocol.ProtocolItem())
+              LazyResource('core.protocol', 'ProtocolItem'))
 api.add_route('/protocols/{id_}/export',
-              protocol.ProtocolExport())
+              LazyResource('core.protocol', 'ProtocolExport'))
 api.add_route('/protocols/import',
-              protocol.ProtocolImport())
+              LazyResource('core.protocol', 'ProtocolImport'))
 api.add_route('/protocols/{id_}/clone',
-              protocol.ProtocolClone())
+              LazyResource('core.protocol', 'ProtocolClone'))
 
 api.add_route('/rules',
-              rule.RuleCollection())
+              LazyResource('core.rule', 'RuleCollection'))
 api.add_route('/rules/{id_}',
-              rule.RuleItem())
+              LazyResource('core.rule', 'RuleItem'))
 api.add_route('/rules/{id_}/run',
-              rule.RuleRun())
+              LazyResource('core.rule', 'RuleRun'))
 api.add_route('/rules/{id_}/export',
-              rule.RuleExport())
+              LazyResource('core.rule', 'RuleExport'))
 api.add_route('/rules/import',
-              rule.RuleImport())
+              LazyResource('core.rule', 'RuleImport'))
 api.add_route('/rules/{id_}/clone',
-              rule.RuleClone())
+              LazyResource('core.rule', 'RuleClone'))
 
 api.add_route('/sensors',
-              sensor.SensorCollection())
+              LazyResource('core.sensor', 'SensorCollection'))
 api.add_route('/sensors/{id_}',
-              sensor.SensorItem())
+              LazyResource('core.sensor', 'SensorItem'))
 api.add_route('/sensors/{id_}/points',
-              sensor.SensorPointCollection())
+              LazyResource('core.sensor', 'SensorPointCollection'))
 api.add_route('/sensors/{id_}/points/{pid}',
-              sensor.SensorPointItem())
+              LazyResource('core.sensor', 'SensorPointItem'))
 api.add_route('/sensors/{id_}/export',
-              sensor.SensorExport())
+              LazyResource('core.sensor', 'SensorExport'))
 api.add_route('/sensors/import',
-              sensor.SensorImport())
+              LazyResource('core.sensor', 'SensorImport'))
 api.add_route('/sensors/{id_}/clone',
-              sensor.SensorClone())
+              LazyResource('core.sensor', 'SensorClone'))
 
 api.add_route('/shopfloors',
-              shopfloor.ShopfloorCollection())
+              LazyResource('core.shopfloor', 'ShopfloorCollection'))
 api.add_route('/shopfloors/{id_}',
-              shopfloor.ShopfloorItem())
+              LazyResource('core.shopfloor', 'ShopfloorItem'))
 api.add_route('/shopfloors/{id_}/equipments',
-              shopfloor.ShopfloorEquipmentCollection())
+              LazyResource('core.shopfloor', 'ShopfloorEquipmentCollection'))
 api.add_route('/shopfloors/{id_}/equipments/{eid}',
-              shopfloor.ShopfloorEquipmentItem())
+              LazyResource('core.shopfloor', 'ShopfloorEquipmentItem'))
 api.add_route('/shopfloors/{id_}/meters',
-              shopfloor.ShopfloorMeterCollection())
+              LazyResource('core.shopfloor', 'ShopfloorMeterCollection'))
 api.add_route('/shopfloors/{id_}/meters/{mid}',
-              shopfloor.ShopfloorMeterItem())
+              LazyResource('core.shopfloor', 'ShopfloorMeterItem'))
 api.add_route('/shopfloors/{id_}/offlinemeters',
-              shopfloor.ShopfloorOfflineMeterCollection())
+              LazyResource('core.shopfloor', 'ShopfloorOfflineMeterCollection'))
 api.add_route('/shopfloors/{id_}/offlinemeters/{mid}',
-              shopfloor.ShopfloorOfflineMeterItem())
+              LazyResource('core.shopfloor', 'ShopfloorOfflineMeterItem'))
 api.add_route('/shopfloors/{id_}/points',
-              shopfloor.ShopfloorPointCollection())
+              LazyResource('core.shopfloor', 'ShopfloorPointCollection'))
 api.add_route('/shopfloors/{id_}/points/{pid}',
-              shopfloor.ShopfloorPointItem())
+              LazyResource('core.shopfloor', 'ShopfloorPointItem'))
 api.add_route('/shopfloors/{id_}/sensors',
-              shopfloor.ShopfloorSensorCollection())
+              LazyResource('core.shopfloor', 'ShopfloorSensorCollection'))
 api.add_route('/shopfloors/{id_}/sensors/{sid}',
-              shopfloor.ShopfloorSensorItem())
+              LazyResource('core.shopfloor', 'ShopfloorSensorItem'))
 api.add_route('/shopfloors/{id_}/virtualmeters',
-              shopfloor.ShopfloorVirtualMeterCollection())
+              LazyResource('core.shopfloor', 'ShopfloorVirtualMeterCollection'))
 api.add_route('/shopfloors/{id_}/virtualmeters/{mid}',
-              shopfloor.ShopfloorVirtualMeterItem())
+              LazyResource('core.shopfloor', 'ShopfloorVirtualMeterItem'))
 api.add_route('/shopfloors/{id_}/workingcalendars',
-              shopfloor.ShopfloorWorkingCalendarCollection())
+              LazyResource('core.shopfloor', 'ShopfloorWorkingCalendarCollection'))
 api.add_route('/shopfloors/{id_}/workingcalendars/{wcid}',
-              shopfloor.ShopfloorWorkingCalendarItem())
+              LazyResource('core.shopfloor', 'ShopfloorWorkingCalendarItem'))
 api.add_route('/shopfloors/{id_}/commands',
-              shopfloor.ShopfloorCommandCollection())
+              LazyResource('core.shopfloor', 'ShopfloorCommandCollection'))
 api.add_route('/shopfloors/{id_}/commands/{cid}',
-              shopfloor.ShopfloorCommandItem())
+              LazyResource('core.shopfloor', 'ShopfloorCommandItem'))
 api.add_route('/shopfloors/{id_}/export',
-              shopfloor.ShopfloorExport())
+              LazyResource('core.shopfloor', 'ShopfloorExport'))
 api.add_route('/shopfloors/import',
-              shopfloor.ShopfloorImport())
+              LazyResource('core.shopfloor', 'ShopfloorImport'))
 api.add_route('/shopfloors/{id_}/clone',
-              shopfloor.ShopfloorClone())
+              LazyResource('core.shopfloor', 'ShopfloorClone'))
 
 api.add_route('/spaces',
-              space.SpaceCollection())
+              LazyResource('core.space', 'SpaceCollection'))
 api.add_route('/spaces/{id_}',
-              space.SpaceItem())
+              LazyResource('core.space', 'SpaceItem'))
 api.add_route('/spaces/{id_}/children',
-              space.SpaceChildrenCollection())
+              LazyResource('core.space', 'SpaceChildrenCollection'))
 api.add_route('/spaces/{id_}/combinedequipments',
-              space.SpaceCombinedEquipmentCollection())
+              LazyResource('core.space', 'SpaceCombinedEquipmentCollection'))
 api.add_route('/spaces/{id_}/combinedequipments/{eid}',
-              space.SpaceCombinedEquipmentItem())
+              LazyResource('core.space', 'SpaceCombinedEquipmentItem'))
 api.add_route('/spaces/{id_}/energystoragepowerstations',
-              space.SpaceEnergyStoragePowerStationCollection())
+              LazyResource('core.space', 'SpaceEnergyStoragePowerStationCollection'))
 api.add_route('/spaces/{id_}/energystoragepowerstations/{eid}',
-              space.SpaceEnergyStoragePowerStationItem())
+              LazyResource('core.space', 'SpaceEnergyStoragePowerStationItem'))
 api.add_route('/spaces/{id_}/equipments',
-              space.SpaceEquipmentCollection())
+              LazyResource('core.space', 'SpaceEquipmentCollection'))
 api.add_route('/spaces/{id_}/equipments/{eid}',
-              space.SpaceEquipmentItem())
+              LazyResource('core.space', 'SpaceEquipmentItem'))
 api.add_route('/spaces/{id_}/meters',
-              space.SpaceMeterCollection())
+              LazyResource('core.space', 'SpaceMeterCollection'))
 api.add_route('/spaces/{id_}/meters/{mid}',
-              space.SpaceMeterItem())
+              LazyResource('core.space', 'SpaceMeterItem'))
 api.add_route('/spaces/{id_}/microgrids',
-              space.SpaceMicrogridCollection())
+              LazyResource('core.space', 'SpaceMicrogridCollection'))
 api.add_route('/spaces/{id_}/microgrids/{mid}',
-              space.SpaceMicrogridItem())
+              LazyResource('core.space', 'SpaceMicrogridItem'))
 api.add_route('/spaces/{id_}/export',
-              space.SpaceExport())
+              LazyResource('core.space', 'SpaceExport'))
 api.add_route('/spaces/import',
-              space.SpaceImport())
+              LazyResource('core.space', 'SpaceImport'))
 api.add_route('/spaces/{id_}/clone',
-              space.SpaceClone())
+              LazyResource('core.space', 'SpaceClone'))
+api.add_route('/spaces/{id_}/bulkexport',
+              LazyResource('core.topologybulk', 'TopologyExport'))
+api.add_route('/spaces/bulkimport',
+              LazyResource('core.topologybulk', 'TopologyImport'))
 api.add_route('/spaces/{id_}/energyflowdiagrams',
-              space.SpaceEnergyFlowDiagramCollection())
+              LazyResource('core.space', 'SpaceEnergyFlowDiagramCollection'))
 api.add_route('/spaces/{id_}/energyflowdiagrams/{eid}',
-              space.SpaceEnergyFlowDiagramItem())
+              LazyResource('core.space', 'SpaceEnergyFlowDiagramItem'))
 api.add_route('/spaces/{id_}/distributionsystems',
-              space.DistributionSystemCollection())
+              LazyResource('core.space', 'DistributionSystemCollection'))
 api.add_route('/spaces/{id_}/distributionsystems/{did}',
-              space.DistributionSystemItem())
+              LazyResource('core.space', 'DistributionSystemItem'))
 # Get energy categories of all meters in the space tree
 api.add_route('/spaces/{id_}/treemetersenergycategories',
-              space.SpaceTreeMetersEnergyCategoryCollection())
+              LazyResource('core.space', 'SpaceTreeMetersEnergyCategoryCollection'))
 api.add_route('/spaces/{id_}/offlinemeters',
-              space.SpaceOfflineMeterCollection())
+              LazyResource('core.space', 'SpaceOfflineMeterCollection'))
 api.add_route('/spaces/{id_}/offlinemeters/{mid}',
-              space.SpaceOfflineMeterItem())
+              LazyResource('core.space', 'SpaceOfflineMeterItem'))
 api.add_route('/spaces/{id_}/photovoltaicpowerstations',
-              space.SpacePhotovoltaicPowerStationCollection())
+              LazyResource('core.space', 'SpacePhotovoltaicPowerStationCollection'))
 api.add_route('/spaces/{id_}/photovoltaicpowerstations/{eid}',
-              space.SpacePhotovoltaicPowerStationItem())
+              LazyResource('core.space', 'SpacePhotovoltaicPowerStationItem'))
 api.add_route('/spaces/{id_}/points',
-              space.SpacePointCollection())
+              LazyResource('core.space', 'SpacePointCollection'))
 api.add_route('/spaces/{id_}/points/{pid}',
-              space.SpacePointItem())
+              LazyResource('core.space', 'SpacePointItem'))
 api.add_route('/spaces/{id_}/sensors',
-              space.SpaceSensorCollection())
+              LazyResource('core.space', 'SpaceSensorCollection'))
 api.add_route('/spaces/{id_}/sensors/{sid}',
-              space.SpaceSensorItem())
+              LazyResource('core.space', 'SpaceSensorItem'))
 api.add_route('/spaces/{id_}/shopfloors',
-              space.SpaceShopfloorCollection())
+              LazyResource('core.space', 'SpaceShopfloorCollection'))
 api.add_route('/spaces/{id_}/shopfloors/{sid}',
-              space.SpaceShopfloorItem())
+              LazyResource('core.space', 'SpaceShopfloorItem'))
 api.add_route('/spaces/{id_}/stores',
-              space.SpaceStoreCollection())
+              LazyResource('core.space', 'SpaceStoreCollection'))
 api.add_route('/spaces/{id_}/stores/{tid}',
-              space.SpaceStoreItem())
+              LazyResource('core.space', 'SpaceStoreItem'))
 api.add_route('/spaces/{id_}/tenants',
-              space.SpaceTenantCollection())
+              LazyResource('core.space', 'SpaceTenantCollection'))
 api.add_route('/spaces/{id_}/tenants/{tid}',
-              space.SpaceTenantItem())
+              LazyResource('core.space', 'SpaceTenantItem'))
 api.add_route('/spaces/{id_}/virtualmeters',
-              space.SpaceVirtualMeterCollection())
+              LazyResource('core.space', 'SpaceVirtualMeterCollection'))
 api.add_route('/spaces/{id_}/virtualmeters/{mid}',
-              space.SpaceVirtualMeterItem())
+              LazyResource('core.space', 'SpaceVirtualMeterItem'))
 api.add_route('/spaces/{id_}/workingcalendars',
-              space.SpaceWorkingCalendarCollection())
+              LazyResource('core.space', 'SpaceWorkingCalendarCollection'))
 api.add_route('/spaces/{id_}/workingcalendars/{wcid}',
-              space.SpaceWorkingCalendarItem())
+              LazyResource('core.space', 'SpaceWorkingCalendarItem'))
 api.add_route('/spaces/{id_}/commands',
-              space.SpaceCommandCollection())
+              LazyResource('core.space', 'SpaceCommandCollection'))
 api.add_route('/spaces/{id_}/commands/{cid}',
-              space.SpaceCommandItem())
+              LazyResource('core.space', 'SpaceCommandItem'))
 api.add_route('/spaces/tree',
-              space.SpaceTreeCollection())
+              LazyResource('core.space', 'SpaceTreeCollection'))
 
 api.add_route('/stores',
-              store.StoreCollection())
+              LazyResource('core.store', 'StoreCollection'))
 api.add_route('/stores/{id_}',
-              store.StoreItem())
+              LazyResource('core.store', 'StoreItem'))
 api.add_route('/stores/{id_}/meters',
-              store.StoreMeterCollection())
+              LazyResource('core.store', 'StoreMeterCollection'))
 api.add_route('/stores/{id_}/meters/{mid}',
-              store.StoreMeterItem())
+              LazyResource('core.store', 'StoreMeterItem'))
 api.add_route('/stores/{id_}/offlinemeters',
-              store.StoreOfflineMeterCollection())
+              LazyResource('core.store', 'StoreOfflineMeterCollection'))
 api.add_route('/stores/{id_}/offlinemeters/{mid}',
-              store.StoreOfflineMeterItem())
+              LazyResource('core.store', 'StoreOfflineMeterItem'))
 api.add_route('/stores/{id_}/points',
-              store.StorePointCollection())
+              LazyResource('core.store', 'StorePointCollection'))
 api.add_route('/stores/{id_}/points/{pid}',
-              store.StorePointItem())
+              LazyResource('core.store', 'StorePointItem'))
 api.add_route('/stores/{id_}/sensors',
-              store.StoreSensorCollection())
+              LazyResource('core.store', 'StoreSensorCollection'))
 api.add_route('/stores/{id_}/sensors/{sid}',
-              store.StoreSensorItem())
+              LazyResource('core.store', 'StoreSensorItem'))
 api.add_route('/stores/{id_}/virtualmeters',
-              store.StoreVirtualMeterCollection())
+              LazyResource('core.store', 'StoreVirtualMeterCollection'))
 api.add_route('/stores/{id_}/virtualmeters/{mid}',
-              store.StoreVirtualMeterItem())
+              LazyResource('core.store', 'StoreVirtualMeterItem'))
 api.add_route('/stores/{id_}/workingcalendars',
-              store.StoreWorkingCalendarCollection())
+              LazyResource('core.store', 'StoreWorkingCalendarCollection'))
 api.add_route('/stores/{id_}/workingcalendars/{wcid}',
-              store.StoreWorkingCalendarItem())
+              LazyResource('core.store', 'StoreWorkingCalendarItem'))
 api.add_route('/stores/{id_}/commands',
-              store.StoreCommandCollection())
+              LazyResource('core.store', 'StoreCommandCollection'))
 api.add_route('/stores/{id_}/commands/{cid}',
-              store.StoreCommandItem())
+              LazyResource('core.store', 'StoreCommandItem'))
 api.add_route('/stores/{id_}/export',
-              store.StoreExport())
+              LazyResource('core.store', 'StoreExport'))
 api.add_route('/stores/import',
-              store.StoreImport())
+              LazyResource('core.store', 'StoreImport'))
 api.add_route('/stores/{id_}/clone',
-              store.StoreClone())
+              LazyResource('core.store', 'StoreClone'))
 
 api.add_route('/storetypes',
-              storetype.StoreTypeCollection())
+              LazyResource('core.storetype', 'StoreTypeCollection'))
 api.add_route('/storetypes/{id_}',
-              storetype.StoreTypeItem())
+              LazyResource('core.storetype', 'StoreTypeItem'))
 
 api.add_route('/svgs',
-              svg.SVGCollection())
+              LazyResource('core.svg', 'SVGCollection'))
 api.add_route('/svgs/{id_}',
-              svg.SVGItem())
+              LazyResource('core.svg', 'SVGItem'))
 api.add_route('/svgs/{id_}/export',
-              svg.SVGExport())
+              LazyResource('core.svg', 'SVGExport'))
 api.add_route('/svgs/import',
-              svg.SVGImport())
+              LazyResource('core.svg', 'SVGImport'))
 api.add_route('/svgs/{id_}/clone',
-              svg.SVGClone())
+              LazyResource('core.svg', 'SVGClone'))
 
 api.add_route('/tariffs',
-              tariff.TariffCollection())
+              LazyResource('core.tariff', 'TariffCollection'))
 api.add_route('/tariffs/{id_}',
-              tariff.TariffItem())
+              LazyResource('core.tariff', 'TariffItem'))
 api.add_route('/tariffs/{id_}/export',
-              tariff.TariffExport())
+              LazyResource('core.tariff', 'TariffExport'))
 api.add_route('/tariffs/import',
-              tariff.TariffImport())
+              LazyResource('core.tariff', 'TariffImport'))
 api.add_route('/tariffs/{id_}/clone',
-              tariff.TariffClone())
+              LazyResource('core.tariff', 'TariffClone'))
 
 api.add_route('/tenants',
-              tenant.TenantCollection())
+              LazyResource('core.tenant', 'TenantCollection'))
 api.add_route('/tenants/{id_}',
-              tenant.TenantItem())
+              LazyResource('core.tenant', 'TenantItem'))
 api.add_route('/tenants/{id_}/meters',
-              tenant.TenantMeterCollection())
+              LazyResource('core.tenant', 'TenantMeterCollection'))
 api.add_route('/tenants/{id_}/meters/{mid}',
-              tenant.TenantMeterItem())
+              LazyResource('core.tenant', 'TenantMeterItem'))
 api.add_route('/tenants/{id_}/offlinemeters',
-              tenant.TenantOfflineMeterCollection())
+              LazyResource('core.tenant', 'TenantOfflineMeterCollection'))
 api.add_route('/tenants/{id_}/offlinemeters/{mid}',
-              tenant.TenantOfflineMeterItem())
+              LazyResource('core.tenant', 'TenantOfflineMeterItem'))
 api.add_route('/tenants/{id_}/points',
-              tenant.TenantPointCollection())
+              LazyResource('core.tenant', 'TenantPointCollection'))
 api.add_route('/tenants/{id_}/points/{pid}',
-              tenant.TenantPointItem())
+              LazyResource('core.tenant', 'TenantPointItem'))
 api.add_route('/tenants/{id_}/sensors',
-              tenant.TenantSensorCollection())
+              LazyResource('core.tenant', 'TenantSensorCollection'))
 api.add_route('/tenants/{id_}/sensors/{sid}',
-              tenant.TenantSensorItem())
+              LazyResource('core.tenant', 'TenantSensorItem'))
 api.add_route('/tenants/{id_}/virtualmeters',
-              tenant.TenantVirtualMeterCollection())
+              LazyResource('core.tenant', 'TenantVirtualMeterCollection'))
 api.add_route('/tenants/{id_}/virtualmeters/{mid}',
-              tenant.TenantVirtualMeterItem())
+              LazyResource('core.tenant', 'TenantVirtualMeterItem'))
 api.add_route('/tenants/{id_}/workingcalendars',
-              tenant.TenantWorkingCalendarCollection())
+              LazyResource('core.tenant', 'TenantWorkingCalendarCollection'))
 api.add_route('/tenants/{id_}/workingcalendars/{wcid}',
-              tenant.TenantWorkingCalendarItem())
+              LazyResource('core.tenant', 'TenantWorkingCalendarItem'))
 api.add_route('/tenants/{id_}/commands',
-              tenant.TenantCommandCollection())
+              LazyResource('core.tenant', 'TenantCommandCollection'))
 api.add_route('/tenants/{id_}/commands/{cid}',
-              tenant.TenantCommandItem())
+              LazyResource('core.tenant', 'TenantCommandItem'))
 api.add_route('/tenants/{id_}/export',
-              tenant.TenantExport())
+              LazyResource('core.tenant', 'TenantExport'))
 api.add_route('/tenants/import',
-              tenant.TenantImport())
+              LazyResource('core.tenant', 'TenantImport'))
 api.add_route('/tenants/{id_}/clone',
-              tenant.TenantClone())
+              LazyResource('core.tenant', 'TenantClone'))
 
 api.add_route('/tenanttypes',
-              tenanttype.TenantTypeCollection())
+              LazyResource('core.tenanttype', 'TenantTypeCollection'))
 api.add_route('/tenanttypes/{id_}',
-              tenanttype.TenantTypeItem())
+              LazyResource('core.tenanttype', 'TenantTypeItem'))
 
 api.add_route('/textmessages',
-              textmessage.TextMessageCollection())
+              LazyResource('core.textmessage', 'TextMessageCollection'))
 api.add_route('/textmessages/{id_}',
-              textmessage.TextMessageItem())
+              LazyResource('core.textmessage', 'TextMessageItem'))
 
 api.add_route('/tickets',
-              ticket.TicketCollection())
+              LazyResource('core.ticket', 'TicketCollection'))
 api.add_route('/tickets/{id_}',
-              ticket.TicketItem())
+              LazyResource('core.ticket', 'TicketItem'))
 
 api.add_route('/timezones',
-              timezone.TimezoneCollection())
+              LazyResource('core.timezone', 'TimezoneCollection'))
 api.add_route('/timezones/{id_}',
-              timezone.TimezoneItem())
+              LazyResource('core.timezone', 'TimezoneItem'))
 
 api.add_route('/users',
-              user.UserCollection())
+              LazyResource('core.user', 'UserCollection'))
 api.add_route('/users/{id_}',
-              user.UserItem())
+              LazyResource('core.user', 'UserItem'))
 api.add_route('/users/login',
-              user.UserLogin())
+              LazyResource('core.user', 'UserLogin'))
 api.add_route('/users/logout',
-              user.UserLogout())
+              LazyResource('core.user', 'UserLogout'))
 api.add_route('/users/resetpassword',
-              user.ResetPassword())
+              LazyResource('core.user', 'ResetPassword'))
+api.add_route('/users/authcachestatistics',
+              LazyResource('core.user', 'AuthCacheStatistics'))
 api.add_route('/users/changepassword',
-              user.ChangePassword())
+              LazyResource('core.user', 'ChangePassword'))
 api.add_route('/users/unlock/{id_}',
-              user.Unlock())
+              LazyResource('core.user', 'Unlock'))
 api.add_route('/users/forgotpassword',
-              user.ForgotPassword())
+              LazyResource('core.user', 'ForgotPassword'))
 api.add_route('/users/emailmessages',
-              user.EmailMessageCollection())
+              LazyResource('core.user', 'EmailMessageCollection'))
 api.add_route('/users/emailmessages/{id_}',
-              user.EmailMessageItem())
+              LazyResource('core.user', 'EmailMessageItem'))
 api.add_route('/users/newusers',
-              user.NewUserCollection())
+              LazyResource('core.user', 'NewUserCollection'))
 api.add_route('/users/newusers/{id_}',
-              user.NewUserItem())
+              LazyResource('core.user', 'NewUserItem'))
 api.add_route('/users/newusers/{id_}/approve',
-              user.NewUserApprove())
+              LazyResource('core.user', 'NewUserApprove'))
 
 api.add_route('/virtualmeters',
-              virtualmeter.VirtualMeterCollection())
+              LazyResource('core.virtualmeter', 'VirtualMeterCollection'))
 api.add_route('/virtualmeters/{id_}',
-              virtualmeter.VirtualMeterItem())
+              LazyResource('core.virtualmeter', 'VirtualMeterItem'))
 api.add_route('/virtualmeters/{id_}/export',
-              virtualmeter.VirtualMeterExport())
+              LazyResource('core.virtualmeter', 'VirtualMeterExport'))
 api.add_route('/virtualmeters/import',
-              virtualmeter.VirtualMeterImport())
+              LazyResource('core.virtualmeter', 'VirtualMeterImport'))
 api.add_route('/virtualmeters/{id_}/clone',
-              virtualmeter.VirtualMeterClone())
+              LazyResource('core.virtualmeter', 'VirtualMeterClone'))
 
 api.add_route('/virtualpowerplants',
-              virtualpowerplant.VirtualPowerPlantCollection())
+              LazyResource('core.virtualpowerplant', 'VirtualPowerPlantCollection'))
 api.add_route('/virtualpowerplants/{id_}',
-              virtualpowerplant.VirtualPowerPlantItem())
+              LazyResource('core.virtualpowerplant', 'VirtualPowerPlantItem'))
 api.add_route('/virtualpowerplants/{id_}/microgrids',
-              virtualpowerplant.VirtualPowerPlantMicrogridCollection())
+              LazyResource('core.virtualpowerplant', 'VirtualPowerPlantMicrogridCollection'))
 api.add_route('/virtualpowerplants/{id_}/microgrids/{mid}',
-              virtualpowerplant.VirtualPowerPlantMicrogridItem())
+              LazyResource('core.virtualpowerplant', 'VirtualPowerPlantMicrogridItem'))
 api.add_route('/virtualpowerplants/{id_}/export',
-              virtualpowerplant.VirtualPowerPlantExport())
+              LazyResource('core.virtualpowerplant', 'VirtualPowerPlantExport'))
 api.add_route('/virtualpowerplants/import',
-              virtualpowerplant.VirtualPowerPlantImport())
+              LazyResource('core.virtualpowerplant', 'VirtualPowerPlantImport'))
 api.add_route('/virtualpowerplants/{id_}/clone',
-              virtualpowerplant.VirtualPowerPlantClone())
+              LazyResource('core.virtualpowerplant', 'VirtualPowerPlantClone'))
 
 api.add_route('/webmessages',
-              webmessage.WebMessageCollection())
+              LazyResource('core.webmessage', 'WebMessageCollection'))
 api.add_route('/webmessagesnew',
-              webmessage.WebMessageStatusNewCollection())
+              LazyResource('core.webmessage', 'WebMessageStatusNewCollection'))
 api.add_route('/webmessages/{id_}',
-              webmessage.WebMessageItem())
+              LazyResource('core.webmessage', 'WebMessageItem'))
 api.add_route('/webmessagesbatch',
-              webmessage.WebMessageBatch())
+              LazyResource('core.webmessage', 'WebMessageBatch'))
 
 api.add_route('/wechatmessages',
-              wechatmessage.WechatMessageCollection())
+              LazyResource('core.wechatmessage', 'WechatMessageCollection'))
 api.add_route('/wechatmessages/{id_}',
-              wechatmessage.WechatMessageItem())
+              LazyResource('core.wechatmessage', 'WechatMessageItem'))
 
 api.add_route('/windfarms',
-              windfarm.WindFarmCollection())
+              LazyResource('core.windfarm', 'WindFarmCollection'))
 api.add_route('/windfarms/{id_}',
-              windfarm.WindFarmItem())
+              LazyResource('core.windfarm', 'WindFarmItem'))
 api.add_route('/windfarms/{id_}/export',
-              windfarm.WindFarmExport())
+              LazyResource('core.windfarm', 'WindFarmExport'))
 api.add_route('/windfarms/import',
-              windfarm.WindFarmImport())
+              LazyResource('core.windfarm', 'WindFarmImport'))
 api.add_route('/windfarms/{id_}/clone',
-              windfarm.WindFarmClone())
+              LazyResource('core.windfarm', 'WindFarmClone'))
 
 api.add_route('/workingcalendars',
-              workingcalendar.WorkingCalendarCollection())
+              LazyResource('core.workingcalendar', 'WorkingCalendarCollection'))
 api.add_route('/workingcalendars/{id_}',
-              workingcalendar.WorkingCalendarItem())
+              LazyResource('core.workingcalendar', 'WorkingCalendarItem'))
 api.add_route('/workingcalendars/{id_}/nonworkingdays',
-              workingcalendar.NonWorkingDayCollection())
+              LazyResource('core.workingcalendar', 'NonWorkingDayCollection'))
 api.add_route('/nonworkingdays/{id_}',
-              workingcalendar.NonWorkingDayItem())
+              LazyResource('core.workingcalendar', 'NonWorkingDayItem'))
 api.add_route('/workingcalendars/{id_}/export',
-              workingcalendar.WorkingCalendarExport())
+              LazyResource('core.workingcalendar', 'WorkingCalendarExport'))
 api.add_route('/workingcalendars/import',
-              workingcalendar.WorkingCalendarImport())
+              LazyResource('core.workingcalendar', 'WorkingCalendarImport'))
 api.add_route('/workingcalendars/{id_}/clone',
-              workingcalendar.WorkingCalendarClone())
+              LazyResource('core.workingcalendar', 'WorkingCalendarClone'))
 
 api.add_route('/version',
-              version.VersionItem())
+              LazyResource('core.version', 'VersionItem'))
 
 
 ########################################################################################################################
 # Routes for Reports
 ########################################################################################################################
 api.add_route('/reports/advancedreports',
-              advancedreportfile.AdvancedReportFileCollection())
+              LazyResource('reports.advancedreportfile', 'AdvancedReportFileCollection'))
 api.add_route('/reports/advancedreports/{id_}',
-              advancedreportfile.AdvancedReportFileItem())
+              LazyResource('reports.advancedreportfile', 'AdvancedReportFileItem'))
 api.add_route('/reports/distributionsystem',
-              distributionsystemreport.Reporting())
+              LazyResource('reports.distributionsystem', 'Reporting'))
 api.add_route('/reports/energyflowdiagram',
-              energyflowdiagramreport.Reporting())
+              LazyResource('reports.energyflowdiagram', 'Reporting'))
 api.add_route('/reports/combinedequipmentbatch',
-              combinedequipmentbatch.Reporting())
+              LazyResource('reports.combinedequipmentbatch', 'Reporting'))
 api.add_route('/reports/combinedequipmentcarbon',
-              combinedequipmentcarbon.Reporting())
+              LazyResource('reports.combinedequipmentcarbon', 'Reporting'))
 api.add_route('/reports/combinedequipmentcost',
-              combinedequipmentcost.Reporting())
+              LazyResource('reports.combinedequipmentcost', 'Reporting'))
 api.add_route('/reports/combinedequipmentefficiency',
-              combinedequipmentefficiency.Reporting())
+              LazyResource('reports.combinedequipmentefficiency', 'Reporting'))
 api.add_route('/reports/combinedequipmentenergycategory',
-              combinedequipmentenergycategory.Reporting())
+              LazyResource('reports.combinedequipmentenergycategory', 'Reporting'))
 api.add_route('/reports/combinedequipmentenergyitem',
-              combinedequipmentenergyitem.Reporting())
+              LazyResource('reports.combinedequipmentenergyitem', 'Reporting'))
 api.add_route('/reports/combinedequipmentincome',
-              combinedequipmentincome.Reporting())
+              LazyResource('reports.combinedequipmentincome', 'Reporting'))
 api.add_route('/reports/combinedequipmentload',
-              combinedequipmentload.Reporting())
+              LazyResource('reports.combinedequipmentload', 'Reporting'))
 api.add_route('/reports/combinedequipmentoutput',
-              combinedequipmentoutput.Reporting())
+              LazyResource('reports.combinedequipmentoutput', 'Reporting'))
 api.add_route('/reports/combinedequipmentsaving',
-              combinedequipmentsaving.Reporting())
+              LazyResource('reports.combinedequipmentsaving', 'Reporting'))
 api.add_route('/reports/combinedequipmentplan',
-              combinedequipmentplan.Reporting())
+              LazyResource('reports.combinedequipmentplan', 'Reporting'))
 api.add_route('/reports/combinedequipmentstatistics',
-              combinedequipmentstatistics.Reporting())
+              LazyResource('reports.combinedequipmentstatistics', 'Reporting'))
 api.add_route('/reports/dashboard',
-              dashboard.Reporting())
+              LazyResource('reports.dashboard', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationdashboard',
-              energystoragepowerstationdashboard.Reporting())
+              LazyResource('reports.energystoragepowerstationdashboard', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationitemdashboard',
-              energystoragepowerstationitemdashboard.Reporting())
+              LazyResource('reports.energystoragepowerstationitemdashboard', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationdetails',
-              energystoragepowerstationdetails.Reporting())
+              LazyResource('reports.energystoragepowerstationdetails', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationdetails/{id_}/bms',
-              energystoragepowerstationdetailsbms.Reporting())
+              LazyResource('reports.energystoragepowerstationdetailsbms', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationdetails/{id_}/command',
-              energystoragepowerstationdetailscommand.Reporting())
+              LazyResource('reports.energystoragepowerstationdetailscommand', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationdetails/{id_}/firecontrol',
-              energystoragepowerstationdetailsfirecontrol.Reporting())
+              LazyResource('reports.energystoragepowerstationdetailsfirecontrol', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationdetails/{id_}/hvac',
-              energystoragepowerstationdetailshvac.Reporting())
+              LazyResource('reports.energystoragepowerstationdetailshvac', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationdetails/{id_}/grid',
-              energystoragepowerstationdetailsgrid.Reporting())
+              LazyResource('reports.energystoragepowerstationdetailsgrid', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationdetails/{id_}/load',
-              energystoragepowerstationdetailsload.Reporting())
+              LazyResource('reports.energystoragepowerstationdetailsload', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationdetails/{id_}/dcdc',
-              energystoragepowerstationdetailsdcdc.Reporting())
+              LazyResource('reports.energystoragepowerstationdetailsdcdc', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationdetails/{id_}/pcs',
-              energystoragepowerstationdetailspcs.Reporting())
+              LazyResource('reports.energystoragepowerstationdetailspcs', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationdetails/{id_}/sts',
-              energystoragepowerstationdetailssts.Reporting())
+              LazyResource('reports.energystoragepowerstationdetailssts', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationdetails/{id_}/schedule',
-              energystoragepowerstationdetailsschedule.Reporting())
+              LazyResource('reports.energystoragepowerstationdetailsschedule', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationlist',
-              energystoragepowerstationlist.Reporting())
+              LazyResource('reports.energystoragepowerstationlist', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationreportingrevenue',
-              energystoragepowerstationreportingrevenue.Reporting())
+              LazyResource('reports.energystoragepowerstationreportingrevenue', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationreportingenergy',
-              energystoragepowerstationreportingenergy.Reporting())
+              LazyResource('reports.energystoragepowerstationreportingenergy', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationreportingparameters',
-              energystoragepowerstationreportingparameters.Reporting())
+              LazyResource('reports.energystoragepowerstationreportingparameters', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationcollectionenergy',
-              energystoragepowerstationcollectionenergy.Reporting())
+              LazyResource('reports.energystoragepowerstationcollectionenergy', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationitemenergy',
-              energystoragepowerstationitemenergy.Reporting())
+              LazyResource('reports.energystoragepowerstationitemenergy', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationcollectionbilling',
-              energystoragepowerstationcollectionbilling.Reporting())
+              LazyResource('reports.energystoragepowerstationcollectionbilling', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationitembilling',
-              energystoragepowerstationitembilling.Reporting())
+              LazyResource('reports.energystoragepowerstationitembilling', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationcollectioncarbon',
-              energystoragepowerstationcollectioncarbon.Reporting())
+              LazyResource('reports.energystoragepowerstationcollectioncarbon', 'Reporting'))
 api.add_route('/reports/energystoragepowerstationitemcarbon',
-              energystoragepowerstationitemcarbon.Reporting())
+              LazyResource('reports.energystoragepowerstationitemcarbon', 'Reporting'))
 api.add_route('/reports/equipmentbatch',
-              equipmentbatch.Reporting())
+              LazyResource('reports.equipmentbatch', 'Reporting'))
 api.add_route('/reports/equipmentcarbon',
-              equipmentcarbon.Reporting())
+              LazyResource('reports.equipmentcarbon', 'Reporting'))
 api.add_route('/reports/equipmentcost',
-              equipmentcost.Reporting())
+              LazyResource('reports.equipmentcost', 'Reporting'))
 api.add_route('/reports/equipmentefficiency',
-              equipmentefficiency.Reporting())
+              LazyResource('reports.equipmentefficiency', 'Reporting'))
 api.add_route('/reports/equipmentenergycategory',
-              equipmentenergycategory.Reporting())
+              LazyResource('reports.equipmentenergycategory', 'Reporting'))
 api.add_route('/reports/equipmentenergyitem',
-              equipmentenergyitem.Reporting())
+              LazyResource('reports.equipmentenergyitem', 'Reporting'))
 api.add_route('/reports/equipmentincome',
-              equipmentincome.Reporting())
+              LazyResource('reports.equipmentincome', 'Reporting'))
 api.add_route('/reports/equipmentload',
-              equipmentload.Reporting())
+              LazyResource('reports.equipmentload', 'Reporting'))
 api.add_route('/reports/equipmentoutput',
-              equipmentoutput.Reporting())
+              LazyResource('reports.equipmentoutput', 'Reporting'))
 api.add_route('/reports/equipmentsaving',
-              equipmentsaving.Reporting())
+              LazyResource('reports.equipmentsaving', 'Reporting'))
 api.add_route('/reports/equipmentplan',
-              equipmentplan.Reporting())
+              LazyResource('reports.equipmentplan', 'Reporting'))
 api.add_route('/reports/equipmentstatistics',
-              equipmentstatistics.Reporting())
+              LazyResource('reports.equipmentstatistics', 'Reporting'))
 api.add_route('/reports/equipmenttracking',
-              equipmenttracking.Reporting())
+              LazyResource('reports.equipmenttracking', 'Reporting'))
+api.add_route('/reports/exportjobs',
+              LazyResource('reports.exportjob', 'ExportJobCollection'))
+api.add_route('/reports/exportjobs/{id_}',
+              LazyResource('reports.exportjob', 'ExportJobItem'))
+api.add_route('/reports/exportjobs/{id_}/file',
+              LazyResource('reports.exportjob', 'ExportJobFile'))
 api.add_route('/reports/enterproduction',
-              enterproduction.Reporting())
+              LazyResource('reports.enterproduction', 'Reporting'))
 api.add_route('/reports/spaceproduction',
-              spaceproduction.Reporting())
+              LazyResource('reports.spaceproduction', 'Reporting'))
 api.add_route('/reports/fddfault',
-              fddfault.Reporting())
+              LazyResource('reports.fddfault', 'Reporting'))
 api.add_route('/reports/meterbatch',
-              meterbatch.Reporting())
+              LazyResource('reports.meterbatch', 'Reporting'))
 api.add_route('/reports/metercarbon',
-              metercarbon.Reporting())
+              LazyResource('reports.metercarbon', 'Reporting'))
 api.add_route('/reports/metercomparison',
-              metercomparison.Reporting())
+              LazyResource('reports.metercomparison', 'Reporting'))
 api.add_route('/reports/metercost',
-              metercost.Reporting())
+              LazyResource('reports.metercost', 'Reporting'))
 api.add_route('/reports/meterenergy',
-              meterenergy.Reporting())
+              LazyResource('reports.meterenergy', 'Reporting'))
 api.add_route('/reports/meterrealtime',
-              meterrealtime.Reporting())
+              LazyResource('reports.meterrealtime', 'Reporting'))
 api.add_route('/reports/metersaving',
-              metersaving.Reporting())
+              LazyResource('reports.metersaving', 'Reporting'))
 api.add_route('/reports/meterplan',
-              meterplan.Reporting())
+              LazyResource('reports.meterplan', 'Reporting'))
 api.add_route('/reports/metersubmetersbalance',
-              metersubmetersbalance.Reporting())
+              LazyResource('reports.metersubmetersbalance', 'Reporting'))
 api.add_route('/reports/metertrend',
-              metertrend.Reporting())
+              LazyResource('reports.metertrend', 'Reporting'))
 api.add_route('/reports/metertracking',
-              metertracking.Reporting())
+              LazyResource('reports.metertracking', 'Reporting'))
 api.add_route('/reports/microgriddashboard',
-              microgriddashboard.Reporting())
+              LazyResource('reports.microgriddashboard', 'Reporting'))
 api.add_route('/reports/microgriddetails',
-              microgriddetails.Reporting())
+              LazyResource('reports.microgriddetails', 'Reporting'))
 api.add_route('/reports/microgriddetails/{id_}/bms',
-              microgriddetailsbms.Reporting())
+              LazyResource('reports.microgriddetailsbms', 'Reporting'))
 api.add_route('/reports/microgriddetails/{id_}/evcharger',
-              microgriddetailsevcharger.Reporting())
+              LazyResource('reports.microgriddetailsevcharger', 'Reporting'))
 api.add_route('/reports/microgriddetails/{id_}/generator',
-              microgriddetailsgenerator.Reporting())
+              LazyResource('reports.microgriddetailsgenerator', 'Reporting'))
 api.add_route('/reports/microgriddetails/{id_}/grid',
-              microgriddetailsgrid.Reporting())
+              LazyResource('reports.microgriddetailsgrid', 'Reporting'))
 api.add_route('/reports/microgriddetails/{id_}/heatpump',
-              microgriddetailsheatpump.Reporting())
+              LazyResource('reports.microgriddetailsheatpump', 'Reporting'))
 api.add_route('/reports/microgriddetails/{id_}/load',
-              microgriddetailsload.Reporting())
+              LazyResource('reports.microgriddetailsload', 'Reporting'))
 api.add_route('/reports/microgriddetails/{id_}/pcs',
-              microgriddetailspcs.Reporting())
+              LazyResource('reports.microgriddetailspcs', 'Reporting'))
 api.add_route('/reports/microgriddetails/{id_}/pv',
-              microgriddetailspv.Reporting())
+              LazyResource('reports.microgriddetailspv', 'Reporting'))
 api.add_route('/reports/microgridlist',
-              microgridlist.Reporting())
+              LazyResource('reports.microgridlist', 'Reporting'))
 api.add_route('/reports/microgridreportingenergy',
-              microgridreportingenergy.Reporting())
+              LazyResource('reports.microgridreportingenergy', 'Reporting'))
 api.add_route('/reports/microgridsenergy',
-              microgridsenergy.Reporting())
+              LazyResource('reports.microgridsenergy', 'Reporting'))
 api.add_route('/reports/microgridsbilling',
-              microgridsbilling.Reporting())
+              LazyResource('reports.microgridsbilling', 'Reporting'))
 api.add_route('/reports/microgridscarbon',
-              microgridscarbon.Reporting())
+              LazyResource('reports.microgridscarbon', 'Reporting'))
 api.add_route('/reports/offlinemeterbatch',
-              offlinemeterbatch.Reporting())
+              LazyResource('reports.offlinemeterbatch', 'Reporting'))
 api.add_route('/reports/offlinemetercarbon',
-              offlinemetercarbon.Reporting())
+              LazyResource('reports.offlinemetercarbon', 'Reporting'))
 api.add_route('/reports/offlinemetercost',
-              offlinemetercost.Reporting())
+              LazyResource('reports.offlinemetercost', 'Reporting'))
 api.add_route('/reports/offlinemeterenergy',
-              offlinemeterenergy.Reporting())
+              LazyResource('reports.offlinemeterenergy', 'Reporting'))
 api.add_route('/reports/offlinemeterdaily',
-              offlinemeterdaily.Reporting())
+              LazyResource('reports.offlinemeterdaily', 'Reporting'))
 api.add_route('/reports/offlinemeterinput',
-              offlinemeterinput.Reporting())
+              LazyResource('reports.offlinemeterinput', 'Reporting'))
 api.add_route('/reports/offlinemetersaving',
-              offlinemetersaving.Reporting())
+              LazyResource('reports.offlinemetersaving', 'Reporting'))
 api.add_route('/reports/offlinemeterplan',
-              offlinemeterplan.Reporting())
+              LazyResource('reports.offlinemeterplan', 'Reporting'))
 
 api.add_route('/reports/photovoltaicpowerstationdashboard',
-              photovoltaicpowerstationdashboard.Reporting())
+              LazyResource('reports.photovoltaicpowerstationdashboard', 'Reporting'))
 api.add_route('/reports/photovoltaicpowerstationitemdashboard',
-              photovoltaicpowerstationitemdashboard.Reporting())
+              LazyResource('reports.photovoltaicpowerstationitemdashboard', 'Reporting'))
 api.add_route('/reports/photovoltaicpowerstationdetails',
-              photovoltaicpowerstationdetails.Reporting())
+              LazyResource('reports.photovoltaicpowerstationdetails', 'Reporting'))
 api.add_route('/reports/photovoltaicpowerstationdetails/{id_}/meter',
-              photovoltaicpowerstationdetailsmeter.Reporting())
+              LazyResource('reports.photovoltaicpowerstationdetailsmeter', 'Reporting'))
 api.add_route('/reports/photovoltaicpowerstationdetails/{id_}/invertor',
-              photovoltaicpowerstationdetailsinvertor.Reporting())
+              LazyResource('reports.photovoltaicpowerstationdetailsinvertor', 'Reporting'))
 api.add_route('/reports/photovoltaicpowerstationlist',
-              photovoltaicpowerstationlist.Reporting())
+              LazyResource('reports.photovoltaicpowerstationlist', 'Reporting'))
 api.add_route('/reports/photovoltaicpowerstationreportingrevenue',
-              photovoltaicpowerstationreportingrevenue.Reporting())
+              LazyResource('reports.photovoltaicpowerstationreportingrevenue', 'Reporting'))
 api.add_route('/reports/photovoltaicpowerstationreportingenergy',
-              photovoltaicpowerstationreportingenergy.Reporting())
+              LazyResource('reports.photovoltaicpowerstationreportingenergy', 'Reporting'))
 api.add_route('/reports/photovoltaicpowerstationreportingparameters',
-              photovoltaicpowerstationreportingparameters.Reporting())
+              LazyResource('reports.photovoltaicpowerstationreportingparameters', 'Reporting'))
 api.add_route('/reports/photovoltaicpowerstationcollectionenergy',
-              photovoltaicpowerstationcollectionenergy.Reporting())
+              LazyResource('reports.photovoltaicpowerstationcollectionenergy', 'Reporting'))
 api.add_route('/reports/photovoltaicpowerstationitemenergy',
-              photovoltaicpowerstationitemenergy.Reporting())
+              LazyResource('reports.photovoltaicpowerstationitemenergy', 'Reporting'))
 api.add_route('/reports/photovoltaicpowerstationcollectionbilling',
-              photovoltaicpowerstationcollectionbilling.Reporting())
+              LazyResource('reports.photovoltaicpowerstationcollectionbilling', 'Reporting'))
 api.add_route('/reports/photovoltaicpowerstationitembilling',
-              photovoltaicpowerstationitembilling.Reporting())
+              LazyResource('reports.photovoltaicpowerstationitembilling', 'Reporting'))
 api.add_route('/reports/photovoltaicpowerstationcollectioncarbon',
-              photovoltaicpowerstationcollectioncarbon.Reporting())
+              LazyResource('reports.photovoltaicpowerstationcollectioncarbon', 'Reporting'))
 api.add_route('/reports/photovoltaicpowerstationitemcarbon',
-              photovoltaicpowerstationitemcarbon.Reporting())
+              LazyResource('reports.photovoltaicpowerstationitemcarbon', 'Reporting'))
 api.add_route('/reports/pointrealtime',
-              pointrealtime.Reporting())
+              LazyResource('reports.pointrealtime', 'Reporting'))
+api.add_route('/reports/realtimestream',
+              LazyResource('reports.realtimestream', 'Reporting'))
 api.add_route('/reports/shopfloorcarbon',
-              shopfloorcarbon.Reporting())
+              LazyResource('reports.shopfloorcarbon', 'Reporting'))
 api.add_route('/reports/shopfloorcost',
-              shopfloorcost.Reporting())
+              LazyResource('reports.shopfloorcost', 'Reporting'))
 api.add_route('/reports/shopfloordashboard',
-              shopfloordashboard.Reporting())
+              LazyResource('reports.shopfloordashboard', 'Reporting'))
 api.add_route('/reports/shopfloorenergycategory',
-              shopfloorenergycategory.Reporting())
+              LazyResource('reports.shopfloorenergycategory', 'Reporting'))
 api.add_route('/reports/shopfloorenergyitem',
-              shopfloorenergyitem.Reporting())
+              LazyResource('reports.shopfloorenergyitem', 'Reporting'))
 api.add_route('/reports/shopfloorload',
-              shopfloorload.Reporting())
+              LazyResource('reports.shopfloorload', 'Reporting'))
 api.add_route('/reports/shopfloorsaving',
-              shopfloorsaving.Reporting())
+              LazyResource('reports.shopfloorsaving', 'Reporting'))
 api.add_route('/reports/shopfloorplan',
-              shopfloorplan.Reporting())
+              LazyResource('reports.shopfloorplan', 'Reporting'))
 api.add_route('/reports/shopfloorstatistics',
-              shopfloorstatistics.Reporting())
+              LazyResource('reports.shopfloorstatistics', 'Reporting'))
 api.add_route('/reports/shopfloorbatch',
-              shopfloorbatch.Reporting())
+              LazyResource('reports.shopfloorbatch', 'Reporting'))
 api.add_route('/reports/spacecarbon',
-              spacecarbon.Reporting())
+              LazyResource('reports.spacecarbon', 'Reporting'))
 api.add_route('/reports/spacecost',
-              spacecost.Reporting())
+              LazyResource('reports.spacecost', 'Reporting'))
 api.add_route('/reports/spaceefficiency',
-              spaceefficiency.Reporting())
+              LazyResource('reports.spaceefficiency', 'Reporting'))
 api.add_route('/reports/spaceenergycategory',
-              spaceenergycategory.Reporting())
+              LazyResource('reports.spaceenergycategory', 'Reporting'))
 api.add_route('/reports/spaceenergyitem',
-              spaceenergyitem.Reporting())
+              LazyResource('reports.spaceenergyitem', 'Reporting'))
 api.add_route('/reports/spaceincome',
-              spaceincome.Reporting())
+              LazyResource('reports.spaceincome', 'Reporting'))
 api.add_route('/reports/spaceload',
-              spaceload.Reporting())
+              LazyResource('reports.spaceload', 'Reporting'))
 api.add_route('/reports/spaceoutput',
-              spaceoutput.Reporting())
+              LazyResource('reports.spaceoutput', 'Reporting'))
 api.add_route('/reports/spacesaving',
-              spacesaving.Reporting())
+              LazyResource('reports.spacesaving', 'Reporting'))
 api.add_route('/reports/spaceplan',
-              spaceplan.Reporting())
+              LazyResource('reports.spaceplan', 'Reporting'))
 api.add_route('/reports/spaceprediction',
-              spaceprediction.Reporting())
+              LazyResource('reports.spaceprediction', 'Reporting'))
 api.add_route('/reports/spacestatistics',
-              spacestatistics.Reporting())
+              LazyResource('reports.spacestatistics', 'Reporting'))
 api.add_route('/reports/storebatch',
-              storebatch.Reporting())
+              LazyResource('reports.storebatch', 'Reporting'))
 api.add_route('/reports/storecarbon',
-              storecarbon.Reporting())
+              LazyResource('reports.storecarbon', 'Reporting'))
 api.add_route('/reports/storecost',
-              storecost.Reporting())
+              LazyResource('reports.storecost', 'Reporting'))
 api.add_route('/reports/storeendashboard',
-              storedashboard.Reporting())
+              LazyResource('reports.storedashboard', 'Reporting'))
 api.add_route('/reports/storeenergycategory',
-              storeenergycategory.Reporting())
+              LazyResource('reports.storeenergycategory', 'Reporting'))
 api.add_route('/reports/storeenergyitem',
-              storeenergyitem.Reporting())
+              LazyResource('reports.storeenergyitem', 'Reporting'))
 api.add_route('/reports/spaceenvironmentmonitor',
-              spaceenvironmentmonitor.Reporting())
+              LazyResource('reports.spaceenvironmentmonitor', 'Reporting'))
 api.add_route('/reports/storeload',
-              storeload.Reporting())
+              LazyResource('reports.storeload', 'Reporting'))
 api.add_route('/reports/storesaving',
-              storesaving.Reporting())
+              LazyResource('reports.storesaving', 'Reporting'))
 api.add_route('/reports/storeplan',
-              storeplan.Reporting())
+              LazyResource('reports.storeplan', 'Reporting'))
 api.add_route('/reports/storestatistics',
-              storestatistics.Reporting())
+              LazyResource('reports.storestatistics', 'Reporting'))
 api.add_route('/reports/tenantbatch',
-              tenantbatch.Reporting())
+              LazyResource('reports.tenantbatch', 'Reporting'))
 api.add_route('/reports/tenantbill',
-              tenantbill.Reporting())
+              LazyResource('reports.tenantbill', 'Reporting'))
 api.add_route('/reports/tenantcarbon',
-              tenantcarbon.Reporting())
+              LazyResource('reports.tenantcarbon', 'Reporting'))
 api.add_route('/reports/tenantcost',
-              tenantcost.Reporting())
+              LazyResource('reports.tenantcost', 'Reporting'))
 api.add_route('/reports/tenantdashboard',
-              tenantdashboard.Reporting())
+              LazyResource('reports.tenantdashboard', 'Reporting'))
 api.add_route('/reports/tenantenergycategory',
-              tenantenergycategory.Reporting())
+              LazyResource('reports.tenantenergycategory', 'Reporting'))
 api.add_route('/reports/tenantenergyitem',
-              tenantenergyitem.Reporting())
+              LazyResource('reports.tenantenergyitem', 'Reporting'))
 api.add_route('/reports/tenantload',
-              tenantload.Reporting())
+              LazyResource('reports.tenantload', 'Reporting'))
 api.add_route('/reports/tenantsaving',
-              tenantsaving.Reporting())
+              LazyResource('reports.tenantsaving', 'Reporting'))
 api.add_route('/reports/tenantplan',
-              tenantplan.Reporting())
+              LazyResource('reports.tenantplan', 'Reporting'))
 api.add_route('/reports/tenantstatistics',
-              tenantstatistics.Reporting())
+              LazyResource('reports.tenantstatistics', 'Reporting'))
 api.add_route('/reports/virtualmeterbatch',
-              virtualmeterbatch.Reporting())
+              LazyResource('reports.virtualmeterbatch', 'Reporting'))
 api.add_route('/reports/virtualmetersaving',
-              virtualmetersaving.Reporting())
+              LazyResource('reports.virtualmetersaving', 'Reporting'))
 api.add_route('/reports/virtualmeterplan',
-              virtualmeterplan.Reporting())
+              LazyResource('reports.virtualmeterplan', 'Reporting'))
 api.add_route('/reports/virtualmeterenergy',
-              virtualmeterenergy.Reporting())
+              LazyResource('reports.virtualmeterenergy', 'Reporting'))
 api.add_route('/reports/virtualmetercarbon',
-              virtualmetercarbon.Reporting())
+              LazyResource('reports.virtualmetercarbon', 'Reporting'))
 api.add_route('/reports/virtualmetercost',
-              virtualmetercost.Reporting())
+              LazyResource('reports.virtualmetercost', 'Reporting'))
 
 ########################################################################################################################
 # BEGIN Routes for Enterprise Edition
@@ -1398,6 +1270,12 @@ api.add_route('/reports/virtualmetercost',
 # END Routes for Enterprise Edition
 ########################################################################################################################
 
+# import all resources now, in the gunicorn master process when started with --preload,
+# so that the workers share them copy-on-write
+if config.is_route_preloaded:
+    router.preload()
+    freeze()
+
 # # for debugging on Windows
 # from waitress import serve
 # serve(api, host='0.0.0.0', port=8000)
@@ -0,0 +1,80 @@
+import gc
+import importlib
+import os
+import subprocess
+import sys
+import time
+
+
+########################################################################################################################
+# Benchmark of the startup time and memory of API workers, with lazily resolved and with preloaded routes
+# Each mode imports app.py in a new process, like a gunicorn worker, and then forks workers like gunicorn --preload.
+# The memory of a forked worker is reported after a garbage collection, the private part is not shared with the master.
+# Run in the myems-api folder on Linux: python benchmark_app.py
+########################################################################################################################
+
+WORKER_COUNT = 4
+
+
+def read_memory(pid='self'):
+    """
+    Read the memory of a process from /proc
+    :return: dict of Rss, Pss, Private_Clean and Private_Dirty in kB
+    """
+    memory = dict()
+    with open('/proc/' + str(pid) + '/smaps_rollup') as f:
+        for line in f:
+            fields = line.split()
+            if fields[0].rstrip(':') in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                memory[fields[0].rstrip(':')] = int(fields[1])
+    return memory
+
+
+def run_worker(write_fd):
+    gc.collect()
+    memory = read_memory()
+    os.write(write_fd, '{} {} {}\n'.format(memory['Rss'], memory['Pss'],
+                                            memory['Private_Clean'] + memory['Private_Dirty']).encode('utf-8'))
+    os._exit(0)
+
+
+def run_mode():
+    start_time = time.perf_counter()
+    importlib.import_module('app')
+    startup_time = time.perf_counter() - start_time
+    memory = read_memory()
+    print('{:<40} {:>10.2f} s {:>10.1f} MB RSS'.format('startup', startup_time, memory['Rss'] / 1024))
+
+    read_fd, write_fd = os.pipe()
+    pids = list()
+    for _ in range(WORKER_COUNT):
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            run_worker(write_fd)
+        pids.append(pid)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        lines = f.read().split('\n')
+    for pid in pids:
+        os.waitpid(pid, 0)
+    for i, line in enumerate(line for line in lines if line):
+        rss, pss, private = (int(value) / 1024 for value in line.split())
+        print('{:<40} {:>10.1f} MB RSS {:>10.1f} MB PSS {:>10.1f} MB private'.format(
+            'forked worker ' + str(i + 1), rss, pss, private))
+
+
+def main():
+    for is_route_preloaded in ('False', 'True'):
+        print('IS_ROUTE_PRELOADED=' + is_route_preloaded)
+        sys.stdout.flush()
+        # every mode runs in a new interpreter so that no module is imported yet
+        subprocess.run([sys.executable, __file__, 'mode'],
+                       env=dict(os.environ, IS_ROUTE_PRELOADED=is_route_preloaded), check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'mode':
+        run_mode()
+    else:
+        main()
@@ -0,0 +1,91 @@
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+import excelexporters.meterbatch
+import excelexporters.meterenergy
+import excelexporters.metertracking
+
+
+########################################################################################################################
+# Benchmark of peak memory and time per report of excel exporters with synthetic report data
+# Run in the myems-api folder: python benchmark_excelexporters.py
+########################################################################################################################
+
+def build_meter_batch_report(meter_count, energy_category_count):
+    return {'meters': [{'id': i,
+                        'meter_name': 'Meter ' + str(i),
+                        'space_name': 'Space ' + str(i % 100),
+                        'values': [Decimal(i * j) / Decimal(7) for j in range(energy_category_count)]}
+                       for i in range(meter_count)],
+            'energycategories': [{'name': 'Category ' + str(j), 'unit_of_measure': 'kWh'}
+                                 for j in range(energy_category_count)]}
+
+
+def build_meter_tracking_report(meter_count):
+    return {'meters': [{'id': i,
+                        'meter_name': 'Meter ' + str(i),
+                        'space_name': 'Space ' + str(i % 100),
+                        'cost_center_name': 'Cost Center',
+                        'energy_category_name': 'Electricity',
+                        'description': None,
+                        'start_value': Decimal(i),
+                        'end_value': Decimal(i * 2),
+                        'difference_value': Decimal(i)}
+                       for i in range(meter_count)],
+            'start_integrity_rate': Decimal(1),
+            'end_integrity_rate': Decimal(1),
+            'full_integrity_rate': Decimal(1)}
+
+
+def build_meter_energy_report(days, point_count, minutes_per_sample):
+    start_datetime = datetime(2024, 1, 1)
+    daily_timestamps = [(start_datetime + timedelta(days=i)).isoformat()[0:19] for i in range(days)]
+    daily_values = [Decimal(i) for i in range(days)]
+    sample_count = days * 24 * 60 // minutes_per_sample
+    parameter_timestamps = [(start_datetime + timedelta(minutes=i * minutes_per_sample)).isoformat()[0:19]
+                            for i in range(sample_count)]
+    return {'meter': {'energy_category_name': 'Electricity', 'unit_of_measure': 'kWh'},
+            'base_period': {'total_in_category': Decimal(0), 'timestamps': [], 'values': []},
+            'reporting_period': {'total_in_category': sum(daily_values),
+                                 'total_in_kgce': Decimal(0),
+                                 'total_in_kgco2e': Decimal(0),
+                                 'increment_rate': None,
+                                 'timestamps': daily_timestamps,
+                                 'values': daily_values,
+                                 'rates': [None] * days},
+            'parameters': {'names': ['Point ' + str(j) for j in range(point_count)],
+                           'timestamps': [parameter_timestamps for _ in range(point_count)],
+                           'values': [[Decimal(i % 100) for i in range(sample_count)] for _ in range(point_count)]}}
+
+
+def measure(name, func, *args):
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    base64_message = func(*args)
+    elapsed_time = time.perf_counter() - start_time
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('{:<40} {:>10.2f} s {:>10.1f} MB peak {:>10.1f} KB base64'.format(
+        name, elapsed_time, peak_memory / 1024 / 1024, len(base64_message) / 1024))
+
+
+def main():
+    start = '2024-01-01T00:00:00'
+    end = '2024-02-01T00:00:00'
+    for meter_count in (100, 3000):
+        measure('meterbatch ' + str(meter_count) + ' meters',
+                excelexporters.meterbatch.export,
+                build_meter_batch_report(meter_count, 6), 'Space', start, end, 'en')
+        measure('metertracking ' + str(meter_count) + ' meters',
+                excelexporters.metertracking.export,
+                build_meter_tracking_report(meter_count), 'Space', None, start, end, 'en')
+    for point_count, minutes_per_sample in ((5, 60), (20, 15)):
+        measure('meterenergy ' + str(point_count) + ' points every ' + str(minutes_per_sample) + ' min',
+                excelexporters.meterenergy.export,
+                build_meter_energy_report(31, point_count, minutes_per_sample),
+                'Meter', start, end, None, None, 'daily', 'en')
+
+
+if __name__ == "__main__":
+    main()
@@ -144,3 +144,151 @@ is_recursive = config('IS_RECURSIVE', default=True, cast=bool)
 # indicates how long in second the user session expires
 # default value is 60 * 60 * 8 = 28800
 session_expires_in_seconds = config('SESSION_EXPIRES_IN_SECONDS', default=28800, cast=int)
+
+# indicates how long in second a validated user session or API key is cached in each API worker
+# set to 0 to disable the cache
+auth_cache_ttl_in_seconds = config('AUTH_CACHE_TTL_IN_SECONDS', default=60, cast=int)
+
+# indicates the maximum number of user sessions and API keys cached in each API worker
+auth_cache_max_size = config('AUTH_CACHE_MAX_SIZE', default=10000, cast=int)
+
+# indicates if the Excel file is generated and embedded as base64 string in JSON reports
+# set to False to return report data only and download Excel files through the export jobs API
+# the request parameter 'excel' overrides this config
+is_excel_inline = config('IS_EXCEL_INLINE', default=True, cast=bool)
+
+# indicates where Excel files of export jobs will be saved to
+export_path = config('EXPORT_PATH', default='/tmp/myems-api-export/')
+
+# indicates the maximum number of export jobs running concurrently in each API worker
+export_job_max_workers = config('EXPORT_JOB_MAX_WORKERS', default=2, cast=int)
+
+# indicates how long in second the export job and its Excel file are kept
+export_job_expires_in_seconds = config('EXPORT_JOB_EXPIRES_IN_SECONDS', default=3600, cast=int)
+
+# indicates the maximum number of chart images cached in each API worker for excel exports
+# set to 0 to disable the cache
+chart_image_cache_max_size = config('CHART_IMAGE_CACHE_MAX_SIZE', default=100, cast=int)
+
+# indicates if the chart renderer is started when the API worker starts
+# otherwise it is started by the first excel export with charts
+is_chart_renderer_warmed_up = config('IS_CHART_RENDERER_WARMED_UP', default=False, cast=bool)
+
+# indicates if the resources of all routes are imported when the API starts, to be used with gunicorn --preload
+# otherwise the resources of a route are imported by the first request of the route
+is_route_preloaded = config('IS_ROUTE_PRELOADED', default=False, cast=bool)
+
+# indicates the maximum total size in bytes of report results cached in each API worker
+# reports of meter energy and space energy category are cached in quick mode only, without raw point values
+# set to 0 to disable the report cache
+report_cache_max_bytes = config('REPORT_CACHE_MAX_BYTES', default=67108864, cast=int)
+
+# indicates how often in second the data watermarks of the report cache are refreshed from databases
+report_cache_watermark_refresh_seconds = config('REPORT_CACHE_WATERMARK_REFRESH_SECONDS', default=10, cast=int)
+
+# indicates how long in second a cached report result is served at most
+# the data watermarks invalidate results when data changes, this limit covers changes of system settings
+report_cache_max_age_in_seconds = config('REPORT_CACHE_MAX_AGE_IN_SECONDS', default=3600, cast=int)
+
+# indicates the size of the connection pool of each database used by grouped report queries in each API worker
+# the maximum value is 32
+query_connection_pool_size = min(config('QUERY_CONNECTION_POOL_SIZE', default=5, cast=int), 32)
+
+# indicates the maximum number of grouped report queries running in parallel in each API worker
+query_max_workers = config('QUERY_MAX_WORKERS', default=4, cast=int)
+
+# indicates the quality of service of command messages published to the MQTT broker, 0, 1 or 2
+mqtt_command_qos = config('MQTT_COMMAND_QOS', default=1, cast=int)
+
+# indicates how long in second sending commands waits for the connection and delivery acknowledgements
+mqtt_publish_timeout_in_seconds = config('MQTT_PUBLISH_TIMEOUT_IN_SECONDS', default=5, cast=float)
+
+# indicates the maximum number of outbound messages queued by the MQTT publisher of each API worker
+mqtt_max_queued_messages = config('MQTT_MAX_QUEUED_MESSAGES', default=1000, cast=int)
+
+# indicates the maximum delay in second between reconnect attempts of the MQTT publisher
+mqtt_reconnect_max_delay_in_seconds = config('MQTT_RECONNECT_MAX_DELAY_IN_SECONDS', default=60, cast=int)
+
+# indicates how long in second the topology index of the space tree is kept in each API worker
+# changes invalidate the index of the API worker immediately, and of the other workers within
+# COLLECTION_VERSION_REFRESH_SECONDS
+topology_cache_ttl_in_seconds = config('TOPOLOGY_CACHE_TTL_IN_SECONDS', default=300, cast=int)
+
+# indicates how long in second the non-working days of working calendars are kept in each API worker
+# changes invalidate them in the API worker immediately, and in the other workers within
+# COLLECTION_VERSION_REFRESH_SECONDS
+working_calendar_cache_ttl_in_seconds = config('WORKING_CALENDAR_CACHE_TTL_IN_SECONDS', default=300, cast=int)
+
+# indicates how long in second the points of energy storage and photovoltaic power stations are kept in each API worker
+# changes of stations, their devices and points are picked up within COLLECTION_VERSION_REFRESH_SECONDS
+fleet_index_cache_ttl_in_seconds = config('FLEET_INDEX_CACHE_TTL_IN_SECONDS', default=300, cast=int)
+
+# indicates how often in second each API worker refreshes its snapshot of latest point values
+# set to 0 to query the latest value tables on every request
+latest_value_snapshot_refresh_seconds = config('LATEST_VALUE_SNAPSHOT_REFRESH_SECONDS', default=5, cast=int)
+
+# indicates how often in second the snapshot of latest point values is reloaded from the whole tables
+latest_value_snapshot_reload_seconds = config('LATEST_VALUE_SNAPSHOT_RELOAD_SECONDS', default=300, cast=int)
+
+# indicates how often in second a realtime stream checks for changed values and sends them as one event
+realtime_stream_coalescing_interval_in_seconds = config('REALTIME_STREAM_COALESCING_INTERVAL_IN_SECONDS', default=2,
+                                                        cast=float)
+
+# indicates the idle time in second after which a realtime stream sends a heartbeat comment
+realtime_stream_heartbeat_interval_in_seconds = config('REALTIME_STREAM_HEARTBEAT_INTERVAL_IN_SECONDS', default=30,
+                                                       cast=int)
+
+# indicates how long in second a realtime stream lasts before the client has to reconnect
+# keep it below the gunicorn --timeout, 600 in myems-api.service, Dockerfile and run.sh
+realtime_stream_max_duration_in_seconds = config('REALTIME_STREAM_MAX_DURATION_IN_SECONDS', default=300, cast=int)
+
+# indicates how long in millisecond a client waits before reconnecting to a closed realtime stream
+realtime_stream_retry_in_milliseconds = config('REALTIME_STREAM_RETRY_IN_MILLISECONDS', default=5000, cast=int)
+
+# indicates the maximum number of realtime streams served by each API worker
+# every stream holds a worker thread, keep it below the gunicorn --threads
+# which is 32 in myems-api.service, Dockerfile and run.sh
+realtime_stream_max_connections = config('REALTIME_STREAM_MAX_CONNECTIONS', default=16, cast=int)
+
+# indicates the maximum number of points subscribed by one realtime stream
+realtime_stream_max_points = config('REALTIME_STREAM_MAX_POINTS', default=5000, cast=int)
+
+# indicates the minimum size in byte of response bodies compressed with gzip or brotli
+# set to 0 to disable response compression, for example if a reverse proxy compresses responses
+response_compression_min_bytes = config('RESPONSE_COMPRESSION_MIN_BYTES', default=1024, cast=int)
+
+# indicates the compression level of response bodies, from 1 (fastest) to 9 (smallest)
+response_compression_level = config('RESPONSE_COMPRESSION_LEVEL', default=6, cast=int)
+
+# indicates the number of samples to which trend reports reduce each series of raw point values
+# the request parameter samples overrides it, set to 0 to return raw values by default
+# the embedded Excel file always contains raw values
+trend_downsampling_samples = config('TREND_DOWNSAMPLING_SAMPLES', default=2000, cast=int)
+
+# indicates the downsampling method of trend reports, lttb or minmax
+# the request parameter sampling overrides it
+trend_downsampling_method = config('TREND_DOWNSAMPLING_METHOD', default='lttb')
+
+# indicates how often in second each API worker refreshes the change counters of collections
+# within this time, unchanged collections are answered with 304 Not Modified without querying databases
+collection_version_refresh_seconds = config('COLLECTION_VERSION_REFRESH_SECONDS', default=5, cast=int)
+
+# indicates the number of rows of a collection page if the request parameter size is not specified
+collection_default_page_size = config('COLLECTION_DEFAULT_PAGE_SIZE', default=100, cast=int)
+
+# indicates the maximum number of rows of a collection page
+collection_max_page_size = config('COLLECTION_MAX_PAGE_SIZE', default=1000, cast=int)
+
+# indicates if requests are profiled, printed as JSON lines and aggregated by route in each API worker
+# the metrics are served by the endpoint /profiling/metrics for the API worker which serves the request only,
+# they are not aggregated across workers, use the printed JSON lines for all workers
+is_profiling_enabled = config('IS_PROFILING_ENABLED', default=False, cast=bool)
+
+# indicates the latency in millisecond from which the queries of a profiled request are printed and kept
+profiling_slow_request_threshold_in_ms = config('PROFILING_SLOW_REQUEST_THRESHOLD_IN_MS', default=5000, cast=int)
+
+# indicates the number of the last slow requests kept with their queries in each API worker
+profiling_slow_request_sample_size = config('PROFILING_SLOW_REQUEST_SAMPLE_SIZE', default=20, cast=int)
+
+# indicates the maximum number of queries recorded for one profiled request
+profiling_max_queries_per_request = config('PROFILING_MAX_QUERIES_PER_REQUEST', default=1000, cast=int)
@@ -5,7 +5,7 @@ import falcon
 import mysql.connector
 import simplejson as json
 import config
-from core.useractivity import admin_control
+from core.useractivity import admin_control, invalidate_api_key
 
 
 class ApiKeyCollection:
@@ -200,16 +200,19 @@ class ApiKeyItem:
         cursor.execute(" SELECT token "
                        " FROM tbl_api_keys "
                        " WHERE id = %s ", (id_,))
-        if cursor.fetchone() is None:
+        row = cursor.fetchone()
+        if row is None:
             cursor.close()
             cnx.close()
             raise falcon.HTTPError(status=falcon.HTTP_404, title='API.NOT_FOUND',
                                    description='API.API_KEY_NOT_FOUND')
+        token = row[0]
 
         cursor.execute(" UPDATE tbl_api_keys "
                        " SET name = %s, expires_datetime_utc = %s "
                        " WHERE id = %s ", (name, expires_datetime_utc, id_))
         cnx.commit()
+        invalidate_api_key(token)
         
         cursor.close()
         cnx.close()
@@ -229,14 +232,17 @@ class ApiKeyItem:
         cursor.execute(" SELECT token "
                        " FROM tbl_api_keys "
                        " WHERE id = %s ", (id_,))
-        if cursor.fetchone() is None:
+        row = cursor.fetchone()
+        if row is None:
             cursor.close()
             cnx.close()
             raise falcon.HTTPError(status=falcon.HTTP_404, title='API.NOT_FOUND',
                                    description='API.API_KEY_NOT_FOUND')
+        token = row[0]
 
         cursor.execute(" DELETE FROM tbl_api_keys WHERE id = %s ", (id_,))
         cnx.commit()
+        invalidate_api_key(token)
 
         cursor.close()
         cnx.close()
@@ -0,0 +1,185 @@
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+import mysql.connector
+import numpy as np
+import config
+from core import collectionquery
+
+
+########################################################################################################################
+# Index of the non-working days of working calendars
+# The non-working days of each calendar are loaded once per API worker and kept as one bitmap per year, bit n of the
+# bitmap of a year is set if day n of the year (counted from 0) is a non-working day. The non-working days of an
+# entity with several calendars are the union of their bitmaps. Arrays of datetimes are classified with NumPy by
+# looking up their day numbers in the sorted array of non-working day numbers.
+# The baseline and prediction stages of myems-aggregation classify days the same way in get_slots and
+# get_non_working_day_codes of profiles.py. The services are deployed separately and share no package, so a change of
+# the classification rules must be made in both modules.
+# The working calendar admin endpoints in core/workingcalendar.py increment the change counter of
+# tbl_working_calendars_non_working_days, see core/collectionquery.py, and the index of every API worker is dropped
+# when the counter changes. The calendars are also reloaded after config.working_calendar_cache_ttl_in_seconds.
+########################################################################################################################
+TABLE_NAME = 'tbl_working_calendars_non_working_days'
+
+_lock = threading.Lock()
+_index = {'bitmaps': dict(), 'loaded_at': dict(), 'generation': 0, 'version': None}
+
+# ids per IN list
+_BATCH_SIZE = 1000
+
+
+def build_bitmaps(days):
+    """
+    Build the bitmaps of non-working days
+    :param days: iterable of dates
+    :return: dict of year and bitmap
+    """
+    bitmaps = dict()
+    for day in days:
+        day_of_year = day.toordinal() - date(day.year, 1, 1).toordinal()
+        bitmaps[day.year] = bitmaps.get(day.year, 0) | (1 << day_of_year)
+    return bitmaps
+
+
+class NonWorkingDays:
+    """
+    The union of the non-working days of working calendars
+    """
+    def __init__(self, bitmaps_list=()):
+        self.bitmaps = dict()
+        for bitmaps in bitmaps_list:
+            for year, bitmap in bitmaps.items():
+                self.bitmaps[year] = self.bitmaps.get(year, 0) | bitmap
+        self._first_ordinals = {year: date(year, 1, 1).toordinal() for year in self.bitmaps}
+        self._ordinals = None
+
+    def __contains__(self, day):
+        """
+        :param day: date or local datetime
+        """
+        bitmap = self.bitmaps.get(day.year)
+        if bitmap is None:
+            return False
+        return (bitmap >> (day.toordinal() - self._first_ordinals[day.year])) & 1 == 1
+
+    def __len__(self):
+        return sum(bin(bitmap).count('1') for bitmap in self.bitmaps.values())
+
+    def get_ordinals(self):
+        """
+        :return: sorted array of the proleptic Gregorian ordinals of the non-working days
+        """
+        if self._ordinals is None:
+            ordinals = list()
+            for year, bitmap in self.bitmaps.items():
+                first_ordinal = self._first_ordinals[year]
+                day_of_year = 0
+                while bitmap:
+                    if bitmap & 1:
+                        ordinals.append(first_ordinal + day_of_year)
+                    bitmap >>= 1
+                    day_of_year += 1
+            self._ordinals = np.array(sorted(ordinals), dtype=np.int64)
+        return self._ordinals
+
+    def classify(self, datetimes_local):
+        """
+        Classify many datetimes at once
+        :param datetimes_local: iterable of dates or local datetimes
+        :return: list of booleans, True for non-working days
+        """
+        ordinals = np.fromiter((datetime_local.toordinal() for datetime_local in datetimes_local), dtype=np.int64)
+        if len(self.bitmaps) == 0:
+            return [False] * len(ordinals)
+        return np.isin(ordinals, self.get_ordinals()).tolist()
+
+    def split_subtotals(self, rows_hourly, timezone_offset):
+        """
+        Split hourly rows into working days and non-working days subtotals, the rows are classified at once
+        :param rows_hourly: list of (start_datetime_utc, actual_value)
+        :param timezone_offset: offset in minutes of the local time from UTC
+        :return: tuple of (working days subtotal, non-working days subtotal)
+        """
+        offset = timedelta(minutes=timezone_offset)
+        rows_hourly = [row for row in rows_hourly if row[1] is not None]
+        is_non_working_list = self.classify([row[0] + offset for row in rows_hourly])
+        working_days_subtotal = sum((row[1] for row, is_non_working in zip(rows_hourly, is_non_working_list)
+                                     if not is_non_working), Decimal(0.0))
+        non_working_days_subtotal = sum((row[1] for row, is_non_working in zip(rows_hourly, is_non_working_list)
+                                         if is_non_working), Decimal(0.0))
+        return working_days_subtotal, non_working_days_subtotal
+
+
+def _load_bitmaps(working_calendar_ids):
+    days = {working_calendar_id: list() for working_calendar_id in working_calendar_ids}
+    cnx = None
+    cursor = None
+    try:
+        cnx = mysql.connector.connect(**config.myems_system_db)
+        cursor = cnx.cursor()
+        for i in range(0, len(working_calendar_ids), _BATCH_SIZE):
+            chunk = working_calendar_ids[i:i + _BATCH_SIZE]
+            cursor.execute(" SELECT working_calendar_id, date_local "
+                           " FROM tbl_working_calendars_non_working_days "
+                           " WHERE working_calendar_id IN (" + ', '.join(['%s'] * len(chunk)) + ") ", tuple(chunk))
+            for row in cursor.fetchall():
+                days[row[0]].append(row[1])
+    finally:
+        if cursor:
+            cursor.close()
+        if cnx:
+            cnx.close()
+    return {working_calendar_id: build_bitmaps(calendar_days) for working_calendar_id, calendar_days in days.items()}
+
+
+def get_non_working_days(working_calendar_ids):
+    """
+    Get the union of the non-working days of working calendars
+    :param working_calendar_ids: iterable of working calendar ids
+    :return: NonWorkingDays
+    """
+    working_calendar_ids = sorted(set(working_calendar_ids))
+    versions = collectionquery.get_versions([TABLE_NAME])
+    version = versions[TABLE_NAME][0] if versions is not None else None
+    now = time.monotonic()
+    bitmaps_list = list()
+    missing_ids = list()
+    with _lock:
+        if version is not None and version != _index['version']:
+            # changed through an API worker, maybe another one
+            _drop()
+            _index['version'] = version
+        for working_calendar_id in working_calendar_ids:
+            loaded_at = _index['loaded_at'].get(working_calendar_id)
+            if loaded_at is not None and now - loaded_at < config.working_calendar_cache_ttl_in_seconds:
+                bitmaps_list.append(_index['bitmaps'][working_calendar_id])
+            else:
+                missing_ids.append(working_calendar_id)
+        generation = _index['generation']
+    if len(missing_ids) > 0:
+        loaded = _load_bitmaps(missing_ids)
+        bitmaps_list.extend(loaded.values())
+        with _lock:
+            # do not keep bitmaps loaded before the last invalidation
+            if _index['generation'] == generation:
+                for working_calendar_id, bitmaps in loaded.items():
+                    _index['bitmaps'][working_calendar_id] = bitmaps
+                    _index['loaded_at'][working_calendar_id] = now
+    return NonWorkingDays(bitmaps_list)
+
+
+def _drop():
+    _index['bitmaps'] = dict()
+    _index['loaded_at'] = dict()
+    _index['generation'] += 1
+
+
+def invalidate():
+    """
+    Drop the index of the API worker, must be called after non-working days change and the change counter of
+    tbl_working_calendars_non_working_days is touched in the transaction of the change
+    """
+    with _lock:
+        _drop()
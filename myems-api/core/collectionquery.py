@@ -0,0 +1,189 @@
+import hashlib
+import threading
+import time
+from datetime import timezone
+import falcon
+import mysql.connector
+import config
+
+
+########################################################################################################################
+# Helpers for collection endpoints of admin resources
+# Change counters: every handler writing one of the tables of a collection calls touch() before committing, which
+# increments the counter of the table in tbl_change_counters within the same transaction. The ETag and Last-Modified
+# headers of a collection are derived from the counters of the tables it reads, so an unchanged list is answered with
+# 304 Not Modified. The counters are cached in each API worker for config.collection_version_refresh_seconds, and
+# writes through the same worker refresh them immediately. If the counters cannot be read, for example before the
+# database is upgraded, they are not queried again within the same interval.
+# The collections of points, meters, energy categories, energy items, cost centers, cost center tariffs and tariffs
+# are conditional, all writes of their tables go through the counted handlers. Collections with columns written by
+# other services, like the last seen time of data sources and gateways, are not, a counter would miss those writes.
+# Pagination: with the request parameter page, a collection returns one page of size rows, and the total number of
+# rows in the X-Total-Count header. Without it, the whole collection is returned as before. Only points and meters,
+# which grow with the number of devices, are paginated, the other collections are short lookup lists.
+########################################################################################################################
+_lock = threading.Lock()
+_versions = dict()
+_failed_at = {'time': None}
+
+
+def touch(cursor, *table_names):
+    """
+    Increment the change counters of tables, must be called in the transaction of the change before commit
+    :param cursor: cursor of myems_system_db
+    :param table_names: names of the changed tables, for example 'tbl_points'
+    """
+    try:
+        for table_name in table_names:
+            cursor.execute(" INSERT INTO tbl_change_counters (table_name, counter, last_modified_datetime_utc) "
+                           " VALUES (%s, 1, UTC_TIMESTAMP()) "
+                           " ON DUPLICATE KEY UPDATE counter = counter + 1, "
+                           "                         last_modified_datetime_utc = UTC_TIMESTAMP() ",
+                           (table_name,))
+    except mysql.connector.Error as ex:
+        # the database is not upgraded yet, collections are returned without ETag
+        print('collectionquery: ' + str(ex))
+    with _lock:
+        for table_name in table_names:
+            _versions.pop(table_name, None)
+
+
+def _query_versions(table_names):
+    cnx = None
+    cursor = None
+    try:
+        cnx = mysql.connector.connect(**config.myems_system_db)
+        cursor = cnx.cursor()
+        cursor.execute(" SELECT table_name, counter, last_modified_datetime_utc "
+                       " FROM tbl_change_counters "
+                       " WHERE table_name IN (" + ', '.join(['%s'] * len(table_names)) + ") ",
+                       tuple(table_names))
+        result = {table_name: (0, None) for table_name in table_names}
+        for row in cursor.fetchall():
+            result[row[0]] = (row[1], row[2])
+        return result
+    finally:
+        if cursor:
+            cursor.close()
+        if cnx:
+            cnx.close()
+
+
+def get_versions(table_names):
+    """
+    Get the change counters of tables
+    :param table_names: list of table names
+    :return: dict of table name and tuple of (counter, last_modified_datetime_utc), or None if unavailable
+    """
+    now = time.monotonic()
+    result = dict()
+    with _lock:
+        for table_name in table_names:
+            entry = _versions.get(table_name)
+            if entry is not None and now - entry[1] < config.collection_version_refresh_seconds:
+                result[table_name] = entry[0]
+        failed_at = _failed_at['time']
+    missing = [table_name for table_name in table_names if table_name not in result]
+    if len(missing) > 0:
+        if failed_at is not None and now - failed_at < config.collection_version_refresh_seconds:
+            return None
+        try:
+            queried = _query_versions(missing)
+        except mysql.connector.Error as ex:
+            print('collectionquery: ' + str(ex))
+            with _lock:
+                _failed_at['time'] = now
+            return None
+        with _lock:
+            for table_name, version in queried.items():
+                _versions[table_name] = (version, now)
+        result.update(queried)
+    return result
+
+
+def is_not_modified(req, resp, table_names):
+    """
+    Set the ETag and Last-Modified headers of a collection and check the conditional request headers
+    :param req: HTTP request, the query parameters are part of the ETag
+    :param resp: HTTP response
+    :param table_names: list of the tables read by the collection
+    :return: True if the client has the current representation, then the status is set to 304
+    """
+    versions = get_versions(table_names)
+    if versions is None:
+        return False
+    key = repr((req.path, sorted(req.params.items()), sorted(versions.items())))
+    etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    resp.etag = etag
+    last_modified_list = [version[1] for version in versions.values() if version[1] is not None]
+    last_modified = max(last_modified_list) if len(last_modified_list) > 0 else None
+    if last_modified is not None:
+        resp.last_modified = last_modified.replace(tzinfo=timezone.utc)
+
+    if req.if_none_match is not None:
+        is_match = any(item == '*' or item == etag for item in req.if_none_match)
+    elif req.if_modified_since is not None and last_modified is not None:
+        # HTTP dates have a resolution of one second
+        is_match = last_modified.replace(microsecond=0) <= req.if_modified_since.replace(tzinfo=None)
+    else:
+        is_match = False
+    if is_match:
+        resp.status = falcon.HTTP_304
+    return is_match
+
+
+def get_page(req):
+    """
+    Get the pagination parameters of a collection request
+    :param req: HTTP request
+    :return: tuple of (limit, offset), or None to return the whole collection
+    """
+    page = req.params.get('page')
+    if page is None or len(str.strip(page)) == 0:
+        return None
+    page = str.strip(page)
+    if not page.isdigit() or int(page) <= 0:
+        raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST', description='API.INVALID_PAGE')
+
+    size = req.params.get('size')
+    if size is None or len(str.strip(size)) == 0:
+        size = config.collection_default_page_size
+    else:
+        size = str.strip(size)
+        if not size.isdigit() or int(size) <= 0 or int(size) > config.collection_max_page_size:
+            raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                                   description='API.INVALID_PAGE_SIZE')
+        size = int(size)
+    return size, (int(page) - 1) * size
+
+
+def get_id_filter(req, name, description):
+    """
+    Get an id filter of a collection request
+    :param req: HTTP request
+    :param name: name of the request parameter, for example 'datasourceid'
+    :param description: error description if the value is invalid
+    :return: the id or None
+    """
+    value = req.params.get(name)
+    if value is None or len(str.strip(value)) == 0:
+        return None
+    value = str.strip(value)
+    if not value.isdigit() or int(value) <= 0:
+        raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST', description=description)
+    return int(value)
+
+
+def get_search(req):
+    """
+    Get the search text of a collection request, which matches the beginning of names so that the name index is used
+    :param req: HTTP request
+    :return: the LIKE pattern or None
+    """
+    search = req.params.get('search')
+    if search is None or len(str.strip(search)) == 0:
+        return None
+    search = str.strip(search)
+    for character in ('\\', '%', '_'):
+        search = search.replace(character, '\\' + character)
+    return search + '%'
@@ -3,13 +3,31 @@ from datetime import datetime, timedelta
 import falcon
 import mysql.connector
 import simplejson as json
-import paho.mqtt.client as mqtt
-import time
 from string import Template
+from core import mqttpublisher
 from core.useractivity import user_logger, admin_control, access_control, api_key_control
 import config
 
 
+def _parse_set_value(data):
+    if 'set_value' not in data.keys() or data['set_value'] is None:
+        return None
+    elif isinstance(data['set_value'], float):
+        return float(data['set_value'])
+    elif isinstance(data['set_value'], int):
+        return int(data['set_value'])
+    else:
+        raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                               description='API.INVALID_SET_VALUE')
+
+
+def _build_payload(command):
+    if command['set_value'] is not None:
+        return Template(command['payload']).substitute(s1=str(command['set_value']))
+    else:
+        return Template(command['payload']).substitute(s1=str(0))
+
+
 class CommandCollection:
     def __init__(self):
         """"Initializes CommandCollection"""
@@ -447,15 +465,7 @@ class CommandSend:
 
         new_values = json.loads(raw_json)
 
-        if 'set_value' not in new_values['data'].keys() or new_values['data']['set_value'] is None:
-            set_value = None
-        elif isinstance(new_values['data']['set_value'], float):
-            set_value = float(new_values['data']['set_value'])
-        elif isinstance(new_values['data']['set_value'], int):
-            set_value = int(new_values['data']['set_value'])
-        else:
-            raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
-                                   description='API.INVALID_SET_VALUE')
+        set_value = _parse_set_value(new_values['data'])
 
         cnx = mysql.connector.connect(**config.myems_system_db)
         cursor = cnx.cursor()
@@ -487,35 +497,107 @@ class CommandSend:
         cursor.close()
         cnx.close()
 
-        mqc = None
-        try:
-            mqc = mqtt.Client(callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
-                              client_id='MYEMS' + "-" + str(time.time()),
-                              clean_session=None,
-                              userdata=None,
-                              protocol=mqtt.MQTTv5,
-                              transport='tcp',
-                              reconnect_on_failure=True,
-                              manual_ack=False)
-            mqc.username_pw_set(config.myems_mqtt_broker['username'], config.myems_mqtt_broker['password'])
-            mqc.connect(config.myems_mqtt_broker['host'], config.myems_mqtt_broker['port'], 60)
-        except Exception as e:
+        result = mqttpublisher.publish(command['topic'], _build_payload(command))
+        if result['is_queued']:
+            # the command is delivered when the broker acknowledges it, it must not be sent again
+            resp.status = falcon.HTTP_202
+            resp.text = json.dumps('queued')
+            return
+        if result['error'] is not None:
             raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
-                                   description='API.MQTT_CONNECTION_ERROR')
+                                   description=result['error'])
 
+        resp.text = json.dumps('success')
+
+
+class CommandBatchSend:
+    def __init__(self):
+        """"Initializes CommandBatchSend"""
+        pass
+
+    @staticmethod
+    def on_options(req, resp):
+        resp.status = falcon.HTTP_200
+
+    @staticmethod
+    def on_put(req, resp):
+        """Handles PUT requests to send many commands with one request"""
+        admin_control(req)
         try:
-            if command['set_value'] is not None:
-                payload = Template(command['payload']).substitute(s1=str(command['set_value']))
-            else:
-                payload = Template(command['payload']).substitute(s1=str(0))
-            print('payload=' + str(payload))
-            mqc.publish(command['topic'], payload=payload)
-        except Exception as e:
-            print(str(e))
+            raw_json = req.stream.read().decode('utf-8')
+        except Exception as ex:
+            raise falcon.HTTPError(status=falcon.HTTP_400,
+                                   title='API.BAD_REQUEST',
+                                   description='API.FAILED_TO_READ_REQUEST_STREAM')
+
+        new_values = json.loads(raw_json)
+
+        if 'data' not in new_values.keys() or \
+                not isinstance(new_values['data'], list) or \
+                len(new_values['data']) == 0:
             raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
-                                   description='API.MQTT_PUBLISH_ERROR')
+                                   description='API.INVALID_COMMAND_ID')
 
-        resp.text = json.dumps('success')
+        set_value_dict = dict()
+        for item in new_values['data']:
+            if not isinstance(item, dict) or \
+                    'id' not in item.keys() or \
+                    not isinstance(item['id'], int) or \
+                    item['id'] <= 0:
+                raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                                       description='API.INVALID_COMMAND_ID')
+            set_value_dict[item['id']] = _parse_set_value(item)
+
+        cnx = mysql.connector.connect(**config.myems_system_db)
+        cursor = cnx.cursor()
+
+        query = (" SELECT id, name, uuid, topic, payload, set_value "
+                 " FROM tbl_commands "
+                 " WHERE id IN (" + ', '.join(['%s'] * len(set_value_dict)) + ") ")
+        cursor.execute(query, tuple(set_value_dict.keys()))
+        rows = cursor.fetchall()
+
+        command_dict = dict()
+        for row in rows:
+            command_dict[row[0]] = {"id": row[0],
+                                    "name": row[1],
+                                    "uuid": row[2],
+                                    "topic": row[3],
+                                    "payload": row[4],
+                                    "set_value": set_value_dict[row[0]]
+                                    if set_value_dict[row[0]] is not None else row[5]}
+
+        if len(command_dict) != len(set_value_dict):
+            cursor.close()
+            cnx.close()
+            raise falcon.HTTPError(status=falcon.HTTP_404, title='API.NOT_FOUND',
+                                   description='API.COMMAND_NOT_FOUND')
+
+        update_row = (" UPDATE tbl_commands "
+                      " SET set_value = %s "
+                      " WHERE id = %s ")
+        cursor.executemany(update_row, [(set_value, command_id) for command_id, set_value in set_value_dict.items()])
+        cnx.commit()
+
+        cursor.close()
+        cnx.close()
+
+        # commands are sent in the order of the request
+        command_list = [command_dict[item['id']] for item in new_values['data']]
+        results = mqttpublisher.publish_many([(command['topic'], _build_payload(command))
+                                              for command in command_list])
+
+        result = list()
+        for command, publish_result in zip(command_list, results):
+            result.append({"id": command['id'],
+                           "name": command['name'],
+                           "uuid": command['uuid'],
+                           "mid": publish_result['mid'],
+                           "is_acknowledged": publish_result['is_acknowledged'],
+                           "is_queued": publish_result['is_queued'],
+                           "error": publish_result['error']})
+
+        resp.text = json.dumps(result)
 
 
 class CommandExport:
@@ -2,6 +2,7 @@ import uuid
 import falcon
 import mysql.connector
 import simplejson as json
+from core import collectionquery
 from core.useractivity import user_logger, admin_control, access_control, api_key_control
 import config
 
@@ -24,6 +25,10 @@ class CostCenterCollection:
             access_control(req)
         else:
             api_key_control(req)
+
+        if collectionquery.is_not_modified(req, resp, ['tbl_cost_centers']):
+            return
+
         cnx = mysql.connector.connect(**config.myems_system_db)
         cursor = cnx.cursor()
 
@@ -103,6 +108,7 @@ class CostCenterCollection:
                                  str(uuid.uuid4()),
                                  external_id,))
         new_id = cursor.lastrowid
+        collectionquery.touch(cursor, 'tbl_cost_centers')
         cnx.commit()
         cursor.close()
         cnx.close()
@@ -287,6 +293,7 @@ class CostCenterItem:
         cursor.execute(" DELETE FROM tbl_cost_centers_tariffs WHERE cost_center_id = %s ", (id_,))
 
         cursor.execute(" DELETE FROM tbl_cost_centers WHERE id = %s ", (id_,))
+        collectionquery.touch(cursor, 'tbl_cost_centers', 'tbl_cost_centers_tariffs')
         cnx.commit()
 
         cursor.close()
@@ -375,6 +382,7 @@ class CostCenterItem:
         cursor.execute(update_row, (name,
                                     external_id,
                                     id_,))
+        collectionquery.touch(cursor, 'tbl_cost_centers')
         cnx.commit()
 
         cursor.close()
@@ -405,6 +413,9 @@ class CostCenterTariffCollection:
             raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
                                    description='API.INVALID_COST_CENTER_ID')
 
+        if collectionquery.is_not_modified(req, resp, ['tbl_tariffs', 'tbl_cost_centers_tariffs']):
+            return
+
         cnx = mysql.connector.connect(**config.myems_system_db)
         cursor = cnx.cursor()
 
@@ -485,6 +496,7 @@ class CostCenterTariffCollection:
                    "             (cost_center_id, tariff_id) "
                    " VALUES (%s, %s) ")
         cursor.execute(add_row, (id_, new_values['data']['tariff_id'],))
+        collectionquery.touch(cursor, 'tbl_cost_centers_tariffs')
         cnx.commit()
 
         cursor.close()
@@ -548,6 +560,7 @@ class CostCenterTariffItem:
 
         cursor.execute(" DELETE FROM tbl_cost_centers_tariffs "
                        " WHERE cost_center_id = %s AND tariff_id = %s ", (id_, tid))
+        collectionquery.touch(cursor, 'tbl_cost_centers_tariffs')
         cnx.commit()
 
         cursor.close()
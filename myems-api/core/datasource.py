@@ -3,6 +3,7 @@ from datetime import datetime, timezone, timedelta
 import falcon
 import mysql.connector
 import simplejson as json
+from core import collectionquery
 from core.useractivity import user_logger, admin_control
 import config
 from decimal import Decimal
@@ -166,6 +167,7 @@ class DataSourceCollection:
                                     connection,
                                     description))
         new_id = cursor.lastrowid
+        collectionquery.touch(cursor, 'tbl_data_sources')
         cnx.commit()
         cursor.close()
         cnx.close()
@@ -275,6 +277,7 @@ class DataSourceItem:
         # todo : check if this data source is being used by any other objects
         cursor.execute(" DELETE FROM tbl_points WHERE data_source_id = %s ", (id_,))
         cursor.execute(" DELETE FROM tbl_data_sources WHERE id = %s ", (id_,))
+        collectionquery.touch(cursor, 'tbl_points', 'tbl_data_sources')
         cnx.commit()
 
         cursor.close()
@@ -382,6 +385,7 @@ class DataSourceItem:
                                     connection,
                                     description,
                                     id_,))
+        collectionquery.touch(cursor, 'tbl_data_sources')
         cnx.commit()
 
         cursor.close()
@@ -729,6 +733,7 @@ class DataSourceImport:
                                            point['description'],
                                            point['faults'],
                                            point['definitions']))
+        collectionquery.touch(cursor, 'tbl_data_sources', 'tbl_points')
         cnx.commit()
         cursor.close()
         cnx.close()
@@ -847,6 +852,7 @@ class DataSourceClone:
                                            point['description'],
                                            point['faults'],
                                            point['definitions']))
+        collectionquery.touch(cursor, 'tbl_data_sources', 'tbl_points')
         cnx.commit()
         cursor.close()
         cnx.close()
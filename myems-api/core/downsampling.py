@@ -0,0 +1,300 @@
+from collections import deque
+from datetime import datetime
+import falcon
+import config
+from core import utilities
+
+
+########################################################################################################################
+# Downsampling of raw point values for trend charts
+# A chart shows at most a few thousand samples per series, while months of raw values are hundreds of thousands of
+# rows. With the request parameter samples, or config.trend_downsampling_samples, every series is reduced to about that
+# number of samples with one of these methods, selected by the request parameter sampling or
+# config.trend_downsampling_method:
+#   lttb: Largest-Triangle-Three-Buckets over equal time buckets. Rows are streamed from the cursor and only two
+#         buckets are kept in memory. The samples are chosen to preserve the visual shape of the series.
+#   minmax: the minimum and the maximum of each time bucket with their timestamps, computed by the database, so only
+#           the reduced series is transferred. Spikes and the value envelope are always kept.
+# Series with fewer rows than samples are returned unchanged.
+# Reports embedding the Excel file fetch raw values for the workbook, and downsample the series of the JSON report with
+# downsample_result after the export, with the same methods in Python.
+########################################################################################################################
+METHODS = ('lttb', 'minmax')
+
+_FETCH_SIZE = 10000
+
+
+def get_sampling(req):
+    """
+    Get the downsampling parameters of a trend report request
+    :param req: HTTP request
+    :return: tuple of (sample_count, method), sample_count is 0 if raw values are returned
+    """
+    samples = req.params.get('samples')
+    if samples is None or len(str.strip(samples)) == 0:
+        sample_count = config.trend_downsampling_samples
+    else:
+        samples = str.strip(samples)
+        if not samples.isdigit():
+            raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                                   description='API.INVALID_SAMPLES')
+        sample_count = int(samples)
+    # a sample count below 3 means raw values, lttb always keeps the first and the last row
+    if sample_count < 3:
+        sample_count = 0
+
+    method = req.params.get('sampling')
+    if method is None or len(str.strip(method)) == 0:
+        method = config.trend_downsampling_method
+    else:
+        method = str.lower(str.strip(method))
+        if method not in METHODS:
+            raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                                   description='API.INVALID_SAMPLING_METHOD')
+    return sample_count, method
+
+
+def get_fetch_sample_count(req, sample_count):
+    """
+    Get the sample count of the rows fetched for a report which may embed the Excel file
+    :param req: HTTP request
+    :param sample_count: the sample count of the JSON report, see get_sampling
+    :return: 0 if the Excel file is embedded, so that the workbook contains all raw values, else sample_count
+    """
+    return 0 if utilities.is_excel_inline(req) else sample_count
+
+
+def _area(a, b, c):
+    return abs((a[0] - c[0]) * (b[1] - a[1]) - (a[0] - b[0]) * (c[1] - a[1]))
+
+
+def _to_xy(row, start_datetime_utc):
+    return (row[0] - start_datetime_utc).total_seconds(), float(row[1])
+
+
+def _select(bucket, previous_xy, next_xy, start_datetime_utc):
+    """
+    Select the row of the bucket forming the largest triangle with the previous selected row and the next point
+    """
+    selected = None
+    max_area = -1.0
+    for row in bucket:
+        area = _area(previous_xy, _to_xy(row, start_datetime_utc), next_xy)
+        if area > max_area:
+            max_area = area
+            selected = row
+    return selected
+
+
+def _average(bucket, start_datetime_utc):
+    x = 0.0
+    y = 0.0
+    for row in bucket:
+        row_x, row_y = _to_xy(row, start_datetime_utc)
+        x += row_x
+        y += row_y
+    return x / len(bucket), y / len(bucket)
+
+
+def lttb(rows, sample_count, start_datetime_utc, end_datetime_utc):
+    """
+    Downsample rows with Largest-Triangle-Three-Buckets over equal time buckets between start and end
+    :param rows: iterable of (utc_date_time, actual_value) ordered by utc_date_time
+    :param sample_count: the maximum number of samples
+    :param start_datetime_utc: start of the time buckets
+    :param end_datetime_utc: end of the time buckets
+    :return: list of (utc_date_time, actual_value)
+    """
+    rows = iter(rows)
+    # return short series unchanged
+    head = list()
+    for row in rows:
+        head.append(row)
+        if len(head) > sample_count:
+            break
+    if len(head) <= sample_count:
+        return head
+
+    bucket_count = sample_count - 2
+    bucket_seconds = max((end_datetime_utc - start_datetime_utc).total_seconds(), 1.0) / bucket_count
+
+    result = [head[0]]
+    previous_xy = _to_xy(head[0], start_datetime_utc)
+    # complete buckets waiting for the average of the next bucket
+    complete = deque()
+    current = list()
+    current_index = None
+    last_row = None
+
+    def stream():
+        yield from head[1:]
+        yield from rows
+
+    for row in stream():
+        if last_row is not None:
+            # the last row is kept as is, so each row is placed in its bucket one row later
+            index = min(int((last_row[0] - start_datetime_utc).total_seconds() // bucket_seconds), bucket_count - 1)
+            if current_index is not None and index != current_index:
+                complete.append(current)
+                current = list()
+                if len(complete) == 2:
+                    bucket = complete.popleft()
+                    selected = _select(bucket, previous_xy, _average(complete[0], start_datetime_utc),
+                                       start_datetime_utc)
+                    result.append(selected)
+                    previous_xy = _to_xy(selected, start_datetime_utc)
+            current_index = index
+            current.append(last_row)
+        last_row = row
+
+    if len(current) > 0:
+        complete.append(current)
+    last_xy = _to_xy(last_row, start_datetime_utc)
+    while len(complete) > 0:
+        bucket = complete.popleft()
+        next_xy = _average(complete[0], start_datetime_utc) if len(complete) > 0 else last_xy
+        selected = _select(bucket, previous_xy, next_xy, start_datetime_utc)
+        result.append(selected)
+        previous_xy = _to_xy(selected, start_datetime_utc)
+    result.append(last_row)
+    return result
+
+
+def _get_minmax_bucket_seconds(start_datetime, end_datetime, sample_count):
+    """
+    Get the length of the minmax time buckets, every bucket returns up to two samples
+    :return: whole seconds, so that the range from start to end, both included, has at most sample_count // 2 buckets
+    """
+    return int((end_datetime - start_datetime).total_seconds() // max(sample_count // 2, 1)) + 1
+
+
+def minmax(rows, sample_count, start_datetime, end_datetime):
+    """
+    Downsample rows to the minimum and the maximum of equal time buckets between start and end,
+    the same samples as fetch_point_values computes in the database
+    :param rows: list of (datetime, value, ...) ordered by datetime
+    :param sample_count: the maximum number of samples
+    :return: list of rows
+    """
+    if len(rows) <= sample_count:
+        return rows
+    bucket_seconds = _get_minmax_bucket_seconds(start_datetime, end_datetime, sample_count)
+    buckets = dict()
+    for row in rows:
+        index = int((row[0] - start_datetime).total_seconds() // bucket_seconds)
+        bucket = buckets.get(index)
+        if bucket is None:
+            buckets[index] = [row, row]
+        else:
+            # the first row of the minimum and of the maximum value is kept
+            if row[1] < bucket[0][1]:
+                bucket[0] = row
+            if row[1] > bucket[1][1]:
+                bucket[1] = row
+    result = list()
+    for index in sorted(buckets):
+        min_row, max_row = buckets[index]
+        if min_row is max_row:
+            result.append(min_row)
+        else:
+            result.extend(sorted([min_row, max_row], key=lambda row: row[0]))
+    return result
+
+
+def downsample_result(result, sample_count, method, keys=('parameters',)):
+    """
+    Downsample the series of a report result after the Excel file has been exported with all raw values
+    :param result: the report result
+    :param sample_count: the maximum number of samples, 0 for raw values
+    :param method: 'lttb' or 'minmax'
+    :param keys: the keys of the result with names, timestamps and values lists of series
+    :return: None, the series of the result are replaced
+    """
+    if sample_count == 0:
+        return
+    for key in keys:
+        series = result.get(key)
+        if not isinstance(series, dict):
+            continue
+        for i, (timestamps, values) in enumerate(zip(series['timestamps'], series['values'])):
+            if len(timestamps) <= sample_count or any(value is None for value in values):
+                continue
+            # the rows carry the original timestamps, which are local ISO strings
+            rows = [(datetime.fromisoformat(timestamp), value, timestamp)
+                    for timestamp, value in zip(timestamps, values)]
+            if method == 'minmax':
+                rows = minmax(rows, sample_count, rows[0][0], rows[-1][0])
+            else:
+                rows = lttb(rows, sample_count, rows[0][0], rows[-1][0])
+            series['timestamps'][i] = [row[2] for row in rows]
+            series['values'][i] = [row[1] for row in rows]
+
+
+def _fetch_iter(cursor):
+    while True:
+        rows = cursor.fetchmany(_FETCH_SIZE)
+        if not rows:
+            break
+        yield from rows
+
+
+def _parse_datetime(value):
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def fetch_point_values(cursor, table, point_id, start_datetime_utc, end_datetime_utc, sample_count, method):
+    """
+    Fetch the values of a point between start and end, both included, downsampled if sample_count is not 0
+    :param cursor: cursor of myems_historical_db
+    :param table: 'tbl_analog_value', 'tbl_energy_value' or 'tbl_digital_value'
+    :param point_id: the point id
+    :param start_datetime_utc: start datetime in utc
+    :param end_datetime_utc: end datetime in utc
+    :param sample_count: the maximum number of samples, 0 for raw values
+    :param method: 'lttb' or 'minmax'
+    :return: list of (utc_date_time, actual_value) ordered by utc_date_time
+    """
+    if sample_count == 0:
+        cursor.execute(" SELECT utc_date_time, actual_value "
+                       " FROM " + table +
+                       " WHERE point_id = %s "
+                       "       AND utc_date_time BETWEEN %s AND %s "
+                       " ORDER BY utc_date_time ", (point_id, start_datetime_utc, end_datetime_utc))
+        return cursor.fetchall()
+
+    if method == 'minmax':
+        bucket_seconds = _get_minmax_bucket_seconds(start_datetime_utc, end_datetime_utc, sample_count)
+        # the timestamp of the minimum and the maximum is the first item of the timestamps ordered by value
+        cursor.execute(" SELECT SUBSTRING_INDEX(GROUP_CONCAT(utc_date_time ORDER BY actual_value, utc_date_time), "
+                       "                        ',', 1), "
+                       "        MIN(actual_value), "
+                       "        SUBSTRING_INDEX(GROUP_CONCAT(utc_date_time ORDER BY actual_value DESC, utc_date_time), "
+                       "                        ',', 1), "
+                       "        MAX(actual_value), "
+                       "        COUNT(*) "
+                       " FROM " + table +
+                       " WHERE point_id = %s "
+                       "       AND utc_date_time BETWEEN %s AND %s "
+                       " GROUP BY FLOOR(TIMESTAMPDIFF(SECOND, %s, utc_date_time) / %s) "
+                       " ORDER BY MIN(utc_date_time) ",
+                       (point_id, start_datetime_utc, end_datetime_utc, start_datetime_utc, bucket_seconds))
+        rows = cursor.fetchall()
+        if sum(row[4] for row in rows) <= sample_count:
+            # the whole series fits, return raw values
+            return fetch_point_values(cursor, table, point_id, start_datetime_utc, end_datetime_utc, 0, method)
+        result = list()
+        for row in rows:
+            min_row = (_parse_datetime(row[0]), row[1])
+            max_row = (_parse_datetime(row[2]), row[3])
+            if min_row[0] == max_row[0]:
+                result.append(min_row)
+            else:
+                result.extend(sorted([min_row, max_row]))
+        return result
+
+    cursor.execute(" SELECT utc_date_time, actual_value "
+                   " FROM " + table +
+                   " WHERE point_id = %s "
+                   "       AND utc_date_time BETWEEN %s AND %s "
+                   " ORDER BY utc_date_time ", (point_id, start_datetime_utc, end_datetime_utc))
+    return lttb(_fetch_iter(cursor), sample_count, start_datetime_utc, end_datetime_utc)
@@ -2,6 +2,7 @@ import uuid
 import falcon
 import mysql.connector
 import simplejson as json
+from core import collectionquery
 from core.useractivity import user_logger, admin_control, access_control, api_key_control
 import config
 
@@ -23,6 +24,10 @@ class EnergyCategoryCollection:
             access_control(req)
         else:
             api_key_control(req)
+
+        if collectionquery.is_not_modified(req, resp, ['tbl_energy_categories']):
+            return
+
         cnx = mysql.connector.connect(**config.myems_system_db)
         cursor = cnx.cursor()
 
@@ -109,6 +114,7 @@ class EnergyCategoryCollection:
                                    kgce,
                                    kgco2e))
         new_id = cursor.lastrowid
+        collectionquery.touch(cursor, 'tbl_energy_categories')
         cnx.commit()
         cursor.close()
         cnx.close()
@@ -236,6 +242,7 @@ class EnergyCategoryItem:
                                    description='API.ENERGY_CATEGORY_USED_IN_ENERGY_ITEMS')
 
         cursor.execute(" DELETE FROM tbl_energy_categories WHERE id = %s ", (id_,))
+        collectionquery.touch(cursor, 'tbl_energy_categories')
         cnx.commit()
 
         cursor.close()
@@ -318,6 +325,7 @@ class EnergyCategoryItem:
                                     kgce,
                                     kgco2e,
                                     id_,))
+        collectionquery.touch(cursor, 'tbl_energy_categories')
         cnx.commit()
         cursor.close()
         cnx.close()
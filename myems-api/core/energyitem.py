@@ -2,6 +2,7 @@ import uuid
 import falcon
 import mysql.connector
 import simplejson as json
+from core import collectionquery
 from core.useractivity import user_logger, admin_control, access_control, api_key_control
 import config
 
@@ -23,6 +24,10 @@ class EnergyItemCollection:
             access_control(req)
         else:
             api_key_control(req)
+
+        if collectionquery.is_not_modified(req, resp, ['tbl_energy_items', 'tbl_energy_categories']):
+            return
+
         cnx = mysql.connector.connect(**config.myems_system_db)
         cursor = cnx.cursor()
 
@@ -114,6 +119,7 @@ class EnergyItemCollection:
                                    str(uuid.uuid4()),
                                    energy_category_id))
         new_id = cursor.lastrowid
+        collectionquery.touch(cursor, 'tbl_energy_items')
         cnx.commit()
         cursor.close()
         cnx.close()
@@ -228,6 +234,7 @@ class EnergyItemItem:
                                    description='API.ENERGY_ITEM_USED_IN_OFFLINE_METER')
 
         cursor.execute(" DELETE FROM tbl_energy_items WHERE id = %s ", (id_,))
+        collectionquery.touch(cursor, 'tbl_energy_items')
         cnx.commit()
 
         cursor.close()
@@ -301,6 +308,7 @@ class EnergyItemItem:
         cursor.execute(update_row, (name,
                                     energy_category_id,
                                     id_,))
+        collectionquery.touch(cursor, 'tbl_energy_items')
         cnx.commit()
         cursor.close()
         cnx.close()
@@ -2,6 +2,7 @@ import uuid
 import falcon
 import mysql.connector
 import simplejson as json
+from core import collectionquery, fleetindex
 from core.useractivity import user_logger, admin_control, access_control, api_key_control
 import config
 from datetime import datetime, timedelta
@@ -300,10 +301,14 @@ class EnergyStorageContainerItem:
 
         cursor.execute(" DELETE FROM tbl_energy_storage_containers "
                        " WHERE id = %s ", (id_,))
+        collectionquery.touch(cursor,
+                              'tbl_energy_storage_containers_batteries',
+                              'tbl_energy_storage_containers_power_conversion_systems')
         cnx.commit()
 
         cursor.close()
         cnx.close()
+        fleetindex.invalidate()
 
         resp.status = falcon.HTTP_204
 
@@ -687,9 +692,11 @@ class EnergyStorageContainerBatteryCollection:
                                     nominal_voltage
                                     ))
         new_id = cursor.lastrowid
+        collectionquery.touch(cursor, 'tbl_energy_storage_containers_batteries')
         cnx.commit()
         cursor.close()
         cnx.close()
+        fleetindex.invalidate()
 
         resp.status = falcon.HTTP_201
         resp.location = '/energystoragecontainers/' + str(id_) + '/batteries/' + str(new_id)
@@ -826,10 +833,12 @@ class EnergyStorageContainerBatteryItem:
 
         cursor.execute(" DELETE FROM tbl_energy_storage_containers_batteries "
                        " WHERE id = %s ", (bid,))
+        collectionquery.touch(cursor, 'tbl_energy_storage_containers_batteries')
         cnx.commit()
 
         cursor.close()
         cnx.close()
+        fleetindex.invalidate()
 
         resp.status = falcon.HTTP_204
 
@@ -1017,10 +1026,12 @@ class EnergyStorageContainerBatteryItem:
                                     rated_power,
                                     nominal_voltage,
                                     bid))
+        collectionquery.touch(cursor, 'tbl_energy_storage_containers_batteries')
         cnx.commit()
 
         cursor.close()
         cnx.close()
+        fleetindex.invalidate()
 
         resp.status = falcon.HTTP_200
 
@@ -4263,9 +4274,11 @@ class EnergyStorageContainerPCSCollection:
                                     rated_output_power
                                     ))
         new_id = cursor.lastrowid
+        collectionquery.touch(cursor, 'tbl_energy_storage_containers_power_conversion_systems')
         cnx.commit()
         cursor.close()
         cnx.close()
+        fleetindex.invalidate()
 
         resp.status = falcon.HTTP_201
         resp.location = '/energystoragecontainerpowerconversionsystems/' + str(new_id)
@@ -4404,10 +4417,12 @@ class EnergyStorageContainerPCSItem:
 
         cursor.execute(" DELETE FROM tbl_energy_storage_containers_power_conversion_systems "
                        " WHERE id = %s ", (pcsid,))
+        collectionquery.touch(cursor, 'tbl_energy_storage_containers_power_conversion_systems')
         cnx.commit()
 
         cursor.close()
         cnx.close()
+        fleetindex.invalidate()
 
         resp.status = falcon.HTTP_204
 
@@ -4492,10 +4507,12 @@ class EnergyStorageContainerPCSItem:
                                     run_state_point_id,
                                     rated_output_power,
                                     pcsid))
+        collectionquery.touch(cursor, 'tbl_energy_storage_containers_power_conversion_systems')
         cnx.commit()
 
         cursor.close()
         cnx.close()
+        fleetindex.invalidate()
 
         resp.status = falcon.HTTP_200
 
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 import falcon
 import mysql.connector
 import simplejson as json
+from core import collectionquery, fleetindex
 from core.useractivity import user_logger, admin_control, access_control
 import config
 
@@ -456,10 +457,12 @@ class EnergyStoragePowerStationItem:
 
         cursor.execute(" DELETE FROM tbl_energy_storage_power_stations "
                        " WHERE id = %s ", (id_,))
+        collectionquery.touch(cursor, 'tbl_energy_storage_power_stations_containers')
         cnx.commit()
 
         cursor.close()
         cnx.close()
+        fleetindex.invalidate()
 
         resp.status = falcon.HTTP_204
 
@@ -807,9 +810,11 @@ class EnergyStoragePowerStationContainerCollection:
                    "        (energy_storage_power_station_id, energy_storage_container_id) "
                    " VALUES (%s, %s) ")
         cursor.execute(add_row, (id_, energy_storage_container_id,))
+        collectionquery.touch(cursor, 'tbl_energy_storage_power_stations_containers')
         cnx.commit()
         cursor.close()
         cnx.close()
+        fleetindex.invalidate()
 
         resp.status = falcon.HTTP_201
         resp.location = '/energystoragepowerstationss/' + str(id_) + '/containers/' + str(energy_storage_container_id)
@@ -868,10 +873,12 @@ class EnergyStoragePowerStationContainerItem:
 
         cursor.execute(" DELETE FROM tbl_energy_storage_power_stations_containers "
                        " WHERE energy_storage_power_station_id = %s AND energy_storage_container_id = %s ", (id_, sid))
+        collectionquery.touch(cursor, 'tbl_energy_storage_power_stations_containers')
         cnx.commit()
 
         cursor.close()
         cnx.close()
+        fleetindex.invalidate()
 
         resp.status = falcon.HTTP_204
 
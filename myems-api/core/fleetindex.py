@@ -0,0 +1,165 @@
+import threading
+import time
+import mysql.connector
+import simplejson as json
+import config
+from core import collectionquery
+
+
+########################################################################################################################
+# Index of the points of energy storage power stations and photovoltaic power stations, read by the fleet list reports
+# Each station is mapped to the state, SoC and power points of its first power conversion system, battery or invertor,
+# and to the data source of its state point, with one grouped query per device type for all stations. The definitions
+# of the mapped digital points are loaded with them, so that a list request only reads the latest values and the data
+# source last seen datetimes of the points it needs.
+# The index is reloaded when the change counters of the tables it reads change, see core/collectionquery.py. They are
+# incremented by the endpoints binding containers to stations, by those of the batteries and power conversion systems
+# of containers and of the invertors of photovoltaic power stations, and by the point endpoints, so changes made
+# through any API worker are picked up within config.collection_version_refresh_seconds. The index is also reloaded
+# after config.fleet_index_cache_ttl_in_seconds.
+########################################################################################################################
+TABLE_NAMES = ['tbl_energy_storage_power_stations_containers',
+               'tbl_energy_storage_containers_power_conversion_systems',
+               'tbl_energy_storage_containers_batteries',
+               'tbl_photovoltaic_power_stations_invertors',
+               'tbl_points']
+
+_lock = threading.Lock()
+_index = {'stations': None, 'loaded_at': None, 'generation': 0, 'versions': None}
+
+
+def _first_rows(rows):
+    # the rows are ordered by station and device id, the first device of every station is kept
+    result = dict()
+    for row in rows:
+        if row[0] not in result:
+            result[row[0]] = row[1:]
+    return result
+
+
+def _load():
+    cnx = None
+    cursor = None
+    try:
+        cnx = mysql.connector.connect(**config.myems_system_db)
+        cursor = cnx.cursor()
+        cursor.execute(" SELECT psc.energy_storage_power_station_id, pcs.run_state_point_id, p.data_source_id "
+                       " FROM tbl_energy_storage_power_stations_containers psc, "
+                       "      tbl_energy_storage_containers_power_conversion_systems pcs "
+                       "      LEFT JOIN tbl_points p ON pcs.run_state_point_id = p.id "
+                       " WHERE psc.energy_storage_container_id = pcs.energy_storage_container_id "
+                       " ORDER BY psc.energy_storage_power_station_id, pcs.id ")
+        power_conversion_systems = _first_rows(cursor.fetchall())
+        cursor.execute(" SELECT psc.energy_storage_power_station_id, "
+                       "        b.battery_state_point_id, b.soc_point_id, b.power_point_id "
+                       " FROM tbl_energy_storage_power_stations_containers psc, "
+                       "      tbl_energy_storage_containers_batteries b "
+                       " WHERE psc.energy_storage_container_id = b.energy_storage_container_id "
+                       " ORDER BY psc.energy_storage_power_station_id, b.id ")
+        batteries = _first_rows(cursor.fetchall())
+        cursor.execute(" SELECT photovoltaic_power_station_id, invertor_state_point_id "
+                       " FROM tbl_photovoltaic_power_stations_invertors "
+                       " ORDER BY photovoltaic_power_station_id, id ")
+        invertors = _first_rows(cursor.fetchall())
+
+        energy_storage_power_stations = dict()
+        for station_id in set(power_conversion_systems) | set(batteries):
+            run_state_point_id, data_source_id = power_conversion_systems.get(station_id, (None, None))
+            battery_state_point_id, soc_point_id, power_point_id = batteries.get(station_id, (None, None, None))
+            energy_storage_power_stations[station_id] = {'run_state_point_id': run_state_point_id,
+                                                         'data_source_id': data_source_id,
+                                                         'battery_state_point_id': battery_state_point_id,
+                                                         'soc_point_id': soc_point_id,
+                                                         'power_point_id': power_point_id}
+        photovoltaic_power_stations = {station_id: {'invertor_state_point_id': row[0]}
+                                       for station_id, row in invertors.items()}
+
+        # definitions of the digital state points
+        point_ids = sorted({point_id for point_id in
+                            [station['run_state_point_id'] for station in energy_storage_power_stations.values()] +
+                            [station['battery_state_point_id']
+                             for station in energy_storage_power_stations.values()] +
+                            [station['invertor_state_point_id'] for station in photovoltaic_power_stations.values()]
+                            if point_id is not None})
+        definitions = dict()
+        if len(point_ids) > 0:
+            cursor.execute(" SELECT id, definitions "
+                           " FROM tbl_points "
+                           " WHERE id IN (" + ', '.join(['%s'] * len(point_ids)) + ") "
+                           "       AND object_type = 'DIGITAL_VALUE' AND definitions IS NOT NULL ",
+                           tuple(point_ids))
+            for row in cursor.fetchall():
+                try:
+                    definitions[row[0]] = json.loads(row[1])
+                except Exception as e:
+                    print("Invalid point definitions in JSON " + str(e))
+    finally:
+        if cursor:
+            cursor.close()
+        if cnx:
+            cnx.close()
+    return {'energy_storage_power_station': energy_storage_power_stations,
+            'photovoltaic_power_station': photovoltaic_power_stations,
+            'definitions': definitions}
+
+
+def _get_stations():
+    versions = collectionquery.get_versions(TABLE_NAMES)
+    now = time.monotonic()
+    with _lock:
+        stations = _index['stations']
+        if stations is not None and now - _index['loaded_at'] < config.fleet_index_cache_ttl_in_seconds and \
+                (versions is None or versions == _index['versions']):
+            return stations
+        generation = _index['generation']
+    stations = _load()
+    with _lock:
+        # do not keep an index loaded before the last invalidation
+        if _index['generation'] == generation:
+            _index['stations'] = stations
+            _index['loaded_at'] = now
+            _index['versions'] = versions
+    return stations
+
+
+def get_energy_storage_power_station_points(station_ids):
+    """
+    Get the points of energy storage power stations
+    :param station_ids: iterable of energy storage power station ids
+    :return: dict of station id and dict of run_state_point_id, data_source_id, battery_state_point_id, soc_point_id
+             and power_point_id, stations without containers are omitted
+    """
+    stations = _get_stations()['energy_storage_power_station']
+    return {station_id: stations[station_id] for station_id in station_ids if station_id in stations}
+
+
+def get_photovoltaic_power_station_points(station_ids):
+    """
+    Get the points of photovoltaic power stations
+    :param station_ids: iterable of photovoltaic power station ids
+    :return: dict of station id and dict of invertor_state_point_id, stations without invertors are omitted
+    """
+    stations = _get_stations()['photovoltaic_power_station']
+    return {station_id: stations[station_id] for station_id in station_ids if station_id in stations}
+
+
+def get_point_definition(point_id):
+    """
+    Get the definitions of a digital state point of the index
+    :param point_id: the point id
+    :return: dict of value and name, None if the point has no definitions
+    """
+    if point_id is None:
+        return None
+    return _get_stations()['definitions'].get(point_id)
+
+
+def invalidate():
+    """
+    Drop the index of the API worker, must be called after stations, their containers or devices change, and the
+    change counters of the changed tables are touched in the transaction of the change
+    """
+    with _lock:
+        _index['stations'] = None
+        _index['loaded_at'] = None
+        _index['generation'] += 1
@@ -0,0 +1,148 @@
+import threading
+import time
+from datetime import timedelta
+import mysql.connector
+import config
+
+
+########################################################################################################################
+# Snapshot of the latest point values for realtime and details endpoints
+# Each API worker keeps one snapshot per value table, a dict of point_id and (utc_date_time, actual_value).
+# At most once every config.latest_value_snapshot_refresh_seconds a single request thread refreshes the snapshot with
+# the rows updated since the last refresh, which is a range scan on the utc_date_time index, while other requests keep
+# reading the previous snapshot. Every config.latest_value_snapshot_reload_seconds the whole table is reloaded to
+# drop rows of deleted points and pick up rows written with late timestamps.
+########################################################################################################################
+VALUE_TABLES = {
+    'analog': 'tbl_analog_value_latest',
+    'digital': 'tbl_digital_value_latest',
+    'energy': 'tbl_energy_value_latest',
+}
+
+# rows written by gateways whose clocks lag behind are still picked up by incremental refreshes within this window
+_REFRESH_OVERLAP = timedelta(minutes=1)
+
+_refresh_locks = {value_type: threading.Lock() for value_type in VALUE_TABLES}
+_snapshots = {value_type: {'values': dict(), 'watermark': None, 'refreshed_at': None, 'reloaded_at': None}
+              for value_type in VALUE_TABLES}
+
+
+def _query_rows(table, since):
+    cnx = None
+    cursor = None
+    try:
+        cnx = mysql.connector.connect(**config.myems_historical_db)
+        cursor = cnx.cursor()
+        if since is None:
+            cursor.execute(" SELECT point_id, utc_date_time, actual_value "
+                           " FROM " + table)
+        else:
+            cursor.execute(" SELECT point_id, utc_date_time, actual_value "
+                           " FROM " + table +
+                           " WHERE utc_date_time > %s ", (since,))
+        return cursor.fetchall()
+    finally:
+        if cursor:
+            cursor.close()
+        if cnx:
+            cnx.close()
+
+
+def _refresh(value_type):
+    snapshot = _snapshots[value_type]
+    now = time.monotonic()
+    is_reload = snapshot['reloaded_at'] is None or \
+        now - snapshot['reloaded_at'] >= config.latest_value_snapshot_reload_seconds or \
+        snapshot['watermark'] is None
+    if is_reload:
+        rows = _query_rows(VALUE_TABLES[value_type], None)
+        values = dict()
+    else:
+        rows = _query_rows(VALUE_TABLES[value_type], snapshot['watermark'] - _REFRESH_OVERLAP)
+        # copy on write, readers may be iterating the current dict
+        values = dict(snapshot['values'])
+
+    watermark = snapshot['watermark'] if not is_reload else None
+    for row in rows:
+        values[row[0]] = (row[1], row[2])
+        if watermark is None or row[1] > watermark:
+            watermark = row[1]
+
+    _snapshots[value_type] = {'values': values,
+                              'watermark': watermark,
+                              'refreshed_at': now,
+                              'reloaded_at': now if is_reload else snapshot['reloaded_at']}
+
+
+def get_snapshot(value_type):
+    """
+    Get the snapshot of latest values, refresh it first if it is older than config.latest_value_snapshot_refresh_seconds
+    :param value_type: 'analog', 'digital' or 'energy'
+    :return: dict of point_id and tuple of (utc_date_time, actual_value), must not be modified
+    """
+    snapshot = _snapshots[value_type]
+    if snapshot['refreshed_at'] is None or \
+            time.monotonic() - snapshot['refreshed_at'] >= config.latest_value_snapshot_refresh_seconds:
+        lock = _refresh_locks[value_type]
+        # only one thread refreshes, the others read the current snapshot unless there is none yet
+        if lock.acquire(blocking=snapshot['refreshed_at'] is None):
+            try:
+                snapshot = _snapshots[value_type]
+                if snapshot['refreshed_at'] is None or \
+                        time.monotonic() - snapshot['refreshed_at'] >= config.latest_value_snapshot_refresh_seconds:
+                    _refresh(value_type)
+            finally:
+                lock.release()
+    return _snapshots[value_type]['values']
+
+
+def get_value(value_type, point_id, since=None):
+    """
+    Get the latest value of a point
+    :param value_type: 'analog', 'digital' or 'energy'
+    :param point_id: the point id
+    :param since: if not None, only a value with utc_date_time later than since is returned
+    :return: the actual value or None
+    """
+    item = get_snapshot(value_type).get(point_id)
+    if item is None or (since is not None and item[0] <= since):
+        return None
+    return item[1]
+
+
+def get_point_value(point_id, since=None):
+    """
+    Get the latest value of a point of any object type, a point id has rows in only one of the value tables
+    :param point_id: the point id
+    :param since: if not None, only a value with utc_date_time later than since is returned
+    :return: the actual value or None
+    """
+    for value_type in ('digital', 'energy', 'analog'):
+        value = get_value(value_type, point_id, since)
+        if value is not None:
+            return value
+    return None
+
+
+def get_values(value_type, since=None):
+    """
+    Get the latest values of all points, in place of SELECT point_id, actual_value FROM tbl_..._value_latest
+    Handlers looking up the values of known points use get_value or get_point_value instead of scanning this list.
+    :param value_type: 'analog', 'digital' or 'energy'
+    :param since: if not None, only values with utc_date_time later than since are returned
+    :return: list of (point_id, actual_value)
+    """
+    return [(point_id, item[1]) for point_id, item in get_snapshot(value_type).items()
+            if since is None or item[0] > since]
+
+
+def get_rows(value_type, since=None):
+    """
+    Get the latest values of all points with their timestamps,
+    in place of SELECT point_id, utc_date_time, actual_value FROM tbl_..._value_latest
+    :param value_type: 'analog', 'digital' or 'energy'
+    :param since: if not None, only values with utc_date_time later than since are returned
+    :return: list of (point_id, utc_date_time, actual_value)
+    """
+    return [(point_id, item[0], item[1]) for point_id, item in get_snapshot(value_type).items()
+            if since is None or item[0] > since]
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 import falcon
 import mysql.connector
 import simplejson as json
+from core import collectionquery
 from core.useractivity import user_logger, admin_control, access_control, api_key_control
 import config
 
@@ -24,78 +25,78 @@ class MeterCollection:
             access_control(req)
         else:
             api_key_control(req)
+        page = collectionquery.get_page(req)
+        filters = [('energy_category_id', collectionquery.get_id_filter(req, 'energycategoryid',
+                                                                         'API.INVALID_ENERGY_CATEGORY_ID')),
+                   ('cost_center_id', collectionquery.get_id_filter(req, 'costcenterid',
+                                                                     'API.INVALID_COST_CENTER_ID')),
+                   ('energy_item_id', collectionquery.get_id_filter(req, 'energyitemid',
+                                                                     'API.INVALID_ENERGY_ITEM_ID')),
+                   ('master_meter_id', collectionquery.get_id_filter(req, 'mastermeterid',
+                                                                      'API.INVALID_MASTER_METER_ID'))]
+        search = collectionquery.get_search(req)
+
+        if collectionquery.is_not_modified(req, resp, ['tbl_meters', 'tbl_energy_categories',
+                                                       'tbl_cost_centers', 'tbl_energy_items']):
+            return
+
+        conditions = list()
+        params = list()
+        for column, value in filters:
+            if value is not None:
+                conditions.append(" " + column + " = %s ")
+                params.append(value)
+        if search is not None:
+            conditions.append(" name LIKE %s ")
+            params.append(search)
+        where = (" WHERE " + " AND ".join(conditions)) if len(conditions) > 0 else ""
+
         cnx = mysql.connector.connect(**config.myems_system_db)
         cursor = cnx.cursor()
 
-        query = (" SELECT id, name, uuid "
-                 " FROM tbl_energy_categories ")
-        cursor.execute(query)
-        rows_energy_categories = cursor.fetchall()
-
-        energy_category_dict = dict()
-        if rows_energy_categories is not None and len(rows_energy_categories) > 0:
-            for row in rows_energy_categories:
-                energy_category_dict[row[0]] = {"id": row[0],
-                                                "name": row[1],
-                                                "uuid": row[2]}
-
-        query = (" SELECT id, name, uuid "
-                 " FROM tbl_cost_centers ")
-        cursor.execute(query)
-        rows_cost_centers = cursor.fetchall()
-
-        cost_center_dict = dict()
-        if rows_cost_centers is not None and len(rows_cost_centers) > 0:
-            for row in rows_cost_centers:
-                cost_center_dict[row[0]] = {"id": row[0],
-                                            "name": row[1],
-                                            "uuid": row[2]}
-
-        query = (" SELECT id, name, uuid "
-                 " FROM tbl_energy_items ")
-        cursor.execute(query)
-        rows_energy_items = cursor.fetchall()
-
-        energy_item_dict = dict()
-        if rows_energy_items is not None and len(rows_energy_items) > 0:
-            for row in rows_energy_items:
-                energy_item_dict[row[0]] = {"id": row[0],
-                                            "name": row[1],
-                                            "uuid": row[2]}
-
-        query = (" SELECT id, name, uuid "
-                 " FROM tbl_meters ")
-        cursor.execute(query)
-        rows_master_meters = cursor.fetchall()
-
-        master_meter_dict = dict()
-        if rows_master_meters is not None and len(rows_master_meters) > 0:
-            for row in rows_master_meters:
-                master_meter_dict[row[0]] = {"id": row[0],
-                                             "name": row[1],
-                                             "uuid": row[2]}
-
         query = (" SELECT id, name, uuid, energy_category_id, "
                  "        is_counted, hourly_low_limit, hourly_high_limit, "
                  "        cost_center_id, energy_item_id, master_meter_id, description "
-                 " FROM tbl_meters "
+                 " FROM tbl_meters " + where +
                  " ORDER BY id ")
-        cursor.execute(query)
+        if page is not None:
+            cursor.execute(" SELECT COUNT(*) FROM tbl_meters " + where, tuple(params))
+            resp.set_header('X-Total-Count', str(cursor.fetchone()[0]))
+            query += " LIMIT %s OFFSET %s "
+            params.extend(page)
+        cursor.execute(query, tuple(params))
         rows_meters = cursor.fetchall()
 
+        # only the energy categories, cost centers, energy items and master meters of the returned meters
+        lookup_dicts = dict()
+        for table, index in (('tbl_energy_categories', 3), ('tbl_cost_centers', 7),
+                             ('tbl_energy_items', 8), ('tbl_meters', 9)):
+            lookup_dict = dict()
+            lookup_ids = sorted(set(row[index] for row in rows_meters if row[index] is not None))
+            if len(lookup_ids) > 0:
+                query = (" SELECT id, name, uuid "
+                         " FROM " + table +
+                         " WHERE id IN (" + ', '.join(['%s'] * len(lookup_ids)) + ") ")
+                cursor.execute(query, tuple(lookup_ids))
+                for row in cursor.fetchall():
+                    lookup_dict[row[0]] = {"id": row[0],
+                                           "name": row[1],
+                                           "uuid": row[2]}
+            lookup_dicts[index] = lookup_dict
+
         result = list()
         if rows_meters is not None and len(rows_meters) > 0:
             for row in rows_meters:
                 meta_result = {"id": row[0],
                                "name": row[1],
                                "uuid": row[2],
-                               "energy_category": energy_category_dict.get(row[3], None),
+                               "energy_category": lookup_dicts[3].get(row[3], None),
                                "is_counted": True if row[4] else False,
                                "hourly_low_limit": row[5],
                                "hourly_high_limit": row[6],
-                               "cost_center": cost_center_dict.get(row[7], None),
-                               "energy_item": energy_item_dict.get(row[8], None),
-                               "master_meter": master_meter_dict.get(row[9], None),
+                               "cost_center": lookup_dicts[7].get(row[7], None),
+                               "energy_item": lookup_dicts[8].get(row[8], None),
+                               "master_meter": lookup_dicts[9].get(row[9], None),
                                "description": row[10],
                                "qrcode": "meter:" + row[2]}
                 result.append(meta_result)
@@ -269,6 +270,7 @@ class MeterCollection:
                                     master_meter_id,
                                     description))
         new_id = cursor.lastrowid
+        collectionquery.touch(cursor, 'tbl_meters')
         cnx.commit()
         cursor.close()
         cnx.close()
@@ -644,6 +646,7 @@ class MeterItem:
         cursor.execute(" DELETE FROM tbl_meters_points WHERE meter_id = %s ", (id_,))
 
         cursor.execute(" DELETE FROM tbl_meters WHERE id = %s ", (id_,))
+        collectionquery.touch(cursor, 'tbl_meters')
         cnx.commit()
 
         cursor.close()
@@ -844,6 +847,7 @@ class MeterItem:
                                     master_meter_id,
                                     description,
                                     id_,))
+        collectionquery.touch(cursor, 'tbl_meters')
         cnx.commit()
 
         cursor.close()
@@ -1658,6 +1662,7 @@ class MeterImport:
                 else:
                     raise falcon.HTTPError(status=falcon.HTTP_400, title='API.NOT_FOUND',
                                            description='API.INVALID_POINT_ID')
+        collectionquery.touch(cursor, 'tbl_meters')
         cnx.commit()
         cursor.close()
         cnx.close()
@@ -1801,6 +1806,7 @@ class MeterClone:
                     add_row = (" INSERT INTO tbl_meters_points (meter_id, point_id) "
                                " VALUES (%s, %s) ")
                     cursor.execute(add_row, (new_id, point['id'],))
+        collectionquery.touch(cursor, 'tbl_meters')
         cnx.commit()
         cursor.close()
         cnx.close()
@@ -0,0 +1,142 @@
+import threading
+import time
+import uuid
+import paho.mqtt.client as mqtt
+import config
+
+
+########################################################################################################################
+# Persistent MQTT publisher for command dispatch
+# One client is shared by all requests of an API worker. It is created on first use, keeps its network loop running
+# in a background thread, and reconnects with an exponential backoff between 1 second and
+# config.mqtt_reconnect_max_delay_in_seconds.
+# Outbound messages wait in the bounded queue of the client while the broker is unreachable, so a burst of commands is
+# delivered on reconnect, or rejected with API.MQTT_QUEUE_FULL when the queue is full.
+# A QoS 1 or 2 message which is not acknowledged in time, because the broker is unreachable or slow, stays in the queue
+# and is still delivered later. It is reported as queued with API.MQTT_COMMAND_QUEUED and not as a failure, so that
+# clients do not send the same command again.
+# publish_many publishes all messages first and then waits for their acknowledgements (PUBACK for QoS 1, PUBCOMP for
+# QoS 2), so a batch costs one round trip instead of one connection per command.
+########################################################################################################################
+_client = None
+_client_lock = threading.Lock()
+_connected_event = threading.Event()
+
+
+def _on_connect(client, userdata, connect_flags, reason_code, properties):
+    if reason_code == 0:
+        _connected_event.set()
+    else:
+        print('mqttpublisher: bad connection reason code=' + str(reason_code))
+
+
+def _on_disconnect(client, userdata, disconnect_flags, reason_code, properties):
+    _connected_event.clear()
+    print('mqttpublisher: disconnected reason code=' + str(reason_code))
+
+
+def _get_client():
+    """
+    Get the shared client, create it and start its network loop on first use
+    :return: the client
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            client = mqtt.Client(callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
+                                 client_id='MYEMS' + "-" + str(uuid.uuid4()),
+                                 clean_session=None,
+                                 userdata=None,
+                                 protocol=mqtt.MQTTv5,
+                                 transport='tcp',
+                                 reconnect_on_failure=True,
+                                 manual_ack=False)
+            client.username_pw_set(config.myems_mqtt_broker['username'], config.myems_mqtt_broker['password'])
+            client.reconnect_delay_set(min_delay=1, max_delay=config.mqtt_reconnect_max_delay_in_seconds)
+            client.max_queued_messages_set(config.mqtt_max_queued_messages)
+            client.on_connect = _on_connect
+            client.on_disconnect = _on_disconnect
+            client.connect_async(config.myems_mqtt_broker['host'], config.myems_mqtt_broker['port'], 60)
+            # loop_start() runs the network loop in a background thread, which also handles reconnects
+            client.loop_start()
+            _client = client
+        return _client
+
+
+def is_connected():
+    return _connected_event.is_set()
+
+
+def _result(mid, error, is_acknowledged=False, is_queued=False):
+    return {'mid': mid, 'is_acknowledged': is_acknowledged, 'is_queued': is_queued, 'error': error}
+
+
+def publish_many(messages, qos=None, timeout=None):
+    """
+    Publish messages with the shared client and wait for their delivery acknowledgements
+    :param messages: list of (topic, payload)
+    :param qos: quality of service, config.mqtt_command_qos by default
+    :param timeout: seconds to wait for the connection and all acknowledgements,
+                    config.mqtt_publish_timeout_in_seconds by default
+    :return: list of dict with mid, is_acknowledged, is_queued and error, in the order of messages,
+             error is None or one of API.MQTT_CONNECTION_ERROR, API.MQTT_QUEUE_FULL, API.MQTT_PUBLISH_ERROR,
+             API.MQTT_PUBLISH_TIMEOUT and API.MQTT_COMMAND_QUEUED,
+             is_queued is True if the message is not acknowledged yet but will still be delivered
+    """
+    qos = config.mqtt_command_qos if qos is None else qos
+    timeout = config.mqtt_publish_timeout_in_seconds if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+
+    client = _get_client()
+    # QoS 0 messages are dropped while disconnected, QoS 1 and 2 messages are queued and sent on reconnect
+    if not _connected_event.wait(timeout) and qos == 0:
+        return [_result(None, 'API.MQTT_CONNECTION_ERROR') for _ in messages]
+
+    infos = list()
+    for topic, payload in messages:
+        try:
+            infos.append(client.publish(topic, payload=payload, qos=qos))
+        except Exception as ex:
+            print('mqttpublisher: ' + str(ex))
+            infos.append(None)
+
+    result = list()
+    for info in infos:
+        if info is None:
+            result.append(_result(None, 'API.MQTT_PUBLISH_ERROR'))
+            continue
+        if info.rc == mqtt.MQTT_ERR_QUEUE_SIZE:
+            result.append(_result(info.mid, 'API.MQTT_QUEUE_FULL'))
+            continue
+        if info.rc == mqtt.MQTT_ERR_NO_CONN:
+            # QoS 1 and 2 messages stay queued and are delivered on reconnect, QoS 0 messages are dropped
+            result.append(_result(info.mid, 'API.MQTT_COMMAND_QUEUED' if qos > 0 else 'API.MQTT_CONNECTION_ERROR',
+                                  is_queued=qos > 0))
+            continue
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            result.append(_result(info.mid, 'API.MQTT_PUBLISH_ERROR'))
+            continue
+        try:
+            info.wait_for_publish(max(deadline - time.monotonic(), 0))
+            is_published = info.is_published()
+        except Exception as ex:
+            print('mqttpublisher: ' + str(ex))
+            is_published = False
+        if is_published:
+            result.append(_result(info.mid, None, is_acknowledged=True))
+        elif qos > 0:
+            # the message is sent again until it is acknowledged, also after a reconnect
+            result.append(_result(info.mid, 'API.MQTT_COMMAND_QUEUED', is_queued=True))
+        elif not _connected_event.is_set():
+            result.append(_result(info.mid, 'API.MQTT_CONNECTION_ERROR'))
+        else:
+            result.append(_result(info.mid, 'API.MQTT_PUBLISH_TIMEOUT'))
+    return result
+
+
+def publish(topic, payload, qos=None, timeout=None):
+    """
+    Publish a message with the shared client and wait for its delivery acknowledgement
+    :return: dict with mid, is_acknowledged, is_queued and error, see publish_many
+    """
+    return publish_many([(topic, payload)], qos, timeout)[0]
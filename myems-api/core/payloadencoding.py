@@ -0,0 +1,191 @@
+import base64
+import gzip
+import operator
+import sys
+from array import array
+from datetime import datetime
+from decimal import Decimal
+from itertools import islice
+import simplejson as json
+import config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+########################################################################################################################
+# Compact encoding of time series in report payloads
+# A client asks for it with the query parameter format=compact or the Accept header COMPACT_MEDIA_TYPE.
+# Every dict of the report with 'timestamps' and 'values' lists is encoded column by column:
+#   timestamps of second resolution, 'YYYY-MM-DDTHH:MM:SS' in local time, become
+#       {"encoding": "epoch", "utc_offset": "+08:00", "start": 1704067200, "step": 60, "count": 1440}
+#   if the samples are evenly spaced, or otherwise
+#       {"encoding": "epoch", "utc_offset": "+08:00", "start": 1704067200, "deltas": [60, 60, 120, ...]}
+#   with epoch seconds in UTC, and numeric values become
+#       {"encoding": "float64", "data": "<base64 of little endian IEEE 754 doubles, NaN for None>"}
+# Lists of such lists, for example parameters of many points, are encoded item by item. Timestamps of other
+# resolutions, for example '2024-01' of monthly periods, and non numeric values are left as they are.
+########################################################################################################################
+COMPACT_MEDIA_TYPE = 'application/vnd.myems.compact+json'
+
+_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+_VALUE_TYPES = {int, float, Decimal, type(None)}
+
+
+def is_compact(req):
+    """
+    Check if the client asks for the compact encoding
+    :param req: HTTP request
+    :return: True or False
+    """
+    response_format = req.params.get('format')
+    if response_format is not None:
+        return str.lower(str.strip(response_format)) == 'compact'
+    accept = req.get_header('Accept')
+    return accept is not None and COMPACT_MEDIA_TYPE in accept
+
+
+def _get_timezone_offset():
+    timezone_offset = int(config.utc_offset[1:3]) * 60 + int(config.utc_offset[4:6])
+    if config.utc_offset[0] == '-':
+        timezone_offset = -timezone_offset
+    return timezone_offset
+
+
+def _is_timestamp_list(items):
+    return len(items) > 0 and all(isinstance(item, str) and len(item) == 19 and item[10] == 'T' for item in items)
+
+
+def _is_number_list(items):
+    # bool is not a number here, type() does not match subclasses
+    return len(items) > 0 and set(map(type, items)).issubset(_VALUE_TYPES)
+
+
+def _to_epoch(value, timezone_offset):
+    return (value.toordinal() - _EPOCH_ORDINAL) * 86400 + \
+        value.hour * 3600 + value.minute * 60 + value.second - timezone_offset * 60
+
+
+def _encode_timestamps(timestamps, timezone_offset):
+    try:
+        datetimes = list(map(datetime.fromisoformat, timestamps))
+    except ValueError:
+        return timestamps
+    result = {'encoding': 'epoch', 'utc_offset': config.utc_offset, 'start': _to_epoch(datetimes[0], timezone_offset)}
+    # most series are evenly spaced, which is checked without converting every timestamp
+    steps = set(map(operator.sub, islice(datetimes, 1, None), datetimes))
+    if len(steps) <= 1:
+        result['step'] = int(steps.pop().total_seconds()) if len(steps) > 0 else 0
+        result['count'] = len(datetimes)
+    else:
+        epochs = [_to_epoch(item, timezone_offset) for item in datetimes]
+        result['deltas'] = [epochs[i] - epochs[i - 1] for i in range(1, len(epochs))]
+    return result
+
+
+def _encode_values(values):
+    try:
+        data = array('d', map(float, values))
+    except TypeError:
+        data = array('d', [float('nan') if item is None else float(item) for item in values])
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return {'encoding': 'float64', 'data': base64.b64encode(data.tobytes()).decode('ascii')}
+
+
+def _encode_column(items, is_column, encode_column):
+    if is_column(items):
+        return encode_column(items)
+    if len(items) > 0 and all(isinstance(item, list) and is_column(item) for item in items):
+        return [encode_column(item) for item in items]
+    return items
+
+
+def encode(obj, timezone_offset=None):
+    """
+    Encode the time series of a report result, the result itself is not modified
+    :param obj: the report result, any structure of dicts and lists
+    :param timezone_offset: timezone offset in minutes of the timestamps, config.utc_offset by default
+    :return: the encoded result
+    """
+    if timezone_offset is None:
+        timezone_offset = _get_timezone_offset()
+    if isinstance(obj, list):
+        return [encode(item, timezone_offset) for item in obj]
+    if not isinstance(obj, dict):
+        return obj
+    result = dict()
+    for key, value in obj.items():
+        if key == 'timestamps' and isinstance(value, list) and 'values' in obj:
+            result[key] = _encode_column(value, _is_timestamp_list,
+                                         lambda items: _encode_timestamps(items, timezone_offset))
+        elif key == 'values' and isinstance(value, list) and 'timestamps' in obj:
+            result[key] = _encode_column(value, _is_number_list, _encode_values)
+        else:
+            result[key] = encode(value, timezone_offset)
+    return result
+
+
+def dumps(req, result):
+    """
+    Serialize a report result to JSON, with the compact encoding if the client asks for it
+    :param req: HTTP request
+    :param result: the report result
+    :return: JSON text
+    """
+    if is_compact(req):
+        return json.dumps(encode(result))
+    return json.dumps(result)
+
+
+########################################################################################################################
+# Compression of response bodies
+# Responses larger than config.response_compression_min_bytes are compressed with brotli, if the brotli package is
+# installed and the client accepts it, or with gzip.
+########################################################################################################################
+def _accepts(accept_encoding, coding):
+    for item in accept_encoding.split(','):
+        parts = item.split(';')
+        if str.strip(parts[0]) != coding:
+            continue
+        for parameter in parts[1:]:
+            name, _, value = str.strip(parameter).partition('=')
+            if name == 'q' and value in ('0', '0.0', '0.00', '0.000'):
+                return False
+        return True
+    return False
+
+
+class CompressionMiddleware:
+    def process_response(self, req, resp, resource, req_succeeded):
+        _ = resource
+        _ = req_succeeded
+        if config.response_compression_min_bytes <= 0 or \
+                resp.stream is not None or \
+                resp.get_header('Content-Encoding') is not None:
+            return
+        accept_encoding = req.get_header('Accept-Encoding')
+        if accept_encoding is None:
+            return
+
+        if resp.text is not None:
+            body = resp.text.encode('utf-8')
+        elif isinstance(resp.data, bytes):
+            body = resp.data
+        else:
+            return
+        if len(body) < config.response_compression_min_bytes:
+            return
+
+        if brotli is not None and _accepts(accept_encoding, 'br'):
+            resp.data = brotli.compress(body, quality=config.response_compression_level)
+            resp.set_header('Content-Encoding', 'br')
+        elif _accepts(accept_encoding, 'gzip'):
+            resp.data = gzip.compress(body, compresslevel=config.response_compression_level)
+            resp.set_header('Content-Encoding', 'gzip')
+        else:
+            return
+        resp.text = None
+        resp.append_header('Vary', 'Accept-Encoding')
@@ -4,6 +4,7 @@ from decimal import Decimal
 import falcon
 import mysql.connector
 import simplejson as json
+from core import collectionquery, fleetindex
 from core.useractivity import user_logger, admin_control, access_control
 import config
 
@@ -388,6 +389,7 @@ class PhotovoltaicPowerStationItem:
 
         cursor.close()
         cnx.close()
+        fleetindex.invalidate()
 
         resp.status = falcon.HTTP_204
 
@@ -2857,9 +2859,11 @@ class PhotovoltaicPowerStationInvertorCollection:
                                     mppt_10_energy_point_id
                                     ))
         new_id = cursor.lastrowid
+        collectionquery.touch(cursor, 'tbl_photovoltaic_power_stations_invertors')
         cnx.commit()
         cursor.close()
         cnx.close()
+        fleetindex.invalidate()
 
         resp.status = falcon.HTTP_201
         resp.location = '/photovoltaicpowerstations/' + str(id_) + '/grids/' + str(new_id)
@@ -3153,10 +3157,12 @@ class PhotovoltaicPowerStationInvertorItem:
 
         cursor.execute(" DELETE FROM tbl_photovoltaic_power_stations_invertors "
                        " WHERE id = %s ", (iid,))
+        collectionquery.touch(cursor, 'tbl_photovoltaic_power_stations_invertors')
         cnx.commit()
 
         cursor.close()
         cnx.close()
+        fleetindex.invalidate()
 
         resp.status = falcon.HTTP_204
 
@@ -3993,10 +3999,12 @@ class PhotovoltaicPowerStationInvertorItem:
                                     mppt_9_energy_point_id,
                                     mppt_10_energy_point_id,
                                     iid))
+        collectionquery.touch(cursor, 'tbl_photovoltaic_power_stations_invertors')
         cnx.commit()
 
         cursor.close()
         cnx.close()
+        fleetindex.invalidate()
 
         resp.status = falcon.HTTP_200
 
@@ -2,6 +2,7 @@ import falcon
 from datetime import datetime, timedelta
 import mysql.connector
 import simplejson as json
+from core import collectionquery
 from core.useractivity import user_logger, admin_control
 import config
 from decimal import Decimal
@@ -20,27 +21,64 @@ class PointCollection:
     def on_get(req, resp):
         """Handles GET requests"""
         admin_control(req)
+        page = collectionquery.get_page(req)
+        data_source_id = collectionquery.get_id_filter(req, 'datasourceid', 'API.INVALID_DATA_SOURCE_ID')
+        object_type = req.params.get('objecttype')
+        if object_type is not None and len(str.strip(object_type)) > 0:
+            object_type = str.strip(object_type)
+            if object_type not in ('ENERGY_VALUE', 'ANALOG_VALUE', 'DIGITAL_VALUE', 'TEXT_VALUE'):
+                raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                                       description='API.INVALID_OBJECT_TYPE')
+        else:
+            object_type = None
+        search = collectionquery.get_search(req)
+
+        if collectionquery.is_not_modified(req, resp, ['tbl_points', 'tbl_data_sources']):
+            return
+
+        conditions = list()
+        params = list()
+        if data_source_id is not None:
+            conditions.append(" data_source_id = %s ")
+            params.append(data_source_id)
+        if object_type is not None:
+            conditions.append(" object_type = %s ")
+            params.append(object_type)
+        if search is not None:
+            conditions.append(" name LIKE %s ")
+            params.append(search)
+        where = (" WHERE " + " AND ".join(conditions)) if len(conditions) > 0 else ""
+
         cnx = mysql.connector.connect(**config.myems_system_db)
         cursor = cnx.cursor()
 
-        query = (" SELECT id, name, uuid "
-                 " FROM tbl_data_sources ")
-        cursor.execute(query)
-        rows_data_sources = cursor.fetchall()
-
-        data_source_dict = dict()
-        if rows_data_sources is not None and len(rows_data_sources) > 0:
-            for row in rows_data_sources:
-                data_source_dict[row[0]] = {"id": row[0],
-                                            "name": row[1],
-                                            "uuid": row[2]}
-
         query = (" SELECT id, name, data_source_id, object_type, units, "
                  "        high_limit, low_limit, higher_limit, lower_limit, ratio, offset_constant, "
                  "        is_trend, is_virtual, address, description, faults, definitions "
-                 " FROM tbl_points ")
-        cursor.execute(query)
+                 " FROM tbl_points " + where +
+                 " ORDER BY id ")
+        if page is not None:
+            cursor.execute(" SELECT COUNT(*) FROM tbl_points " + where, tuple(params))
+            resp.set_header('X-Total-Count', str(cursor.fetchone()[0]))
+            query += " LIMIT %s OFFSET %s "
+            params.extend(page)
+        cursor.execute(query, tuple(params))
         rows = cursor.fetchall()
+
+        # only the data sources of the returned points
+        data_source_ids = sorted(set(row[2] for row in rows))
+        data_source_dict = dict()
+        if len(data_source_ids) > 0:
+            query = (" SELECT id, name, uuid "
+                     " FROM tbl_data_sources "
+                     " WHERE id IN (" + ', '.join(['%s'] * len(data_source_ids)) + ") ")
+            cursor.execute(query, tuple(data_source_ids))
+            rows_data_sources = cursor.fetchall()
+            if rows_data_sources is not None and len(rows_data_sources) > 0:
+                for row in rows_data_sources:
+                    data_source_dict[row[0]] = {"id": row[0],
+                                                "name": row[1],
+                                                "uuid": row[2]}
         cursor.close()
         cnx.close()
 
@@ -250,6 +288,7 @@ class PointCollection:
                                    faults,
                                    definitions))
         new_id = cursor.lastrowid
+        collectionquery.touch(cursor, 'tbl_points')
         cnx.commit()
         cursor.close()
         cnx.close()
@@ -779,6 +818,7 @@ class PointItem:
                                    'API.THERE_IS_RELATION_WITH_ENERGY_STORAGE_CONTAINERS_STSES')
 
         cursor.execute(" DELETE FROM tbl_points WHERE id = %s ", (id_,))
+        collectionquery.touch(cursor, 'tbl_points')
         cnx.commit()
 
         cursor.close()
@@ -982,6 +1022,7 @@ class PointItem:
                                     faults,
                                     definitions,
                                     id_,))
+        collectionquery.touch(cursor, 'tbl_points')
         cnx.commit()
 
         cursor.close()
@@ -1063,6 +1104,7 @@ class PointLimit:
                                     higher_limit,
                                     lower_limit,
                                     id_,))
+        collectionquery.touch(cursor, 'tbl_points')
         cnx.commit()
 
         cursor.close()
@@ -1327,6 +1369,7 @@ class PointImport:
                                    faults,
                                    definitions))
         new_id = cursor.lastrowid
+        collectionquery.touch(cursor, 'tbl_points')
         cnx.commit()
         cursor.close()
         cnx.close()
@@ -1410,6 +1453,7 @@ class PointClone:
                                    result['faults'],
                                    result['definitions']))
         new_id = cursor.lastrowid
+        collectionquery.touch(cursor, 'tbl_points')
         cnx.commit()
         cursor.close()
         cnx.close()
@@ -0,0 +1,371 @@
+import collections
+import contextvars
+import os
+import re
+import threading
+import time
+from functools import wraps
+import falcon
+import mysql.connector
+import simplejson as json
+import config
+from core.useractivity import admin_control
+
+
+########################################################################################################################
+# Profiling of API requests
+# ProfilingMiddleware records per request the total latency, the time, query count and rows fetched of each database,
+# and the time spent in functions decorated with timed, for example the aggregation helpers of core/utilities.py and
+# the export functions of excelexporters.
+# The connections made with mysql.connector.connect during a request, and those of queryexecutor, are wrapped by
+# ProfiledConnection, whose cursors time every execute and fetch. The profile of a request is kept in a context
+# variable, which queryexecutor.run_in_parallel copies to its threads.
+# Every request is printed as one line of JSON, requests slower than config.profiling_slow_request_threshold_in_ms
+# with the list of their queries, which is also kept for the last slow requests. The metrics aggregated by route,
+# with latency histograms, are served by the ProfilingMetrics endpoint of each API worker.
+# The metrics are kept in the memory of each worker and are not aggregated across workers: a GET request to the
+# endpoint returns those of the worker which serves it, and a DELETE request resets them. The pid of the worker
+# prefixes the route keys, so that the metrics of several workers can be collected and summed without mixing them.
+# For all workers, sum the printed JSON lines.
+# Nothing is installed and the decorated functions only check the context variable when profiling is disabled.
+########################################################################################################################
+
+# upper bounds in seconds of the latency histogram buckets, the last bucket counts the slower requests
+HISTOGRAM_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# characters of a statement kept in the query list
+_STATEMENT_MAX_LENGTH = 1000
+
+_current_profile = contextvars.ContextVar('myems_api_profile', default=None)
+_active_spans = contextvars.ContextVar('myems_api_profile_spans', default=frozenset())
+
+_lock = threading.Lock()
+_metrics = dict()
+_slow_requests = collections.deque()
+_connect = mysql.connector.connect
+_installed = {'is_installed': False}
+
+
+class RequestProfile:
+    """
+    The measures of one request
+    """
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.route = None
+        self.started_at = time.perf_counter()
+        self.databases = dict()
+        self.spans = dict()
+        self.queries = list()
+        self.truncated_query_count = 0
+        self._lock = threading.Lock()
+
+    def add_query(self, database, statement, seconds):
+        """
+        :return: the query entry to which the fetches of the cursor are added
+        """
+        entry = {'database': database,
+                 'statement': re.sub(r'\s+', ' ', str(statement)).strip()[:_STATEMENT_MAX_LENGTH],
+                 'seconds': seconds,
+                 'rows': 0}
+        with self._lock:
+            measures = self.databases.setdefault(database, {'seconds': 0.0, 'queries': 0, 'rows': 0})
+            measures['seconds'] += seconds
+            measures['queries'] += 1
+            if len(self.queries) < config.profiling_max_queries_per_request:
+                self.queries.append(entry)
+            else:
+                self.truncated_query_count += 1
+        return entry
+
+    def add_fetch(self, database, entry, seconds, row_count):
+        with self._lock:
+            measures = self.databases.setdefault(database, {'seconds': 0.0, 'queries': 0, 'rows': 0})
+            measures['seconds'] += seconds
+            measures['rows'] += row_count
+            if entry is not None:
+                entry['seconds'] += seconds
+                entry['rows'] += row_count
+
+    def add_database_time(self, database, seconds):
+        with self._lock:
+            measures = self.databases.setdefault(database, {'seconds': 0.0, 'queries': 0, 'rows': 0})
+            measures['seconds'] += seconds
+
+    def add_span(self, name, seconds):
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+
+class ProfiledCursor:
+    """
+    Cursor wrapper timing the queries and counting the fetched rows
+    """
+    def __init__(self, cursor, database, profile):
+        self._cursor = cursor
+        self._database = database
+        self._profile = profile
+        self._entry = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._cursor.close()
+
+    def __iter__(self):
+        row = self.fetchone()
+        while row is not None:
+            yield row
+            row = self.fetchone()
+
+    def _execute(self, method, operation, *args, **kwargs):
+        started_at = time.perf_counter()
+        try:
+            return method(operation, *args, **kwargs)
+        finally:
+            self._entry = self._profile.add_query(self._database, operation, time.perf_counter() - started_at)
+
+    def execute(self, operation, *args, **kwargs):
+        return self._execute(self._cursor.execute, operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        return self._execute(self._cursor.executemany, operation, *args, **kwargs)
+
+    def _fetch(self, method, *args, **kwargs):
+        started_at = time.perf_counter()
+        rows = method(*args, **kwargs)
+        if rows is None:
+            row_count = 0
+        elif isinstance(rows, list):
+            row_count = len(rows)
+        else:
+            row_count = 1
+        self._profile.add_fetch(self._database, self._entry, time.perf_counter() - started_at, row_count)
+        return rows
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._fetch(self._cursor.fetchmany, *args, **kwargs)
+
+
+class ProfiledConnection:
+    """
+    Connection wrapper returning profiled cursors
+    """
+    def __init__(self, cnx, database, profile):
+        self._cnx = cnx
+        self._database = database
+        self._profile = profile
+
+    def __getattr__(self, name):
+        return getattr(self._cnx, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._cnx.close()
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self._cnx.cursor(*args, **kwargs), self._database, self._profile)
+
+    def commit(self):
+        started_at = time.perf_counter()
+        try:
+            return self._cnx.commit()
+        finally:
+            self._profile.add_database_time(self._database, time.perf_counter() - started_at)
+
+
+def wrap_connection(cnx, database):
+    """
+    Wrap a connection if the current request is profiled
+    :param cnx: the connection
+    :param database: the database name, for example 'myems_energy_db'
+    :return: the connection or its ProfiledConnection
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return cnx
+    return ProfiledConnection(cnx, database, profile)
+
+
+def connect(*args, **kwargs):
+    """
+    Replacement of mysql.connector.connect wrapping the connections made during profiled requests
+    """
+    return wrap_connection(_connect(*args, **kwargs), kwargs.get('database'))
+
+
+def install():
+    """
+    Wrap the connections of mysql.connector.connect, called once when the API starts with profiling enabled
+    """
+    with _lock:
+        if not _installed['is_installed']:
+            mysql.connector.connect = connect
+            _installed['is_installed'] = True
+
+
+def timed(name):
+    """
+    Decorator adding the time of the function to the span name of the profiled request
+    Nested calls of functions of the same span are counted once.
+    :param name: the span name, for example 'aggregation' or 'excel_export'
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = _current_profile.get()
+            active_spans = _active_spans.get()
+            if profile is None or name in active_spans:
+                return func(*args, **kwargs)
+            token = _active_spans.set(active_spans | {name})
+            started_at = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.add_span(name, time.perf_counter() - started_at)
+                _active_spans.reset(token)
+        return wrapper
+    return decorator
+
+
+def _record(profile, status, seconds):
+    route = str(os.getpid()) + ' ' + profile.method + ' ' + (profile.route or 'unrouted')
+    with _lock:
+        metrics = _metrics.get(route)
+        if metrics is None:
+            metrics = {'count': 0,
+                       'seconds': 0.0,
+                       'max_seconds': 0.0,
+                       'histogram': [0] * (len(HISTOGRAM_BUCKETS) + 1),
+                       'statuses': dict(),
+                       'databases': dict(),
+                       'spans': dict()}
+            _metrics[route] = metrics
+        metrics['count'] += 1
+        metrics['seconds'] += seconds
+        metrics['max_seconds'] = max(metrics['max_seconds'], seconds)
+        bucket = next((i for i, upper_bound in enumerate(HISTOGRAM_BUCKETS) if seconds <= upper_bound),
+                      len(HISTOGRAM_BUCKETS))
+        metrics['histogram'][bucket] += 1
+        metrics['statuses'][status] = metrics['statuses'].get(status, 0) + 1
+        for database, measures in profile.databases.items():
+            totals = metrics['databases'].setdefault(database, {'seconds': 0.0, 'queries': 0, 'rows': 0})
+            for key in totals:
+                totals[key] += measures[key]
+        for name, span_seconds in profile.spans.items():
+            metrics['spans'][name] = metrics['spans'].get(name, 0.0) + span_seconds
+
+
+class ProfilingMiddleware:
+    def process_request(self, req, resp):
+        _ = resp
+        profile = RequestProfile(req.method, req.path)
+        req.context.profile = profile
+        req.context.profile_token = _current_profile.set(profile)
+
+    def process_resource(self, req, resp, resource, params):
+        _ = resp
+        _ = resource
+        _ = params
+        profile = getattr(req.context, 'profile', None)
+        if profile is not None:
+            profile.route = req.uri_template
+
+    def process_response(self, req, resp, resource, req_succeeded):
+        _ = resource
+        _ = req_succeeded
+        profile = getattr(req.context, 'profile', None)
+        if profile is None:
+            return
+        seconds = time.perf_counter() - profile.started_at
+        _current_profile.reset(req.context.profile_token)
+        status = str(resp.status).split(' ')[0]
+        _record(profile, status, seconds)
+
+        log = {'event': 'request_profile',
+               'pid': os.getpid(),
+               'method': profile.method,
+               'path': profile.path,
+               'route': profile.route,
+               'status': status,
+               'seconds': round(seconds, 6),
+               'databases': profile.databases,
+               'spans': profile.spans}
+        if seconds * 1000 >= config.profiling_slow_request_threshold_in_ms:
+            log['query_string'] = req.query_string
+            log['queries'] = profile.queries
+            log['truncated_query_count'] = profile.truncated_query_count
+            with _lock:
+                _slow_requests.append(log)
+                while len(_slow_requests) > config.profiling_slow_request_sample_size:
+                    _slow_requests.popleft()
+        print(json.dumps(log))
+
+
+def get_metrics():
+    """
+    Get the metrics of the API worker, the other workers keep their own
+    :return: dict of the pid, the histogram buckets, the metrics by pid, method and route and the last slow requests
+    """
+    with _lock:
+        routes = {route: {'count': metrics['count'],
+                          'seconds': metrics['seconds'],
+                          'average_seconds': metrics['seconds'] / metrics['count'],
+                          'max_seconds': metrics['max_seconds'],
+                          'histogram': list(metrics['histogram']),
+                          'statuses': dict(metrics['statuses']),
+                          'databases': {database: dict(measures)
+                                        for database, measures in metrics['databases'].items()},
+                          'spans': dict(metrics['spans'])}
+                  for route, metrics in _metrics.items()}
+        slow_requests = list(_slow_requests)
+    return {'pid': os.getpid(),
+            'histogram_buckets': list(HISTOGRAM_BUCKETS),
+            'routes': routes,
+            'slow_requests': slow_requests}
+
+
+def clear():
+    with _lock:
+        _metrics.clear()
+        _slow_requests.clear()
+
+
+class ProfilingMetrics:
+    def __init__(self):
+        """"Initializes ProfilingMetrics"""
+        pass
+
+    @staticmethod
+    def on_options(req, resp):
+        resp.status = falcon.HTTP_200
+
+    @staticmethod
+    def on_get(req, resp):
+        admin_control(req)
+        if not config.is_profiling_enabled:
+            raise falcon.HTTPError(status=falcon.HTTP_404, title='API.NOT_FOUND',
+                                   description='API.PROFILING_NOT_ENABLED')
+        resp.text = json.dumps(get_metrics())
+
+    @staticmethod
+    def on_delete(req, resp):
+        admin_control(req)
+        if not config.is_profiling_enabled:
+            raise falcon.HTTPError(status=falcon.HTTP_404, title='API.NOT_FOUND',
+                                   description='API.PROFILING_NOT_ENABLED')
+        clear()
+        resp.status = falcon.HTTP_204
@@ -0,0 +1,272 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import mysql.connector
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
+import config
+from core import profiling
+
+
+########################################################################################################################
+# Query execution helpers for report handlers
+# Instead of one query per entity and energy category, the fetch functions issue one grouped query per table and
+# period for all entities and categories, with entity ids split into chunks of bounded IN lists.
+# Independent grouped queries, for example on myems_energy_db and myems_billing_db, can run concurrently with
+# run_in_parallel on a bounded thread pool, each with its own pooled connection.
+########################################################################################################################
+_IN_LIST_CHUNK_SIZE = 1000
+
+_pools = dict()
+_pools_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_connection(db_name):
+    """
+    Get a connection from the pool of the database, or a new connection if the pool is exhausted
+    :param db_name: name of the database config, for example 'myems_energy_db'
+    :return: the connection, close() returns it to the pool
+    """
+    with _pools_lock:
+        pool = _pools.get(db_name)
+        if pool is None:
+            pool = pooling.MySQLConnectionPool(pool_name='myems_api_' + db_name,
+                                               pool_size=config.query_connection_pool_size,
+                                               pool_reset_session=True,
+                                               **getattr(config, db_name))
+            _pools[db_name] = pool
+    try:
+        return profiling.wrap_connection(pool.get_connection(), db_name)
+    except PoolError:
+        return mysql.connector.connect(**getattr(config, db_name))
+
+
+def run_in_parallel(tasks):
+    """
+    Run independent functions concurrently on the bounded thread pool and wait for all of them
+    :param tasks: dict of name and tuple of (function, arg1, arg2, ...)
+    :return: dict of name and the result of the function, the first exception is raised
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.query_max_workers)
+    # every task runs in a copy of the context of the caller, which holds the profile of the request
+    futures = {name: _executor.submit(contextvars.copy_context().run, task[0], *task[1:])
+               for name, task in tasks.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def _chunks(values):
+    values = list(values)
+    for i in range(0, len(values), _IN_LIST_CHUNK_SIZE):
+        yield values[i:i + _IN_LIST_CHUNK_SIZE]
+
+
+def _in_list(values):
+    return '(' + ', '.join(['%s'] * len(values)) + ')'
+
+
+def fetch_hourly_rows(db_name, table, entity_column, entity_ids, category_ids, start_datetime_utc, end_datetime_utc,
+                      category_column='energy_category_id'):
+    """
+    Fetch hourly rows of many entities and categories with one grouped query per chunk of entity ids
+    :param db_name: name of the database config, for example 'myems_energy_db'
+    :param table: hourly table, for example 'tbl_space_input_category_hourly'
+    :param entity_column: entity id column, for example 'space_id'
+    :param entity_ids: iterable of entity ids
+    :param category_ids: iterable of category ids
+    :param start_datetime_utc: start datetime in utc, included
+    :param end_datetime_utc: end datetime in utc, excluded
+    :param category_column: category id column, 'energy_category_id' by default
+    :return: dict of (entity_id, category_id) and list of (start_datetime_utc, actual_value) ordered by datetime
+    """
+    result = dict()
+    category_ids = list(category_ids)
+    if start_datetime_utc is None or end_datetime_utc is None or len(category_ids) == 0:
+        return result
+    cnx = get_connection(db_name)
+    cursor = cnx.cursor()
+    try:
+        for entity_id_chunk in _chunks(entity_ids):
+            query = (" SELECT " + entity_column + ", " + category_column + ", start_datetime_utc, actual_value "
+                     " FROM " + table +
+                     " WHERE " + entity_column + " IN " + _in_list(entity_id_chunk) +
+                     "     AND " + category_column + " IN " + _in_list(category_ids) +
+                     "     AND start_datetime_utc >= %s "
+                     "     AND start_datetime_utc < %s "
+                     " ORDER BY " + entity_column + ", " + category_column + ", start_datetime_utc ")
+            cursor.execute(query, tuple(entity_id_chunk) + tuple(category_ids) +
+                           (start_datetime_utc, end_datetime_utc))
+            for row in cursor.fetchall():
+                result.setdefault((row[0], row[1]), list()).append((row[2], row[3]))
+    finally:
+        cursor.close()
+        cnx.close()
+    return result
+
+
+def fetch_subtotals(db_name, table, entity_column, entity_ids, category_ids, start_datetime_utc, end_datetime_utc,
+                    category_column='energy_category_id'):
+    """
+    Fetch subtotals of many entities and categories with one GROUP BY query per chunk of entity ids
+    :return: dict of (entity_id, category_id) and subtotal, missing keys have no rows in the period
+    """
+    result = dict()
+    category_ids = list(category_ids)
+    if start_datetime_utc is None or end_datetime_utc is None or len(category_ids) == 0:
+        return result
+    cnx = get_connection(db_name)
+    cursor = cnx.cursor()
+    try:
+        for entity_id_chunk in _chunks(entity_ids):
+            query = (" SELECT " + entity_column + ", " + category_column + ", SUM(actual_value) "
+                     " FROM " + table +
+                     " WHERE " + entity_column + " IN " + _in_list(entity_id_chunk) +
+                     "     AND " + category_column + " IN " + _in_list(category_ids) +
+                     "     AND start_datetime_utc >= %s "
+                     "     AND start_datetime_utc < %s "
+                     " GROUP BY " + entity_column + ", " + category_column)
+            cursor.execute(query, tuple(entity_id_chunk) + tuple(category_ids) +
+                           (start_datetime_utc, end_datetime_utc))
+            for row in cursor.fetchall():
+                result[(row[0], row[1])] = Decimal(0.0) if row[2] is None else row[2]
+    finally:
+        cursor.close()
+        cnx.close()
+    return result
+
+
+########################################################################################################################
+# Batch report helpers
+# Batch and tracking reports of a space tree compute the same figures for thousands of entities. These helpers return
+# them for all entities with a few grouped queries, so the number of queries does not grow with the number of entities.
+########################################################################################################################
+def fetch_entity_subtotals(db_name, table, entity_column, entity_ids, start_datetime_utc, end_datetime_utc):
+    """
+    Fetch subtotals of many entities of a single energy category, for example meters, with one GROUP BY query per
+    chunk of entity ids
+    :return: dict of entity_id and subtotal, missing keys have no rows in the period
+    """
+    result = dict()
+    cnx = get_connection(db_name)
+    cursor = cnx.cursor()
+    try:
+        for entity_id_chunk in _chunks(entity_ids):
+            query = (" SELECT " + entity_column + ", SUM(actual_value) "
+                     " FROM " + table +
+                     " WHERE " + entity_column + " IN " + _in_list(entity_id_chunk) +
+                     "     AND start_datetime_utc >= %s "
+                     "     AND start_datetime_utc < %s "
+                     " GROUP BY " + entity_column)
+            cursor.execute(query, tuple(entity_id_chunk) + (start_datetime_utc, end_datetime_utc))
+            for row in cursor.fetchall():
+                result[row[0]] = row[1]
+    finally:
+        cursor.close()
+        cnx.close()
+    return result
+
+
+def fetch_category_aggregates(db_name, table, entity_column, entity_ids, start_datetime_utc, end_datetime_utc):
+    """
+    Fetch subtotals and maximums of all energy categories of many entities, for example tenants or equipments,
+    with one GROUP BY query per chunk of entity ids
+    :return: dict of (entity_id, energy_category_id) and tuple of (subtotal, maximum)
+    """
+    result = dict()
+    cnx = get_connection(db_name)
+    cursor = cnx.cursor()
+    try:
+        for entity_id_chunk in _chunks(entity_ids):
+            query = (" SELECT " + entity_column + ", energy_category_id, SUM(actual_value), MAX(actual_value) "
+                     " FROM " + table +
+                     " WHERE " + entity_column + " IN " + _in_list(entity_id_chunk) +
+                     "     AND start_datetime_utc >= %s "
+                     "     AND start_datetime_utc < %s "
+                     " GROUP BY " + entity_column + ", energy_category_id ")
+            cursor.execute(query, tuple(entity_id_chunk) + (start_datetime_utc, end_datetime_utc))
+            for row in cursor.fetchall():
+                result[(row[0], row[1])] = (row[2], row[3])
+    finally:
+        cursor.close()
+        cnx.close()
+    return result
+
+
+def fetch_meter_energy_point_ids(meter_ids):
+    """
+    Fetch the ENERGY_VALUE points of many meters with one query per chunk of meter ids
+    :return: dict of meter_id and list of point ids, missing keys have no energy value points
+    """
+    result = dict()
+    cnx = get_connection('myems_system_db')
+    cursor = cnx.cursor()
+    try:
+        for meter_id_chunk in _chunks(meter_ids):
+            cursor.execute(" SELECT mp.meter_id, mp.point_id "
+                           " FROM tbl_meters_points mp, tbl_points p "
+                           " WHERE p.id = mp.point_id AND p.object_type = 'ENERGY_VALUE' "
+                           "       AND mp.meter_id IN " + _in_list(meter_id_chunk),
+                           tuple(meter_id_chunk))
+            for row in cursor.fetchall():
+                result.setdefault(row[0], list()).append(row[1])
+    finally:
+        cursor.close()
+        cnx.close()
+    return result
+
+
+def fetch_latest_energy_values(point_ids, start_datetime_utc, end_datetime_utc):
+    """
+    Fetch the latest energy value of many points between start and end, both included, with one query per chunk of
+    point ids. The latest row per point is found by joining the GROUP BY MAX(utc_date_time) of the chunk, which uses
+    the (point_id, utc_date_time) index and works on all supported MySQL and MariaDB versions.
+    :return: dict of point_id and tuple of (utc_date_time, actual_value), missing keys have no value in the period
+    """
+    result = dict()
+    cnx = get_connection('myems_historical_db')
+    cursor = cnx.cursor()
+    try:
+        for point_id_chunk in _chunks(point_ids):
+            cursor.execute(" SELECT v.point_id, v.utc_date_time, v.actual_value "
+                           " FROM tbl_energy_value v, "
+                           "      (SELECT point_id, MAX(utc_date_time) AS utc_date_time "
+                           "       FROM tbl_energy_value "
+                           "       WHERE point_id IN " + _in_list(point_id_chunk) +
+                           "             AND utc_date_time BETWEEN %s AND %s "
+                           "       GROUP BY point_id) latest "
+                           " WHERE v.point_id = latest.point_id AND v.utc_date_time = latest.utc_date_time ",
+                           tuple(point_id_chunk) + (start_datetime_utc, end_datetime_utc))
+            for row in cursor.fetchall():
+                result[row[0]] = (row[1], row[2])
+    finally:
+        cursor.close()
+        cnx.close()
+    return result
+
+
+def fetch_meter_latest_energy_values(meter_point_ids, start_datetime_utc, end_datetime_utc):
+    """
+    Fetch the latest energy value of many meters between start and end, both included, which is the latest value of
+    all energy value points of each meter
+    :param meter_point_ids: dict of meter_id and list of point ids, as returned by fetch_meter_energy_point_ids
+    :return: dict of meter_id and actual_value, missing keys have no value in the period
+    """
+    point_ids = set()
+    for point_id_list in meter_point_ids.values():
+        point_ids.update(point_id_list)
+    point_values = fetch_latest_energy_values(point_ids, start_datetime_utc, end_datetime_utc)
+    result = dict()
+    for meter_id, point_id_list in meter_point_ids.items():
+        latest = None
+        for point_id in point_id_list:
+            point_value = point_values.get(point_id)
+            if point_value is not None and (latest is None or point_value[0] > latest[0]):
+                latest = point_value
+        if latest is not None:
+            result[meter_id] = latest[1]
+    return result
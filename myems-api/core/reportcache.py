@@ -0,0 +1,199 @@
+import collections
+import threading
+import time
+from functools import wraps
+import falcon
+import mysql.connector
+import simplejson as json
+import config
+from core import payloadencoding
+from core.useractivity import access_control, api_key_control
+
+
+########################################################################################################################
+# Result cache for report endpoints
+# The cache key is the report type, the request parameters (entity id, period, language, ...) and, for reports that
+# depend on the user's privilege, the user uuid.
+# Every entry remembers the data watermarks of the tables the report reads, for example MAX(id) of an hourly table
+# which grows whenever normalization or aggregation inserts rows, or MAX(utc_date_time) of a latest value table.
+# An entry is served only while these watermarks are unchanged, so cached reports never lag behind the pipeline.
+# Only the hourly and system data of a report are cached: requests reading raw point values, whose tables grow every
+# minute, are not cached at all, and the latest values of points are refreshed on every hit by a realtime function.
+# The cache is bounded by the total size of cached response texts in each API worker.
+########################################################################################################################
+_lock = threading.Lock()
+_cache = collections.OrderedDict()
+_cache_size = {'bytes': 0}
+_watermarks = dict()
+_statistics = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+def _query_watermark(db_name, table, column):
+    cnx = None
+    cursor = None
+    try:
+        cnx = mysql.connector.connect(**getattr(config, db_name))
+        cursor = cnx.cursor()
+        cursor.execute(" SELECT MAX(" + column + ") FROM " + table)
+        row = cursor.fetchone()
+        return row[0] if row is not None else None
+    finally:
+        if cursor:
+            cursor.close()
+        if cnx:
+            cnx.close()
+
+
+def get_watermark(db_name, table, column='id'):
+    """
+    Get the data watermark of a table, refreshed at most every config.report_cache_watermark_refresh_seconds
+    :param db_name: name of the database config, for example 'myems_energy_db'
+    :param table: table name, for example 'tbl_meter_hourly'
+    :param column: an indexed column whose maximum grows when the table changes, 'id' by default
+    :return: the watermark value
+    """
+    key = (db_name, table, column)
+    now = time.monotonic()
+    with _lock:
+        entry = _watermarks.get(key)
+        if entry is not None and now - entry[1] < config.report_cache_watermark_refresh_seconds:
+            return entry[0]
+    value = _query_watermark(db_name, table, column)
+    with _lock:
+        _watermarks[key] = (value, now)
+    return value
+
+
+def is_quick_mode(req):
+    """
+    Check the quickmode parameter in the same way as report handlers
+    :param req: HTTP request
+    :return: True if quick mode is on, in which case parameters data and excel file are not returned
+    """
+    quick_mode = req.params.get('quickmode')
+    return quick_mode is not None and \
+        len(str.strip(quick_mode)) > 0 and \
+        str.lower(str.strip(quick_mode)) in ('true', 't', 'on', 'yes', 'y')
+
+
+def check_access(req):
+    """
+    Check the credentials of a report request, once when the handler is decorated with cached
+    :param req: HTTP request
+    :return: HTTPError if invalid else None
+    """
+    context = getattr(req, 'context', None)
+    if context is not None and getattr(context, 'is_access_checked', False):
+        return
+    if 'API-KEY' not in req.headers or \
+            not isinstance(req.headers['API-KEY'], str) or \
+            len(str.strip(req.headers['API-KEY'])) == 0:
+        access_control(req)
+    else:
+        api_key_control(req)
+    if context is not None:
+        context.is_access_checked = True
+
+
+def _evict():
+    while _cache_size['bytes'] > config.report_cache_max_bytes and len(_cache) > 0:
+        _, entry = _cache.popitem(last=False)
+        _cache_size['bytes'] -= len(entry['text'])
+        _statistics['evictions'] += 1
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+        _cache_size['bytes'] = 0
+        _watermarks.clear()
+
+
+def get_statistics():
+    """
+    Get hit, miss and eviction counters and the current size of the report cache
+    :return: dict of statistics
+    """
+    with _lock:
+        result = dict(_statistics)
+        result['entries'] = len(_cache)
+        result['bytes'] = _cache_size['bytes']
+    return result
+
+
+def cached(report_type, watermarks, is_per_user=False, realtime=None):
+    """
+    Decorator for on_get of report handlers to cache the response text until the data watermarks change
+    The handler checks access with check_access, which is done once by the decorator.
+    :param report_type: report name used in the cache key
+    :param watermarks: list of (db_name, table, column) or a function of the request returning such a list,
+                       or None if the request is not cached
+    :param is_per_user: True if the report content depends on the user, for example dashboards
+    :param realtime: function updating in place the realtime fields of a cached result, for example latest values
+    :return: the decorator
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(req, resp, *args, **kwargs):
+            if config.report_cache_max_bytes <= 0:
+                func(req, resp, *args, **kwargs)
+                return
+
+            # check access before serving anything from the cache
+            check_access(req)
+
+            user_uuid = str.strip(req.headers['USER-UUID']) \
+                if is_per_user and isinstance(req.headers.get('USER-UUID'), str) else None
+            params = tuple(sorted((key, str.strip(str(value))) for key, value in req.params.items()))
+            # the compact encoding may also be negotiated by the Accept header
+            key = (report_type, user_uuid, params, payloadencoding.is_compact(req)) + \
+                tuple(args) + tuple(sorted(kwargs.items()))
+
+            try:
+                watermark_list = watermarks(req) if callable(watermarks) else watermarks
+                if watermark_list is None:
+                    func(req, resp, *args, **kwargs)
+                    return
+                watermark = tuple(get_watermark(*item) for item in watermark_list)
+            except Exception as ex:
+                # never fail a report because of the cache
+                print('reportcache: ' + str(ex))
+                func(req, resp, *args, **kwargs)
+                return
+
+            now = time.monotonic()
+            with _lock:
+                entry = _cache.get(key)
+                if entry is not None and entry['watermark'] == watermark and \
+                        now - entry['created'] <= config.report_cache_max_age_in_seconds:
+                    _cache.move_to_end(key)
+                    _statistics['hits'] += 1
+                    text = entry['text']
+                else:
+                    text = None
+                    _statistics['misses'] += 1
+            if text is not None:
+                if realtime is not None:
+                    # the time series are already encoded in the text, the other fields are plain JSON
+                    result = json.loads(text, use_decimal=True)
+                    realtime(result)
+                    text = json.dumps(result)
+                resp.text = text
+                resp.status = falcon.HTTP_200
+                return
+
+            func(req, resp, *args, **kwargs)
+
+            if resp.status not in (falcon.HTTP_200, 200) or not isinstance(resp.text, str):
+                return
+            if len(resp.text) > config.report_cache_max_bytes:
+                return
+            with _lock:
+                old_entry = _cache.pop(key, None)
+                if old_entry is not None:
+                    _cache_size['bytes'] -= len(old_entry['text'])
+                _cache[key] = {'text': resp.text, 'watermark': watermark, 'created': now}
+                _cache_size['bytes'] += len(resp.text)
+                _evict()
+        return wrapper
+    return decorator
@@ -0,0 +1,144 @@
+from decimal import Decimal
+import numpy as np
+from core import profiling, utilities
+
+
+########################################################################################################################
+# Revenue computation of the reporting revenue reports of microgrids, energy storage and photovoltaic power stations
+# All billing series of a report are loaded with one query into arrays of datetimes and values. The values are kept
+# as integers in millionths, the scale of actual_value in myems_billing_db, so that the totals are exact and equal to
+# the Decimal sums of the rows.
+# Period totals and time of use splits are computed with array operations, the periods are the same as those of
+# utilities.aggregate_hourly_data_by_period. Values are converted to Decimal only in the returned results.
+########################################################################################################################
+PEAK_TYPES = ('toppeak', 'onpeak', 'midpeak', 'offpeak', 'deep')
+
+# actual_value is DECIMAL(21, 6)
+_SCALE = 6
+
+# ids per IN list
+_BATCH_SIZE = 1000
+
+
+class BillingSeries:
+    """
+    The hourly rows of one billing series
+    """
+    def __init__(self, rows=()):
+        """
+        :param rows: list of (start_datetime_utc, actual_value) ordered by start_datetime_utc
+        """
+        self.datetimes_utc = np.array([row[0] for row in rows], dtype='datetime64[m]')
+        self.values = np.array([0 if row[1] is None else int(row[1].scaleb(_SCALE).to_integral_value())
+                                for row in rows], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.values)
+
+
+def to_decimal(value):
+    """
+    Convert an integer in millionths to Decimal
+    """
+    value = int(value)
+    return Decimal(0.0) if value == 0 else Decimal(value).scaleb(-_SCALE)
+
+
+def load_table_series(cursor, tables, key_column, key_id, start_datetime_utc, end_datetime_utc):
+    """
+    Load the billing series of one entity from several tables with one query
+    :param cursor: cursor of myems_billing_db
+    :param tables: list of hourly table names
+    :param key_column: the entity column of the tables, for example energy_storage_power_station_id
+    :param key_id: the entity id
+    :param start_datetime_utc: start datetime in utc
+    :param end_datetime_utc: end datetime in utc
+    :return: list of BillingSeries in the order of tables
+    """
+    rows_list = [list() for _ in tables]
+    if len(tables) == 0 or start_datetime_utc is None or end_datetime_utc is None:
+        return [BillingSeries() for _ in tables]
+    query = " UNION ALL ".join(["(SELECT " + str(i) + ", start_datetime_utc, actual_value "
+                                " FROM " + table +
+                                " WHERE " + key_column + " = %s "
+                                "     AND start_datetime_utc >= %s "
+                                "     AND start_datetime_utc < %s)"
+                                for i, table in enumerate(tables)])
+    cursor.execute(query + " ORDER BY 1, 2 ",
+                   (key_id, start_datetime_utc, end_datetime_utc) * len(tables))
+    for row in cursor.fetchall():
+        rows_list[row[0]].append(row[1:])
+    return [BillingSeries(rows) for rows in rows_list]
+
+
+def load_meter_series(cursor, meter_ids, start_datetime_utc, end_datetime_utc):
+    """
+    Load the billing series of meters with one query per thousand meters
+    :param cursor: cursor of myems_billing_db
+    :param meter_ids: list of meter ids
+    :param start_datetime_utc: start datetime in utc
+    :param end_datetime_utc: end datetime in utc
+    :return: dict of meter id and BillingSeries, meters without rows are omitted
+    """
+    rows_dict = dict()
+    meter_ids = sorted(set(meter_ids))
+    if start_datetime_utc is None or end_datetime_utc is None:
+        return dict()
+    for i in range(0, len(meter_ids), _BATCH_SIZE):
+        chunk = meter_ids[i:i + _BATCH_SIZE]
+        cursor.execute(" SELECT meter_id, start_datetime_utc, actual_value "
+                       " FROM tbl_meter_hourly "
+                       " WHERE meter_id IN (" + ', '.join(['%s'] * len(chunk)) + ") "
+                       "     AND start_datetime_utc >= %s "
+                       "     AND start_datetime_utc < %s "
+                       " ORDER BY meter_id, start_datetime_utc ",
+                       tuple(chunk) + (start_datetime_utc, end_datetime_utc))
+        for row in cursor.fetchall():
+            rows_dict.setdefault(row[0], list()).append(row[1:])
+    return {meter_id: BillingSeries(rows) for meter_id, rows in rows_dict.items()}
+
+
+@profiling.timed('aggregation')
+def aggregate_by_period(series, start_datetime_utc, end_datetime_utc, period_type):
+    """
+    Aggregate a billing series by period
+    :param series: BillingSeries with rows from start_datetime_utc to end_datetime_utc
+    :param start_datetime_utc: start datetime in utc
+    :param end_datetime_utc: end datetime in utc
+    :param period_type: use one of the period types, 'hourly', 'daily', 'weekly', 'monthly' and 'yearly'
+    :return: list of (start_datetime_utc, Decimal), the same as utilities.aggregate_hourly_data_by_period
+    """
+    # the period starts without rows, the loops of aggregate_hourly_data_by_period only run once per period
+    period_starts = [row[0] for row in
+                     utilities.aggregate_hourly_data_by_period(list(), start_datetime_utc, end_datetime_utc,
+                                                               period_type)]
+    if len(period_starts) == 0:
+        return list()
+    totals = np.zeros(len(period_starts), dtype=np.int64)
+    # the periods are contiguous and the last one ends after end_datetime_utc
+    indexes = np.searchsorted(np.array(period_starts, dtype='datetime64[m]'), series.datetimes_utc,
+                              side='right') - 1
+    is_in_periods = indexes >= 0
+    np.add.at(totals, indexes[is_in_periods], series.values[is_in_periods])
+    return [(period_start, to_decimal(total)) for period_start, total in zip(period_starts, totals.tolist())]
+
+
+@profiling.timed('aggregation')
+def split_by_peak_types(series, peak_types):
+    """
+    Split the total of a billing series by the peak types of the time of use tariff
+    :param series: BillingSeries
+    :param peak_types: dict of start_datetime_utc and peak type, see utilities.get_energy_category_peak_types
+    :return: dict of peak type in PEAK_TYPES and Decimal
+    """
+    totals = np.zeros(len(PEAK_TYPES) + 1, dtype=np.int64)
+    if len(peak_types) > 0 and len(series) > 0:
+        items = sorted(peak_types.items())
+        keys = np.array([item[0] for item in items], dtype='datetime64[m]')
+        # rows without a known peak type are counted in the last item
+        codes = np.array([PEAK_TYPES.index(item[1]) if item[1] in PEAK_TYPES else len(PEAK_TYPES)
+                          for item in items], dtype=np.int64)
+        positions = np.minimum(np.searchsorted(keys, series.datetimes_utc), len(keys) - 1)
+        row_codes = np.where(keys[positions] == series.datetimes_utc, codes[positions], len(PEAK_TYPES))
+        np.add.at(totals, row_codes, series.values)
+    return {peak_type: to_decimal(total) for peak_type, total in zip(PEAK_TYPES, totals.tolist())}
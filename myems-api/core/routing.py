@@ -0,0 +1,104 @@
+import gc
+import importlib
+import threading
+from falcon.routing import CompiledRouter
+from falcon.routing.util import set_default_responders
+
+
+########################################################################################################################
+# Lazily resolved routes of the API
+# The routes are registered with LazyResource placeholders naming the module and the class of the resource, so that
+# importing app.py only imports falcon and the middleware. The module of a resource, with its excel exporter, openpyxl
+# and plotly, is imported by the worker on the first request of one of its routes, and the resource of the route is
+# instantiated once, as it was when the routes were added with resource instances.
+# When the routes are preloaded, see config.is_route_preloaded, all resources are resolved at startup, and the objects
+# created so far are moved out of the garbage collector generations, so that the workers forked by gunicorn --preload
+# share the imported modules with the master process instead of copying the memory pages they touch.
+########################################################################################################################
+
+
+class LazyResource:
+    """
+    Placeholder of a resource which is imported and instantiated on first use
+    """
+    def __init__(self, module_name, class_name):
+        """
+        :param module_name: the module of the resource, for example 'core.meter'
+        :param class_name: the class of the resource in the module, for example 'MeterItem'
+        """
+        self.module_name = module_name
+        self.class_name = class_name
+        self._lock = threading.Lock()
+        self._resource = None
+
+    def __repr__(self):
+        return 'LazyResource(' + self.module_name + '.' + self.class_name + ')'
+
+    def resolve(self):
+        """
+        Import the module and instantiate the resource, once
+        :return: the resource
+        """
+        resource = self._resource
+        if resource is None:
+            with self._lock:
+                if self._resource is None:
+                    module = importlib.import_module(self.module_name)
+                    self._resource = getattr(module, self.class_name)()
+                resource = self._resource
+        return resource
+
+
+class LazyRouter(CompiledRouter):
+    """
+    Router resolving the LazyResource placeholders of the routes on the first request
+    """
+    def __init__(self):
+        super().__init__()
+        # (uri template, resource id) and (resource, keyword arguments of add_route)
+        self._lazy_routes = dict()
+        self._method_maps = dict()
+
+    def add_route(self, uri_template, resource, **kwargs):
+        if isinstance(resource, LazyResource):
+            self._lazy_routes[(uri_template, id(resource))] = (resource, kwargs)
+        super().add_route(uri_template, resource, **kwargs)
+
+    def _resolve(self, uri_template, resource):
+        key = (uri_template, id(resource))
+        real_resource = resource.resolve()
+        method_map = self._method_maps.get(key)
+        if method_map is None:
+            kwargs = self._lazy_routes[key][1]
+            # the responders are mapped as falcon.App.add_route maps those of an eagerly created resource
+            method_map = self.map_http_methods(real_resource, **kwargs)
+            set_default_responders(method_map, asgi=kwargs.get('_asgi', False))
+            self._method_maps[key] = method_map
+        return real_resource, method_map
+
+    def find(self, uri, req=None):
+        route = super().find(uri, req=req)
+        if route is not None and isinstance(route[0], LazyResource):
+            resource, method_map = self._resolve(route[3], route[0])
+            return resource, method_map, route[2], route[3]
+        return route
+
+    def preload(self):
+        """
+        Resolve the resources of all routes and compile the router
+        :return: the number of resolved routes
+        """
+        for (uri_template, _), (resource, _) in list(self._lazy_routes.items()):
+            self._resolve(uri_template, resource)
+        # the router is compiled on the first search
+        super().find('/')
+        return len(self._lazy_routes)
+
+
+def freeze():
+    """
+    Move the objects created so far out of the garbage collector generations, to be called in the gunicorn master
+    process before the workers are forked, so that collections in the workers do not write to the shared pages
+    """
+    gc.collect()
+    gc.freeze()
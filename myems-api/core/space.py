@@ -3,8 +3,7 @@ from datetime import datetime, timedelta
 import falcon
 import mysql.connector
 import simplejson as json
-from anytree import AnyNode, LevelOrderIter
-from anytree.exporter import JsonExporter
+from core import topology
 from core.useractivity import user_logger, admin_control, access_control, api_key_control
 import config
 
@@ -296,6 +295,7 @@ class SpaceCollection:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_201
         resp.location = '/spaces/' + str(new_id)
 
@@ -482,6 +482,7 @@ class SpaceItem:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_204
 
     @staticmethod
@@ -695,6 +696,7 @@ class SpaceItem:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_200
 
 
@@ -947,6 +949,7 @@ class SpaceCombinedEquipmentCollection:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_201
         resp.location = '/spaces/' + str(id_) + '/combinedequipments/' + str(combined_equipment_id)
 
@@ -1009,6 +1012,7 @@ class SpaceCombinedEquipmentItem:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_204
 
 
@@ -1338,6 +1342,7 @@ class SpaceEquipmentCollection:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_201
         resp.location = '/spaces/' + str(id_) + '/equipments/' + str(equipment_id)
 
@@ -1399,6 +1404,7 @@ class SpaceEquipmentItem:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_204
 
 
@@ -1526,6 +1532,7 @@ class SpaceMeterCollection:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_201
         resp.location = '/spaces/' + str(id_) + '/meters/' + str(meter_id)
 
@@ -1589,6 +1596,7 @@ class SpaceMeterItem:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_204
 
 
@@ -1892,6 +1900,7 @@ class SpaceOfflineMeterCollection:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_201
         resp.location = '/spaces/' + str(id_) + '/offlinemeters/' + str(offline_meter_id)
 
@@ -1954,6 +1963,7 @@ class SpaceOfflineMeterItem:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_204
 
 
@@ -2607,6 +2617,7 @@ class SpaceShopfloorCollection:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_201
         resp.location = '/spaces/' + str(id_) + '/shopfloors/' + str(shopfloor_id)
 
@@ -2668,6 +2679,7 @@ class SpaceShopfloorItem:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_204
 
 
@@ -2782,6 +2794,7 @@ class SpaceStoreCollection:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_201
         resp.location = '/spaces/' + str(id_) + '/stores/' + str(store_id)
 
@@ -2843,6 +2856,7 @@ class SpaceStoreItem:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_204
 
 
@@ -2957,6 +2971,7 @@ class SpaceTenantCollection:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_201
         resp.location = '/spaces/' + str(id_) + '/tenants/' + str(tenant_id)
 
@@ -3018,6 +3033,7 @@ class SpaceTenantItem:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_204
 
 
@@ -3145,6 +3161,7 @@ class SpaceVirtualMeterCollection:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_201
         resp.location = '/spaces/' + str(id_) + '/virtualmeters/' + str(virtual_meter_id)
 
@@ -3207,6 +3224,7 @@ class SpaceVirtualMeterItem:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_204
 
 
@@ -3302,24 +3320,8 @@ class SpaceTreeCollection:
             if space_id is None:
                 raise falcon.HTTPError(status=falcon.HTTP_404, title='API.NOT_FOUND',
                                        description='API.PRIVILEGE_NOT_FOUND')
-        # get all spaces
-        cnx = mysql.connector.connect(**config.myems_system_db)
-        cursor = cnx.cursor()
-
-        query = (" SELECT id, name, parent_space_id "
-                 " FROM tbl_spaces "
-                 " ORDER BY id ")
-        cursor.execute(query)
-        rows_spaces = cursor.fetchall()
-        node_dict = dict()
-        if rows_spaces is not None and len(rows_spaces) > 0:
-            for row in rows_spaces:
-                parent_node = node_dict[row[2]] if row[2] is not None else None
-                node_dict[row[0]] = AnyNode(id=row[0], parent=parent_node, name=row[1])
-
-        cursor.close()
-        cnx.close()
-        resp.text = JsonExporter(sort_keys=True).export(node_dict[space_id], )
+        # get the space tree from the topology index
+        resp.text = json.dumps(topology.get_tree(space_id), sort_keys=True)
 
 
 # Get energy categories of all meters in the space tree
@@ -3360,31 +3362,19 @@ class SpaceTreeMetersEnergyCategoryCollection:
                                    description='API.SPACE_NOT_FOUND')
 
         ################################################################################################################
-        # Step 2: build a space tree
+        # Step 2: get the meters in the space tree from the topology index
         ################################################################################################################
-        query = (" SELECT id, name, parent_space_id "
-                 " FROM tbl_spaces "
-                 " ORDER BY id ")
-        cursor.execute(query)
-        rows_spaces = cursor.fetchall()
-        node_dict = dict()
-        if rows_spaces is not None and len(rows_spaces) > 0:
-            for row in rows_spaces:
-                parent_node = node_dict[row[2]] if row[2] is not None else None
-                node_dict[row[0]] = AnyNode(id=row[0], parent=parent_node, name=row[1])
+        meter_space_dict = topology.get_subtree_entities(int(id_), 'meter')
         ################################################################################################################
         # Step 3: query energy categories of all meters in the space tree
         ################################################################################################################
-        space_dict = dict()
-
-        for node in LevelOrderIter(node_dict[int(id_)]):
-            space_dict[node.id] = node.name
-
-        cursor.execute(" SELECT distinct(m.energy_category_id), ec.name AS energy_category_name, ec.uuid "
-                       " FROM tbl_spaces s, tbl_spaces_meters sm, tbl_meters m, tbl_energy_categories ec  "
-                       " WHERE s.id IN ( " + ', '.join(map(str, space_dict.keys())) + ") "
-                       "       AND sm.space_id = s.id AND sm.meter_id = m.id  AND m.energy_category_id = ec.id ", )
-        rows_energy_categories = cursor.fetchall()
+        rows_energy_categories = None
+        if len(meter_space_dict) > 0:
+            cursor.execute(" SELECT distinct(m.energy_category_id), ec.name AS energy_category_name, ec.uuid "
+                           " FROM tbl_meters m, tbl_energy_categories ec  "
+                           " WHERE m.id IN ( " + ', '.join(map(str, meter_space_dict.keys())) + ") "
+                           "       AND m.energy_category_id = ec.id ", )
+            rows_energy_categories = cursor.fetchall()
 
         result = list()
         if rows_energy_categories is not None and len(rows_energy_categories) > 0:
@@ -4650,6 +4640,7 @@ class SpaceImport:
         cursor.close()
         cnx.close()
 
+        topology.invalidate()
         resp.status = falcon.HTTP_201
         resp.location = '/spaces/' + str(new_id)
 
@@ -5296,6 +5287,7 @@ class SpaceClone:
             cursor.close()
             cnx.close()
 
+            topology.invalidate()
             resp.status = falcon.HTTP_201
             resp.location = '/spaces/' + str(new_id)
 
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta, timezone
 import falcon
 import mysql.connector
 import simplejson as json
+from core import collectionquery
 from core.useractivity import user_logger, admin_control, access_control, api_key_control
 import config
 
@@ -24,6 +25,10 @@ class TariffCollection:
             access_control(req)
         else:
             api_key_control(req)
+
+        if collectionquery.is_not_modified(req, resp, ['tbl_tariffs', 'tbl_energy_categories']):
+            return
+
         cnx = mysql.connector.connect(**config.myems_system_db)
         cursor = cnx.cursor()
 
@@ -37,6 +42,21 @@ class TariffCollection:
         cursor.execute(query)
         rows = cursor.fetchall()
 
+        # the time of use periods of all tariffs with one query
+        timeofuse_dict = dict()
+        query = (" SELECT tariff_id, start_time_of_day, end_time_of_day, peak_type, price "
+                 " FROM tbl_tariffs_timeofuses "
+                 " ORDER BY tariff_id, id ")
+        cursor.execute(query)
+        rows_timeofuses = cursor.fetchall()
+        if rows_timeofuses is not None and len(rows_timeofuses) > 0:
+            for row_timeofuse in rows_timeofuses:
+                timeofuse_dict.setdefault(row_timeofuse[0], list()).append(
+                    {"start_time_of_day": str(row_timeofuse[1]),
+                     "end_time_of_day": str(row_timeofuse[2]),
+                     "peak_type": row_timeofuse[3],
+                     "price": row_timeofuse[4]})
+
         timezone_offset = int(config.utc_offset[1:3]) * 60 + int(config.utc_offset[4:6])
         if config.utc_offset[0] == '-':
             timezone_offset = -timezone_offset
@@ -57,20 +77,7 @@ class TariffCollection:
                                                  + timedelta(minutes=timezone_offset)).isoformat()[0:19]}
 
                 if meta_result['tariff_type'] == 'timeofuse':
-                    meta_result['timeofuse'] = list()
-                    query = (" SELECT start_time_of_day, end_time_of_day, peak_type, price "
-                             " FROM tbl_tariffs_timeofuses "
-                             " WHERE tariff_id = %s  "
-                             " ORDER BY id")
-                    cursor.execute(query, (meta_result['id'],))
-                    rows_timeofuses = cursor.fetchall()
-                    if rows_timeofuses is not None and len(rows_timeofuses) > 0:
-                        for row_timeofuse in rows_timeofuses:
-                            meta_data = {"start_time_of_day": str(row_timeofuse[0]),
-                                         "end_time_of_day": str(row_timeofuse[1]),
-                                         "peak_type": row_timeofuse[2],
-                                         "price": row_timeofuse[3]}
-                            meta_result['timeofuse'].append(meta_data)
+                    meta_result['timeofuse'] = timeofuse_dict.get(meta_result['id'], list())
                 else:
                     cursor.close()
                     cnx.close()
@@ -192,6 +199,9 @@ class TariffCollection:
                                                timeofuse['price']))
                 cnx.commit()
 
+        collectionquery.touch(cursor, 'tbl_tariffs')
+        cnx.commit()
+
         cursor.close()
         cnx.close()
 
@@ -311,6 +321,7 @@ class TariffItem:
         cnx.commit()
 
         cursor.execute(" DELETE FROM tbl_tariffs WHERE id = %s ", (id_,))
+        collectionquery.touch(cursor, 'tbl_tariffs')
         cnx.commit()
 
         cursor.close()
@@ -419,6 +430,7 @@ class TariffItem:
                                     valid_from,
                                     valid_through,
                                     id_,))
+        collectionquery.touch(cursor, 'tbl_tariffs')
         cnx.commit()
 
         # update prices of the tariff
@@ -447,6 +459,9 @@ class TariffItem:
                                                    timeofuse['price']))
                     cnx.commit()
 
+        collectionquery.touch(cursor, 'tbl_tariffs')
+        cnx.commit()
+
         cursor.close()
         cnx.close()
         resp.status = falcon.HTTP_200
@@ -645,6 +660,9 @@ class TariffImport:
                                                timeofuse['price']))
                 cnx.commit()
 
+        collectionquery.touch(cursor, 'tbl_tariffs')
+        cnx.commit()
+
         cursor.close()
         cnx.close()
 
@@ -747,6 +765,9 @@ class TariffClone:
                                                timeofuse['price']))
                 cnx.commit()
 
+        collectionquery.touch(cursor, 'tbl_tariffs')
+        cnx.commit()
+
         cursor.close()
         cnx.close()
 
@@ -0,0 +1,182 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+import mysql.connector
+import config
+from core import collectionquery
+
+
+########################################################################################################################
+# Index of the time of use tariffs of cost centers, behind utilities.get_energy_category_tariffs and
+# utilities.get_energy_category_peak_types
+# The tariffs, their time of use rows and the cost center bindings are loaded once per API worker. The index is
+# reloaded when the change counters of tbl_tariffs or tbl_cost_centers_tariffs change, which the tariff and cost center
+# admin endpoints increment, see core/collectionquery.py.
+# The price or peak type of a time slot only depends on the local hour of the slot, so every tariff keeps a table of
+# 24 hours and the slots are only generated inside the requested window. The results are memoized by cost center,
+# energy category and window, and are the same as those of the former full expansion of the tariff validity.
+########################################################################################################################
+TABLE_NAMES = ['tbl_tariffs', 'tbl_cost_centers_tariffs']
+
+# memoized results per API worker
+_MEMO_SIZE = 1024
+
+_lock = threading.Lock()
+_index = {'tariffs': None, 'versions': None, 'loaded_at': None}
+_memo = OrderedDict()
+
+
+def _get_timezone_offset():
+    timezone_offset = int(config.utc_offset[1:3]) * 60 + int(config.utc_offset[4:6])
+    if config.utc_offset[0] == '-':
+        timezone_offset = -timezone_offset
+    return timezone_offset
+
+
+def _build_hours(valid_from_datetime_utc, rates, timezone_offset):
+    """
+    Get the rate of every local hour of the slots of a tariff
+    :return: list of 24 (price, peak_type) or None
+    """
+    # the slots start at whole minutes from valid_from, their seconds since midnight are counted without the minute
+    valid_from_datetime_local = valid_from_datetime_utc + timedelta(minutes=timezone_offset)
+    seconds = valid_from_datetime_local.second + valid_from_datetime_local.microsecond / 1000000
+    hours = list()
+    for hour in range(24):
+        seconds_since_midnight = hour * 3600 + seconds
+        hours.append(next((rate[2:] for rate in rates
+                           if rate[0] <= seconds_since_midnight < rate[1]), None))
+    return hours
+
+
+def _load():
+    cnx = None
+    cursor = None
+    try:
+        cnx = mysql.connector.connect(**config.myems_system_db)
+        cursor = cnx.cursor()
+        cursor.execute(" SELECT cct.cost_center_id, t.energy_category_id, t.id, "
+                       "        t.valid_from_datetime_utc, t.valid_through_datetime_utc "
+                       " FROM tbl_tariffs t, tbl_cost_centers_tariffs cct "
+                       " WHERE t.id = cct.tariff_id "
+                       " ORDER BY t.valid_from_datetime_utc, t.id ")
+        rows_tariffs = cursor.fetchall()
+        cursor.execute(" SELECT tariff_id, start_time_of_day, end_time_of_day, price, peak_type "
+                       " FROM tbl_tariffs_timeofuses "
+                       " ORDER BY tariff_id, start_time_of_day ")
+        rows_timeofuse_tariffs = cursor.fetchall()
+    finally:
+        if cursor:
+            cursor.close()
+        if cnx:
+            cnx.close()
+
+    rates = dict()
+    for row in rows_timeofuse_tariffs:
+        rates.setdefault(row[0], list()).append((row[1].total_seconds(), row[2].total_seconds(), row[3], row[4]))
+    timezone_offset = _get_timezone_offset()
+    tariffs = dict()
+    for row in rows_tariffs:
+        if row[2] not in rates:
+            continue
+        tariffs.setdefault((row[0], row[1]), list()).append(
+            {'valid_from_datetime_utc': row[3],
+             'valid_through_datetime_utc': row[4],
+             'hours': _build_hours(row[3], rates[row[2]], timezone_offset)})
+    return tariffs
+
+
+def _get_tariffs():
+    now = time.monotonic()
+    try:
+        versions = collectionquery.get_versions(TABLE_NAMES)
+    except Exception as e:
+        print('tariffindex: ' + str(e))
+        versions = None
+    with _lock:
+        tariffs = _index['tariffs']
+        if tariffs is not None:
+            if versions is not None and versions == _index['versions']:
+                return tariffs
+            # without change counters the index is reloaded as often as the counters are refreshed
+            if versions is None and now - _index['loaded_at'] < config.collection_version_refresh_seconds:
+                return tariffs
+    tariffs = _load()
+    with _lock:
+        _index['tariffs'] = tariffs
+        _index['versions'] = versions
+        _index['loaded_at'] = now
+        _memo.clear()
+    return tariffs
+
+
+def _compute(tariffs, item, cost_center_id, energy_category_id, start_datetime_utc, end_datetime_utc):
+    timezone_offset = timedelta(minutes=_get_timezone_offset())
+    step = timedelta(minutes=config.minutes_to_count)
+    result = dict()
+    for tariff in tariffs.get((cost_center_id, energy_category_id), ()):
+        valid_from_datetime_utc = tariff['valid_from_datetime_utc']
+        valid_through_datetime_utc = tariff['valid_through_datetime_utc']
+        if valid_through_datetime_utc < start_datetime_utc or valid_from_datetime_utc > end_datetime_utc:
+            continue
+        # the first slot of the tariff in the window
+        current_datetime_utc = valid_from_datetime_utc
+        if start_datetime_utc > current_datetime_utc:
+            current_datetime_utc += -((valid_from_datetime_utc - start_datetime_utc) // step) * step
+        hours = tariff['hours']
+        while current_datetime_utc < valid_through_datetime_utc and current_datetime_utc <= end_datetime_utc:
+            rate = hours[(current_datetime_utc + timezone_offset).hour]
+            if rate is not None:
+                result[current_datetime_utc] = rate[item]
+            current_datetime_utc += step
+    return result
+
+
+def _get(item, cost_center_id, energy_category_id, start_datetime_utc, end_datetime_utc):
+    if cost_center_id is None:
+        return dict()
+    start_datetime_utc = start_datetime_utc.replace(tzinfo=None)
+    end_datetime_utc = end_datetime_utc.replace(tzinfo=None)
+    try:
+        tariffs = _get_tariffs()
+    except Exception as e:
+        print(str(e))
+        return dict()
+    key = (item, cost_center_id, energy_category_id, start_datetime_utc, end_datetime_utc)
+    with _lock:
+        if _index['tariffs'] is tariffs and key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+    result = _compute(tariffs, item, cost_center_id, energy_category_id, start_datetime_utc, end_datetime_utc)
+    with _lock:
+        if _index['tariffs'] is tariffs:
+            _memo[key] = result
+            if len(_memo) > _MEMO_SIZE:
+                _memo.popitem(last=False)
+    return result
+
+
+def get_prices(cost_center_id, energy_category_id, start_datetime_utc, end_datetime_utc):
+    """
+    Get the time of use prices of a cost center and energy category
+    :param cost_center_id: the cost center id, or None
+    :param energy_category_id: the energy category id
+    :param start_datetime_utc: start datetime in utc
+    :param end_datetime_utc: end datetime in utc, included
+    :return: dict of start_datetime_utc of the time slots and price, must not be modified
+    """
+    return _get(0, cost_center_id, energy_category_id, start_datetime_utc, end_datetime_utc)
+
+
+def get_peak_types(cost_center_id, energy_category_id, start_datetime_utc, end_datetime_utc):
+    """
+    Get the time of use peak types of a cost center and energy category
+    :param cost_center_id: the cost center id, or None
+    :param energy_category_id: the energy category id
+    :param start_datetime_utc: start datetime in utc
+    :param end_datetime_utc: end datetime in utc, included
+    :return: dict of start_datetime_utc of the time slots and peak type, must not be modified
+    """
+    return _get(1, cost_center_id, energy_category_id, start_datetime_utc, end_datetime_utc)
+
@@ -0,0 +1,209 @@
+import threading
+import time
+import mysql.connector
+import config
+from core import collectionquery
+
+
+########################################################################################################################
+# Topology index of the space tree and its entity attachments
+# The space tree is loaded once per API worker and kept as compact arrays: space ids in pre-order, so that the subtree
+# of a space is the contiguous range order[position[space_id]:end[position[space_id]]], together with parent and
+# children lookups.
+# Entity attachments (meters, equipments, stores, tenants, ...) are loaded per entity type on first use, and subtree
+# lookups return them without database round trips, so the batch and tracking reports only query the entities
+# themselves. These reports list the entities ordered by id.
+# The index is invalidated by the space admin endpoints in core/space.py, which also increment the change counter of
+# tbl_spaces, see collectionquery, so that the other API workers reload it within
+# config.collection_version_refresh_seconds. It is reloaded at the latest after config.topology_cache_ttl_in_seconds.
+########################################################################################################################
+ENTITY_TABLES = {
+    'meter': ('tbl_spaces_meters', 'meter_id'),
+    'offline_meter': ('tbl_spaces_offline_meters', 'offline_meter_id'),
+    'virtual_meter': ('tbl_spaces_virtual_meters', 'virtual_meter_id'),
+    'equipment': ('tbl_spaces_equipments', 'equipment_id'),
+    'combined_equipment': ('tbl_spaces_combined_equipments', 'combined_equipment_id'),
+    'shopfloor': ('tbl_spaces_shopfloors', 'shopfloor_id'),
+    'store': ('tbl_spaces_stores', 'store_id'),
+    'tenant': ('tbl_spaces_tenants', 'tenant_id'),
+}
+
+_lock = threading.Lock()
+_index = {'tree': None, 'entities': dict(), 'loaded_at': None, 'version': None, 'generation': 0}
+
+
+def _query_rows(query):
+    cnx = None
+    cursor = None
+    try:
+        cnx = mysql.connector.connect(**config.myems_system_db)
+        cursor = cnx.cursor()
+        cursor.execute(query)
+        return cursor.fetchall()
+    finally:
+        if cursor:
+            cursor.close()
+        if cnx:
+            cnx.close()
+
+
+def _build_tree(rows_spaces):
+    name = dict()
+    parent = dict()
+    children = dict()
+    for row in rows_spaces:
+        name[row[0]] = row[1]
+        parent[row[0]] = row[2]
+        children.setdefault(row[0], list())
+    roots = list()
+    for row in rows_spaces:
+        if row[2] is not None and row[2] in children:
+            children[row[2]].append(row[0])
+        else:
+            roots.append(row[0])
+
+    # pre-order walk without recursion, end[i] is the position after the last descendant of order[i]
+    order = list()
+    end = list()
+    position = dict()
+    stack = [(space_id, False) for space_id in reversed(roots)]
+    while len(stack) > 0:
+        space_id, is_visited = stack.pop()
+        if is_visited:
+            end[position[space_id]] = len(order)
+            continue
+        position[space_id] = len(order)
+        order.append(space_id)
+        end.append(None)
+        stack.append((space_id, True))
+        for child_id in reversed(children[space_id]):
+            stack.append((child_id, False))
+
+    return {'order': order, 'end': end, 'position': position,
+            'name': name, 'parent': parent, 'children': children}
+
+
+def _get_version():
+    versions = collectionquery.get_versions(['tbl_spaces'])
+    return versions['tbl_spaces'][0] if versions is not None else None
+
+
+def _get_tree(space_id=None):
+    """
+    Get the space tree, reload it if it is expired or the space is unknown, for example just created by another worker
+    """
+    version = _get_version()
+    now = time.monotonic()
+    with _lock:
+        tree = _index['tree']
+        if tree is not None and now - _index['loaded_at'] < config.topology_cache_ttl_in_seconds and \
+                (version is None or _index['version'] == version) and \
+                (space_id is None or space_id in tree['position']):
+            return tree
+        generation = _index['generation']
+    tree = _build_tree(_query_rows(" SELECT id, name, parent_space_id "
+                                   " FROM tbl_spaces "
+                                   " ORDER BY id "))
+    with _lock:
+        # do not keep a tree loaded before the last invalidation
+        if _index['generation'] == generation:
+            _index['tree'] = tree
+            _index['entities'] = dict()
+            _index['loaded_at'] = now
+            _index['version'] = version
+    return tree
+
+
+def _get_entities(entity_type, space_id=None):
+    tree = _get_tree(space_id)
+    with _lock:
+        entities = _index['entities'].get(entity_type)
+        if entities is not None:
+            return tree, entities
+    table, column = ENTITY_TABLES[entity_type]
+    entities = dict()
+    for row in _query_rows(" SELECT space_id, " + column + " FROM " + table + " ORDER BY " + column):
+        entities.setdefault(row[0], list()).append(row[1])
+    with _lock:
+        if _index['tree'] is tree:
+            _index['entities'][entity_type] = entities
+    return tree, entities
+
+
+def invalidate():
+    """
+    Drop the index of all API workers, must be called after the space hierarchy or entity attachments change
+    """
+    with _lock:
+        _index['tree'] = None
+        _index['entities'] = dict()
+        _index['loaded_at'] = None
+        _index['generation'] += 1
+    cnx = None
+    cursor = None
+    try:
+        cnx = mysql.connector.connect(**config.myems_system_db)
+        cursor = cnx.cursor()
+        collectionquery.touch(cursor, 'tbl_spaces')
+        cnx.commit()
+    except Exception as e:
+        print('topology: ' + str(e))
+    finally:
+        if cursor:
+            cursor.close()
+        if cnx:
+            cnx.close()
+
+
+def get_subtree_space_ids(space_id):
+    """
+    Get the ids of the space and all its descendants
+    :param space_id: the space id
+    :return: list of space ids in pre-order starting with the space itself, empty if the space does not exist
+    """
+    tree = _get_tree(space_id)
+    i = tree['position'].get(space_id)
+    if i is None:
+        return list()
+    return tree['order'][i:tree['end'][i]]
+
+
+def get_tree(space_id):
+    """
+    Get the space and all its descendants as nested dicts of id, name and children, children is omitted for leaves
+    :param space_id: the space id
+    :return: the nested dicts, None if the space does not exist
+    """
+    tree = _get_tree(space_id)
+    if space_id not in tree['position']:
+        return None
+    result = {'id': space_id, 'name': tree['name'][space_id]}
+    stack = [result]
+    while len(stack) > 0:
+        node = stack.pop()
+        child_ids = tree['children'][node['id']]
+        if len(child_ids) > 0:
+            node['children'] = [{'id': child_id, 'name': tree['name'][child_id]} for child_id in child_ids]
+            stack.extend(node['children'])
+    return result
+
+
+def get_subtree_entities(space_id, entity_type, is_recursive=True):
+    """
+    Get the entities attached to the space and all its descendants, with the name of the space they are attached to
+    An entity attached to several spaces of the subtree is returned once, with the first of them in pre-order.
+    :param space_id: the space id
+    :param entity_type: one of the ENTITY_TABLES keys, for example 'meter'
+    :param is_recursive: False to get the entities attached to the space itself only
+    :return: dict of entity id and space name, ordered by entity id, empty if the space does not exist
+    """
+    tree, entities = _get_entities(entity_type, space_id)
+    i = tree['position'].get(space_id)
+    if i is None:
+        return dict()
+    result = dict()
+    for subtree_space_id in tree['order'][i:tree['end'][i] if is_recursive else i + 1]:
+        for entity_id in entities.get(subtree_space_id, ()):
+            if entity_id not in result:
+                result[entity_id] = tree['name'][subtree_space_id]
+    return dict(sorted(result.items()))
@@ -0,0 +1,724 @@
+import uuid
+import falcon
+import mysql.connector
+import simplejson as json
+from core import collectionquery, topology
+from core.useractivity import user_logger, admin_control, access_control, api_key_control
+import config
+
+
+########################################################################################################################
+# Bulk import and export of a space subtree with its points, meters and equipments
+# A topology document has four lists, spaces, points, meters and equipments. Every item has a key, which is unique in
+# its list, and references other items either by key (a string) or existing rows by id (an integer):
+#   spaces:     parent, and the attached meters, points and equipments
+#   meters:     master_meter, and the points of the meter
+#   equipments: meters, as list of {"meter": reference, "is_output": bool}
+# The import validates the whole document in memory, checks names and referenced ids with a few batched queries, and
+# writes it with multi-row inserts in a single transaction, so either the whole subtree is created or nothing.
+# The export streams the same document for a space and its descendants, with the uuids of the exported rows as keys,
+# so that it can be imported again after renaming, or on another instance sharing the same master data.
+########################################################################################################################
+# rows per multi-row statement and ids per IN list, keeps statements below max_allowed_packet
+_BATCH_SIZE = 1000
+
+OBJECT_TYPES = ('ENERGY_VALUE', 'ANALOG_VALUE', 'DIGITAL_VALUE', 'TEXT_VALUE')
+
+
+def _bad_request(description):
+    return falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST', description=description)
+
+
+def _chunks(items):
+    items = list(items)
+    for i in range(0, len(items), _BATCH_SIZE):
+        yield items[i:i + _BATCH_SIZE]
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def _get_name(item, description):
+    if not isinstance(item.get('name'), str) or len(str.strip(item['name'])) == 0:
+        raise _bad_request(description)
+    return str.strip(item['name'])
+
+
+def _get_text(item, name):
+    if item.get(name) is not None and len(str(item[name])) > 0:
+        return str.strip(str(item[name]))
+    return None
+
+
+def _get_bool(item, name, description):
+    if not isinstance(item.get(name), bool):
+        raise _bad_request(description)
+    return item[name]
+
+
+def _get_number(item, name, description, is_required=True):
+    if item.get(name) is None and not is_required:
+        return None
+    if not _is_number(item.get(name)):
+        raise _bad_request(description)
+    return item[name]
+
+
+def _get_id(item, name, description, is_required=True):
+    if item.get(name) is None and not is_required:
+        return None
+    if not _is_id(item.get(name)):
+        raise _bad_request(description)
+    return item[name]
+
+
+def _get_ref(value, keys, description):
+    """
+    Check a reference, a key of the document or the id of an existing row
+    """
+    if isinstance(value, str) and value in keys:
+        return value
+    if _is_id(value):
+        return value
+    raise _bad_request(description)
+
+
+def _get_refs(item, name, keys, description):
+    values = item.get(name)
+    if values is None:
+        return list()
+    if not isinstance(values, list):
+        raise _bad_request(description)
+    result = list()
+    for value in values:
+        ref = _get_ref(value, keys, description)
+        if ref not in result:
+            result.append(ref)
+    return result
+
+
+def _get_items(document, name, description):
+    items = document.get(name)
+    if items is None:
+        return list()
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise _bad_request(description)
+    keys = set()
+    for item in items:
+        if not isinstance(item.get('key'), str) or len(item['key']) == 0 or item['key'] in keys:
+            raise _bad_request(description)
+        keys.add(item['key'])
+    return items
+
+
+def _get_depths(items, parent_name, description):
+    """
+    Get the depth of every item in the tree of references to other items of the same list, and reject cycles
+    :return: dict of key and depth, 0 for items without a parent in the document
+    """
+    parent = {item['key']: item[parent_name] for item in items}
+    depths = dict()
+    for key in parent:
+        path = list()
+        current = key
+        while isinstance(current, str) and current not in depths:
+            if current in path:
+                raise _bad_request(description)
+            path.append(current)
+            current = parent[current]
+        depth = depths[current] + 1 if isinstance(current, str) else 0
+        for path_key in reversed(path):
+            depths[path_key] = depth
+            depth += 1
+    return depths
+
+
+def _parse_document(document):
+    """
+    Validate a topology document in memory
+    :return: dict of the lists of normalized points, meters, equipments and spaces
+    """
+    if not isinstance(document, dict):
+        raise _bad_request('API.INVALID_TOPOLOGY_DOCUMENT')
+    raw_points = _get_items(document, 'points', 'API.INVALID_POINT_KEY')
+    raw_meters = _get_items(document, 'meters', 'API.INVALID_METER_KEY')
+    raw_equipments = _get_items(document, 'equipments', 'API.INVALID_EQUIPMENT_KEY')
+    raw_spaces = _get_items(document, 'spaces', 'API.INVALID_SPACE_KEY')
+    point_keys = {item['key'] for item in raw_points}
+    meter_keys = {item['key'] for item in raw_meters}
+    equipment_keys = {item['key'] for item in raw_equipments}
+    space_keys = {item['key'] for item in raw_spaces}
+
+    points = list()
+    point_names = set()
+    for item in raw_points:
+        point = {'key': item['key'],
+                 'name': _get_name(item, 'API.INVALID_POINT_NAME'),
+                 'data_source_id': _get_id(item, 'data_source_id', 'API.INVALID_DATA_SOURCE_ID')}
+        if (point['data_source_id'], point['name']) in point_names:
+            raise _bad_request('API.POINT_NAME_IS_ALREADY_IN_USE')
+        point_names.add((point['data_source_id'], point['name']))
+        if not isinstance(item.get('object_type'), str) or str.strip(item['object_type']) not in OBJECT_TYPES:
+            raise _bad_request('API.INVALID_OBJECT_TYPE')
+        point['object_type'] = str.strip(item['object_type'])
+        if not isinstance(item.get('units'), str) or len(str.strip(item['units'])) == 0:
+            raise _bad_request('API.INVALID_UNITS')
+        point['units'] = str.strip(item['units'])
+        point['high_limit'] = _get_number(item, 'high_limit', 'API.INVALID_HIGH_LIMIT_VALUE')
+        point['low_limit'] = _get_number(item, 'low_limit', 'API.INVALID_LOW_LIMIT_VALUE')
+        point['higher_limit'] = _get_number(item, 'higher_limit', 'API.INVALID_HIGHER_LIMIT_VALUE', False)
+        point['lower_limit'] = _get_number(item, 'lower_limit', 'API.INVALID_LOWER_LIMIT_VALUE', False)
+        point['ratio'] = _get_number(item, 'ratio', 'API.INVALID_RATIO_VALUE')
+        point['offset_constant'] = _get_number(item, 'offset_constant', 'API.INVALID_OFFSET_CONSTANT_VALUE')
+        point['is_trend'] = _get_bool(item, 'is_trend', 'API.INVALID_IS_TREND_VALUE')
+        point['is_virtual'] = _get_bool(item, 'is_virtual', 'API.INVALID_IS_VIRTUAL_VALUE')
+        if point['is_virtual'] and point['object_type'] == 'DIGITAL_VALUE':
+            raise _bad_request('API.VIRTUAL_POINT_CAN_NOT_BE_DIGITAL_VALUE')
+        if point['is_virtual'] and point['object_type'] == 'TEXT_VALUE':
+            raise _bad_request('API.VIRTUAL_POINT_CAN_NOT_BE_TEXT_VALUE')
+        if not isinstance(item.get('address'), str) or len(str.strip(item['address'])) == 0:
+            raise _bad_request('API.INVALID_ADDRESS')
+        point['address'] = str.strip(item['address'])
+        point['description'] = _get_text(item, 'description')
+        point['faults'] = _get_text(item, 'faults')
+        point['definitions'] = _get_text(item, 'definitions')
+        points.append(point)
+
+    meters = list()
+    for item in raw_meters:
+        meter = {'key': item['key'],
+                 'name': _get_name(item, 'API.INVALID_METER_NAME'),
+                 'energy_category_id': _get_id(item, 'energy_category_id', 'API.INVALID_ENERGY_CATEGORY_ID'),
+                 'is_counted': _get_bool(item, 'is_counted', 'API.INVALID_IS_COUNTED_VALUE'),
+                 'hourly_low_limit': _get_number(item, 'hourly_low_limit', 'API.INVALID_HOURLY_LOW_LIMIT_VALUE'),
+                 'hourly_high_limit': _get_number(item, 'hourly_high_limit', 'API.INVALID_HOURLY_HIGH_LIMIT_VALUE'),
+                 'cost_center_id': _get_id(item, 'cost_center_id', 'API.INVALID_COST_CENTER_ID'),
+                 'energy_item_id': _get_id(item, 'energy_item_id', 'API.INVALID_ENERGY_ITEM_ID', False),
+                 'master_meter': None,
+                 'description': _get_text(item, 'description'),
+                 'points': _get_refs(item, 'points', point_keys, 'API.INVALID_POINT_ID')}
+        if item.get('master_meter') is not None:
+            meter['master_meter'] = _get_ref(item['master_meter'], meter_keys, 'API.INVALID_MASTER_METER_ID')
+            if meter['master_meter'] == meter['key']:
+                raise _bad_request('API.INVALID_MASTER_METER_ID')
+        meters.append(meter)
+    _get_depths(meters, 'master_meter', 'API.INVALID_MASTER_METER_ID')
+    meter_dict = {meter['key']: meter for meter in meters}
+    for meter in meters:
+        if isinstance(meter['master_meter'], str) and \
+                meter_dict[meter['master_meter']]['energy_category_id'] != meter['energy_category_id']:
+            raise _bad_request('API.MASTER_METER_DOES_NOT_BELONG_TO_SAME_ENERGY_CATEGORY')
+
+    equipments = list()
+    for item in raw_equipments:
+        equipment = {'key': item['key'],
+                     'name': _get_name(item, 'API.INVALID_EQUIPMENT_NAME'),
+                     'is_input_counted': _get_bool(item, 'is_input_counted', 'API.INVALID_IS_INPUT_COUNTED_VALUE'),
+                     'is_output_counted': _get_bool(item, 'is_output_counted',
+                                                    'API.INVALID_IS_OUTPUT_COUNTED_VALUE'),
+                     'cost_center_id': _get_id(item, 'cost_center_id', 'API.INVALID_COST_CENTER_ID'),
+                     'svg_id': _get_id(item, 'svg_id', 'API.INVALID_SVG_ID', False),
+                     'camera_url': _get_text(item, 'camera_url'),
+                     'description': _get_text(item, 'description'),
+                     'meters': list()}
+        if item.get('meters') is not None and not isinstance(item['meters'], list):
+            raise _bad_request('API.INVALID_METER_ID')
+        meter_refs = set()
+        for equipment_meter in item.get('meters') or ():
+            if not isinstance(equipment_meter, dict):
+                raise _bad_request('API.INVALID_METER_ID')
+            ref = _get_ref(equipment_meter.get('meter'), meter_keys, 'API.INVALID_METER_ID')
+            if ref in meter_refs:
+                raise _bad_request('API.EQUIPMENT_METER_RELATION_EXISTS')
+            meter_refs.add(ref)
+            equipment['meters'].append((ref, _get_bool(equipment_meter, 'is_output', 'API.INVALID_IS_OUTPUT_VALUE')))
+        equipments.append(equipment)
+
+    spaces = list()
+    for item in raw_spaces:
+        space = {'key': item['key'],
+                 'name': _get_name(item, 'API.INVALID_SPACE_NAME'),
+                 'parent': None,
+                 'area': _get_number(item, 'area', 'API.INVALID_AREA_VALUE'),
+                 'number_of_occupants': _get_number(item, 'number_of_occupants', 'API.INVALID_NUMBER_OF_OCCUPANTS'),
+                 'timezone_id': _get_id(item, 'timezone_id', 'API.INVALID_TIMEZONE_ID'),
+                 'is_input_counted': _get_bool(item, 'is_input_counted', 'API.INVALID_IS_INPUT_COUNTED_VALUE'),
+                 'is_output_counted': _get_bool(item, 'is_output_counted', 'API.INVALID_IS_OUTPUT_COUNTED_VALUE'),
+                 'contact_id': _get_id(item, 'contact_id', 'API.INVALID_CONTACT_ID', False),
+                 'cost_center_id': _get_id(item, 'cost_center_id', 'API.INVALID_COST_CENTER_ID', False),
+                 'latitude': _get_number(item, 'latitude', 'API.INVALID_LATITUDE_VALUE', False),
+                 'longitude': _get_number(item, 'longitude', 'API.INVALID_LONGITUDE_VALUE', False),
+                 'description': _get_text(item, 'description'),
+                 'meters': _get_refs(item, 'meters', meter_keys, 'API.INVALID_METER_ID'),
+                 'points': _get_refs(item, 'points', point_keys, 'API.INVALID_POINT_ID'),
+                 'equipments': _get_refs(item, 'equipments', equipment_keys, 'API.INVALID_EQUIPMENT_ID')}
+        if item.get('parent') is not None:
+            space['parent'] = _get_ref(item['parent'], space_keys, 'API.INVALID_PARENT_SPACE_ID')
+            if space['parent'] == space['key']:
+                raise _bad_request('API.INVALID_PARENT_SPACE_ID')
+        if space['area'] <= 0.0:
+            raise _bad_request('API.INVALID_AREA_VALUE')
+        if space['number_of_occupants'] <= 0:
+            raise _bad_request('API.INVALID_NUMBER_OF_OCCUPANTS')
+        if space['latitude'] is not None and not -90.0 <= space['latitude'] <= 90.0:
+            raise _bad_request('API.INVALID_LATITUDE_VALUE')
+        if space['longitude'] is not None and not -180.0 <= space['longitude'] <= 180.0:
+            raise _bad_request('API.INVALID_LONGITUDE_VALUE')
+        spaces.append(space)
+    depths = _get_depths(spaces, 'parent', 'API.INVALID_PARENT_SPACE_ID')
+
+    for items, description in ((meters, 'API.METER_NAME_IS_ALREADY_IN_USE'),
+                               (equipments, 'API.EQUIPMENT_NAME_IS_ALREADY_IN_USE'),
+                               (spaces, 'API.SPACE_NAME_IS_ALREADY_IN_USE')):
+        if len({item['name'] for item in items}) != len(items):
+            raise _bad_request(description)
+
+    return {'points': points, 'meters': meters, 'equipments': equipments, 'spaces': spaces, 'depths': depths}
+
+
+def _query_by_ids(cursor, query, ids):
+    """
+    Query rows by ids in batches
+    :param query: query with the placeholder {ids} for the IN list, the first column must be the id
+    :return: dict of id and row
+    """
+    result = dict()
+    for chunk in _chunks(set(ids)):
+        cursor.execute(query.format(ids=', '.join(['%s'] * len(chunk))), tuple(chunk))
+        for row in cursor.fetchall():
+            result[row[0]] = row
+    return result
+
+
+def _check_ids(cursor, table, ids, description):
+    ids = {value for value in ids if _is_id(value)}
+    if len(ids) > 0 and len(_query_by_ids(cursor, " SELECT id FROM " + table + " WHERE id IN ({ids}) ", ids)) != len(ids):
+        raise _bad_request(description)
+
+
+def _check_names(cursor, table, names, description):
+    for chunk in _chunks(names):
+        cursor.execute(" SELECT name "
+                       " FROM " + table +
+                       " WHERE name IN (" + ', '.join(['%s'] * len(chunk)) + ") ", tuple(chunk))
+        if len(cursor.fetchall()) > 0:
+            raise _bad_request(description)
+
+
+def _check_references(cursor, document):
+    """
+    Check the names of the new rows and the referenced existing rows against the database
+    """
+    points = document['points']
+    meters = document['meters']
+    equipments = document['equipments']
+    spaces = document['spaces']
+
+    point_names = {(point['data_source_id'], point['name']) for point in points}
+    for chunk in _chunks({point['name'] for point in points}):
+        cursor.execute(" SELECT data_source_id, name "
+                       " FROM tbl_points "
+                       " WHERE name IN (" + ', '.join(['%s'] * len(chunk)) + ") ", tuple(chunk))
+        if any((row[0], row[1]) in point_names for row in cursor.fetchall()):
+            raise _bad_request('API.POINT_NAME_IS_ALREADY_IN_USE')
+    _check_names(cursor, 'tbl_meters', [meter['name'] for meter in meters], 'API.METER_NAME_IS_ALREADY_IN_USE')
+    _check_names(cursor, 'tbl_equipments', [equipment['name'] for equipment in equipments],
+                 'API.EQUIPMENT_NAME_IS_ALREADY_IN_USE')
+    _check_names(cursor, 'tbl_spaces', [space['name'] for space in spaces], 'API.SPACE_NAME_IS_ALREADY_IN_USE')
+
+    _check_ids(cursor, 'tbl_data_sources', [point['data_source_id'] for point in points], 'API.DATA_SOURCE_NOT_FOUND')
+    _check_ids(cursor, 'tbl_energy_categories', [meter['energy_category_id'] for meter in meters],
+               'API.ENERGY_CATEGORY_NOT_FOUND')
+    _check_ids(cursor, 'tbl_cost_centers',
+               [item['cost_center_id'] for item in meters + equipments + spaces], 'API.COST_CENTER_NOT_FOUND')
+    _check_ids(cursor, 'tbl_svgs', [equipment['svg_id'] for equipment in equipments], 'API.SVG_NOT_FOUND')
+    _check_ids(cursor, 'tbl_timezones', [space['timezone_id'] for space in spaces], 'API.TIMEZONE_NOT_FOUND')
+    _check_ids(cursor, 'tbl_contacts', [space['contact_id'] for space in spaces], 'API.CONTACT_NOT_FOUND')
+    _check_ids(cursor, 'tbl_points', [ref for item in meters + spaces for ref in item['points']],
+               'API.POINT_NOT_FOUND')
+    _check_ids(cursor, 'tbl_equipments', [ref for space in spaces for ref in space['equipments']],
+               'API.EQUIPMENT_NOT_FOUND')
+    _check_ids(cursor, 'tbl_spaces', [space['parent'] for space in spaces], 'API.PARENT_SPACE_NOT_FOUND')
+    _check_ids(cursor, 'tbl_meters',
+               [ref for space in spaces for ref in space['meters']] +
+               [ref for equipment in equipments for ref, _ in equipment['meters']],
+               'API.METER_NOT_FOUND')
+
+    energy_items = _query_by_ids(cursor,
+                                 " SELECT id, energy_category_id FROM tbl_energy_items WHERE id IN ({ids}) ",
+                                 [meter['energy_item_id'] for meter in meters if meter['energy_item_id'] is not None])
+    master_meters = _query_by_ids(cursor,
+                                  " SELECT id, energy_category_id FROM tbl_meters WHERE id IN ({ids}) ",
+                                  [meter['master_meter'] for meter in meters if _is_id(meter['master_meter'])])
+    for meter in meters:
+        if meter['energy_item_id'] is not None:
+            if meter['energy_item_id'] not in energy_items:
+                raise _bad_request('API.ENERGY_ITEM_NOT_FOUND')
+            if energy_items[meter['energy_item_id']][1] != meter['energy_category_id']:
+                raise _bad_request('API.ENERGY_ITEM_DOES_NOT_BELONG_TO_ENERGY_CATEGORY')
+        if _is_id(meter['master_meter']):
+            if meter['master_meter'] not in master_meters:
+                raise _bad_request('API.MASTER_METER_NOT_FOUND')
+            if master_meters[meter['master_meter']][1] != meter['energy_category_id']:
+                raise _bad_request('API.MASTER_METER_DOES_NOT_BELONG_TO_SAME_ENERGY_CATEGORY')
+
+
+def _insert_many(cursor, query, rows):
+    # executemany sends an INSERT ... VALUES statement as one multi-row insert
+    for chunk in _chunks(rows):
+        cursor.executemany(query, chunk)
+
+
+def _insert_by_uuid(cursor, table, query, items, get_row):
+    """
+    Insert items with new uuids and look up the new ids
+    :return: dict of key and new id
+    """
+    uuids = {item['key']: str(uuid.uuid4()) for item in items}
+    _insert_many(cursor, query, [get_row(item, uuids[item['key']]) for item in items])
+    ids = dict()
+    for chunk in _chunks(uuids.values()):
+        cursor.execute(" SELECT uuid, id "
+                       " FROM " + table +
+                       " WHERE uuid IN (" + ', '.join(['%s'] * len(chunk)) + ") ", tuple(chunk))
+        ids.update(cursor.fetchall())
+    return {key: ids[value] for key, value in uuids.items()}
+
+
+def _write_document(cursor, document):
+    """
+    Insert the rows of a validated document
+    :return: dict of the lists and the new ids by key
+    """
+    points = document['points']
+    meters = document['meters']
+    equipments = document['equipments']
+    spaces = document['spaces']
+
+    _insert_many(cursor,
+                 " INSERT INTO tbl_points (name, data_source_id, object_type, units, "
+                 "                         high_limit, low_limit, higher_limit, lower_limit, ratio, "
+                 "                         offset_constant, is_trend, is_virtual, address, description, faults, "
+                 "                         definitions) "
+                 " VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) ",
+                 [(point['name'], point['data_source_id'], point['object_type'], point['units'],
+                   point['high_limit'], point['low_limit'], point['higher_limit'], point['lower_limit'],
+                   point['ratio'], point['offset_constant'], point['is_trend'], point['is_virtual'],
+                   point['address'], point['description'], point['faults'], point['definitions'])
+                  for point in points])
+    # points have no uuid, the name is unique per data source
+    point_keys = {(point['data_source_id'], point['name']): point['key'] for point in points}
+    point_ids = dict()
+    for chunk in _chunks({point['name'] for point in points}):
+        cursor.execute(" SELECT id, data_source_id, name "
+                       " FROM tbl_points "
+                       " WHERE name IN (" + ', '.join(['%s'] * len(chunk)) + ") ", tuple(chunk))
+        for row in cursor.fetchall():
+            if (row[1], row[2]) in point_keys:
+                point_ids[point_keys[(row[1], row[2])]] = row[0]
+
+    meter_ids = _insert_by_uuid(cursor, 'tbl_meters',
+                                " INSERT INTO tbl_meters "
+                                "    (name, uuid, energy_category_id, is_counted, hourly_low_limit, "
+                                "     hourly_high_limit, cost_center_id, energy_item_id, master_meter_id, "
+                                "     description) "
+                                " VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s) ",
+                                meters,
+                                lambda meter, meter_uuid: (meter['name'], meter_uuid, meter['energy_category_id'],
+                                                           meter['is_counted'], meter['hourly_low_limit'],
+                                                           meter['hourly_high_limit'], meter['cost_center_id'],
+                                                           meter['energy_item_id'],
+                                                           meter['master_meter']
+                                                           if _is_id(meter['master_meter']) else None,
+                                                           meter['description']))
+    master_meter_rows = [(meter_ids[meter['master_meter']], meter_ids[meter['key']])
+                         for meter in meters if isinstance(meter['master_meter'], str)]
+    for chunk in _chunks(master_meter_rows):
+        cursor.executemany(" UPDATE tbl_meters SET master_meter_id = %s WHERE id = %s ", chunk)
+    _insert_many(cursor,
+                 " INSERT INTO tbl_meters_points (meter_id, point_id) "
+                 " VALUES (%s, %s) ",
+                 [(meter_ids[meter['key']], point_ids.get(ref, ref)) for meter in meters for ref in meter['points']])
+
+    equipment_ids = _insert_by_uuid(cursor, 'tbl_equipments',
+                                    " INSERT INTO tbl_equipments "
+                                    "    (name, uuid, is_input_counted, is_output_counted, "
+                                    "     cost_center_id, svg_id, camera_url, description) "
+                                    " VALUES (%s, %s, %s, %s, %s, %s, %s, %s) ",
+                                    equipments,
+                                    lambda equipment, equipment_uuid: (equipment['name'], equipment_uuid,
+                                                                       equipment['is_input_counted'],
+                                                                       equipment['is_output_counted'],
+                                                                       equipment['cost_center_id'],
+                                                                       equipment['svg_id'],
+                                                                       equipment['camera_url'],
+                                                                       equipment['description']))
+    _insert_many(cursor,
+                 " INSERT INTO tbl_equipments_meters (equipment_id, meter_id, is_output) "
+                 " VALUES (%s, %s, %s) ",
+                 [(equipment_ids[equipment['key']], meter_ids.get(ref, ref), is_output)
+                  for equipment in equipments for ref, is_output in equipment['meters']])
+
+    # one multi-row insert per level of the space tree, the parents of each level are known
+    space_ids = dict()
+    depths = document['depths']
+    levels = dict()
+    for space in spaces:
+        levels.setdefault(depths[space['key']], list()).append(space)
+    for depth in sorted(levels.keys()):
+        space_ids.update(_insert_by_uuid(cursor, 'tbl_spaces',
+                                         " INSERT INTO tbl_spaces "
+                                         "    (name, uuid, parent_space_id, area, number_of_occupants, timezone_id, "
+                                         "     is_input_counted, is_output_counted, contact_id, cost_center_id, "
+                                         "     latitude, longitude, description) "
+                                         " VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) ",
+                                         levels[depth],
+                                         lambda space, space_uuid: (space['name'], space_uuid,
+                                                                    space_ids.get(space['parent'], space['parent']),
+                                                                    space['area'], space['number_of_occupants'],
+                                                                    space['timezone_id'], space['is_input_counted'],
+                                                                    space['is_output_counted'], space['contact_id'],
+                                                                    space['cost_center_id'], space['latitude'],
+                                                                    space['longitude'], space['description'])))
+    for table, column, name, entity_ids in (('tbl_spaces_meters', 'meter_id', 'meters', meter_ids),
+                                            ('tbl_spaces_points', 'point_id', 'points', point_ids),
+                                            ('tbl_spaces_equipments', 'equipment_id', 'equipments', equipment_ids)):
+        _insert_many(cursor,
+                     " INSERT INTO " + table + " (space_id, " + column + ") "
+                     " VALUES (%s, %s) ",
+                     [(space_ids[space['key']], entity_ids.get(ref, ref)) for space in spaces for ref in space[name]])
+
+    return {'spaces': space_ids, 'points': point_ids, 'meters': meter_ids, 'equipments': equipment_ids}
+
+
+class TopologyImport:
+    def __init__(self):
+        """Initializes Class"""
+        pass
+
+    @staticmethod
+    def on_options(req, resp):
+        resp.status = falcon.HTTP_200
+
+    @staticmethod
+    @user_logger
+    def on_post(req, resp):
+        """Handles POST requests"""
+        admin_control(req)
+        try:
+            raw_json = req.stream.read().decode('utf-8')
+            new_values = json.loads(raw_json)
+        except Exception as ex:
+            print(str(ex))
+            raise falcon.HTTPError(status=falcon.HTTP_400,
+                                   title='API.BAD_REQUEST',
+                                   description='API.FAILED_TO_READ_REQUEST_STREAM')
+
+        document = _parse_document(new_values)
+
+        cnx = mysql.connector.connect(**config.myems_system_db)
+        cursor = cnx.cursor()
+        try:
+            _check_references(cursor, document)
+            result = _write_document(cursor, document)
+            collectionquery.touch(cursor, 'tbl_points', 'tbl_meters')
+            cnx.commit()
+        except mysql.connector.Error as ex:
+            print('topologybulk: ' + str(ex))
+            cnx.rollback()
+            raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                                   description='API.FAILED_TO_IMPORT_TOPOLOGY')
+        except falcon.HTTPError:
+            cnx.rollback()
+            raise
+        finally:
+            cursor.close()
+            cnx.close()
+        topology.invalidate()
+
+        resp.status = falcon.HTTP_201
+        resp.text = json.dumps(result)
+
+
+########################################################################################################################
+# Export
+########################################################################################################################
+def _fetch_by_ids(cursor, query, ids):
+    """
+    Fetch rows by ids in batches, in the order of the batches
+    :param query: query with the placeholder {ids} for the IN list
+    """
+    for chunk in _chunks(ids):
+        cursor.execute(query.format(ids=', '.join(['%s'] * len(chunk))), tuple(chunk))
+        yield from cursor.fetchall()
+
+
+def _dump_list(name, items, is_first):
+    """
+    Serialize a list of the document item by item
+    """
+    yield (('{' if is_first else ', ') + json.dumps(name) + ': [').encode('utf-8')
+    is_first_item = True
+    for item in items:
+        yield (('' if is_first_item else ', ') + json.dumps(item)).encode('utf-8')
+        is_first_item = False
+    yield b']'
+
+
+def _generate_document(space_id):
+    """
+    Generate the topology document of the space and its descendants
+    :param space_id: the space id
+    :return: generator of bytes
+    """
+    space_ids = topology.get_subtree_space_ids(space_id)
+    cnx = mysql.connector.connect(**config.myems_system_db)
+    cursor = cnx.cursor()
+    try:
+        space_keys = dict()
+        space_rows = list()
+        for row in _fetch_by_ids(cursor,
+                                 " SELECT id, name, uuid, parent_space_id, area, number_of_occupants, timezone_id, "
+                                 "        is_input_counted, is_output_counted, contact_id, cost_center_id, "
+                                 "        latitude, longitude, description "
+                                 " FROM tbl_spaces "
+                                 " WHERE id IN ({ids}) ", space_ids):
+            space_keys[row[0]] = row[2]
+            space_rows.append(row)
+        attachments = {name: dict() for name in ('meters', 'points', 'equipments')}
+        for table, column, name in (('tbl_spaces_meters', 'meter_id', 'meters'),
+                                    ('tbl_spaces_points', 'point_id', 'points'),
+                                    ('tbl_spaces_equipments', 'equipment_id', 'equipments')):
+            for row in _fetch_by_ids(cursor,
+                                     " SELECT space_id, " + column +
+                                     " FROM " + table +
+                                     " WHERE space_id IN ({ids}) "
+                                     " ORDER BY id ", space_ids):
+                attachments[name].setdefault(row[0], list()).append(row[1])
+
+        equipment_ids = list(dict.fromkeys(equipment_id for space_id in space_ids
+                                           for equipment_id in attachments['equipments'].get(space_id, ())))
+        equipment_rows = list(_fetch_by_ids(cursor,
+                                            " SELECT id, name, uuid, is_input_counted, is_output_counted, "
+                                            "        cost_center_id, svg_id, camera_url, description "
+                                            " FROM tbl_equipments "
+                                            " WHERE id IN ({ids}) "
+                                            " ORDER BY id ", equipment_ids))
+        equipment_keys = {row[0]: row[2] for row in equipment_rows}
+        equipment_meters = dict()
+        for row in _fetch_by_ids(cursor,
+                                 " SELECT equipment_id, meter_id, is_output "
+                                 " FROM tbl_equipments_meters "
+                                 " WHERE equipment_id IN ({ids}) "
+                                 " ORDER BY id ", equipment_ids):
+            equipment_meters.setdefault(row[0], list()).append((row[1], bool(row[2])))
+
+        # the meters of the spaces and of their equipments
+        meter_ids = list(dict.fromkeys([meter_id for space_id in space_ids
+                                        for meter_id in attachments['meters'].get(space_id, ())] +
+                                       [meter_id for equipment_id in equipment_ids
+                                        for meter_id, _ in equipment_meters.get(equipment_id, ())]))
+        meter_rows = list(_fetch_by_ids(cursor,
+                                        " SELECT id, name, uuid, energy_category_id, is_counted, hourly_low_limit, "
+                                        "        hourly_high_limit, cost_center_id, energy_item_id, master_meter_id, "
+                                        "        description "
+                                        " FROM tbl_meters "
+                                        " WHERE id IN ({ids}) "
+                                        " ORDER BY id ", meter_ids))
+        meter_keys = {row[0]: row[2] for row in meter_rows}
+        meter_points = dict()
+        for row in _fetch_by_ids(cursor,
+                                 " SELECT meter_id, point_id "
+                                 " FROM tbl_meters_points "
+                                 " WHERE meter_id IN ({ids}) "
+                                 " ORDER BY id ", meter_ids):
+            meter_points.setdefault(row[0], list()).append(row[1])
+
+        # the points of the spaces and of their meters
+        point_ids = list(dict.fromkeys([point_id for space_id in space_ids
+                                        for point_id in attachments['points'].get(space_id, ())] +
+                                       [point_id for meter_id in meter_ids
+                                        for point_id in meter_points.get(meter_id, ())]))
+        # points have no uuid, their keys are made of the ids
+        point_keys = {point_id: 'point-' + str(point_id) for point_id in point_ids}
+
+        def point_items():
+            for row in _fetch_by_ids(cursor,
+                                     " SELECT id, name, data_source_id, object_type, units, "
+                                     "        high_limit, low_limit, higher_limit, lower_limit, ratio, "
+                                     "        offset_constant, is_trend, is_virtual, address, description, faults, "
+                                     "        definitions "
+                                     " FROM tbl_points "
+                                     " WHERE id IN ({ids}) "
+                                     " ORDER BY id ", point_ids):
+                yield {'key': point_keys[row[0]], 'name': row[1], 'data_source_id': row[2], 'object_type': row[3],
+                       'units': row[4], 'high_limit': row[5], 'low_limit': row[6], 'higher_limit': row[7],
+                       'lower_limit': row[8], 'ratio': row[9], 'offset_constant': row[10],
+                       'is_trend': bool(row[11]), 'is_virtual': bool(row[12]), 'address': row[13],
+                       'description': row[14], 'faults': row[15], 'definitions': row[16]}
+
+        meter_items = ({'key': row[2], 'name': row[1], 'energy_category_id': row[3], 'is_counted': bool(row[4]),
+                        'hourly_low_limit': row[5], 'hourly_high_limit': row[6], 'cost_center_id': row[7],
+                        'energy_item_id': row[8], 'master_meter': meter_keys.get(row[9], row[9]),
+                        'description': row[10],
+                        'points': [point_keys[point_id] for point_id in meter_points.get(row[0], ())]}
+                       for row in meter_rows)
+        equipment_items = ({'key': row[2], 'name': row[1], 'is_input_counted': bool(row[3]),
+                            'is_output_counted': bool(row[4]), 'cost_center_id': row[5], 'svg_id': row[6],
+                            'camera_url': row[7], 'description': row[8],
+                            'meters': [{'meter': meter_keys[meter_id], 'is_output': is_output}
+                                       for meter_id, is_output in equipment_meters.get(row[0], ())]}
+                           for row in equipment_rows)
+        space_items = ({'key': row[2], 'name': row[1], 'parent': space_keys.get(row[3], row[3]),
+                        'area': row[4], 'number_of_occupants': row[5], 'timezone_id': row[6],
+                        'is_input_counted': bool(row[7]), 'is_output_counted': bool(row[8]),
+                        'contact_id': row[9], 'cost_center_id': row[10], 'latitude': row[11],
+                        'longitude': row[12], 'description': row[13],
+                        'meters': [meter_keys[meter_id] for meter_id in attachments['meters'].get(row[0], ())],
+                        'points': [point_keys[point_id] for point_id in attachments['points'].get(row[0], ())],
+                        'equipments': [equipment_keys[equipment_id]
+                                       for equipment_id in attachments['equipments'].get(row[0], ())]}
+                       for row in space_rows)
+
+        yield from _dump_list('spaces', space_items, True)
+        yield from _dump_list('points', point_items(), False)
+        yield from _dump_list('meters', meter_items, False)
+        yield from _dump_list('equipments', equipment_items, False)
+        yield b'}'
+    finally:
+        cursor.close()
+        cnx.close()
+
+
+class TopologyExport:
+    def __init__(self):
+        """Initializes Class"""
+        pass
+
+    @staticmethod
+    def on_options(req, resp, id_):
+        resp.status = falcon.HTTP_200
+
+    @staticmethod
+    def on_get(req, resp, id_):
+        if 'API-KEY' not in req.headers or \
+                not isinstance(req.headers['API-KEY'], str) or \
+                len(str.strip(req.headers['API-KEY'])) == 0:
+            access_control(req)
+        else:
+            api_key_control(req)
+        if not id_.isdigit() or int(id_) <= 0:
+            raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                                   description='API.INVALID_SPACE_ID')
+        if len(topology.get_subtree_space_ids(int(id_))) == 0:
+            raise falcon.HTTPError(status=falcon.HTTP_404, title='API.NOT_FOUND',
+                                   description='API.SPACE_NOT_FOUND')
+
+        resp.content_type = falcon.MEDIA_JSON
+        # the connection is opened when the server starts reading the stream
+        resp.stream = _generate_document(int(id_))
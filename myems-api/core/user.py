@@ -7,7 +7,8 @@ import random
 import falcon
 import mysql.connector
 import simplejson as json
-from core.useractivity import user_logger, write_log, admin_control
+from core.useractivity import user_logger, write_log, admin_control, invalidate_session, invalidate_user_sessions, \
+    get_auth_cache_statistics
 import config
 
 
@@ -306,6 +307,7 @@ class UserItem:
 
         cursor_user_db.execute(" DELETE FROM tbl_sessions WHERE user_uuid = %s ", (user_uuid,))
         cnx_user_db.commit()
+        invalidate_user_sessions(user_uuid)
 
         cursor_user_db.execute(" DELETE FROM tbl_logs WHERE user_uuid = %s ", (user_uuid,))
         cnx_user_db.commit()
@@ -684,6 +686,7 @@ class UserLogout:
         cnx.commit()
         cursor.close()
         cnx.close()
+        invalidate_session(user_uuid, token)
         if rowcount is None or rowcount == 0:
             raise falcon.HTTPError(status=falcon.HTTP_404, title='API.NOT_FOUND',
                                    description='API.USER_SESSION_NOT_FOUND')
@@ -810,6 +813,7 @@ class ChangePassword:
         utc_expires = datetime.utcnow() + timedelta(seconds=1000 * 60 * 60 * 8)
         cursor.execute(update_session, (utc_expires, user_uuid, token, ))
         cnx.commit()
+        invalidate_user_sessions(user_uuid)
 
         cursor.close()
         cnx.close()
@@ -913,7 +917,7 @@ class ResetPassword:
         cursor.execute(update_user, (salt, hashed_password, user_name,))
         cnx.commit()
 
-        query = (" SELECT id "
+        query = (" SELECT id, uuid "
                  " FROM tbl_users "
                  " WHERE name = %s ")
         cursor.execute(query, (user_name,))
@@ -924,6 +928,7 @@ class ResetPassword:
             raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST', description='API.INVALID_USERNAME')
 
         user_id = row[0]
+        invalidate_user_sessions(row[1])
 
         # Refresh administrator session
         update_session = (" UPDATE tbl_sessions "
@@ -1122,6 +1127,22 @@ class ForgotPassword:
                   resource_id=result['id'], request_body=None)
 
 
+class AuthCacheStatistics:
+    def __init__(self):
+        """Initializes AuthCacheStatistics"""
+        pass
+
+    @staticmethod
+    def on_options(req, resp):
+        resp.status = falcon.HTTP_200
+
+    @staticmethod
+    def on_get(req, resp):
+        """Handles GET requests, the statistics are those of the API worker serving the request"""
+        admin_control(req)
+        resp.text = json.dumps(get_auth_cache_statistics())
+
+
 class EmailMessageCollection:
     def __init__(self):
         """"Initializes EmailMessageCollection"""
@@ -1,4 +1,7 @@
+import collections
 import os
+import threading
+import time
 import uuid
 from datetime import datetime
 from functools import wraps
@@ -7,6 +10,143 @@ import mysql.connector
 import simplejson as json
 from gunicorn.http.body import Body
 import config
+from core import collectionquery
+
+
+########################################################################################################################
+# In-memory cache of validated user sessions and API keys for this worker process
+# Entries are kept for at most config.auth_cache_ttl_in_seconds and are also bounded by their own expiration time.
+# Logout, user deletion, password change and API key update/deletion must call the invalidate functions below.
+# The invalidate functions also increment a change counter, see collectionquery, one per user for sessions and one
+# for tbl_api_keys, and every entry keeps the counter read before it was validated. An entry whose counter is older is
+# discarded on hit, so an invalidation in one worker reaches the other workers within
+# config.collection_version_refresh_seconds, and a logout only discards the sessions of the same user.
+########################################################################################################################
+_auth_cache_lock = threading.Lock()
+_session_cache = collections.OrderedDict()
+_api_key_cache = collections.OrderedDict()
+_auth_cache_statistics = {'session_hits': 0, 'session_misses': 0, 'api_key_hits': 0, 'api_key_misses': 0}
+
+
+def _get_session_counter_name(user_uuid):
+    return 'tbl_sessions:' + user_uuid
+
+
+def _get_auth_generation(table_name):
+    """
+    Get the change counter of credentials, shared by the API workers
+    :param table_name: the counter name of the sessions of a user, see _get_session_counter_name, or 'tbl_api_keys'
+    :return: the counter, or None if the cache is disabled or the counters are unavailable
+    """
+    if config.auth_cache_ttl_in_seconds <= 0 or config.auth_cache_max_size <= 0:
+        return None
+    versions = collectionquery.get_versions([table_name])
+    if versions is None:
+        return None
+    return versions[table_name][0]
+
+
+def _touch_auth_generation(table_name):
+    """
+    Increment the change counter of credentials, so that the other API workers discard their entries
+    :param table_name: the counter name of the sessions of a user, see _get_session_counter_name, or 'tbl_api_keys'
+    """
+    cnx = None
+    cursor = None
+    try:
+        cnx = mysql.connector.connect(**config.myems_system_db)
+        cursor = cnx.cursor()
+        collectionquery.touch(cursor, table_name)
+        cnx.commit()
+    except Exception as e:
+        print('useractivity: ' + str(e))
+    finally:
+        if cursor:
+            cursor.close()
+        if cnx:
+            cnx.close()
+
+
+def _auth_cache_get(cache, key, statistics_prefix, generation):
+    """
+    Get the expiration datetime of a cached credential, or None if not cached or stale
+    :param cache: the ordered dict used as LRU cache
+    :param key: the cache key
+    :param statistics_prefix: 'session' or 'api_key'
+    :param generation: the current change counter of the credentials, see _get_auth_generation
+    :return: expiration datetime in UTC or None
+    """
+    with _auth_cache_lock:
+        entry = cache.get(key)
+        if entry is not None:
+            utc_expires, cached_at, cached_generation = entry
+            if time.monotonic() - cached_at <= config.auth_cache_ttl_in_seconds and \
+                    datetime.utcnow() <= utc_expires and \
+                    (generation is None or cached_generation == generation):
+                cache.move_to_end(key)
+                _auth_cache_statistics[statistics_prefix + '_hits'] += 1
+                return utc_expires
+            del cache[key]
+        _auth_cache_statistics[statistics_prefix + '_misses'] += 1
+        return None
+
+
+def _auth_cache_put(cache, key, utc_expires, generation):
+    if config.auth_cache_ttl_in_seconds <= 0 or config.auth_cache_max_size <= 0:
+        return
+    with _auth_cache_lock:
+        cache[key] = (utc_expires, time.monotonic(), generation)
+        cache.move_to_end(key)
+        while len(cache) > config.auth_cache_max_size:
+            cache.popitem(last=False)
+
+
+def invalidate_session(user_uuid, token):
+    """
+    Remove a user session from the cache of all workers, for example on logout
+    :param user_uuid: user uuid
+    :param token: session token
+    """
+    with _auth_cache_lock:
+        _session_cache.pop((user_uuid, token), None)
+    _touch_auth_generation(_get_session_counter_name(user_uuid))
+
+
+def invalidate_user_sessions(user_uuid):
+    """
+    Remove all cached sessions of a user from the cache of all workers, for example on user deletion or password change
+    :param user_uuid: user uuid
+    """
+    with _auth_cache_lock:
+        for key in [key for key in _session_cache.keys() if key[0] == user_uuid]:
+            del _session_cache[key]
+    _touch_auth_generation(_get_session_counter_name(user_uuid))
+
+
+def invalidate_api_key(token=None):
+    """
+    Remove an API key from the cache of all workers, or all API keys if token is None
+    :param token: API key token
+    """
+    with _auth_cache_lock:
+        if token is None:
+            _api_key_cache.clear()
+        else:
+            _api_key_cache.pop(token, None)
+    _touch_auth_generation('tbl_api_keys')
+
+
+def get_auth_cache_statistics():
+    """
+    Get hit and miss counters and current size of the authentication cache
+    :return: dict of statistics
+    """
+    with _auth_cache_lock:
+        result = dict(_auth_cache_statistics)
+        result['session_size'] = len(_session_cache)
+        result['api_key_size'] = len(_api_key_cache)
+    result['pid'] = os.getpid()
+    return result
 
 
 def admin_control(req):
@@ -86,6 +226,11 @@ def access_control(req):
                                description='API.INVALID_TOKEN')
     ordinary_token = str.strip(req.headers['TOKEN'])
 
+    # the counter is read before the session, so that an invalidation during the check discards the new entry
+    generation = _get_auth_generation(_get_session_counter_name(user_uuid))
+    if _auth_cache_get(_session_cache, (user_uuid, ordinary_token), 'session', generation) is not None:
+        return
+
     # Check user session
     cnx = mysql.connector.connect(**config.myems_user_db)
     cursor = cnx.cursor()
@@ -121,6 +266,7 @@ def access_control(req):
         raise falcon.HTTPError(status=falcon.HTTP_400,
                                title='API.BAD_REQUEST',
                                description='API.INVALID_PRIVILEGE')
+    _auth_cache_put(_session_cache, (user_uuid, ordinary_token), utc_expires, generation)
 
 
 def api_key_control(req):
@@ -130,6 +276,10 @@ def api_key_control(req):
         :return: HTTPError if invalid else None
     """
     api_key = str.strip(req.headers['API-KEY'])
+    generation = _get_auth_generation('tbl_api_keys')
+    if _auth_cache_get(_api_key_cache, api_key, 'api_key', generation) is not None:
+        return
+
     cnx = mysql.connector.connect(**config.myems_user_db)
     cursor = cnx.cursor()
     query = (" SELECT expires_datetime_utc "
@@ -149,6 +299,7 @@ def api_key_control(req):
             raise falcon.HTTPError(status=falcon.HTTP_400,
                                    title='API.BAD_REQUEST',
                                    description='API.API_KEY_HAS_EXPIRED')
+        _auth_cache_put(_api_key_cache, api_key, expires_datetime_utc, generation)
 
 
 def write_log(user_uuid, request_method, resource_type, resource_id, request_body):
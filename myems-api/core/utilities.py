@@ -1,10 +1,9 @@
-import collections
 import statistics
 from datetime import datetime, timedelta
 from decimal import Decimal
-import mysql.connector
 import config
 import gettext
+from core import profiling, tariffindex
 
 
 ########################################################################################################################
@@ -15,6 +14,7 @@ import gettext
 # period_type: use one of the period types, 'hourly', 'daily', 'weekly', 'monthly' and 'yearly'
 # Note: this procedure doesn't work with multiple energy categories
 ########################################################################################################################
+@profiling.timed('aggregation')
 def aggregate_hourly_data_by_period(rows_hourly, start_datetime_utc, end_datetime_utc, period_type):
     # todo: validate parameters
     if start_datetime_utc is None or \
@@ -145,209 +145,21 @@ def aggregate_hourly_data_by_period(rows_hourly, start_datetime_utc, end_datetim
 
 ########################################################################################################################
 # Get tariffs by energy category
+# Returns: dict of start_datetime_utc of the time slots from start_datetime_utc to end_datetime_utc and price,
+#          shared by the requests with the same parameters, must not be modified. See core/tariffindex.py
 ########################################################################################################################
 def get_energy_category_tariffs(cost_center_id, energy_category_id, start_datetime_utc, end_datetime_utc):
-    # todo: validate parameters
-    if cost_center_id is None:
-        return dict()
-
-    start_datetime_utc = start_datetime_utc.replace(tzinfo=None)
-    end_datetime_utc = end_datetime_utc.replace(tzinfo=None)
-
-    # get timezone offset in minutes, this value will be returned to client
-    timezone_offset = int(config.utc_offset[1:3]) * 60 + int(config.utc_offset[4:6])
-    if config.utc_offset[0] == '-':
-        timezone_offset = -timezone_offset
-
-    tariff_dict = collections.OrderedDict()
-
-    cnx = None
-    cursor = None
-    try:
-        cnx = mysql.connector.connect(**config.myems_system_db)
-        cursor = cnx.cursor()
-        query_tariffs = (" SELECT t.id, t.valid_from_datetime_utc, t.valid_through_datetime_utc "
-                         " FROM tbl_tariffs t, tbl_cost_centers_tariffs cct "
-                         " WHERE t.energy_category_id = %s AND "
-                         "       t.id = cct.tariff_id AND "
-                         "       cct.cost_center_id = %s AND "
-                         "       t.valid_through_datetime_utc >= %s AND "
-                         "       t.valid_from_datetime_utc <= %s "
-                         " ORDER BY t.valid_from_datetime_utc ")
-        cursor.execute(query_tariffs, (energy_category_id, cost_center_id, start_datetime_utc, end_datetime_utc,))
-        rows_tariffs = cursor.fetchall()
-    except Exception as e:
-        print(str(e))
-        if cnx:
-            cnx.close()
-        if cursor:
-            cursor.close()
-        return dict()
-
-    if rows_tariffs is None or len(rows_tariffs) == 0:
-        if cursor:
-            cursor.close()
-        if cnx:
-            cnx.close()
-        return dict()
-
-    for row in rows_tariffs:
-        tariff_dict[row[0]] = {'valid_from_datetime_utc': row[1],
-                               'valid_through_datetime_utc': row[2],
-                               'rates': list()}
-
-    try:
-        query_timeofuse_tariffs = (" SELECT tariff_id, start_time_of_day, end_time_of_day, price "
-                                   " FROM tbl_tariffs_timeofuses "
-                                   " WHERE tariff_id IN ( " + ', '.join(map(str, tariff_dict.keys())) + ")"
-                                   " ORDER BY tariff_id, start_time_of_day ")
-        cursor.execute(query_timeofuse_tariffs, )
-        rows_timeofuse_tariffs = cursor.fetchall()
-    except Exception as e:
-        print(str(e))
-        if cnx:
-            cnx.close()
-        if cursor:
-            cursor.close()
-        return dict()
-
-    if cursor:
-        cursor.close()
-    if cnx:
-        cnx.close()
-
-    if rows_timeofuse_tariffs is None or len(rows_timeofuse_tariffs) == 0:
-        return dict()
-
-    for row in rows_timeofuse_tariffs:
-        tariff_dict[row[0]]['rates'].append({'start_time_of_day': row[1],
-                                             'end_time_of_day': row[2],
-                                             'price': row[3]})
-
-    result = dict()
-    for tariff_id, tariff_value in tariff_dict.items():
-        current_datetime_utc = tariff_value['valid_from_datetime_utc']
-        while current_datetime_utc < tariff_value['valid_through_datetime_utc']:
-            for rate in tariff_value['rates']:
-                current_datetime_local = current_datetime_utc + timedelta(minutes=timezone_offset)
-                seconds_since_midnight = (current_datetime_local -
-                                          current_datetime_local.replace(hour=0,
-                                                                         second=0,
-                                                                         microsecond=0,
-                                                                         tzinfo=None)).total_seconds()
-                if rate['start_time_of_day'].total_seconds() <= \
-                        seconds_since_midnight < rate['end_time_of_day'].total_seconds():
-                    result[current_datetime_utc] = rate['price']
-                    break
-
-            # start from the next time slot
-            current_datetime_utc += timedelta(minutes=config.minutes_to_count)
-
-    return {k: v for k, v in result.items() if start_datetime_utc <= k <= end_datetime_utc}
+    return tariffindex.get_prices(cost_center_id, energy_category_id, start_datetime_utc, end_datetime_utc)
 
 
 ########################################################################################################################
 # Get peak types of tariff by energy category
 # peak types: toppeak, onpeak, midpeak, offpeak, deep
+# Returns: dict of start_datetime_utc of the time slots from start_datetime_utc to end_datetime_utc and peak type,
+#          shared by the requests with the same parameters, must not be modified. See core/tariffindex.py
 ########################################################################################################################
 def get_energy_category_peak_types(cost_center_id, energy_category_id, start_datetime_utc, end_datetime_utc):
-    # todo: validate parameters
-    if cost_center_id is None:
-        return dict()
-
-    start_datetime_utc = start_datetime_utc.replace(tzinfo=None)
-    end_datetime_utc = end_datetime_utc.replace(tzinfo=None)
-
-    # get timezone offset in minutes, this value will be returned to client
-    timezone_offset = int(config.utc_offset[1:3]) * 60 + int(config.utc_offset[4:6])
-    if config.utc_offset[0] == '-':
-        timezone_offset = -timezone_offset
-
-    tariff_dict = collections.OrderedDict()
-
-    cnx = None
-    cursor = None
-    try:
-        cnx = mysql.connector.connect(**config.myems_system_db)
-        cursor = cnx.cursor()
-        query_tariffs = (" SELECT t.id, t.valid_from_datetime_utc, t.valid_through_datetime_utc "
-                         " FROM tbl_tariffs t, tbl_cost_centers_tariffs cct "
-                         " WHERE t.energy_category_id = %s AND "
-                         "       t.id = cct.tariff_id AND "
-                         "       cct.cost_center_id = %s AND "
-                         "       t.valid_through_datetime_utc >= %s AND "
-                         "       t.valid_from_datetime_utc <= %s "
-                         " ORDER BY t.valid_from_datetime_utc ")
-        cursor.execute(query_tariffs, (energy_category_id, cost_center_id, start_datetime_utc, end_datetime_utc,))
-        rows_tariffs = cursor.fetchall()
-    except Exception as e:
-        print(str(e))
-        if cnx:
-            cnx.close()
-        if cursor:
-            cursor.close()
-        return dict()
-
-    if rows_tariffs is None or len(rows_tariffs) == 0:
-        if cursor:
-            cursor.close()
-        if cnx:
-            cnx.close()
-        return dict()
-
-    for row in rows_tariffs:
-        tariff_dict[row[0]] = {'valid_from_datetime_utc': row[1],
-                               'valid_through_datetime_utc': row[2],
-                               'rates': list()}
-
-    try:
-        query_timeofuse_tariffs = (" SELECT tariff_id, start_time_of_day, end_time_of_day, peak_type "
-                                   " FROM tbl_tariffs_timeofuses "
-                                   " WHERE tariff_id IN ( " + ', '.join(map(str, tariff_dict.keys())) + ")"
-                                   " ORDER BY tariff_id, start_time_of_day ")
-        cursor.execute(query_timeofuse_tariffs, )
-        rows_timeofuse_tariffs = cursor.fetchall()
-    except Exception as e:
-        print(str(e))
-        if cnx:
-            cnx.close()
-        if cursor:
-            cursor.close()
-        return dict()
-
-    if cursor:
-        cursor.close()
-    if cnx:
-        cnx.close()
-
-    if rows_timeofuse_tariffs is None or len(rows_timeofuse_tariffs) == 0:
-        return dict()
-
-    for row in rows_timeofuse_tariffs:
-        tariff_dict[row[0]]['rates'].append({'start_time_of_day': row[1],
-                                             'end_time_of_day': row[2],
-                                             'peak_type': row[3]})
-
-    result = dict()
-    for tariff_id, tariff_value in tariff_dict.items():
-        current_datetime_utc = tariff_value['valid_from_datetime_utc']
-        while current_datetime_utc < tariff_value['valid_through_datetime_utc']:
-            for rate in tariff_value['rates']:
-                current_datetime_local = current_datetime_utc + timedelta(minutes=timezone_offset)
-                seconds_since_midnight = (current_datetime_local -
-                                          current_datetime_local.replace(hour=0,
-                                                                         second=0,
-                                                                         microsecond=0,
-                                                                         tzinfo=None)).total_seconds()
-                if rate['start_time_of_day'].total_seconds() <= \
-                        seconds_since_midnight < rate['end_time_of_day'].total_seconds():
-                    result[current_datetime_utc] = rate['peak_type']
-                    break
-
-            # start from the next time slot
-            current_datetime_utc += timedelta(minutes=config.minutes_to_count)
-
-    return {k: v for k, v in result.items() if start_datetime_utc <= k <= end_datetime_utc}
+    return tariffindex.get_peak_types(cost_center_id, energy_category_id, start_datetime_utc, end_datetime_utc)
 
 
 ########################################################################################################################
@@ -359,6 +171,7 @@ def get_energy_category_peak_types(cost_center_id, energy_category_id, start_dat
 # Returns: periodically data of average and maximum
 # Note: this procedure doesn't work with multiple energy categories
 ########################################################################################################################
+@profiling.timed('aggregation')
 def averaging_hourly_data_by_period(rows_hourly, start_datetime_utc, end_datetime_utc, period_type):
     # todo: validate parameters
     if start_datetime_utc is None or \
@@ -650,6 +463,7 @@ def averaging_hourly_data_by_period(rows_hourly, start_datetime_utc, end_datetim
 # Returns: periodically data of values and statistics of mean, median, minimum, maximum, stdev and variance
 # Note: this procedure doesn't work with multiple energy categories
 ########################################################################################################################
+@profiling.timed('aggregation')
 def statistics_hourly_data_by_period(rows_hourly, start_datetime_utc, end_datetime_utc, period_type):
     # todo: validate parameters
     if start_datetime_utc is None or \
@@ -999,3 +813,17 @@ def round2(actual_value, precision):
         return result
     else:
         return "-"
+
+
+def is_excel_inline(req):
+    """
+    Check if the Excel file should be generated and embedded in the JSON report as base64 string
+    The request parameter 'excel' overrides config.is_excel_inline,
+    clients who only need the report data should use the export jobs API to download the Excel file
+    :param req: HTTP request
+    :return: True if the Excel file should be embedded else False
+    """
+    excel = req.params.get('excel')
+    if excel is not None and len(str.strip(excel)) > 0:
+        return str.lower(str.strip(excel)) in ('true', 't', 'on', 'yes', 'y')
+    return config.is_excel_inline
@@ -2,6 +2,7 @@ import falcon
 from datetime import datetime, timedelta
 import mysql.connector
 import simplejson as json
+from core import calendarindex, collectionquery
 from core.useractivity import admin_control, access_control, api_key_control
 import config
 
@@ -207,11 +208,13 @@ class WorkingCalendarItem:
         cnx.commit()
 
         cursor.execute(" DELETE FROM tbl_working_calendars WHERE id = %s ", (id_,))
+        collectionquery.touch(cursor, calendarindex.TABLE_NAME)
         cnx.commit()
 
         cursor.close()
         cnx.close()
 
+        calendarindex.invalidate()
         resp.status = falcon.HTTP_204
 
     @staticmethod
@@ -371,10 +374,12 @@ class NonWorkingDayCollection:
                       " VALUES (%s, %s, %s) ")
         cursor.execute(add_values, (working_calendar_id, date_local, description))
         new_id = cursor.lastrowid
+        collectionquery.touch(cursor, calendarindex.TABLE_NAME)
         cnx.commit()
         cursor.close()
         cnx.close()
 
+        calendarindex.invalidate()
         resp.status = falcon.HTTP_201
         resp.location = '/nonworkingday/' + str(new_id)
 
@@ -440,11 +445,13 @@ class NonWorkingDayItem:
                                    description='API.NON_WORKING_DAY_NOT_FOUND')
 
         cursor.execute(" DELETE FROM tbl_working_calendars_non_working_days WHERE id = %s ", (id_,))
+        collectionquery.touch(cursor, calendarindex.TABLE_NAME)
         cnx.commit()
 
         cursor.close()
         cnx.close()
 
+        calendarindex.invalidate()
         resp.status = falcon.HTTP_204
 
     @staticmethod
@@ -502,11 +509,13 @@ class NonWorkingDayItem:
                       " SET date_local = %s, description = %s "
                       " WHERE id = %s ")
         cursor.execute(update_row, (date_local, description, id_))
+        collectionquery.touch(cursor, calendarindex.TABLE_NAME)
         cnx.commit()
 
         cursor.close()
         cnx.close()
 
+        calendarindex.invalidate()
         resp.status = falcon.HTTP_200
 
 
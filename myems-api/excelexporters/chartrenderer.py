@@ -0,0 +1,107 @@
+import collections
+import hashlib
+import os
+import threading
+import config
+
+
+########################################################################################################################
+# Chart rendering service for excel exporters
+# Figures are rendered to in-memory PNG buffers, so concurrent exports never share a file in the working directory.
+# The renderer is started once per API worker and kept warm, and rendered images are cached by the diagram name,
+# the reporting period and a digest of the figure, so repeated exports of the same diagram skip rendering.
+# plotly is imported by the first rendering, and a worker forked from a preloaded master starts its own renderer.
+########################################################################################################################
+_render_lock = threading.Lock()
+_cache_lock = threading.Lock()
+_image_cache = collections.OrderedDict()
+_is_renderer_started = False
+
+
+def _after_fork_in_child():
+    # the renderer process and the threads holding the locks are not inherited by a forked worker
+    global _render_lock, _cache_lock, _is_renderer_started
+    _render_lock = threading.Lock()
+    _cache_lock = threading.Lock()
+    _is_renderer_started = False
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _start_renderer():
+    """
+    Start the persistent renderer, must be called with _render_lock held
+    """
+    global _is_renderer_started
+    if _is_renderer_started:
+        return
+    try:
+        import kaleido
+        # kaleido 1.x renders through a browser process which is kept running by the sync server,
+        # kaleido 0.2.x keeps its own subprocess alive after the first image
+        if hasattr(kaleido, 'start_sync_server'):
+            kaleido.start_sync_server(silence_warnings=True)
+    except Exception as ex:
+        print('chartrenderer: ' + str(ex))
+    _is_renderer_started = True
+
+
+def warm_up():
+    """
+    Start the renderer and render a tiny figure so that the first export does not pay the startup cost
+    """
+    try:
+        import plotly.graph_objects as go
+        render_png(go.Figure(data=[go.Sankey(node=dict(label=['A', 'B']),
+                                             link=dict(source=[0], target=[1], value=[1]))]),
+                   width=100, height=100)
+    except Exception as ex:
+        print('chartrenderer: ' + str(ex))
+
+
+def render_png(fig, width=None, height=None):
+    """
+    Render the figure to PNG bytes
+    :param fig: the plotly figure
+    :param width: image width in pixels or None for the default
+    :param height: image height in pixels or None for the default
+    :return: the bytes of the PNG image
+    """
+    import plotly.io as pio
+    with _render_lock:
+        _start_renderer()
+        return pio.to_image(fig, format='png', width=width, height=height)
+
+
+def render_png_cached(fig, key, width=None, height=None):
+    """
+    Render the figure to PNG bytes, or get them from the cache
+    :param fig: the plotly figure
+    :param key: tuple identifying the chart, for example (diagram name, start datetime, end datetime)
+    :param width: image width in pixels or None for the default
+    :param height: image height in pixels or None for the default
+    :return: the bytes of the PNG image
+    """
+    digest = hashlib.sha1(fig.to_json().encode('utf-8')).hexdigest()
+    cache_key = (key, digest, width, height)
+    with _cache_lock:
+        if cache_key in _image_cache:
+            _image_cache.move_to_end(cache_key)
+            return _image_cache[cache_key]
+
+    image_bytes = render_png(fig, width, height)
+
+    if config.chart_image_cache_max_size > 0:
+        with _cache_lock:
+            _image_cache[cache_key] = image_bytes
+            _image_cache.move_to_end(cache_key)
+            while len(_image_cache) > config.chart_image_cache_max_size:
+                _image_cache.popitem(last=False)
+    return image_bytes
+
+
+def clear_cache():
+    with _cache_lock:
+        _image_cache.clear()
@@ -1,8 +1,6 @@
-import base64
 from core.utilities import get_translation
-import os
+from core import profiling
 import re
-import uuid
 import openpyxl.utils.cell as format_cell
 from openpyxl import Workbook
 from openpyxl.chart import PieChart, LineChart, Reference
@@ -10,6 +8,7 @@ from openpyxl.chart.label import DataLabelList
 from openpyxl.drawing.image import Image
 from openpyxl.styles import PatternFill, Border, Side, Alignment, Font
 from core.utilities import round2
+from excelexporters import workbookwriter
 
 ########################################################################################################################
 # PROCEDURES
@@ -19,6 +18,7 @@ from core.utilities import round2
 ########################################################################################################################
 
 
+@profiling.timed('excel_export')
 def export(report,
            name,
            base_period_start_datetime_local,
@@ -37,34 +37,18 @@ def export(report,
     ####################################################################################################################
     # Step 2: Generate excel file from the report data
     ####################################################################################################################
-    filename = generate_excel(report,
-                              name,
-                              base_period_start_datetime_local,
-                              base_period_end_datetime_local,
-                              reporting_start_datetime_local,
-                              reporting_end_datetime_local,
-                              period_type,
-                              language)
+    binary_file_data = generate_excel(report,
+                                      name,
+                                      base_period_start_datetime_local,
+                                      base_period_end_datetime_local,
+                                      reporting_start_datetime_local,
+                                      reporting_end_datetime_local,
+                                      period_type,
+                                      language)
     ####################################################################################################################
     # Step 3: Encode the excel file to Base64
     ####################################################################################################################
-    binary_file_data = b''
-    try:
-        with open(filename, 'rb') as binary_file:
-            binary_file_data = binary_file.read()
-    except IOError as ex:
-        print(str(ex))
-
-    # Base64 encode the bytes
-    base64_encoded_data = base64.b64encode(binary_file_data)
-    # get the Base64 encoded data using human-readable characters.
-    base64_message = base64_encoded_data.decode('utf-8')
-    # delete the file from server
-    try:
-        os.remove(filename)
-    except NotImplementedError as ex:
-        print(str(ex))
-    return base64_message
+    return workbookwriter.encode_to_base64(binary_file_data)
 
 
 def generate_excel(report,
@@ -86,8 +70,7 @@ def generate_excel(report,
 
     # Row height
     ws.row_dimensions[1].height = 102
-    for i in range(2, 2000 + 1):
-        ws.row_dimensions[i].height = 42
+    workbookwriter.set_default_row_height(ws, 42)
 
     # Col width
     ws.column_dimensions['A'].width = 1.5
@@ -175,10 +158,7 @@ def generate_excel(report,
 
     if "reporting_period" not in report.keys() or \
             "names" not in report['reporting_period'].keys() or len(report['reporting_period']['names']) == 0:
-        filename = str(uuid.uuid4()) + '.xlsx'
-        wb.save(filename)
-
-        return filename
+        return workbookwriter.save_to_bytes(wb)
 
     ####################################################################################################################
 
@@ -673,16 +653,12 @@ def generate_excel(report,
         file_name = (re.sub(r'[^A-Z]', '', ws.title))+'_'
         parameters_ws = wb.create_sheet(file_name + _('Parameters'))
 
-        parameters_timestamps_data_max_len = \
-            get_parameters_timestamps_lists_max_len(list(parameters_data['timestamps']))
-
         # Row height
         parameters_ws.row_dimensions[1].height = 102
         for i in range(2, 7 + 1):
             parameters_ws.row_dimensions[i].height = 42
 
-        for i in range(8, parameters_timestamps_data_max_len + 10):
-            parameters_ws.row_dimensions[i].height = 60
+        workbookwriter.set_default_row_height(parameters_ws, 60)
 
         # Col width
         parameters_ws.column_dimensions['A'].width = 1.5
@@ -820,10 +796,7 @@ def generate_excel(report,
 
         current_sheet_parameters_row_number += 1
     ####################################################################################################################
-    filename = str(uuid.uuid4()) + '.xlsx'
-    wb.save(filename)
-
-    return filename
+    return workbookwriter.save_to_bytes(wb)
 
 
 def group_by_category(category_list):
@@ -835,15 +808,6 @@ def group_by_category(category_list):
     return category_dict
 
 
-def get_parameters_timestamps_lists_max_len(parameters_timestamps_lists):
-    max_len = 0
-    for i, value in enumerate(list(parameters_timestamps_lists)):
-        if len(value) > max_len:
-            max_len = len(value)
-
-    return max_len
-
-
 def timestamps_data_all_equal_0(lists):
     for i, value in enumerate(list(lists)):
         if len(value) > 0:
@@ -1,13 +1,12 @@
-import base64
 from core.utilities import get_translation
-import os
-import uuid
+from core import profiling
+from io import BytesIO
 from openpyxl import Workbook
 from openpyxl.drawing.image import Image
 from openpyxl.styles import PatternFill, Border, Side, Alignment, Font
 from core.utilities import round2
 from decimal import Decimal
-import plotly.graph_objects as go
+from excelexporters import chartrenderer, workbookwriter
 
 
 ####################################################################################################################
@@ -16,6 +15,7 @@ import plotly.graph_objects as go
 # Step 2: Generate excelexporters file
 # Step 3: Encode the excelexporters file to Base64
 ####################################################################################################################
+@profiling.timed('excel_export')
 def export(result, name, reporting_start_datetime_local, reporting_end_datetime_local, language):
     ####################################################################################################################
     # Step 1: Validate the report data
@@ -26,31 +26,15 @@ def export(result, name, reporting_start_datetime_local, reporting_end_datetime_
     ####################################################################################################################
     # Step 2: Generate excel file from the report data
     ####################################################################################################################
-    filename = generate_excel(result,
-                              name,
-                              reporting_start_datetime_local,
-                              reporting_end_datetime_local,
-                              language)
+    binary_file_data = generate_excel(result,
+                                      name,
+                                      reporting_start_datetime_local,
+                                      reporting_end_datetime_local,
+                                      language)
     ####################################################################################################################
     # Step 3: Encode the excel file to Base64
     ####################################################################################################################
-    binary_file_data = b''
-    try:
-        with open(filename, 'rb') as binary_file:
-            binary_file_data = binary_file.read()
-    except IOError as ex:
-        print(str(ex))
-
-    # Base64 encode the bytes
-    base64_encoded_data = base64.b64encode(binary_file_data)
-    # get the Base64 encoded data using human-readable characters.
-    base64_message = base64_encoded_data.decode('utf-8')
-    # delete the file from server
-    try:
-        os.remove(filename)
-    except NotImplementedError as ex:
-        print(str(ex))
-    return base64_message
+    return workbookwriter.encode_to_base64(binary_file_data)
 
 
 def generate_excel(report, name, reporting_start_datetime_local, reporting_end_datetime_local, language):
@@ -199,6 +183,8 @@ def generate_excel(report, name, reporting_start_datetime_local, reporting_end_d
 
         current_row_number += 1
 
+    # plotly is only imported by the exports with the diagram
+    import plotly.graph_objects as go
     fig = go.Figure(data=[go.Sankey(
         valueformat=".0f",
         valuesuffix="TWh",
@@ -209,19 +195,16 @@ def generate_excel(report, name, reporting_start_datetime_local, reporting_end_d
     )])
 
     fig.update_layout(title_text=name, font_size=10)
-    
-    # Save image file
-    fig.write_image("sankey.png")  
+
+    # Render image to memory, the image is cached by diagram and reporting period
+    image_bytes = chartrenderer.render_png_cached(fig, (name,
+                                                        reporting_start_datetime_local,
+                                                        reporting_end_datetime_local))
 
     # Insert image
-    img = Image("sankey.png")
+    img = Image(BytesIO(image_bytes))
     ws.add_image(img, 'B' + str(current_row_number))
 
     current_row_number += 1
 
-    filename = str(uuid.uuid4()) + '.xlsx'
-    wb.save(filename)
-
-    # Delete image file
-    os.remove("sankey.png")
-    return filename
+    return workbookwriter.save_to_bytes(wb)
@@ -1,14 +1,13 @@
-import base64
 from core.utilities import get_translation
-import os
+from core import profiling
 import re
-import uuid
 import openpyxl.utils.cell as format_cell
 from openpyxl import Workbook
 from openpyxl.chart import LineChart, Reference
 from openpyxl.drawing.image import Image
 from openpyxl.styles import PatternFill, Border, Side, Alignment, Font
 from core.utilities import round2
+from excelexporters import workbookwriter
 
 
 ########################################################################################################################
@@ -17,6 +16,7 @@ from core.utilities import round2
 # Step 2: Generate excel file from the report data
 # Step 3: Encode the excel file to Base64
 ########################################################################################################################
+@profiling.timed('excel_export')
 def export(report,
            name,
            base_period_start_datetime_local,
@@ -34,34 +34,18 @@ def export(report,
     ####################################################################################################################
     # Step 2: Generate excel file from the report data
     ####################################################################################################################
-    filename = generate_excel(report,
-                              name,
-                              base_period_start_datetime_local,
-                              base_period_end_datetime_local,
-                              reporting_start_datetime_local,
-                              reporting_end_datetime_local,
-                              period_type,
-                              language)
+    binary_file_data = generate_excel(report,
+                                      name,
+                                      base_period_start_datetime_local,
+                                      base_period_end_datetime_local,
+                                      reporting_start_datetime_local,
+                                      reporting_end_datetime_local,
+                                      period_type,
+                                      language)
     ####################################################################################################################
     # Step 3: Encode the excel file to Base64
     ####################################################################################################################
-    binary_file_data = b''
-    try:
-        with open(filename, 'rb') as binary_file:
-            binary_file_data = binary_file.read()
-    except IOError as ex:
-        print(str(ex))
-
-    # Base64 encode the bytes
-    base64_encoded_data = base64.b64encode(binary_file_data)
-    # get the Base64 encoded data using human-readable characters.
-    base64_message = base64_encoded_data.decode('utf-8')
-    # delete the file from server
-    try:
-        os.remove(filename)
-    except NotImplementedError as ex:
-        print(str(ex))
-    return base64_message
+    return workbookwriter.encode_to_base64(binary_file_data)
 
 
 def generate_excel(report,
@@ -83,8 +67,7 @@ def generate_excel(report,
 
     # Row height
     ws.row_dimensions[1].height = 102
-    for i in range(2, 2000 + 1):
-        ws.row_dimensions[i].height = 42
+    workbookwriter.set_default_row_height(ws, 42)
 
     # Col width
     ws.column_dimensions['A'].width = 1.5
@@ -174,10 +157,7 @@ def generate_excel(report,
     if "reporting_period" not in report.keys() or \
             "values_saving" not in report['reporting_period'].keys() or \
             len(report['reporting_period']['values_saving']) == 0:
-        filename = str(uuid.uuid4()) + '.xlsx'
-        wb.save(filename)
-
-        return filename
+        return workbookwriter.save_to_bytes(wb)
     ####################################################################################################################
     # First: Saving
     # 7: title
@@ -565,16 +545,12 @@ def generate_excel(report,
         file_name = (re.sub(r'[^A-Z]', '', ws.title))+'_'
         parameters_ws = wb.create_sheet(file_name + _('Parameters'))
 
-        parameters_timestamps_data_max_len = \
-            get_parameters_timestamps_lists_max_len(list(parameters_data['timestamps']))
-
         # Row height
         parameters_ws.row_dimensions[1].height = 102
         for i in range(2, 7 + 1):
             parameters_ws.row_dimensions[i].height = 42
 
-        for i in range(8, parameters_timestamps_data_max_len + 10):
-            parameters_ws.row_dimensions[i].height = 60
+        workbookwriter.set_default_row_height(parameters_ws, 60)
 
         # Col width
         parameters_ws.column_dimensions['A'].width = 1.5
@@ -645,47 +621,13 @@ def generate_excel(report,
         # Optimized insert parameter data
         ################################################################################################################
 
-        timestamps_list = parameters_data['timestamps']
-        values_list = parameters_data['values']
-
-        timestamps_data_temp_save_start_row = parameters_timestamps_data_max_len + 10
-
-        values_data_temp_save_start_row = parameters_timestamps_data_max_len * 2 + 10 + 1
-
-        parameters_ws["A" + str(timestamps_data_temp_save_start_row)] = ""
-        for i in range(parameters_timestamps_data_max_len):
-            temp_list = []
-            for j in range(len(timestamps_list)):
-                try:
-                    temp_list.append(timestamps_list[j][i])
-                except IndexError:
-                    temp_list.append("")
-            parameters_ws.append(temp_list)
-
-        parameters_ws["A" + str(values_data_temp_save_start_row)] = ""
-        for i in range(parameters_timestamps_data_max_len):
-            temp_list = []
-            for j in range(len(values_list)):
-                try:
-                    temp_list.append(values_list[j][i])
-                except IndexError:
-                    temp_list.append("")
-            parameters_ws.append(temp_list)
-
-        parameter_current_col_number = 1
-
-        for i in range(len(timestamps_list)):
-            col = format_cell.get_column_letter(parameter_current_col_number)
-            parameters_ws.move_range(
-                "{}{}:{}{}".format(col, timestamps_data_temp_save_start_row + 1, col,
-                                   timestamps_data_temp_save_start_row + parameters_timestamps_data_max_len),
-                (- timestamps_data_temp_save_start_row + (parameters_ws_current_row_number - 1)), (i * 2) + 1)
-            parameters_ws.move_range(
-                "{}{}:{}{}".format(col, values_data_temp_save_start_row + 1, col,
-                                   values_data_temp_save_start_row + parameters_timestamps_data_max_len),
-                (- values_data_temp_save_start_row + (parameters_ws_current_row_number - 1)), (i * 2) + 2)
-
-            parameter_current_col_number += 1
+        # the timestamps and values of the i-th parameter are written to the columns 3 * i + 2 and 3 * i + 3
+        for i in range(parameters_names_len):
+            table_current_row_number = parameters_ws_current_row_number
+            for timestamp, value in zip(parameters_data['timestamps'][i], parameters_data['values'][i]):
+                parameters_ws.cell(row=table_current_row_number, column=3 * i + 2, value=timestamp)
+                parameters_ws.cell(row=table_current_row_number, column=3 * i + 3, value=value)
+                table_current_row_number += 1
 
         ################################################################################################################
         # parameters chart and parameters table
@@ -728,10 +670,7 @@ def generate_excel(report,
 
         current_sheet_parameters_row_number += 1
 
-    filename = str(uuid.uuid4()) + '.xlsx'
-    wb.save(filename)
-
-    return filename
+    return workbookwriter.save_to_bytes(wb)
 
 
 def timestamps_data_all_equal_0(lists):
@@ -742,15 +681,6 @@ def timestamps_data_all_equal_0(lists):
     return True
 
 
-def get_parameters_timestamps_lists_max_len(parameters_timestamps_lists):
-    max_len = 0
-    for i, value in enumerate(list(parameters_timestamps_lists)):
-        if len(value) > max_len:
-            max_len = len(value)
-
-    return max_len
-
-
 def timestamps_data_not_equal_0(lists):
     number = 0
     for i, value in enumerate(list(lists)):
@@ -1,8 +1,7 @@
-import base64
 from core.utilities import get_translation
-import os
-import uuid
+from core import profiling
 from openpyxl import Workbook
+from excelexporters import workbookwriter
 
 
 ########################################################################################################################
@@ -12,6 +11,7 @@ from openpyxl import Workbook
 # Step 3: Encode the excel file to Base64
 ########################################################################################################################
 
+@profiling.timed('excel_export')
 def export(report, name, reporting_start_datetime_local, reporting_end_datetime_local, base_period_start_datetime,
            base_period_end_datetime, period_type, language):
     ####################################################################################################################
@@ -23,34 +23,18 @@ def export(report, name, reporting_start_datetime_local, reporting_end_datetime_
     ####################################################################################################################
     # Step 2: Generate excel file from the report data
     ####################################################################################################################
-    filename = generate_excel(report,
-                              name,
-                              reporting_start_datetime_local,
-                              reporting_end_datetime_local,
-                              base_period_start_datetime,
-                              base_period_end_datetime,
-                              period_type,
-                              language)
+    binary_file_data = generate_excel(report,
+                                      name,
+                                      reporting_start_datetime_local,
+                                      reporting_end_datetime_local,
+                                      base_period_start_datetime,
+                                      base_period_end_datetime,
+                                      period_type,
+                                      language)
     ####################################################################################################################
     # Step 3: Encode the excel file to Base64
     ####################################################################################################################
-    binary_file_data = b''
-    try:
-        with open(filename, 'rb') as binary_file:
-            binary_file_data = binary_file.read()
-    except IOError as ex:
-        print(str(ex))
-
-    # Base64 encode the bytes
-    base64_encoded_data = base64.b64encode(binary_file_data)
-    # get the Base64 encoded data using human-readable characters.
-    base64_message = base64_encoded_data.decode('utf-8')
-    # delete the file from server
-    try:
-        os.remove(filename)
-    except NotImplementedError as ex:
-        print(str(ex))
-    return base64_message
+    return workbookwriter.encode_to_base64(binary_file_data)
 
 
 def generate_excel(report, name, reporting_start_datetime_local, reporting_end_datetime_local,
@@ -63,7 +47,4 @@ def generate_excel(report, name, reporting_start_datetime_local, reporting_end_d
     ws = wb.active
     ws.title = "MicrogridReporting"
     # todo add microgrid reproting data
-    filename = str(uuid.uuid4()) + '.xlsx'
-    wb.save(filename)
-
-    return filename
+    return workbookwriter.save_to_bytes(wb)
@@ -1,10 +1,7 @@
-import base64
 from core.utilities import get_translation
-import os
-import uuid
-from openpyxl import Workbook
+from core import profiling
 from openpyxl.drawing.image import Image
-from openpyxl.styles import Alignment, Font
+from excelexporters import workbookwriter
 
 
 ########################################################################################################################
@@ -14,6 +11,7 @@ from openpyxl.styles import Alignment, Font
 # Step 3: Encode the excel file to Base64
 ########################################################################################################################
 
+@profiling.timed('excel_export')
 def export(result, space_name, reporting_start_datetime_local, reporting_end_datetime_local, language):
     ####################################################################################################################
     # Step 1: Validate the report data
@@ -24,31 +22,15 @@ def export(result, space_name, reporting_start_datetime_local, reporting_end_dat
     ####################################################################################################################
     # Step 2: Generate excel file from the report data
     ####################################################################################################################
-    filename = generate_excel(result,
-                              space_name,
-                              reporting_start_datetime_local,
-                              reporting_end_datetime_local,
-                              language)
+    binary_file_data = generate_excel(result,
+                                      space_name,
+                                      reporting_start_datetime_local,
+                                      reporting_end_datetime_local,
+                                      language)
     ####################################################################################################################
     # Step 3: Encode the excel file to Base64
     ####################################################################################################################
-    binary_file_data = b''
-    try:
-        with open(filename, 'rb') as binary_file:
-            binary_file_data = binary_file.read()
-    except IOError as ex:
-        print(str(ex))
-
-    # Base64 encode the bytes
-    base64_encoded_data = base64.b64encode(binary_file_data)
-    # get the Base64 encoded data using human-readable characters.
-    base64_message = base64_encoded_data.decode('utf-8')
-    # delete the file from server
-    try:
-        os.remove(filename)
-    except NotImplementedError as ex:
-        print(str(ex))
-    return base64_message
+    return workbookwriter.encode_to_base64(binary_file_data)
 
 
 def generate_excel(report, space_name, reporting_start_datetime_local, reporting_end_datetime_local, language):
@@ -57,65 +39,39 @@ def generate_excel(report, space_name, reporting_start_datetime_local, reporting
     trans.install()
     _ = trans.gettext
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "OfflineMeterBatch"
+    wb = workbookwriter.create_write_only_workbook()
+    ws = wb.create_sheet("OfflineMeterBatch")
 
     # Col width
-    for i in range(ord('A'), ord('L')):
-        ws.column_dimensions[chr(i)].width = 20.0
+    workbookwriter.set_column_widths(ws, {chr(i): 20.0 for i in range(ord('A'), ord('L'))})
 
     # Head image
     ws.row_dimensions[1].height = 105
     img = Image("excelexporters/myems.png")
     ws.add_image(img, 'A1')
+    ws.append([])
+    ws.append([])
 
     # Query Parameters
-    b_r_alignment = Alignment(vertical='bottom',
-                              horizontal='right',
-                              text_rotation=0,
-                              wrap_text=True,
-                              shrink_to_fit=False,
-                              indent=0)
-    ws['A3'].alignment = b_r_alignment
-    ws['A3'] = _('Space') + ':'
-    ws['B3'] = space_name
-    ws['A4'].alignment = b_r_alignment
-    ws['A4'] = _('Start Datetime') + ':'
-    ws['B4'] = reporting_start_datetime_local
-    ws['A5'].alignment = b_r_alignment
-    ws['A5'] = _('End Datetime') + ':'
-    ws['B5'] = reporting_end_datetime_local
+    ws.append([workbookwriter.cell(ws, _('Space') + ':', 'myems_label'), space_name])
+    ws.append([workbookwriter.cell(ws, _('Start Datetime') + ':', 'myems_label'), reporting_start_datetime_local])
+    ws.append([workbookwriter.cell(ws, _('End Datetime') + ':', 'myems_label'), reporting_end_datetime_local])
 
     # Title
-    title_font = Font(size=12, bold=True)
-    ws['A6'].font = title_font
-    ws['A6'] = _('ID')
-    ws['B6'].font = title_font
-    ws['B6'] = _('Name')
-    ws['C6'].font = title_font
-    ws['C6'] = _('Space')
-
-    ca_len = len(report['energycategories'])
-    for i in range(0, ca_len):
-        col = chr(ord('D') + i)
-        ws[col + '6'].font = title_font
-        ws[col + '6'] = report['energycategories'][i]['name'] + " (" + \
-            report['energycategories'][i]['unit_of_measure'] + ")"
-
-    current_row_number = 7
-    for i in range(0, len(report['offline_meters'])):
-        ws['A' + str(current_row_number)] = str(report['offline_meters'][i]['id'])
-        ws['B' + str(current_row_number)] = report['offline_meters'][i]['offline_meter_name']
-        ws['C' + str(current_row_number)] = report['offline_meters'][i]['space_name']
-        ca_len = len(report['offline_meters'][i]['values'])
-        for j in range(0, ca_len):
-            col = chr(ord('D') + j)
-            ws[col + str(current_row_number)] = report['offline_meters'][i]['values'][j]
-
-        current_row_number += 1
-
-    filename = str(uuid.uuid4()) + '.xlsx'
-    wb.save(filename)
-
-    return filename
+    title_row = [workbookwriter.cell(ws, _('ID'), 'myems_title'),
+                 workbookwriter.cell(ws, _('Name'), 'myems_title'),
+                 workbookwriter.cell(ws, _('Space'), 'myems_title')]
+    for energy_category in report['energycategories']:
+        title_row.append(workbookwriter.cell(ws,
+                                             energy_category['name'] + " (" +
+                                             energy_category['unit_of_measure'] + ")",
+                                             'myems_title'))
+    ws.append(title_row)
+
+    # rows are streamed to the workbook as they are appended
+    for offline_meter in report['offline_meters']:
+        ws.append([str(offline_meter['id']),
+                   offline_meter['offline_meter_name'],
+                   offline_meter['space_name']] + list(offline_meter['values']))
+
+    return workbookwriter.save_to_bytes(wb)
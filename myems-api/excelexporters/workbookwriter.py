@@ -0,0 +1,123 @@
+import base64
+from io import BytesIO
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle, Alignment, Border, Font, PatternFill, Side
+
+
+########################################################################################################################
+# Shared helpers for excel exporters
+# Workbooks are saved to in-memory buffers instead of temporary files in the working directory.
+# Large tabular reports should use write-only workbooks, whose rows are streamed to the buffer as they are appended,
+# together with the named styles below, which are registered once per workbook instead of styling every cell.
+########################################################################################################################
+_thin_side = Side(border_style='thin', color='000000')
+_thin_border = Border(left=_thin_side, right=_thin_side, bottom=_thin_side, top=_thin_side)
+_medium_side = Side(border_style='medium')
+_medium_border = Border(left=_medium_side, right=_medium_side, bottom=_medium_side, top=_medium_side)
+
+NAMED_STYLES = {
+    'myems_title': dict(font=Font(size=12, bold=True)),
+    'myems_label': dict(alignment=Alignment(vertical='bottom', horizontal='right', wrap_text=True)),
+    'myems_header': dict(font=Font(name='Arial', size=12, bold=True, color='FFFFFF'),
+                         fill=PatternFill(fill_type='solid', fgColor='90ee90'),
+                         border=_thin_border,
+                         alignment=Alignment(vertical='center', horizontal='center', wrap_text=True)),
+    'myems_body': dict(font=Font(name='Arial', size=11),
+                       border=_thin_border,
+                       alignment=Alignment(vertical='center', horizontal='center', wrap_text=True)),
+    # styles of the batch and tracking sheets of equipments, tenants, stores, shop floors and combined equipments
+    'myems_batch_label': dict(alignment=Alignment(vertical='bottom', horizontal='right', wrap_text=True)),
+    'myems_batch_value': dict(border=Border(bottom=_medium_side),
+                              alignment=Alignment(vertical='bottom', horizontal='center', wrap_text=True)),
+    'myems_batch_header': dict(font=Font(name='Arial', size=15, bold=True),
+                               fill=PatternFill(fill_type='solid', fgColor='90ee90'),
+                               border=_medium_border,
+                               alignment=Alignment(vertical='center', horizontal='center', wrap_text=True)),
+    'myems_batch_title': dict(font=Font(name='Arial', size=15, bold=True),
+                              border=_medium_border,
+                              alignment=Alignment(vertical='bottom', horizontal='center', wrap_text=True)),
+    'myems_batch_name': dict(font=Font(name='Arial', size=15, bold=True),
+                             border=_medium_border,
+                             alignment=Alignment(vertical='center', horizontal='center', wrap_text=True)),
+    'myems_batch_data': dict(font=Font(name='Franklin Gothic Book', size=11),
+                             border=_medium_border,
+                             alignment=Alignment(vertical='center', horizontal='center', wrap_text=True)),
+}
+
+
+def add_named_styles(wb):
+    """
+    Register the shared named styles to the workbook
+    :param wb: the workbook
+    """
+    for name, attributes in NAMED_STYLES.items():
+        if name not in wb.named_styles:
+            wb.add_named_style(NamedStyle(name=name, **attributes))
+
+
+def create_write_only_workbook():
+    """
+    Create a write-only workbook with the shared named styles registered
+    :return: the workbook
+    """
+    wb = Workbook(write_only=True)
+    add_named_styles(wb)
+    return wb
+
+
+def cell(ws, value, style=None):
+    """
+    Create a cell for the append() method of write-only worksheets
+    :param ws: the write-only worksheet
+    :param value: the cell value
+    :param style: one of the NAMED_STYLES names or None
+    :return: the cell
+    """
+    if style is None:
+        return value
+    result = WriteOnlyCell(ws, value=value)
+    result.style = style
+    return result
+
+
+def set_column_widths(ws, widths):
+    """
+    Set column widths, must be called before appending rows to write-only worksheets
+    :param ws: the worksheet
+    :param widths: dict of column letter and width
+    """
+    for column, width in widths.items():
+        ws.column_dimensions[column].width = width
+
+
+def set_default_row_height(ws, height):
+    """
+    Set the height of the rows without their own height, instead of setting the height of every row
+    :param ws: the worksheet
+    :param height: the row height in points
+    """
+    ws.sheet_format.defaultRowHeight = height
+    ws.sheet_format.customHeight = True
+
+
+def save_to_bytes(wb):
+    """
+    Save the workbook to an in-memory buffer
+    :param wb: the workbook
+    :return: the bytes of the xlsx file
+    """
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def encode_to_base64(binary_file_data):
+    """
+    Encode the bytes of the xlsx file to base64 string
+    :param binary_file_data: the bytes of the xlsx file
+    :return: the base64 string using human-readable characters
+    """
+    if binary_file_data is None:
+        return None
+    return base64.b64encode(binary_file_data).decode('utf-8')
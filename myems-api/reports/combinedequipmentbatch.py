@@ -3,9 +3,9 @@ from decimal import Decimal
 import falcon
 import mysql.connector
 import simplejson as json
-from anytree import AnyNode, LevelOrderIter
 import config
 import excelexporters.combinedequipmentbatch
+from core import queryexecutor, topology, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -22,7 +22,7 @@ class Reporting:
     ####################################################################################################################
     # PROCEDURES
     # Step 1: valid parameters
-    # Step 2: build a space tree
+    # Step 2: get the combined equipments in the space tree from the topology index
     # Step 3: query all combined equipments in the space tree
     # Step 4: query energy categories
     # Step 5: query reporting period energy input
@@ -122,46 +122,33 @@ class Reporting:
                 str.lower(str.strip(quick_mode)) in ('true', 't', 'on', 'yes', 'y'):
             is_quick_mode = True
         ################################################################################################################
-        # Step 2: build a space tree
+        # Step 2: get the combined equipments in the space tree from the topology index
         ################################################################################################################
-
-        query = (" SELECT id, name, parent_space_id "
-                 " FROM tbl_spaces "
-                 " ORDER BY id ")
-        cursor_system_db.execute(query)
-        rows_spaces = cursor_system_db.fetchall()
-        node_dict = dict()
-        if rows_spaces is not None and len(rows_spaces) > 0:
-            for row in rows_spaces:
-                parent_node = node_dict[row[2]] if row[2] is not None else None
-                node_dict[row[0]] = AnyNode(id=row[0], parent=parent_node, name=row[1])
+        combined_equipment_space_dict = topology.get_subtree_entities(space_id, 'combined_equipment')
 
         ################################################################################################################
         # Step 3: query all combined equipments in the space tree
         ################################################################################################################
         combined_equipment_dict = dict()
-        space_dict = dict()
-
-        for node in LevelOrderIter(node_dict[space_id]):
-            space_dict[node.id] = node.name
 
-        cursor_system_db.execute(" SELECT ce.id, ce.name AS combined_equipment_name, "
-                                 "        ce.uuid AS combined_equipment_uuid, s.name AS space_name, "
-                                 "        cc.name AS cost_center_name, ce.description "
-                                 " FROM tbl_spaces s, tbl_spaces_combined_equipments sce, "
-                                 "      tbl_combined_equipments ce, tbl_cost_centers cc "
-                                 " WHERE s.id IN ( " + ', '.join(map(str, space_dict.keys())) + ") "
-                                 "       AND sce.space_id = s.id AND sce.combined_equipment_id = ce.id "
-                                 "       AND ce.cost_center_id = cc.id  ", )
-        rows_combined_equipments = cursor_system_db.fetchall()
-        if rows_combined_equipments is not None and len(rows_combined_equipments) > 0:
-            for row in rows_combined_equipments:
-                combined_equipment_dict[row[0]] = {"combined_equipment_name": row[1],
-                                                   "combined_equipment_uuid": row[2],
-                                                   "space_name": row[3],
-                                                   "cost_center_name": row[4],
-                                                   "description": row[5],
-                                                   "values": list()}
+        if len(combined_equipment_space_dict) > 0:
+            cursor_system_db.execute(" SELECT ce.id, ce.name AS combined_equipment_name, "
+                                     "        ce.uuid AS combined_equipment_uuid, "
+                                     "        cc.name AS cost_center_name, ce.description "
+                                     " FROM tbl_combined_equipments ce, tbl_cost_centers cc "
+                                     " WHERE ce.id IN ( " + ', '.join(map(str, combined_equipment_space_dict.keys())) +
+                                     ") "
+                                     "       AND ce.cost_center_id = cc.id "
+                                     " ORDER BY ce.id ", )
+            rows_combined_equipments = cursor_system_db.fetchall()
+            if rows_combined_equipments is not None and len(rows_combined_equipments) > 0:
+                for row in rows_combined_equipments:
+                    combined_equipment_dict[row[0]] = {"combined_equipment_name": row[1],
+                                                       "combined_equipment_uuid": row[2],
+                                                       "space_name": combined_equipment_space_dict[row[0]],
+                                                       "cost_center_name": row[3],
+                                                       "description": row[4],
+                                                       "values": list()}
 
         ################################################################################################################
         # Step 4: query energy categories
@@ -209,24 +196,16 @@ class Reporting:
         ################################################################################################################
         # Step 5: query reporting period energy input
         ################################################################################################################
+        combined_equipment_aggregates = \
+            queryexecutor.fetch_category_aggregates('myems_energy_db', 'tbl_combined_equipment_input_category_hourly',
+                                                    'combined_equipment_id', list(combined_equipment_dict.keys()),
+                                                    reporting_start_datetime_utc, reporting_end_datetime_utc)
         for combined_equipment_id in combined_equipment_dict:
-
-            cursor_energy_db.execute(" SELECT energy_category_id, SUM(actual_value) "
-                                     " FROM tbl_combined_equipment_input_category_hourly "
-                                     " WHERE combined_equipment_id = %s "
-                                     "     AND start_datetime_utc >= %s "
-                                     "     AND start_datetime_utc < %s "
-                                     " GROUP BY energy_category_id ",
-                                     (combined_equipment_id,
-                                      reporting_start_datetime_utc,
-                                      reporting_end_datetime_utc))
-            rows_combined_equipment_energy = cursor_energy_db.fetchall()
             for energy_category in energy_category_list:
                 subtotal = Decimal(0.0)
-                for row_combined_equipment_energy in rows_combined_equipment_energy:
-                    if energy_category['id'] == row_combined_equipment_energy[0]:
-                        subtotal = row_combined_equipment_energy[1]
-                        break
+                aggregates = combined_equipment_aggregates.get((combined_equipment_id, energy_category['id']))
+                if aggregates is not None:
+                    subtotal = aggregates[0]
                 combined_equipment_dict[combined_equipment_id]['values'].append(subtotal)
 
         if cursor_system_db:
@@ -258,7 +237,7 @@ class Reporting:
                   'excel_bytes_base64': None}
 
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = \
                 excelexporters.combinedequipmentbatch.export(result,
                                                              space_name,
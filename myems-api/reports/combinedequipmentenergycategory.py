@@ -3,10 +3,9 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import falcon
 import mysql.connector
-import simplejson as json
 import config
 import excelexporters.combinedequipmentenergycategory
-from core import utilities
+from core import downsampling, payloadencoding, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -164,6 +163,10 @@ class Reporting:
                 str.lower(str.strip(quick_mode)) in ('true', 't', 'on', 'yes', 'y'):
             is_quick_mode = True
 
+        sample_count, sampling_method = downsampling.get_sampling(req)
+        # the Excel file contains all raw values, the series of the JSON report are downsampled after the export
+        fetch_sample_count = downsampling.get_fetch_sample_count(req, sample_count)
+
         trans = utilities.get_translation(language)
         trans.install()
         _ = trans.gettext
@@ -472,15 +475,9 @@ class Reporting:
                 point_values = []
                 point_timestamps = []
                 if point['object_type'] == 'ENERGY_VALUE':
-                    query = (" SELECT utc_date_time, actual_value "
-                             " FROM tbl_energy_value "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time BETWEEN %s AND %s "
-                             " ORDER BY utc_date_time ")
-                    cursor_historical.execute(query, (point['id'],
-                                                      reporting_start_datetime_utc,
-                                                      reporting_end_datetime_utc))
-                    rows = cursor_historical.fetchall()
+                    rows = downsampling.fetch_point_values(cursor_historical, 'tbl_energy_value', point['id'],
+                                                           reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                           fetch_sample_count, sampling_method)
 
                     if rows is not None and len(rows) > 0:
                         for row in rows:
@@ -490,15 +487,9 @@ class Reporting:
                             point_timestamps.append(current_datetime)
                             point_values.append(row[1])
                 elif point['object_type'] == 'ANALOG_VALUE':
-                    query = (" SELECT utc_date_time, actual_value "
-                             " FROM tbl_analog_value "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time BETWEEN %s AND %s "
-                             " ORDER BY utc_date_time ")
-                    cursor_historical.execute(query, (point['id'],
-                                                      reporting_start_datetime_utc,
-                                                      reporting_end_datetime_utc))
-                    rows = cursor_historical.fetchall()
+                    rows = downsampling.fetch_point_values(cursor_historical, 'tbl_analog_value', point['id'],
+                                                           reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                           fetch_sample_count, sampling_method)
 
                     if rows is not None and len(rows) > 0:
                         for row in rows:
@@ -508,15 +499,9 @@ class Reporting:
                             point_timestamps.append(current_datetime)
                             point_values.append(row[1])
                 elif point['object_type'] == 'DIGITAL_VALUE':
-                    query = (" SELECT utc_date_time, actual_value "
-                             " FROM tbl_digital_value "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time BETWEEN %s AND %s "
-                             " ORDER BY utc_date_time ")
-                    cursor_historical.execute(query, (point['id'],
-                                                      reporting_start_datetime_utc,
-                                                      reporting_end_datetime_utc))
-                    rows = cursor_historical.fetchall()
+                    rows = downsampling.fetch_point_values(cursor_historical, 'tbl_digital_value', point['id'],
+                                                           reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                           fetch_sample_count, sampling_method)
 
                     if rows is not None and len(rows) > 0:
                         for row in rows:
@@ -786,7 +771,7 @@ class Reporting:
                 result['associated_equipment']['subtotals_array'].append(
                     associated_equipment_data[energy_category_id]['subtotals'])
         result['excel_bytes_base64'] = None
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = \
                 excelexporters.combinedequipmentenergycategory.export(result,
                                                                       combined_equipment['name'],
@@ -796,4 +781,6 @@ class Reporting:
                                                                       reporting_period_end_datetime_local,
                                                                       period_type,
                                                                       language)
-        resp.text = json.dumps(result)
+        downsampling.downsample_result(result, sample_count, sampling_method)
+
+        resp.text = payloadencoding.dumps(req, result)
@@ -4,8 +4,38 @@ import falcon
 import mysql.connector
 import simplejson as json
 import config
-from core import utilities
-from core.useractivity import access_control, api_key_control
+from core import latestvalues, payloadencoding, queryexecutor, reportcache, utilities
+
+
+_cache_watermarks = [('myems_energy_db', 'tbl_space_input_category_hourly', 'id'),
+                     ('myems_energy_db', 'tbl_space_output_category_hourly', 'id'),
+                     ('myems_billing_db', 'tbl_space_input_category_hourly', 'id')]
+
+
+def _get_point_data(sensors):
+    """
+    Get the latest values of the points of sensors
+    :param sensors: the sensors of the space with their point_id_list
+    :return: dict of point id and latest value
+    """
+    point_data_dict = dict()
+    for sensor in sensors:
+        if sensor['point_id_list'] is not None and len(sensor['point_id_list']) > 0:
+            for point_id in sorted(sensor['point_id_list']):
+                analog_value = latestvalues.get_value('analog', point_id)
+                if analog_value is not None:
+                    point_data_dict[point_id] = analog_value
+                digital_value = latestvalues.get_value('digital', point_id)
+                if digital_value is not None:
+                    point_data_dict[point_id] = digital_value
+    return point_data_dict
+
+
+def _refresh_point_data(result):
+    """
+    Refresh the latest values of the sensor points of a cached dashboard
+    """
+    result['point'] = _get_point_data(result['sensor'].values())
 
 
 class Reporting:
@@ -36,13 +66,9 @@ class Reporting:
     # Step 14: construct the report
     ####################################################################################################################
     @staticmethod
+    @reportcache.cached('dashboard', _cache_watermarks, is_per_user=True, realtime=_refresh_point_data)
     def on_get(req, resp):
-        if 'API-KEY' not in req.headers or \
-                not isinstance(req.headers['API-KEY'], str) or \
-                len(str.strip(req.headers['API-KEY'])) == 0:
-            access_control(req)
-        else:
-            api_key_control(req)
+        reportcache.check_access(req)
         user_uuid = req.params.get('useruuid')
         period_type = req.params.get('periodtype')
         base_period_start_datetime_local = req.params.get('baseperiodstartdatetime')
@@ -317,9 +343,6 @@ class Reporting:
         cnx_system = mysql.connector.connect(**config.myems_system_db)
         cursor_system = cnx_system.cursor()
 
-        cnx_historical = mysql.connector.connect(**config.myems_historical_db)
-        cursor_historical = cnx_historical.cursor()
-
         sensor_id_list = list()
         sensor_dict = dict()
         cursor_system.execute(" SELECT s.id, s.name, s.uuid, s.description "
@@ -351,28 +374,7 @@ class Reporting:
                     sensor_dict[row[0]]['point_name_list'].append(row[2])
                     sensor_dict[row[0]]['point_unit_list'].append(row[3])
 
-        point_data_dict = dict()
-        for key in sensor_dict:
-            if sensor_dict[key]['point_id_list'] is not None and len(sensor_dict[key]['point_id_list']) > 0:
-                cursor_historical.execute(" SELECT point_id, actual_value "
-                                          " FROM tbl_analog_value_latest "
-                                          " WHERE point_id in ({}) "
-                                          " ORDER BY point_id ".
-                                          format(','.join("{0}".format(x) for x in sensor_dict[key]['point_id_list'])))
-                rows_analog_values = cursor_historical.fetchall()
-                if rows_analog_values is not None and len(rows_analog_values) > 0:
-                    for row in rows_analog_values:
-                        point_data_dict[row[0]] = row[1]
-                
-                cursor_historical.execute(" SELECT point_id, actual_value "
-                                          " FROM tbl_digital_value_latest "
-                                          " WHERE point_id in ({}) "
-                                          " ORDER BY point_id ".
-                                          format(','.join("{0}".format(x) for x in sensor_dict[key]['point_id_list'])))
-                rows_digital_values = cursor_historical.fetchall()
-                if rows_digital_values is not None and len(rows_digital_values) > 0:
-                    for row in rows_digital_values:
-                        point_data_dict[row[0]] = row[1]
+        point_data_dict = _get_point_data(sensor_dict.values())
 
         ################################################################################################################
         # Step 5: query child spaces
@@ -387,6 +389,32 @@ class Reporting:
             for row in rows_child_spaces:
                 child_space_list.append({"id": row[0], "name": row[1]})
 
+        ################################################################################################################
+        # query hourly data of all energy categories and child spaces with grouped queries in parallel
+        ################################################################################################################
+        child_space_id_list = [child_space['id'] for child_space in child_space_list]
+        grouped = queryexecutor.run_in_parallel({
+            'base_input': (queryexecutor.fetch_subtotals, 'myems_energy_db', 'tbl_space_input_category_hourly',
+                           'space_id', [space['id']], input_energy_category_set,
+                           base_start_datetime_utc, base_end_datetime_utc),
+            'base_cost': (queryexecutor.fetch_subtotals, 'myems_billing_db', 'tbl_space_input_category_hourly',
+                          'space_id', [space['id']], input_energy_category_set,
+                          base_start_datetime_utc, base_end_datetime_utc),
+            'base_output': (queryexecutor.fetch_subtotals, 'myems_energy_db', 'tbl_space_output_category_hourly',
+                            'space_id', [space['id']], output_energy_category_set,
+                            base_start_datetime_utc, base_end_datetime_utc),
+            'reporting_input': (queryexecutor.fetch_hourly_rows, 'myems_energy_db', 'tbl_space_input_category_hourly',
+                                'space_id', [space['id']] + child_space_id_list, input_energy_category_set,
+                                reporting_start_datetime_utc, reporting_end_datetime_utc),
+            'reporting_cost': (queryexecutor.fetch_hourly_rows, 'myems_billing_db', 'tbl_space_input_category_hourly',
+                               'space_id', [space['id']] + child_space_id_list, input_energy_category_set,
+                               reporting_start_datetime_utc, reporting_end_datetime_utc),
+            'reporting_output': (queryexecutor.fetch_hourly_rows, 'myems_energy_db',
+                                 'tbl_space_output_category_hourly',
+                                 'space_id', [space['id']], output_energy_category_set,
+                                 reporting_start_datetime_utc, reporting_end_datetime_utc),
+        })
+
         ################################################################################################################
         # Step 6: query base period energy input
         ################################################################################################################
@@ -401,21 +429,7 @@ class Reporting:
                 base_input[energy_category_id]['subtotal_in_kgce'] = Decimal(0.0)
                 base_input[energy_category_id]['subtotal_in_kgco2e'] = Decimal(0.0)
 
-                cursor_energy.execute(" SELECT SUM(actual_value) "
-                                      " FROM tbl_space_input_category_hourly "
-                                      " WHERE space_id = %s "
-                                      "     AND energy_category_id = %s "
-                                      "     AND start_datetime_utc >= %s "
-                                      "     AND start_datetime_utc < %s ",
-                                      (space['id'],
-                                       energy_category_id,
-                                       base_start_datetime_utc,
-                                       base_end_datetime_utc))
-                row_space_sum = cursor_energy.fetchone()
-                if row_space_sum is None or len(row_space_sum) < 1 or row_space_sum[0] is None:
-                    actual_value = Decimal(0.0)
-                else:
-                    actual_value = row_space_sum[0]
+                actual_value = grouped['base_input'].get((space['id'], energy_category_id), Decimal(0.0))
                 base_input[energy_category_id]['subtotal'] = actual_value
                 base_input[energy_category_id]['subtotal_in_kgce'] = actual_value * kgce
                 base_input[energy_category_id]['subtotal_in_kgco2e'] = actual_value * kgco2e
@@ -429,21 +443,7 @@ class Reporting:
                 base_cost[energy_category_id] = dict()
                 base_cost[energy_category_id]['subtotal'] = Decimal(0.0)
 
-                cursor_billing.execute(" SELECT SUM(actual_value) "
-                                       " FROM tbl_space_input_category_hourly "
-                                       " WHERE space_id = %s "
-                                       "     AND energy_category_id = %s "
-                                       "     AND start_datetime_utc >= %s "
-                                       "     AND start_datetime_utc < %s ",
-                                       (space['id'],
-                                        energy_category_id,
-                                        base_start_datetime_utc,
-                                        base_end_datetime_utc))
-                row_space_sum = cursor_billing.fetchone()
-                if row_space_sum is None or len(row_space_sum) < 1 or row_space_sum[0] is None:
-                    actual_value = Decimal(0.0)
-                else:
-                    actual_value = row_space_sum[0]
+                actual_value = grouped['base_cost'].get((space['id'], energy_category_id), Decimal(0.0))
                 base_cost[energy_category_id]['subtotal'] = actual_value
 
         ################################################################################################################
@@ -460,21 +460,7 @@ class Reporting:
                 base_output[energy_category_id]['subtotal_in_kgce'] = Decimal(0.0)
                 base_output[energy_category_id]['subtotal_in_kgco2e'] = Decimal(0.0)
 
-                cursor_energy.execute(" SELECT SUM(actual_value) "
-                                      " FROM tbl_space_output_category_hourly "
-                                      " WHERE space_id = %s "
-                                      "     AND energy_category_id = %s "
-                                      "     AND start_datetime_utc >= %s "
-                                      "     AND start_datetime_utc < %s ",
-                                      (space['id'],
-                                       energy_category_id,
-                                       base_start_datetime_utc,
-                                       base_end_datetime_utc))
-                row_space_sum = cursor_energy.fetchone()
-                if row_space_sum is None or len(row_space_sum) < 1 or row_space_sum[0] is None:
-                    actual_value = Decimal(0.0)
-                else:
-                    actual_value = row_space_sum[0]
+                actual_value = grouped['base_output'].get((space['id'], energy_category_id), Decimal(0.0))
                 base_output[energy_category_id]['subtotal'] = actual_value
                 base_output[energy_category_id]['subtotal_in_kgce'] = actual_value * kgce
                 base_output[energy_category_id]['subtotal_in_kgco2e'] = actual_value * kgco2e
@@ -500,18 +486,7 @@ class Reporting:
                 reporting_input[energy_category_id]['offpeak'] = Decimal(0.0)
                 reporting_input[energy_category_id]['deep'] = Decimal(0.0)
 
-                cursor_energy.execute(" SELECT start_datetime_utc, actual_value "
-                                      " FROM tbl_space_input_category_hourly "
-                                      " WHERE space_id = %s "
-                                      "     AND energy_category_id = %s "
-                                      "     AND start_datetime_utc >= %s "
-                                      "     AND start_datetime_utc < %s "
-                                      " ORDER BY start_datetime_utc ",
-                                      (space['id'],
-                                       energy_category_id,
-                                       reporting_start_datetime_utc,
-                                       reporting_end_datetime_utc))
-                rows_space_hourly = cursor_energy.fetchall()
+                rows_space_hourly = grouped['reporting_input'].get((space['id'], energy_category_id), list())
 
                 rows_space_periodically = utilities.aggregate_hourly_data_by_period(rows_space_hourly,
                                                                                     reporting_start_datetime_utc,
@@ -572,18 +547,7 @@ class Reporting:
                 reporting_cost[energy_category_id]['offpeak'] = Decimal(0.0)
                 reporting_cost[energy_category_id]['deep'] = Decimal(0.0)
 
-                cursor_billing.execute(" SELECT start_datetime_utc, actual_value "
-                                       " FROM tbl_space_input_category_hourly "
-                                       " WHERE space_id = %s "
-                                       "     AND energy_category_id = %s "
-                                       "     AND start_datetime_utc >= %s "
-                                       "     AND start_datetime_utc < %s "
-                                       " ORDER BY start_datetime_utc ",
-                                       (space['id'],
-                                        energy_category_id,
-                                        reporting_start_datetime_utc,
-                                        reporting_end_datetime_utc))
-                rows_space_hourly = cursor_billing.fetchall()
+                rows_space_hourly = grouped['reporting_cost'].get((space['id'], energy_category_id), list())
 
                 rows_space_periodically = utilities.aggregate_hourly_data_by_period(rows_space_hourly,
                                                                                     reporting_start_datetime_utc,
@@ -645,18 +609,7 @@ class Reporting:
                 reporting_output[energy_category_id]['offpeak'] = Decimal(0.0)
                 reporting_output[energy_category_id]['deep'] = Decimal(0.0)
 
-                cursor_energy.execute(" SELECT start_datetime_utc, actual_value "
-                                      " FROM tbl_space_output_category_hourly "
-                                      " WHERE space_id = %s "
-                                      "     AND energy_category_id = %s "
-                                      "     AND start_datetime_utc >= %s "
-                                      "     AND start_datetime_utc < %s "
-                                      " ORDER BY start_datetime_utc ",
-                                      (space['id'],
-                                       energy_category_id,
-                                       reporting_start_datetime_utc,
-                                       reporting_end_datetime_utc))
-                rows_space_hourly = cursor_energy.fetchall()
+                rows_space_hourly = grouped['reporting_output'].get((space['id'], energy_category_id), list())
 
                 rows_space_periodically = utilities.aggregate_hourly_data_by_period(rows_space_hourly,
                                                                                     reporting_start_datetime_utc,
@@ -720,18 +673,7 @@ class Reporting:
                     subtotal = 0
                     subtotal_list = list()
 
-                    cursor_energy.execute(" SELECT start_datetime_utc, actual_value"
-                                          " FROM tbl_space_input_category_hourly "
-                                          " WHERE space_id = %s "
-                                          "     AND energy_category_id = %s "
-                                          "     AND start_datetime_utc >= %s "
-                                          "     AND start_datetime_utc < %s "
-                                          " ORDER BY start_datetime_utc ",
-                                          (child_space['id'],
-                                           energy_category_id,
-                                           reporting_start_datetime_utc,
-                                           reporting_end_datetime_utc))
-                    row_subtotal = cursor_energy.fetchall() 
+                    row_subtotal = grouped['reporting_input'].get((child_space['id'], energy_category_id), list())
                     rows_space_periodically = utilities.aggregate_hourly_data_by_period(row_subtotal,
                                                                                         reporting_start_datetime_utc,
                                                                                         reporting_end_datetime_utc,
@@ -760,18 +702,7 @@ class Reporting:
                     child_space_cost[energy_category_id]['child_space_names'].append(child_space['name'])
                     subtotal_list = list()
 
-                    cursor_billing.execute(" SELECT start_datetime_utc, actual_value"
-                                           " FROM tbl_space_input_category_hourly "
-                                           " WHERE space_id = %s "
-                                           "     AND energy_category_id = %s "
-                                           "     AND start_datetime_utc >= %s "
-                                           "     AND start_datetime_utc < %s "
-                                           " ORDER BY start_datetime_utc ",
-                                           (child_space['id'],
-                                            energy_category_id,
-                                            reporting_start_datetime_utc,
-                                            reporting_end_datetime_utc))
-                    row_subtotal = cursor_billing.fetchall() 
+                    row_subtotal = grouped['reporting_cost'].get((child_space['id'], energy_category_id), list())
                     rows_space_periodically = utilities.aggregate_hourly_data_by_period(row_subtotal,
                                                                                         reporting_start_datetime_utc,
                                                                                         reporting_end_datetime_utc,
@@ -1095,4 +1026,4 @@ class Reporting:
                 result['child_space_cost']['subtotals_array'].append(
                     child_space_cost[energy_category_id]['subtotals'])
 
-        resp.text = json.dumps(result)
+        resp.text = payloadencoding.dumps(req, result)
@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 import falcon
 import mysql.connector
 import simplejson as json
+from core import latestvalues
 from core.useractivity import access_control, api_key_control
 import config
 
@@ -114,52 +115,26 @@ class Reporting:
         ################################################################################################################
         # Step 5: query points' data
         ################################################################################################################
-        cnx_historical = mysql.connector.connect(**config.myems_historical_db)
-        cursor_historical = cnx_historical.cursor()
-
         for x in range(len(circuit_list)):
             for y in range(len(circuit_list[x]['points'])):
                 if circuit_list[x]['points'][y]['object_type'] == 'ANALOG_VALUE':
 
-                    query = (" SELECT actual_value "
-                             " FROM tbl_analog_value_latest "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time > %s ")
-                    cursor_historical.execute(query, (circuit_list[x]['points'][y]['id'],
-                                                      reporting_start_datetime_utc))
-                    row = cursor_historical.fetchone()
-
-                    if row is not None:
-                        circuit_list[x]['points'][y]['value'] = row[0]
+                    value = latestvalues.get_value('analog', circuit_list[x]['points'][y]['id'],
+                                                   reporting_start_datetime_utc)
+                    if value is not None:
+                        circuit_list[x]['points'][y]['value'] = value
 
                 elif circuit_list[x]['points'][y]['object_type'] == 'ENERGY_VALUE':
-                    query = (" SELECT actual_value "
-                             " FROM tbl_energy_value_latest "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time > %s ")
-                    cursor_historical.execute(query, (circuit_list[x]['points'][y]['id'],
-                                                      reporting_start_datetime_utc))
-                    row = cursor_historical.fetchone()
-
-                    if row is not None:
-                        circuit_list[x]['points'][y]['value'] = row[0]
+                    value = latestvalues.get_value('energy', circuit_list[x]['points'][y]['id'],
+                                                   reporting_start_datetime_utc)
+                    if value is not None:
+                        circuit_list[x]['points'][y]['value'] = value
 
                 elif circuit_list[x]['points'][y]['object_type'] == 'DIGITAL_VALUE':
-                    query = (" SELECT actual_value "
-                             " FROM tbl_digital_value_latest "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time > %s ")
-                    cursor_historical.execute(query, (circuit_list[x]['points'][y]['id'],
-                                                      reporting_start_datetime_utc))
-                    row = cursor_historical.fetchone()
-
-                    if row is not None:
-                        circuit_list[x]['points'][y]['value'] = row[0]
-
-        if cursor_historical:
-            cursor_historical.close()
-        if cnx_historical:
-            cnx_historical.close()
+                    value = latestvalues.get_value('digital', circuit_list[x]['points'][y]['id'],
+                                                   reporting_start_datetime_utc)
+                    if value is not None:
+                        circuit_list[x]['points'][y]['value'] = value
 
         ################################################################################################################
         # Step 6: construct the report
@@ -3,6 +3,7 @@ import falcon
 import mysql.connector
 import simplejson as json
 import excelexporters.energyflowdiagram
+from core import utilities
 from core.useractivity import access_control, api_key_control
 import config
 
@@ -286,7 +287,7 @@ class Reporting:
                 result['links'].append({'source': link['source_node']['name'],
                                         'target': link['target_node']['name'],
                                         'value': link['value']})
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = \
                 excelexporters.energyflowdiagram.export(result,
                                                         meta_result['name'],
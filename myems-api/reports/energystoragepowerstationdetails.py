@@ -3,7 +3,7 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import falcon
 import mysql.connector
-import simplejson as json
+from core import downsampling, payloadencoding
 from core.useractivity import access_control, api_key_control
 import config
 
@@ -67,6 +67,7 @@ class Reporting:
 
         reporting_start_datetime_utc = datetime.utcnow() - timedelta(days=3)
         reporting_end_datetime_utc = datetime.utcnow()
+        sample_count, sampling_method = downsampling.get_sampling(req)
 
         ################################################################################################################
         # Step 2: query the energy storage power station
@@ -192,30 +193,6 @@ class Reporting:
         ################################################################################################################
         # Step 4: query associated batteries on containers
         ################################################################################################################
-        energy_value_latest_dict = dict()
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_energy_value_latest ")
-        cursor_historical.execute(query, )
-        energy_value_latest_rows = cursor_historical.fetchall()
-        for row in energy_value_latest_rows:
-            energy_value_latest_dict[row[0]] = row[1]
-
-        analog_value_latest_dict = dict()
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_analog_value_latest ")
-        cursor_historical.execute(query, )
-        analog_value_latest_rows = cursor_historical.fetchall()
-        for row in analog_value_latest_rows:
-            analog_value_latest_dict[row[0]] = row[1]
-
-        digital_value_latest_dict = dict()
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_digital_value_latest ")
-        cursor_historical.execute(query, )
-        digital_value_latest_rows = cursor_historical.fetchall()
-        for row in digital_value_latest_rows:
-            digital_value_latest_dict[row[0]] = row[1]
-
         charge_meter_id_list = list()
         discharge_meter_id_list = list()
         for container in container_list:
@@ -454,15 +431,9 @@ class Reporting:
             point_values = []
             point_timestamps = []
             if point['object_type'] == 'ENERGY_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_energy_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_energy_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     reporting_start_datetime_local = reporting_start_datetime_utc.replace(tzinfo=timezone.utc) + \
@@ -482,15 +453,9 @@ class Reporting:
                             point_values.append(rows[index][1])
                             current_datetime_local += timedelta(minutes=1)
             elif point['object_type'] == 'ANALOG_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_analog_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_analog_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     reporting_start_datetime_local = reporting_start_datetime_utc.replace(tzinfo=timezone.utc) + \
@@ -510,15 +475,9 @@ class Reporting:
                             point_values.append(rows[index][1])
                             current_datetime_local += timedelta(minutes=1)
             elif point['object_type'] == 'DIGITAL_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_digital_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_digital_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     reporting_start_datetime_local = reporting_start_datetime_utc.replace(tzinfo=timezone.utc) + \
@@ -582,4 +541,4 @@ class Reporting:
             "values": parameters_data['values']
         }
 
-        resp.text = json.dumps(result)
+        resp.text = payloadencoding.dumps(req, result)
@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 import falcon
 import mysql.connector
 import simplejson as json
+from core import latestvalues
 from core.useractivity import access_control, api_key_control
 import config
 
@@ -50,9 +51,6 @@ class Reporting:
         cnx_system = mysql.connector.connect(**config.myems_system_db)
         cursor_system = cnx_system.cursor()
 
-        cnx_historical = mysql.connector.connect(**config.myems_historical_db)
-        cursor_historical = cnx_historical.cursor()
-
         if energy_storage_power_station_id is not None:
             query = (" SELECT id, name, uuid "
                      " FROM tbl_energy_storage_power_stations "
@@ -65,16 +63,6 @@ class Reporting:
                 raise falcon.HTTPError(status=falcon.HTTP_404, title='API.NOT_FOUND',
                                        description='API.ENERGY_STORAGE_POWER_STATION_NOT_FOUND')
 
-        # query all points
-        query = (" SELECT id, name, units, description "
-                 " FROM tbl_points ")
-        cursor_system.execute(query)
-        rows = cursor_system.fetchall()
-
-        points_dict = dict()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                points_dict[row[0]] = [row[1], row[2], row[3]]
         ################################################################################################################
         # Step 3: query associated containers
         ################################################################################################################
@@ -94,65 +82,13 @@ class Reporting:
         print('container_list:' + str(container_list))
 
         ################################################################################################################
-        # Step 4: query analog points latest values
-        ################################################################################################################
-        latest_value_dict = dict()
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_analog_value_latest "
-                 " WHERE utc_date_time > %s ")
-        cursor_historical.execute(query, (datetime.utcnow() - timedelta(minutes=60),))
-        rows = cursor_historical.fetchall()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                latest_value_dict[row[0]] = [points_dict[row[0]][0],
-                                             points_dict[row[0]][1],
-                                             points_dict[row[0]][2],
-                                             row[1]]
-
-        ################################################################################################################
-        # Step 5: query energy points latest values
+        # Step 4: query points latest values
         ################################################################################################################
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_energy_value_latest "
-                 " WHERE utc_date_time > %s ")
-        cursor_historical.execute(query, (datetime.utcnow() - timedelta(minutes=60),))
-        rows = cursor_historical.fetchall()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                latest_value_dict[row[0]] = [points_dict[row[0]][0],
-                                             points_dict[row[0]][1],
-                                             points_dict[row[0]][2],
-                                             row[1]]
-
-        ################################################################################################################
-        # Step 6: query digital points latest values
-        ################################################################################################################
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_digital_value_latest "
-                 " WHERE utc_date_time > %s ")
-        cursor_historical.execute(query, (datetime.utcnow() - timedelta(minutes=60),))
-        rows = cursor_historical.fetchall()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                latest_value_dict[row[0]] = [points_dict[row[0]][0],
-                                             points_dict[row[0]][1],
-                                             points_dict[row[0]][2],
-                                             row[1]]
+        latest_value_since = datetime.utcnow() - timedelta(minutes=60)
 
         ################################################################################################################
         # Step 7: query the points of BMSes
         ################################################################################################################
-        # query all points with units
-        query = (" SELECT id, units "
-                 " FROM tbl_points ")
-        cursor_system.execute(query)
-        rows = cursor_system.fetchall()
-
-        units_dict = dict()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                units_dict[row[0]] = row[1]
-
         # query bms parameters
         bms_list = list()
 
@@ -173,7 +109,7 @@ class Reporting:
                     bms_list.append(current_bms)
 
             for index, bms in enumerate(bms_list):
-                cursor_system.execute(" SELECT p.id "
+                cursor_system.execute(" SELECT p.id, p.name, p.units, p.description "
                                       " FROM tbl_energy_storage_containers_bmses_points bp, tbl_points p "
                                       " WHERE bp.bms_id = %s AND bp.point_id = p.id "
                                       " ORDER BY bp.id ",
@@ -182,9 +118,9 @@ class Reporting:
                 if rows_points is not None and len(rows_points) > 0:
                     point_list = list()
                     for row in rows_points:
-                        point = latest_value_dict.get(row[0], None)
-                        if point is not None:
-                            point_list.append(point)
+                        value = latestvalues.get_point_value(row[0], latest_value_since)
+                        if value is not None:
+                            point_list.append([row[1], row[2], row[3], value])
                     bms_list[index]['points'] = point_list
 
         if cursor_system:
@@ -192,10 +128,6 @@ class Reporting:
         if cnx_system:
             cnx_system.close()
 
-        if cursor_historical:
-            cursor_historical.close()
-        if cnx_historical:
-            cnx_historical.close()
         ################################################################################################################
         # Step 8: construct the report
         ################################################################################################################
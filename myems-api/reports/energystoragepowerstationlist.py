@@ -3,9 +3,21 @@ from datetime import datetime, timedelta, timezone
 import mysql.connector
 import simplejson as json
 from decimal import Decimal
+from core import fleetindex, latestvalues
 from core.useractivity import access_control
 import config
 
+BATTERY_OPERATING_STATES = {0: 'Reserved',
+                            1: 'Fault',
+                            2: 'Warning',
+                            3: 'Standby',
+                            4: 'ProhibitDisCharging',
+                            5: 'ProhibitCharging',
+                            6: 'Normal',
+                            7: 'Charging',
+                            8: 'Discharging',
+                            9: 'Idle'}
+
 
 class Reporting:
     def __init__(self):
@@ -37,32 +49,43 @@ class Reporting:
                                    description='API.INVALID_PRIVILEGE')
         user_id = row[0]
 
-        # Get all points latest values
-        digital_value_latest_dict = dict()
-        analog_value_latest_dict = dict()
-
-        cnx_historical_db = mysql.connector.connect(**config.myems_historical_db)
-        cursor_historical_db = cnx_historical_db.cursor()
-        query = (" SELECT point_id, utc_date_time, actual_value "
-                 " FROM tbl_digital_value_latest ")
-        cursor_historical_db.execute(query, )
-        rows = cursor_historical_db.fetchall()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                digital_value_latest_dict[row[0]] = {"utc_date_time": row[1],
-                                                     "actual_value": row[2]}
-        query = (" SELECT point_id, utc_date_time, actual_value "
-                 " FROM tbl_analog_value_latest ")
-        cursor_historical_db.execute(query,)
-        rows = cursor_historical_db.fetchall()
-        cursor_historical_db.close()
-        cnx_historical_db.close()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                analog_value_latest_dict[row[0]] = {"utc_date_time": row[1],
-                                                    "actual_value": row[2]}
+        # get energy storage power stations
+        cnx_system_db = mysql.connector.connect(**config.myems_system_db)
+        cursor_system_db = cnx_system_db.cursor()
+        query = (" SELECT m.id, m.name, m.uuid, "
+                 "        m.address, m.latitude, m.longitude, m.rated_capacity, m.rated_power, "
+                 "        m.description, m.phase_of_lifecycle, m.commissioning_date "
+                 " FROM tbl_energy_storage_power_stations m, tbl_energy_storage_power_stations_users mu "
+                 " WHERE m.id = mu.energy_storage_power_station_id AND mu.user_id = %s "
+                 " ORDER BY m.phase_of_lifecycle, m.id ")
+        cursor_system_db.execute(query, (user_id, ))
+        rows_energy_storage_power_stations = cursor_system_db.fetchall()
+        if rows_energy_storage_power_stations is None or len(rows_energy_storage_power_stations) == 0:
+            cursor_system_db.close()
+            cnx_system_db.close()
+            resp.text = json.dumps(list())
+            return
+        station_ids = [row[0] for row in rows_energy_storage_power_stations]
+        in_station_ids = " IN (" + ', '.join(['%s'] * len(station_ids)) + ") "
+
+        # get the points of the stations from the fleet index
+        station_points_dict = fleetindex.get_energy_storage_power_station_points(station_ids)
+
+        # get data sources latest seen datetime of the PCS run state points
+        data_source_ids = sorted({points['data_source_id'] for points in station_points_dict.values()
+                                  if points['data_source_id'] is not None})
+        last_seen_datetime_dict = dict()
+        if len(data_source_ids) > 0:
+            cursor_system_db.execute(" SELECT id, last_seen_datetime_utc "
+                                     " FROM tbl_data_sources "
+                                     " WHERE id IN (" + ', '.join(['%s'] * len(data_source_ids)) + ") ",
+                                     tuple(data_source_ids))
+            for row in cursor_system_db.fetchall():
+                last_seen_datetime_dict[row[0]] = row[1]
+        cursor_system_db.close()
+        cnx_system_db.close()
 
-        # get charge data in latest 24 hours
+        # get charge and discharge data in latest 24 hours of the stations
         timezone_offset = int(config.utc_offset[1:3]) * 60 + int(config.utc_offset[4:6])
         if config.utc_offset[0] == '-':
             timezone_offset = -timezone_offset
@@ -71,63 +94,41 @@ class Reporting:
         today_start_datetime_local = (reporting_end_datetime_utc.replace(tzinfo=timezone.utc) +
                                       timedelta(minutes=timezone_offset)).replace(hour=0, minute=0, second=0,
                                                                                   microsecond=0)
-        charge_report_dict = dict()
+        today_start_datetime_utc = today_start_datetime_local.replace(tzinfo=None) - timedelta(minutes=timezone_offset)
+
         cnx_energy_db = mysql.connector.connect(**config.myems_energy_db)
         cursor_energy_db = cnx_energy_db.cursor()
-
-        cursor_energy_db.execute(" SELECT energy_storage_power_station_id, start_datetime_utc, actual_value "
-                                 " FROM tbl_energy_storage_power_station_charge_hourly "
-                                 " WHERE start_datetime_utc >= %s "
-                                 "     AND start_datetime_utc < %s "
-                                 " ORDER BY energy_storage_power_station_id, start_datetime_utc ",
-                                 (reporting_start_datetime_utc,
-                                  reporting_end_datetime_utc))
-        rows_hourly = cursor_energy_db.fetchall()
-        if rows_hourly is not None and len(rows_hourly) > 0:
-            for row_hourly in rows_hourly:
-                if row_hourly[0] not in charge_report_dict.keys():
-                    charge_report_dict[row_hourly[0]] = dict()
-                    charge_report_dict[row_hourly[0]]['charge_times'] = list()
-                    charge_report_dict[row_hourly[0]]['charge_values'] = list()
-                    # today total charge, not 24 hours
-                    charge_report_dict[row_hourly[0]]['today_total_charge'] = Decimal(0.0)
-
-                current_datetime_local = row_hourly[1].replace(tzinfo=timezone.utc) + timedelta(
-                    minutes=timezone_offset)
-                charge_report_dict[row_hourly[0]]['charge_times'].append(
-                    current_datetime_local.isoformat()[11:16])
-                actual_value = Decimal(0.0) if row_hourly[2] is None else row_hourly[2]
-                charge_report_dict[row_hourly[0]]['charge_values'].append(actual_value)
-                if current_datetime_local >= today_start_datetime_local:
-                    charge_report_dict[row_hourly[0]]['today_total_charge'] += actual_value
-
-        # get discharge data in latest 24 hours
-        discharge_report_dict = dict()
-        cursor_energy_db.execute(" SELECT energy_storage_power_station_id, start_datetime_utc, actual_value "
-                                 " FROM tbl_energy_storage_power_station_discharge_hourly "
-                                 " WHERE start_datetime_utc >= %s "
-                                 "     AND start_datetime_utc < %s "
-                                 " ORDER BY energy_storage_power_station_id, start_datetime_utc ",
-                                 (reporting_start_datetime_utc,
-                                  reporting_end_datetime_utc))
-        rows_hourly = cursor_energy_db.fetchall()
-        if rows_hourly is not None and len(rows_hourly) > 0:
-            for row_hourly in rows_hourly:
-                if row_hourly[0] not in discharge_report_dict.keys():
-                    discharge_report_dict[row_hourly[0]] = dict()
-                    discharge_report_dict[row_hourly[0]]['discharge_times'] = list()
-                    discharge_report_dict[row_hourly[0]]['discharge_values'] = list()
-                    # today total discharge, not 24 hours
-                    discharge_report_dict[row_hourly[0]]['today_total_discharge'] = Decimal(0.0)
-
+        report_dict = dict()
+        for name in ('charge', 'discharge'):
+            table = 'tbl_energy_storage_power_station_' + name + '_hourly'
+            report_dict[name] = dict()
+            cursor_energy_db.execute(" SELECT energy_storage_power_station_id, start_datetime_utc, actual_value "
+                                     " FROM " + table +
+                                     " WHERE energy_storage_power_station_id " + in_station_ids +
+                                     "     AND start_datetime_utc >= %s "
+                                     "     AND start_datetime_utc < %s "
+                                     " ORDER BY energy_storage_power_station_id, start_datetime_utc ",
+                                     tuple(station_ids) + (reporting_start_datetime_utc, reporting_end_datetime_utc))
+            for row_hourly in cursor_energy_db.fetchall():
+                if row_hourly[0] not in report_dict[name]:
+                    report_dict[name][row_hourly[0]] = {'times': list(), 'values': list(), 'today_total': Decimal(0.0)}
                 current_datetime_local = row_hourly[1].replace(tzinfo=timezone.utc) + timedelta(
                     minutes=timezone_offset)
-                discharge_report_dict[row_hourly[0]]['discharge_times'].append(
-                    current_datetime_local.isoformat()[11:16])
-                actual_value = Decimal(0.0) if row_hourly[2] is None else row_hourly[2]
-                discharge_report_dict[row_hourly[0]]['discharge_values'].append(actual_value)
-                if current_datetime_local >= today_start_datetime_local:
-                    discharge_report_dict[row_hourly[0]]['today_total_discharge'] += actual_value
+                report_dict[name][row_hourly[0]]['times'].append(current_datetime_local.isoformat()[11:16])
+                report_dict[name][row_hourly[0]]['values'].append(
+                    Decimal(0.0) if row_hourly[2] is None else row_hourly[2])
+
+            # today total, not 24 hours
+            cursor_energy_db.execute(" SELECT energy_storage_power_station_id, SUM(actual_value) "
+                                     " FROM " + table +
+                                     " WHERE energy_storage_power_station_id " + in_station_ids +
+                                     "     AND start_datetime_utc >= %s "
+                                     "     AND start_datetime_utc < %s "
+                                     " GROUP BY energy_storage_power_station_id ",
+                                     tuple(station_ids) + (today_start_datetime_utc, reporting_end_datetime_utc))
+            for row in cursor_energy_db.fetchall():
+                if row[0] in report_dict[name] and row[1] is not None:
+                    report_dict[name][row[0]]['today_total'] = row[1]
 
         cursor_energy_db.close()
         cnx_energy_db.close()
@@ -144,216 +145,89 @@ class Reporting:
             default_time_list.append(current_datetime_local.isoformat()[11:16])
             default_value_list.append(Decimal(0.0))
             current_datetime_local = current_datetime_local + timedelta(hours=1)
-
-        # get energy storage power stations
-        cnx_system_db = mysql.connector.connect(**config.myems_system_db)
-        cursor_system_db = cnx_system_db.cursor()
-        query = (" SELECT m.id, m.name, m.uuid, "
-                 "        m.address, m.latitude, m.longitude, m.rated_capacity, m.rated_power, "
-                 "        m.description, m.phase_of_lifecycle, m.commissioning_date "
-                 " FROM tbl_energy_storage_power_stations m, tbl_energy_storage_power_stations_users mu "
-                 " WHERE m.id = mu.energy_storage_power_station_id AND mu.user_id = %s "
-                 " ORDER BY m.phase_of_lifecycle, m.id ")
-        cursor_system_db.execute(query, (user_id, ))
-        rows_energy_storage_power_stations = cursor_system_db.fetchall()
-        # get all digital value points definitions
-        point_definition_dict = dict()
-        query = (" SELECT id, definitions "
-                 " FROM tbl_points "
-                 " WHERE object_type = 'DIGITAL_VALUE' AND definitions IS NOT NULL ")
-        cursor_system_db.execute(query, ())
-        rows_point_definitions = cursor_system_db.fetchall()
-        if rows_point_definitions is not None and len(rows_point_definitions) > 0:
-            for row in rows_point_definitions:
-                try:
-                    definition = json.loads(row[1])
-                except Exception as e:
-                    print("Invalid point definitions in JSON " + str(e))
-                    continue
-                point_definition_dict[row[0]] = definition
+        default_report = {'times': default_time_list, 'values': default_value_list, 'today_total': Decimal(0.0)}
 
         # construct the report
         result = list()
-        if rows_energy_storage_power_stations is not None and len(rows_energy_storage_power_stations) > 0:
-            for row in rows_energy_storage_power_stations:
-                energy_storage_power_station_id = row[0]
-                # get is_online by data source latest seen datetime
-                query = (" SELECT tds.last_seen_datetime_utc   "
-                         " FROM tbl_energy_storage_power_stations_containers tespsesc, "
-                         "      tbl_energy_storage_containers_power_conversion_systems tescpcs, "
-                         "      tbl_points tp, tbl_data_sources tds  "
-                         " WHERE tespsesc.energy_storage_power_station_id  = %s "
-                         "        AND tespsesc.energy_storage_container_id = tescpcs.energy_storage_container_id  "
-                         "        AND tescpcs.run_state_point_id = tp.id  "
-                         "        AND tp.data_source_id = tds.id  "
-                         " LIMIT 1 ")
-                cursor_system_db.execute(query, (energy_storage_power_station_id,))
-                row_datetime = cursor_system_db.fetchone()
-
-                is_online = False
-                if row_datetime is not None and len(row_datetime) > 0:
-                    if isinstance(row_datetime[0], datetime):
-                        if row_datetime[0] + timedelta(minutes=10) > datetime.utcnow():
-                            is_online = True
-
+        for row in rows_energy_storage_power_stations:
+            energy_storage_power_station_id = row[0]
+            points = station_points_dict.get(energy_storage_power_station_id, dict())
+            # get is_online by data source latest seen datetime
+            is_online = False
+            last_seen_datetime_utc = last_seen_datetime_dict.get(points.get('data_source_id'))
+            if isinstance(last_seen_datetime_utc, datetime):
+                if last_seen_datetime_utc + timedelta(minutes=10) > datetime.utcnow():
+                    is_online = True
+
+            pcs_run_state = 'Unknown'
+            battery_operating_state = 'Unknown'
+            battery_soc_point_value = None
+            battery_power_point_value = None
+            if is_online:
                 # get PCS run state point
-                pcs_run_state_point_value = None
-                if is_online:
-                    query = (" SELECT tescpcs.run_state_point_id "
-                             " FROM tbl_energy_storage_power_stations_containers tespsesc, "
-                             "     tbl_energy_storage_containers_power_conversion_systems tescpcs "
-                             " WHERE tespsesc.energy_storage_power_station_id  = %s "
-                             "       AND tespsesc.energy_storage_container_id = tescpcs.energy_storage_container_id "
-                             " LIMIT 1 ")
-                    cursor_system_db.execute(query, (energy_storage_power_station_id,))
-                    row_point = cursor_system_db.fetchone()
-                    if row_point is not None and len(row_point) > 0:
-                        if digital_value_latest_dict.get(row_point[0]) is not None:
-                            pcs_run_state_point_value = digital_value_latest_dict.get(row_point[0])['actual_value']
-
-                    # 0：关闭 Shutdown
-                    # 1：软启动中 Soft Starting
-                    # 2：并网充电 On Grid Charging
-                    # 3：并网放电 On Grid DisCharging
-                    # 4：离网放电 Off Grid DisCharging
-                    # 5：降额并网 Derating On Grid
-                    # 6：待机 Standby
-                    # 7：离网充电 Off Grid Charging
-                    print(pcs_run_state_point_value)
-                    if point_definition_dict.get(row_point[0]) is not None:
-                        definition = point_definition_dict.get(row_point[0])
-                        print(definition)
-                        pcs_run_state = definition.get(str(pcs_run_state_point_value))
+                pcs_run_state_point_value = latestvalues.get_value('digital', points.get('run_state_point_id'))
+
+                # 0：关闭 Shutdown
+                # 1：软启动中 Soft Starting
+                # 2：并网充电 On Grid Charging
+                # 3：并网放电 On Grid DisCharging
+                # 4：离网放电 Off Grid DisCharging
+                # 5：降额并网 Derating On Grid
+                # 6：待机 Standby
+                # 7：离网充电 Off Grid Charging
+                definition = fleetindex.get_point_definition(points.get('run_state_point_id'))
+                if definition is not None:
+                    pcs_run_state = definition.get(str(pcs_run_state_point_value))
+                else:
+                    if pcs_run_state_point_value is None:
+                        pcs_run_state = 'Unknown'
+                    elif pcs_run_state_point_value == 0:
+                        pcs_run_state = 'Shutdown'
+                    elif pcs_run_state_point_value == 6:
+                        pcs_run_state = 'Standby'
                     else:
-                        if pcs_run_state_point_value is None:
-                            pcs_run_state = 'Unknown'
-                        elif pcs_run_state_point_value == 0:
-                            pcs_run_state = 'Shutdown'
-                        elif pcs_run_state_point_value == 1:
-                            pcs_run_state = 'Running'
-                        elif pcs_run_state_point_value == 2:
-                            pcs_run_state = 'Running'
-                        elif pcs_run_state_point_value == 3:
-                            pcs_run_state = 'Running'
-                        elif pcs_run_state_point_value == 4:
-                            pcs_run_state = 'Running'
-                        elif pcs_run_state_point_value == 5:
-                            pcs_run_state = 'Running'
-                        elif pcs_run_state_point_value == 6:
-                            pcs_run_state = 'Standby'
-                        elif pcs_run_state_point_value == 7:
-                            pcs_run_state = 'Running'
-                        else:
-                            pcs_run_state = 'Running'
+                        pcs_run_state = 'Running'
 
                 # get battery state point
-                battery_state_point_value = None
-                if is_online:
-                    query = (" SELECT tescb.battery_state_point_id "
-                             " FROM tbl_energy_storage_power_stations_containers tespsesc, "
-                             "      tbl_energy_storage_containers_batteries tescb "
-                             " WHERE tespsesc.energy_storage_power_station_id = %s "
-                             "       AND tespsesc.energy_storage_container_id = tescb.energy_storage_container_id "
-                             " LIMIT 1 ")
-                    cursor_system_db.execute(query, (energy_storage_power_station_id,))
-                    row_point = cursor_system_db.fetchone()
-                    if row_point is not None and len(row_point) > 0:
-                        if digital_value_latest_dict.get(row_point[0]) is not None:
-                            battery_state_point_value = digital_value_latest_dict.get(row_point[0])['actual_value']
+                battery_state_point_value = latestvalues.get_value('digital', points.get('battery_state_point_id'))
 
-                    # 0预留 1故障  2预警  3待机  4禁放  5禁充  6正常 7充电 8放电 9空闲
-                    print(battery_state_point_value)
-                    if point_definition_dict.get(row_point[0]) is not None:
-                        definition = point_definition_dict.get(row_point[0])
-                        print(definition)
-                        battery_operating_state = definition.get(str(battery_state_point_value))
-                    else:
-                        if battery_state_point_value is None:
-                            battery_operating_state = 'Unknown'
-                        elif battery_state_point_value == 0:
-                            battery_operating_state = 'Reserved'
-                        elif battery_state_point_value == 1:
-                            battery_operating_state = 'Fault'
-                        elif battery_state_point_value == 2:
-                            battery_operating_state = 'Warning'
-                        elif battery_state_point_value == 3:
-                            battery_operating_state = 'Standby'
-                        elif battery_state_point_value == 4:
-                            battery_operating_state = 'ProhibitDisCharging'
-                        elif battery_state_point_value == 5:
-                            battery_operating_state = 'ProhibitCharging'
-                        elif battery_state_point_value == 6:
-                            battery_operating_state = 'Normal'
-                        elif battery_state_point_value == 7:
-                            battery_operating_state = 'Charging'
-                        elif battery_state_point_value == 8:
-                            battery_operating_state = 'Discharging'
-                        elif battery_state_point_value == 9:
-                            battery_operating_state = 'Idle'
-                        else:
-                            battery_operating_state = 'Unknown'
+                # 0预留 1故障  2预警  3待机  4禁放  5禁充  6正常 7充电 8放电 9空闲
+                definition = fleetindex.get_point_definition(points.get('battery_state_point_id'))
+                if definition is not None:
+                    battery_operating_state = definition.get(str(battery_state_point_value))
+                else:
+                    battery_operating_state = BATTERY_OPERATING_STATES.get(battery_state_point_value, 'Unknown')
 
                 # get battery soc point, power point
-                battery_soc_point_value = None
-                battery_power_point_value = None
-                if is_online:
-                    query = (" SELECT tescb.soc_point_id, tescb.power_point_id "
-                             " FROM tbl_energy_storage_power_stations_containers tespsc, "
-                             "      tbl_energy_storage_containers_batteries tescb "
-                             " WHERE tespsc.energy_storage_power_station_id = %s "
-                             "       AND tespsc.energy_storage_container_id = tescb.energy_storage_container_id "
-                             " LIMIT 1 ")
-                    cursor_system_db.execute(query, (energy_storage_power_station_id,))
-                    row_point = cursor_system_db.fetchone()
-                    if row_point is not None and len(row_point) > 0:
-                        if analog_value_latest_dict.get(row_point[0]) is not None:
-                            battery_soc_point_value = analog_value_latest_dict.get(row_point[0])['actual_value']
-                        if analog_value_latest_dict.get(row_point[1]) is not None:
-                            battery_power_point_value = analog_value_latest_dict.get(row_point[1])['actual_value']
+                battery_soc_point_value = latestvalues.get_value('analog', points.get('soc_point_id'))
+                battery_power_point_value = latestvalues.get_value('analog', points.get('power_point_id'))
+
+            charge_report = report_dict['charge'].get(energy_storage_power_station_id, default_report)
+            discharge_report = report_dict['discharge'].get(energy_storage_power_station_id, default_report)
+            meta_result = {"id": energy_storage_power_station_id,
+                           "name": row[1],
+                           "uuid": row[2],
+                           "address": row[3],
+                           "latitude": row[4],
+                           "longitude": row[5],
+                           "rated_capacity": row[6],
+                           "rated_power": row[7],
+                           "description": row[8],
+                           "phase_of_lifecycle": row[9],
+                           "commissioning_date": str(row[10]) if row[10] is not None else None,
+                           "qrcode": 'energystoragepowerstation:' + row[2],
+                           "is_online": is_online,
+                           "pcs_run_state": pcs_run_state,
+                           "battery_operating_state": battery_operating_state,
+                           "battery_soc_point_value": battery_soc_point_value,
+                           "battery_power_point_value": battery_power_point_value,
+                           "charge_times": charge_report['times'],
+                           "charge_values": charge_report['values'],
+                           "today_total_charge": charge_report['today_total'],
+                           "discharge_times": discharge_report['times'],
+                           "discharge_values": discharge_report['values'],
+                           "today_total_discharge": discharge_report['today_total'],
+                           }
+            result.append(meta_result)
 
-                # complete the charge_report_dict
-                if energy_storage_power_station_id not in charge_report_dict.keys():
-                    charge_report_dict[energy_storage_power_station_id] = dict()
-                    charge_report_dict[energy_storage_power_station_id]['charge_times'] = default_time_list
-                    charge_report_dict[energy_storage_power_station_id]['charge_values'] = default_value_list
-                    charge_report_dict[energy_storage_power_station_id]['today_total_charge'] = Decimal(0.0)
-
-                if energy_storage_power_station_id not in discharge_report_dict.keys():
-                    discharge_report_dict[energy_storage_power_station_id] = dict()
-                    discharge_report_dict[energy_storage_power_station_id]['discharge_times'] = default_time_list
-                    discharge_report_dict[energy_storage_power_station_id]['discharge_values'] = default_value_list
-                    discharge_report_dict[energy_storage_power_station_id]['today_total_discharge'] = Decimal(0.0)
-
-                meta_result = {"id": energy_storage_power_station_id,
-                               "name": row[1],
-                               "uuid": row[2],
-                               "address": row[3],
-                               "latitude": row[4],
-                               "longitude": row[5],
-                               "rated_capacity": row[6],
-                               "rated_power": row[7],
-                               "description": row[8],
-                               "phase_of_lifecycle": row[9],
-                               "commissioning_date": str(row[10]) if row[10] is not None else None,
-                               "qrcode": 'energystoragepowerstation:' + row[2],
-                               "is_online": is_online,
-                               "pcs_run_state": pcs_run_state,
-                               "battery_operating_state": battery_operating_state,
-                               "battery_soc_point_value": battery_soc_point_value,
-                               "battery_power_point_value": battery_power_point_value,
-                               "charge_times": charge_report_dict[energy_storage_power_station_id]['charge_times'],
-                               "charge_values": charge_report_dict[energy_storage_power_station_id]['charge_values'],
-                               "today_total_charge":
-                                   charge_report_dict[energy_storage_power_station_id]['today_total_charge'],
-                               "discharge_times":
-                                   discharge_report_dict[energy_storage_power_station_id]['discharge_times'],
-                               "discharge_values":
-                                   discharge_report_dict[energy_storage_power_station_id]['discharge_values'],
-                               "today_total_discharge":
-                                   discharge_report_dict[energy_storage_power_station_id]['today_total_discharge'],
-                               }
-                result.append(meta_result)
-
-        cursor_system_db.close()
-        cnx_system_db.close()
         resp.text = json.dumps(result)
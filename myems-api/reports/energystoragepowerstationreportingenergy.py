@@ -3,10 +3,9 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import falcon
 import mysql.connector
-import simplejson as json
 import config
 import excelexporters.energystoragepowerstationreportingenergy
-from core import utilities
+from core import payloadencoding, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -623,7 +622,7 @@ class Reporting:
                 result['reporting_period']['deeps'].append(meta_report['deep'])
 
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = \
                 excelexporters.energystoragepowerstationreportingenergy.\
                 export(result,
@@ -632,4 +631,4 @@ class Reporting:
                        reporting_period_end_datetime_local,
                        period_type,
                        language)
-        resp.text = json.dumps(result)
+        resp.text = payloadencoding.dumps(req, result)
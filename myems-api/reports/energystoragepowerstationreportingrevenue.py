@@ -3,10 +3,9 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import falcon
 import mysql.connector
-import simplejson as json
 import config
 import excelexporters.energystoragepowerstationreportingrevenue
-from core import utilities
+from core import payloadencoding, revenue, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -24,12 +23,8 @@ class Reporting:
     # PROCEDURES
     # Step 1: valid parameters
     # Step 2: query the energy storage power station
-    # Step 3: query billing charge data
-    # Step 4: query billing discharge data
-    # Step 5: query billing grid buy data
-    # Step 6: query billing grid sell data
-    # Step 7: query billing load data
-    # Step 8: construct the report
+    # Step 3: query billing data of the station tables
+    # Step 4: construct the report
     ####################################################################################################################
     @staticmethod
     def on_get(req, resp):
@@ -226,7 +221,7 @@ class Reporting:
                            "qrcode": 'energy_storage_power_station:' + row[2]}
 
         ################################################################################################################
-        # Step 3: query billing charge data
+        # Step 3: query billing data of the station tables
         ################################################################################################################
         timezone_offset = int(config.utc_offset[1:3]) * 60 + int(config.utc_offset[4:6])
         if config.utc_offset[0] == '-':
@@ -235,34 +230,40 @@ class Reporting:
         energy_category_id = 1
         meta_report_list = list()
 
-        cursor_billing.execute(" SELECT start_datetime_utc, actual_value "
-                               " FROM tbl_energy_storage_power_station_charge_hourly "
-                               " WHERE energy_storage_power_station_id = %s "
-                               "     AND start_datetime_utc >= %s "
-                               "     AND start_datetime_utc < %s "
-                               " ORDER BY start_datetime_utc ",
-                               (energy_storage_power_station_id,
-                                reporting_start_datetime_utc,
-                                reporting_end_datetime_utc))
-        rows_hourly = cursor_billing.fetchall()
-        if rows_hourly is not None and len(rows_hourly) > 0:
-            rows_meter_periodically = utilities.aggregate_hourly_data_by_period(rows_hourly,
-                                                                                reporting_start_datetime_utc,
-                                                                                reporting_end_datetime_utc,
-                                                                                period_type)
+        station_tables = [('tbl_energy_storage_power_station_charge_hourly', '充'),
+                          ('tbl_energy_storage_power_station_discharge_hourly', '放'),
+                          ('tbl_energy_storage_power_station_grid_buy_hourly', '网购'),
+                          ('tbl_energy_storage_power_station_grid_sell_hourly', '网售'),
+                          ('tbl_energy_storage_power_station_load_hourly', '荷')]
+        series_list = revenue.load_table_series(cursor_billing,
+                                                [table for table, _ in station_tables],
+                                                'energy_storage_power_station_id',
+                                                energy_storage_power_station_id,
+                                                reporting_start_datetime_utc,
+                                                reporting_end_datetime_utc)
+        # the tariff is the same for all tables
+        peak_types = dict()
+        if meta_result['cost_center'] is not None and any(len(series) > 0 for series in series_list):
+            peak_types = utilities.get_energy_category_peak_types(meta_result['cost_center']['id'],
+                                                                  energy_category_id,
+                                                                  reporting_start_datetime_utc,
+                                                                  reporting_end_datetime_utc)
+
+        for (table, name), series in zip(station_tables, series_list):
+            if len(series) == 0:
+                continue
+            rows_meter_periodically = revenue.aggregate_by_period(series,
+                                                                  reporting_start_datetime_utc,
+                                                                  reporting_end_datetime_utc,
+                                                                  period_type)
             meter_report = dict()
-            meter_report['name'] = '充'
+            meter_report['name'] = name
             meter_report['energy_category_id'] = energy_category_id
             meter_report['unit_of_measure'] = \
                 energy_category_dict[energy_category_id]['unit_of_measure']
             meter_report['timestamps'] = list()
             meter_report['values'] = list()
             meter_report['subtotal'] = Decimal(0.0)
-            meter_report['toppeak'] = Decimal(0.0)
-            meter_report['onpeak'] = Decimal(0.0)
-            meter_report['midpeak'] = Decimal(0.0)
-            meter_report['offpeak'] = Decimal(0.0)
-            meter_report['deep'] = Decimal(0.0)
 
             for row_periodically in rows_meter_periodically:
                 current_datetime_local = row_periodically[0].replace(tzinfo=timezone.utc) + \
@@ -278,303 +279,12 @@ class Reporting:
                 elif period_type == 'yearly':
                     current_datetime = current_datetime_local.isoformat()[0:4]
 
-                actual_value = Decimal(0.0) if row_periodically[1] is None else row_periodically[1]
+                actual_value = row_periodically[1]
                 meter_report['timestamps'].append(current_datetime)
                 meter_report['values'].append(actual_value)
                 meter_report['subtotal'] += actual_value
 
-            tariff_dict = utilities.get_energy_category_peak_types(meta_result['cost_center']['id'],
-                                                                   energy_category_id,
-                                                                   reporting_start_datetime_utc,
-                                                                   reporting_end_datetime_utc)
-            for row in rows_hourly:
-                peak_type = tariff_dict.get(row[0], None)
-                if peak_type == 'toppeak':
-                    meter_report['toppeak'] += row[1]
-                elif peak_type == 'onpeak':
-                    meter_report['onpeak'] += row[1]
-                elif peak_type == 'midpeak':
-                    meter_report['midpeak'] += row[1]
-                elif peak_type == 'offpeak':
-                    meter_report['offpeak'] += row[1]
-                elif peak_type == 'deep':
-                    meter_report['deep'] += row[1]
-
-            meta_report_list.append(meter_report)
-        ################################################################################################################
-        # Step 4: query billing discharge data
-        ################################################################################################################
-        cursor_billing.execute(" SELECT start_datetime_utc, actual_value "
-                               " FROM tbl_energy_storage_power_station_discharge_hourly "
-                               " WHERE energy_storage_power_station_id = %s "
-                               "     AND start_datetime_utc >= %s "
-                               "     AND start_datetime_utc < %s "
-                               " ORDER BY start_datetime_utc ",
-                               (energy_storage_power_station_id,
-                                reporting_start_datetime_utc,
-                                reporting_end_datetime_utc))
-        rows_hourly = cursor_billing.fetchall()
-        if rows_hourly is not None and len(rows_hourly) > 0:
-            rows_meter_periodically = utilities.aggregate_hourly_data_by_period(rows_hourly,
-                                                                                reporting_start_datetime_utc,
-                                                                                reporting_end_datetime_utc,
-                                                                                period_type)
-            meter_report = dict()
-            meter_report['name'] = '放'
-            meter_report['energy_category_id'] = energy_category_id
-            meter_report['unit_of_measure'] = \
-                energy_category_dict[energy_category_id]['unit_of_measure']
-            meter_report['timestamps'] = list()
-            meter_report['values'] = list()
-            meter_report['subtotal'] = Decimal(0.0)
-            meter_report['toppeak'] = Decimal(0.0)
-            meter_report['onpeak'] = Decimal(0.0)
-            meter_report['midpeak'] = Decimal(0.0)
-            meter_report['offpeak'] = Decimal(0.0)
-            meter_report['deep'] = Decimal(0.0)
-
-            for row_periodically in rows_meter_periodically:
-                current_datetime_local = row_periodically[0].replace(tzinfo=timezone.utc) + \
-                                         timedelta(minutes=timezone_offset)
-                if period_type == 'hourly':
-                    current_datetime = current_datetime_local.isoformat()[0:19]
-                elif period_type == 'daily':
-                    current_datetime = current_datetime_local.isoformat()[0:10]
-                elif period_type == 'weekly':
-                    current_datetime = current_datetime_local.isoformat()[0:10]
-                elif period_type == 'monthly':
-                    current_datetime = current_datetime_local.isoformat()[0:7]
-                elif period_type == 'yearly':
-                    current_datetime = current_datetime_local.isoformat()[0:4]
-
-                actual_value = Decimal(0.0) if row_periodically[1] is None else row_periodically[1]
-                meter_report['timestamps'].append(current_datetime)
-                meter_report['values'].append(actual_value)
-                meter_report['subtotal'] += actual_value
-
-            tariff_dict = utilities.get_energy_category_peak_types(meta_result['cost_center']['id'],
-                                                                   energy_category_id,
-                                                                   reporting_start_datetime_utc,
-                                                                   reporting_end_datetime_utc)
-            for row in rows_hourly:
-                peak_type = tariff_dict.get(row[0], None)
-                if peak_type == 'toppeak':
-                    meter_report['toppeak'] += row[1]
-                elif peak_type == 'onpeak':
-                    meter_report['onpeak'] += row[1]
-                elif peak_type == 'midpeak':
-                    meter_report['midpeak'] += row[1]
-                elif peak_type == 'offpeak':
-                    meter_report['offpeak'] += row[1]
-                elif peak_type == 'deep':
-                    meter_report['deep'] += row[1]
-
-            meta_report_list.append(meter_report)
-        ################################################################################################################
-        # Step 5: query billing grid buy data
-        ################################################################################################################
-        cursor_billing.execute(" SELECT start_datetime_utc, actual_value "
-                               " FROM tbl_energy_storage_power_station_grid_buy_hourly "
-                               " WHERE energy_storage_power_station_id = %s "
-                               "     AND start_datetime_utc >= %s "
-                               "     AND start_datetime_utc < %s "
-                               " ORDER BY start_datetime_utc ",
-                               (energy_storage_power_station_id,
-                                reporting_start_datetime_utc,
-                                reporting_end_datetime_utc))
-        rows_hourly = cursor_billing.fetchall()
-        if rows_hourly is not None and len(rows_hourly) > 0:
-            rows_meter_periodically = utilities.aggregate_hourly_data_by_period(rows_hourly,
-                                                                                reporting_start_datetime_utc,
-                                                                                reporting_end_datetime_utc,
-                                                                                period_type)
-            meter_report = dict()
-            meter_report['name'] = '网购'
-            meter_report['energy_category_id'] = energy_category_id
-            meter_report['unit_of_measure'] = \
-                energy_category_dict[energy_category_id]['unit_of_measure']
-            meter_report['timestamps'] = list()
-            meter_report['values'] = list()
-            meter_report['subtotal'] = Decimal(0.0)
-            meter_report['toppeak'] = Decimal(0.0)
-            meter_report['onpeak'] = Decimal(0.0)
-            meter_report['midpeak'] = Decimal(0.0)
-            meter_report['offpeak'] = Decimal(0.0)
-            meter_report['deep'] = Decimal(0.0)
-
-            for row_periodically in rows_meter_periodically:
-                current_datetime_local = row_periodically[0].replace(tzinfo=timezone.utc) + \
-                                         timedelta(minutes=timezone_offset)
-                if period_type == 'hourly':
-                    current_datetime = current_datetime_local.isoformat()[0:19]
-                elif period_type == 'daily':
-                    current_datetime = current_datetime_local.isoformat()[0:10]
-                elif period_type == 'weekly':
-                    current_datetime = current_datetime_local.isoformat()[0:10]
-                elif period_type == 'monthly':
-                    current_datetime = current_datetime_local.isoformat()[0:7]
-                elif period_type == 'yearly':
-                    current_datetime = current_datetime_local.isoformat()[0:4]
-
-                actual_value = Decimal(0.0) if row_periodically[1] is None else row_periodically[1]
-                meter_report['timestamps'].append(current_datetime)
-                meter_report['values'].append(actual_value)
-                meter_report['subtotal'] += actual_value
-
-            tariff_dict = utilities.get_energy_category_peak_types(meta_result['cost_center']['id'],
-                                                                   energy_category_id,
-                                                                   reporting_start_datetime_utc,
-                                                                   reporting_end_datetime_utc)
-            for row in rows_hourly:
-                peak_type = tariff_dict.get(row[0], None)
-                if peak_type == 'toppeak':
-                    meter_report['toppeak'] += row[1]
-                elif peak_type == 'onpeak':
-                    meter_report['onpeak'] += row[1]
-                elif peak_type == 'midpeak':
-                    meter_report['midpeak'] += row[1]
-                elif peak_type == 'offpeak':
-                    meter_report['offpeak'] += row[1]
-                elif peak_type == 'deep':
-                    meter_report['deep'] += row[1]
-
-            meta_report_list.append(meter_report)
-        ################################################################################################################
-        # Step 6: query billing grid sell data
-        ################################################################################################################
-        cursor_billing.execute(" SELECT start_datetime_utc, actual_value "
-                               " FROM tbl_energy_storage_power_station_grid_sell_hourly "
-                               " WHERE energy_storage_power_station_id = %s "
-                               "     AND start_datetime_utc >= %s "
-                               "     AND start_datetime_utc < %s "
-                               " ORDER BY start_datetime_utc ",
-                               (energy_storage_power_station_id,
-                                reporting_start_datetime_utc,
-                                reporting_end_datetime_utc))
-        rows_hourly = cursor_billing.fetchall()
-        if rows_hourly is not None and len(rows_hourly) > 0:
-            rows_meter_periodically = utilities.aggregate_hourly_data_by_period(rows_hourly,
-                                                                                reporting_start_datetime_utc,
-                                                                                reporting_end_datetime_utc,
-                                                                                period_type)
-            meter_report = dict()
-            meter_report['name'] = '网售'
-            meter_report['energy_category_id'] = energy_category_id
-            meter_report['unit_of_measure'] = \
-                energy_category_dict[energy_category_id]['unit_of_measure']
-            meter_report['timestamps'] = list()
-            meter_report['values'] = list()
-            meter_report['subtotal'] = Decimal(0.0)
-            meter_report['toppeak'] = Decimal(0.0)
-            meter_report['onpeak'] = Decimal(0.0)
-            meter_report['midpeak'] = Decimal(0.0)
-            meter_report['offpeak'] = Decimal(0.0)
-            meter_report['deep'] = Decimal(0.0)
-
-            for row_periodically in rows_meter_periodically:
-                current_datetime_local = row_periodically[0].replace(tzinfo=timezone.utc) + \
-                                         timedelta(minutes=timezone_offset)
-                if period_type == 'hourly':
-                    current_datetime = current_datetime_local.isoformat()[0:19]
-                elif period_type == 'daily':
-                    current_datetime = current_datetime_local.isoformat()[0:10]
-                elif period_type == 'weekly':
-                    current_datetime = current_datetime_local.isoformat()[0:10]
-                elif period_type == 'monthly':
-                    current_datetime = current_datetime_local.isoformat()[0:7]
-                elif period_type == 'yearly':
-                    current_datetime = current_datetime_local.isoformat()[0:4]
-
-                actual_value = Decimal(0.0) if row_periodically[1] is None else row_periodically[1]
-                meter_report['timestamps'].append(current_datetime)
-                meter_report['values'].append(actual_value)
-                meter_report['subtotal'] += actual_value
-
-            tariff_dict = utilities.get_energy_category_peak_types(meta_result['cost_center']['id'],
-                                                                   energy_category_id,
-                                                                   reporting_start_datetime_utc,
-                                                                   reporting_end_datetime_utc)
-            for row in rows_hourly:
-                peak_type = tariff_dict.get(row[0], None)
-                if peak_type == 'toppeak':
-                    meter_report['toppeak'] += row[1]
-                elif peak_type == 'onpeak':
-                    meter_report['onpeak'] += row[1]
-                elif peak_type == 'midpeak':
-                    meter_report['midpeak'] += row[1]
-                elif peak_type == 'offpeak':
-                    meter_report['offpeak'] += row[1]
-                elif peak_type == 'deep':
-                    meter_report['deep'] += row[1]
-
-            meta_report_list.append(meter_report)
-        ################################################################################################################
-        # Step 7: query billing load data
-        ################################################################################################################
-        cursor_billing.execute(" SELECT start_datetime_utc, actual_value "
-                               " FROM tbl_energy_storage_power_station_load_hourly "
-                               " WHERE energy_storage_power_station_id = %s "
-                               "     AND start_datetime_utc >= %s "
-                               "     AND start_datetime_utc < %s "
-                               " ORDER BY start_datetime_utc ",
-                               (energy_storage_power_station_id,
-                                reporting_start_datetime_utc,
-                                reporting_end_datetime_utc))
-        rows_hourly = cursor_billing.fetchall()
-        if rows_hourly is not None and len(rows_hourly) > 0:
-            rows_meter_periodically = utilities.aggregate_hourly_data_by_period(rows_hourly,
-                                                                                reporting_start_datetime_utc,
-                                                                                reporting_end_datetime_utc,
-                                                                                period_type)
-            meter_report = dict()
-            meter_report['name'] = '荷'
-            meter_report['energy_category_id'] = energy_category_id
-            meter_report['unit_of_measure'] = \
-                energy_category_dict[energy_category_id]['unit_of_measure']
-            meter_report['timestamps'] = list()
-            meter_report['values'] = list()
-            meter_report['subtotal'] = Decimal(0.0)
-            meter_report['toppeak'] = Decimal(0.0)
-            meter_report['onpeak'] = Decimal(0.0)
-            meter_report['midpeak'] = Decimal(0.0)
-            meter_report['offpeak'] = Decimal(0.0)
-            meter_report['deep'] = Decimal(0.0)
-
-            for row_periodically in rows_meter_periodically:
-                current_datetime_local = row_periodically[0].replace(tzinfo=timezone.utc) + \
-                                         timedelta(minutes=timezone_offset)
-                if period_type == 'hourly':
-                    current_datetime = current_datetime_local.isoformat()[0:19]
-                elif period_type == 'daily':
-                    current_datetime = current_datetime_local.isoformat()[0:10]
-                elif period_type == 'weekly':
-                    current_datetime = current_datetime_local.isoformat()[0:10]
-                elif period_type == 'monthly':
-                    current_datetime = current_datetime_local.isoformat()[0:7]
-                elif period_type == 'yearly':
-                    current_datetime = current_datetime_local.isoformat()[0:4]
-
-                actual_value = Decimal(0.0) if row_periodically[1] is None else row_periodically[1]
-                meter_report['timestamps'].append(current_datetime)
-                meter_report['values'].append(actual_value)
-                meter_report['subtotal'] += actual_value
-
-            tariff_dict = utilities.get_energy_category_peak_types(meta_result['cost_center']['id'],
-                                                                   energy_category_id,
-                                                                   reporting_start_datetime_utc,
-                                                                   reporting_end_datetime_utc)
-            for row in rows_hourly:
-                peak_type = tariff_dict.get(row[0], None)
-                if peak_type == 'toppeak':
-                    meter_report['toppeak'] += row[1]
-                elif peak_type == 'onpeak':
-                    meter_report['onpeak'] += row[1]
-                elif peak_type == 'midpeak':
-                    meter_report['midpeak'] += row[1]
-                elif peak_type == 'offpeak':
-                    meter_report['offpeak'] += row[1]
-                elif peak_type == 'deep':
-                    meter_report['deep'] += row[1]
+            meter_report.update(revenue.split_by_peak_types(series, peak_types))
 
             meta_report_list.append(meter_report)
 
@@ -593,7 +303,7 @@ class Reporting:
         if cnx_historical:
             cnx_historical.close()
         ################################################################################################################
-        # Step 8: construct the report
+        # Step 4: construct the report
         ################################################################################################################
         result = dict()
         result['energy_storage_power_station'] = meta_result
@@ -626,7 +336,7 @@ class Reporting:
                 result['reporting_period']['deeps'].append(meter_report['deep'])
 
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = \
                 excelexporters.energystoragepowerstationreportingrevenue.\
                 export(result,
@@ -635,4 +345,4 @@ class Reporting:
                        reporting_period_end_datetime_local,
                        period_type,
                        language)
-        resp.text = json.dumps(result)
+        resp.text = payloadencoding.dumps(req, result)
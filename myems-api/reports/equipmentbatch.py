@@ -3,9 +3,9 @@ from decimal import Decimal
 import falcon
 import mysql.connector
 import simplejson as json
-from anytree import AnyNode, LevelOrderIter
 import config
 import excelexporters.equipmentbatch
+from core import queryexecutor, topology, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -22,7 +22,7 @@ class Reporting:
     ####################################################################################################################
     # PROCEDURES
     # Step 1: valid parameters
-    # Step 2: build a space tree
+    # Step 2: get the equipments in the space tree from the topology index
     # Step 3: query all equipments in the space tree
     # Step 4: query energy categories
     # Step 5: query reporting period energy input
@@ -123,46 +123,32 @@ class Reporting:
             space_name = row[0]
 
         ################################################################################################################
-        # Step 2: build a space tree
+        # Step 2: get the equipments in the space tree from the topology index
         ################################################################################################################
-
-        query = (" SELECT id, name, parent_space_id "
-                 " FROM tbl_spaces "
-                 " ORDER BY id ")
-        cursor_system_db.execute(query)
-        rows_spaces = cursor_system_db.fetchall()
-        node_dict = dict()
-        if rows_spaces is not None and len(rows_spaces) > 0:
-            for row in rows_spaces:
-                parent_node = node_dict[row[2]] if row[2] is not None else None
-                node_dict[row[0]] = AnyNode(id=row[0], parent=parent_node, name=row[1])
+        equipment_space_dict = topology.get_subtree_entities(space_id, 'equipment')
 
         ################################################################################################################
         # Step 3: query all equipments in the space tree
         ################################################################################################################
         equipment_dict = dict()
-        space_dict = dict()
-
-        for node in LevelOrderIter(node_dict[space_id]):
-            space_dict[node.id] = node.name
 
-        cursor_system_db.execute(" SELECT e.id, e.name AS equipment_name, "
-                                 "        e.uuid AS equipment_uuid, s.name AS space_name, "
-                                 "        cc.name AS cost_center_name, e.description "
-                                 " FROM tbl_spaces s, tbl_spaces_equipments se, "
-                                 "      tbl_equipments e, tbl_cost_centers cc "
-                                 " WHERE s.id IN ( " + ', '.join(map(str, space_dict.keys())) + ") "
-                                 "       AND se.space_id = s.id AND se.equipment_id = e.id "
-                                 "       AND e.cost_center_id = cc.id  ", )
-        rows_equipments = cursor_system_db.fetchall()
-        if rows_equipments is not None and len(rows_equipments) > 0:
-            for row in rows_equipments:
-                equipment_dict[row[0]] = {"equipment_name": row[1],
-                                          "equipment_uuid": row[2],
-                                          "space_name": row[3],
-                                          "cost_center_name": row[4],
-                                          "description": row[5],
-                                          "values": list()}
+        if len(equipment_space_dict) > 0:
+            cursor_system_db.execute(" SELECT e.id, e.name AS equipment_name, "
+                                     "        e.uuid AS equipment_uuid, "
+                                     "        cc.name AS cost_center_name, e.description "
+                                     " FROM tbl_equipments e, tbl_cost_centers cc "
+                                     " WHERE e.id IN ( " + ', '.join(map(str, equipment_space_dict.keys())) + ") "
+                                     "       AND e.cost_center_id = cc.id "
+                                     " ORDER BY e.id ", )
+            rows_equipments = cursor_system_db.fetchall()
+            if rows_equipments is not None and len(rows_equipments) > 0:
+                for row in rows_equipments:
+                    equipment_dict[row[0]] = {"equipment_name": row[1],
+                                              "equipment_uuid": row[2],
+                                              "space_name": equipment_space_dict[row[0]],
+                                              "cost_center_name": row[3],
+                                              "description": row[4],
+                                              "values": list()}
 
         ################################################################################################################
         # Step 4: query energy categories
@@ -210,24 +196,16 @@ class Reporting:
         ################################################################################################################
         # Step 5: query reporting period energy input
         ################################################################################################################
+        equipment_aggregates = \
+            queryexecutor.fetch_category_aggregates('myems_energy_db', 'tbl_equipment_input_category_hourly',
+                                                    'equipment_id', list(equipment_dict.keys()),
+                                                    reporting_start_datetime_utc, reporting_end_datetime_utc)
         for equipment_id in equipment_dict:
-
-            cursor_energy_db.execute(" SELECT energy_category_id, SUM(actual_value) "
-                                     " FROM tbl_equipment_input_category_hourly "
-                                     " WHERE equipment_id = %s "
-                                     "     AND start_datetime_utc >= %s "
-                                     "     AND start_datetime_utc < %s "
-                                     " GROUP BY energy_category_id ",
-                                     (equipment_id,
-                                      reporting_start_datetime_utc,
-                                      reporting_end_datetime_utc))
-            rows_equipment_energy = cursor_energy_db.fetchall()
             for energy_category in energy_category_list:
                 subtotal = Decimal(0.0)
-                for row_equipment_energy in rows_equipment_energy:
-                    if energy_category['id'] == row_equipment_energy[0]:
-                        subtotal = row_equipment_energy[1]
-                        break
+                aggregates = equipment_aggregates.get((equipment_id, energy_category['id']))
+                if aggregates is not None:
+                    subtotal = aggregates[0]
                 equipment_dict[equipment_id]['values'].append(subtotal)
 
         if cursor_system_db:
@@ -258,7 +236,7 @@ class Reporting:
         result = {'equipments': equipment_list, 'energycategories': energy_category_list, 'excel_bytes_base64': None}
 
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = \
                 excelexporters.equipmentbatch.export(result,
                                                      space_name,
@@ -1,9 +1,9 @@
 import falcon
 import mysql.connector
 import simplejson as json
-from anytree import AnyNode, LevelOrderIter
 import config
 import excelexporters.equipmenttracking
+from core import topology, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -20,7 +20,7 @@ class Reporting:
     ####################################################################################################################
     # PROCEDURES
     # Step 1: valid parameters
-    # Step 2: build a space tree
+    # Step 2: get the equipments in the space tree from the topology index
     # Step 3: query all equipments in the space tree
     # Step 4: construct the report
     ####################################################################################################################
@@ -74,45 +74,31 @@ class Reporting:
         else:
             space_name = row[0]
         ################################################################################################################
-        # Step 2: build a space tree
+        # Step 2: get the equipments in the space tree from the topology index
         ################################################################################################################
-
-        query = (" SELECT id, name, parent_space_id "
-                 " FROM tbl_spaces "
-                 " ORDER BY id ")
-        cursor.execute(query)
-        rows_spaces = cursor.fetchall()
-        node_dict = dict()
-        if rows_spaces is not None and len(rows_spaces) > 0:
-            for row in rows_spaces:
-                parent_node = node_dict[row[2]] if row[2] is not None else None
-                node_dict[row[0]] = AnyNode(id=row[0], parent=parent_node, name=row[1])
+        equipment_space_dict = topology.get_subtree_entities(space_id, 'equipment')
 
         ################################################################################################################
         # Step 3: query all equipments in the space tree
         ################################################################################################################
         equipment_list = list()
-        space_dict = dict()
-
-        for node in LevelOrderIter(node_dict[space_id]):
-            space_dict[node.id] = node.name
 
-        cursor.execute(" SELECT e.id, e.name AS equipment_name, e.uuid AS equipment_uuid, s.name AS space_name, "
-                       "        cc.name AS cost_center_name, e.description "
-                       " FROM tbl_spaces s, tbl_spaces_equipments se, tbl_equipments e, tbl_cost_centers cc "
-                       " WHERE s.id IN ( " + ', '.join(map(str, space_dict.keys())) + ") "
-                       "       AND se.space_id = s.id "
-                       "       AND se.equipment_id = e.id "
-                       "       AND e.cost_center_id = cc.id  ", )
-        rows_equipments = cursor.fetchall()
-        if rows_equipments is not None and len(rows_equipments) > 0:
-            for row in rows_equipments:
-                equipment_list.append({"id": row[0],
-                                       "equipment_name": row[1],
-                                       "equipment_uuid": row[2],
-                                       "space_name": row[3],
-                                       "cost_center_name": row[4],
-                                       "description": row[5]})
+        if len(equipment_space_dict) > 0:
+            cursor.execute(" SELECT e.id, e.name AS equipment_name, e.uuid AS equipment_uuid, "
+                           "        cc.name AS cost_center_name, e.description "
+                           " FROM tbl_equipments e, tbl_cost_centers cc "
+                           " WHERE e.id IN ( " + ', '.join(map(str, equipment_space_dict.keys())) + ") "
+                           "       AND e.cost_center_id = cc.id "
+                           " ORDER BY e.id ", )
+            rows_equipments = cursor.fetchall()
+            if rows_equipments is not None and len(rows_equipments) > 0:
+                for row in rows_equipments:
+                    equipment_list.append({"id": row[0],
+                                           "equipment_name": row[1],
+                                           "equipment_uuid": row[2],
+                                           "space_name": equipment_space_dict[row[0]],
+                                           "cost_center_name": row[3],
+                                           "description": row[4]})
 
         if cursor:
             cursor.close()
@@ -125,7 +111,7 @@ class Reporting:
         result = {'equipments': equipment_list, 'excel_bytes_base64': None}
 
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = \
                 excelexporters.equipmenttracking.export(result,
                                                         space_name,
@@ -0,0 +1,340 @@
+import base64
+import hashlib
+import importlib
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import falcon
+import simplejson as json
+import config
+from core.useractivity import access_control, api_key_control
+
+
+########################################################################################################################
+# Export jobs render the Excel file of a report outside the request that fetches the report data
+# A job is stored as two files in config.export_path so that any API worker can serve its status and result:
+#   <job_id>.json: the job status
+#   <job_id>.xlsx: the rendered Excel file
+########################################################################################################################
+_executor = None
+
+_job_id_regex = re.compile(r'^[a-f0-9]{32}\Z')
+_report_name_regex = re.compile(r'^[a-z]+\Z')
+
+_auth_header_names = ('USER-UUID', 'TOKEN', 'API-KEY')
+
+
+class _ExportRequest:
+    """The minimal request object passed to the report handler by export job workers"""
+    def __init__(self, params, headers):
+        self.params = params
+        self.headers = headers
+
+    def get_header(self, name, required=False, default=None):
+        """
+        Get a header value, the header name is case-insensitive as in falcon.Request.get_header
+        """
+        name = name.upper()
+        for key, value in self.headers.items():
+            if key.upper() == name:
+                return value
+        if required:
+            raise falcon.HTTPMissingHeader(name)
+        return default
+
+
+class _ExportResponse:
+    """The minimal response object passed to the report handler by export job workers"""
+    def __init__(self):
+        self.text = None
+        self.status = falcon.HTTP_200
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=config.export_job_max_workers)
+    return _executor
+
+
+def _status_file_name(job_id):
+    return os.path.join(config.export_path, job_id + '.json')
+
+
+def _excel_file_name(job_id):
+    return os.path.join(config.export_path, job_id + '.xlsx')
+
+
+def _read_status(job_id):
+    try:
+        with open(_status_file_name(job_id), 'r') as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return None
+
+
+def _write_status(status):
+    file_name = _status_file_name(status['id'])
+    temp_file_name = file_name + '.' + str(os.getpid()) + '.tmp'
+    with open(temp_file_name, 'w') as f:
+        json.dump(status, f)
+    os.replace(temp_file_name, file_name)
+
+
+def _remove_expired_jobs():
+    expires_before = time.time() - config.export_job_expires_in_seconds
+    try:
+        for file_name in os.listdir(config.export_path):
+            full_file_name = os.path.join(config.export_path, file_name)
+            try:
+                if os.path.getmtime(full_file_name) < expires_before:
+                    os.remove(full_file_name)
+            except OSError as ex:
+                print('export job: ' + str(ex))
+    except OSError as ex:
+        print('export job: ' + str(ex))
+
+
+def _run_job(job_id, report_name, params, headers):
+    """
+    Run the report handler with the Excel file enabled and save the file to config.export_path
+    """
+    status = _read_status(job_id)
+    if status is None:
+        # the job has been deleted before it started
+        return
+    status['status'] = 'running'
+    _write_status(status)
+
+    try:
+        module = importlib.import_module('reports.' + report_name)
+        req = _ExportRequest(params, headers)
+        resp = _ExportResponse()
+        module.Reporting.on_get(req, resp)
+        result = json.loads(resp.text)
+        excel_bytes_base64 = result.get('excel_bytes_base64') if isinstance(result, dict) else None
+        if excel_bytes_base64 is None:
+            raise ValueError('API.REPORT_HAS_NO_EXCEL_FILE')
+        with open(_excel_file_name(job_id), 'wb') as f:
+            f.write(base64.b64decode(excel_bytes_base64))
+        status['status'] = 'done'
+    except falcon.HTTPError as ex:
+        status['status'] = 'failed'
+        status['error'] = ex.description
+    except Exception as ex:
+        print('export job ' + job_id + ': ' + str(ex))
+        status['status'] = 'failed'
+        status['error'] = str(ex)
+
+    status['finished_datetime_utc'] = datetime.utcnow().isoformat()[0:19]
+    if _read_status(job_id) is not None:
+        _write_status(status)
+    else:
+        # the job has been deleted while it was running
+        try:
+            os.remove(_excel_file_name(job_id))
+        except OSError:
+            pass
+
+
+def _check_access(req):
+    if 'API-KEY' not in req.headers or \
+            not isinstance(req.headers['API-KEY'], str) or \
+            len(str.strip(req.headers['API-KEY'])) == 0:
+        access_control(req)
+    else:
+        api_key_control(req)
+
+
+def _get_owner(req):
+    """
+    Get the owner of the jobs of a request, the credential checked by _check_access
+    :return: the user uuid, or the SHA-256 hash of the API key so that the status files do not contain the key
+    """
+    if 'API-KEY' not in req.headers or \
+            not isinstance(req.headers['API-KEY'], str) or \
+            len(str.strip(req.headers['API-KEY'])) == 0:
+        return str.strip(req.headers['USER-UUID'])
+    return 'API-KEY:' + hashlib.sha256(str.strip(req.headers['API-KEY']).encode('utf-8')).hexdigest()
+
+
+def _check_job_id(id_):
+    if not _job_id_regex.match(id_):
+        raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                               description='API.INVALID_EXPORT_JOB_ID')
+
+
+class ExportJobCollection:
+    def __init__(self):
+        """Initializes Class"""
+        pass
+
+    @staticmethod
+    def on_options(req, resp):
+        _ = req
+        resp.status = falcon.HTTP_200
+
+    ####################################################################################################################
+    # PROCEDURES
+    # Step 1: valid parameters
+    # Step 2: save the job status
+    # Step 3: submit the job to the worker pool
+    ####################################################################################################################
+    @staticmethod
+    def on_post(req, resp):
+        _check_access(req)
+        try:
+            raw_json = req.stream.read().decode('utf-8')
+        except Exception as ex:
+            print(str(ex))
+            raise falcon.HTTPError(status=falcon.HTTP_400,
+                                   title='API.BAD_REQUEST',
+                                   description='API.FAILED_TO_READ_REQUEST_STREAM')
+        try:
+            new_values = json.loads(raw_json)
+        except ValueError:
+            raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                                   description='API.INVALID_REQUEST_BODY')
+
+        ################################################################################################################
+        # Step 1: valid parameters
+        ################################################################################################################
+        if 'data' not in new_values.keys() or not isinstance(new_values['data'], dict):
+            raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                                   description='API.INVALID_REQUEST_BODY')
+
+        if 'report' not in new_values['data'].keys() or \
+                not isinstance(new_values['data']['report'], str) or \
+                not _report_name_regex.match(str.strip(new_values['data']['report'])):
+            raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                                   description='API.INVALID_REPORT_NAME')
+        report_name = str.strip(new_values['data']['report'])
+
+        try:
+            module = importlib.import_module('reports.' + report_name)
+        except ImportError:
+            module = None
+        if module is None or not hasattr(module, 'Reporting') or not hasattr(module.Reporting, 'on_get'):
+            raise falcon.HTTPError(status=falcon.HTTP_404, title='API.NOT_FOUND',
+                                   description='API.REPORT_NOT_FOUND')
+
+        params = dict()
+        if 'params' in new_values['data'].keys():
+            if not isinstance(new_values['data']['params'], dict):
+                raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                                       description='API.INVALID_REPORT_PARAMS')
+            for key, value in new_values['data']['params'].items():
+                params[str(key)] = str(value)
+        # always generate the Excel file in export jobs
+        params['quickmode'] = 'false'
+        params['excel'] = 'true'
+
+        headers = {name: req.headers[name] for name in _auth_header_names if name in req.headers}
+
+        ################################################################################################################
+        # Step 2: save the job status
+        ################################################################################################################
+        try:
+            os.makedirs(config.export_path, exist_ok=True)
+        except OSError as ex:
+            print(str(ex))
+            raise falcon.HTTPError(status=falcon.HTTP_500, title='API.ERROR',
+                                   description='API.FAILED_TO_CREATE_EXPORT_JOB')
+        _remove_expired_jobs()
+
+        job_id = uuid.uuid4().hex
+        status = {'id': job_id,
+                  'owner': _get_owner(req),
+                  'report': report_name,
+                  'status': 'queued',
+                  'error': None,
+                  'created_datetime_utc': datetime.utcnow().isoformat()[0:19],
+                  'finished_datetime_utc': None}
+        _write_status(status)
+
+        ################################################################################################################
+        # Step 3: submit the job to the worker pool
+        ################################################################################################################
+        _get_executor().submit(_run_job, job_id, report_name, params, headers)
+
+        resp.status = falcon.HTTP_201
+        resp.location = '/reports/exportjobs/' + job_id
+        resp.text = json.dumps(status)
+
+
+class ExportJobItem:
+    def __init__(self):
+        """Initializes Class"""
+        pass
+
+    @staticmethod
+    def on_options(req, resp, id_):
+        _ = req
+        resp.status = falcon.HTTP_200
+        _ = id_
+
+    @staticmethod
+    def on_get(req, resp, id_):
+        _check_access(req)
+        _check_job_id(id_)
+
+        status = _read_status(id_)
+        if status is None or status.get('owner') != _get_owner(req):
+            raise falcon.HTTPError(status=falcon.HTTP_404, title='API.NOT_FOUND',
+                                   description='API.EXPORT_JOB_NOT_FOUND')
+        resp.text = json.dumps(status)
+
+    @staticmethod
+    def on_delete(req, resp, id_):
+        _check_access(req)
+        _check_job_id(id_)
+
+        status = _read_status(id_)
+        if status is None or status.get('owner') != _get_owner(req):
+            raise falcon.HTTPError(status=falcon.HTTP_404, title='API.NOT_FOUND',
+                                   description='API.EXPORT_JOB_NOT_FOUND')
+        for file_name in (_status_file_name(id_), _excel_file_name(id_)):
+            try:
+                os.remove(file_name)
+            except OSError:
+                pass
+        resp.status = falcon.HTTP_204
+
+
+class ExportJobFile:
+    def __init__(self):
+        """Initializes Class"""
+        pass
+
+    @staticmethod
+    def on_options(req, resp, id_):
+        _ = req
+        resp.status = falcon.HTTP_200
+        _ = id_
+
+    @staticmethod
+    def on_get(req, resp, id_):
+        _check_access(req)
+        _check_job_id(id_)
+
+        status = _read_status(id_)
+        if status is None or status.get('owner') != _get_owner(req):
+            raise falcon.HTTPError(status=falcon.HTTP_404, title='API.NOT_FOUND',
+                                   description='API.EXPORT_JOB_NOT_FOUND')
+        if status['status'] != 'done':
+            raise falcon.HTTPError(status=falcon.HTTP_409, title='API.CONFLICT',
+                                   description='API.EXPORT_JOB_IS_NOT_DONE')
+
+        file_name = _excel_file_name(id_)
+        try:
+            stream = open(file_name, 'rb')
+        except IOError:
+            raise falcon.HTTPError(status=falcon.HTTP_404, title='API.NOT_FOUND',
+                                   description='API.EXPORT_FILE_NOT_FOUND')
+        resp.content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        resp.downloadable_as = status['report'] + '-' + id_ + '.xlsx'
+        resp.set_stream(stream, os.path.getsize(file_name))
+        resp.status = falcon.HTTP_200
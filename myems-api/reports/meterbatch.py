@@ -2,9 +2,9 @@ from datetime import datetime, timedelta, timezone
 import falcon
 import mysql.connector
 import simplejson as json
-from anytree import AnyNode, LevelOrderIter
 import config
 import excelexporters.meterbatch
+from core import queryexecutor, topology, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -21,7 +21,7 @@ class Reporting:
     ####################################################################################################################
     # PROCEDURES
     # Step 1: valid parameters
-    # Step 2: build a space tree
+    # Step 2: get the meters in the space tree from the topology index
     # Step 3: query all meters in the space tree
     # Step 4: query energy categories
     # Step 5: query reporting period energy input
@@ -122,60 +122,34 @@ class Reporting:
             space_name = row[0]
 
         ################################################################################################################
-        # Step 2: build a space tree
+        # Step 2: get the meters in the space tree from the topology index
         ################################################################################################################
-
-        query = (" SELECT id, name, parent_space_id "
-                 " FROM tbl_spaces "
-                 " ORDER BY id ")
-        cursor_system_db.execute(query)
-        rows_spaces = cursor_system_db.fetchall()
-        node_dict = dict()
-        if rows_spaces is not None and len(rows_spaces) > 0:
-            for row in rows_spaces:
-                parent_node = node_dict[row[2]] if row[2] is not None else None
-                node_dict[row[0]] = AnyNode(id=row[0], parent=parent_node, name=row[1])
+        meter_space_dict = topology.get_subtree_entities(space_id, 'meter', config.is_recursive)
 
         ################################################################################################################
         # Step 3: query all meters in the space tree
         ################################################################################################################
         meter_dict = dict()
-        space_dict = dict()
         energy_category_set = set()
 
-        if config.is_recursive:
-            for node in LevelOrderIter(node_dict[space_id]):
-                space_dict[node.id] = node.name
-
+        if len(meter_space_dict) > 0:
             cursor_system_db.execute(" SELECT m.id, m.name AS meter_name, m.uuid, m.energy_category_id, "
-                                     "        s.name AS space_name, "
                                      "        cc.name AS cost_center_name"
-                                     " FROM tbl_spaces s, tbl_spaces_meters sm, "
-                                     "      tbl_meters m, tbl_cost_centers cc "
-                                     " WHERE s.id IN ( " + ', '.join(map(str, space_dict.keys())) + ") "
-                                     " AND sm.space_id = s.id AND sm.meter_id = m.id "
-                                     " AND m.cost_center_id = cc.id ORDER BY meter_id ", )
-        else:
-            cursor_system_db.execute(" SELECT m.id, m.name AS meter_name, m.uuid, m.energy_category_id, "
-                                     "        s.name AS space_name, "
-                                     "        cc.name AS cost_center_name "
-                                     " FROM tbl_spaces s, tbl_spaces_meters sm, "
-                                     "      tbl_meters m, tbl_cost_centers cc "
-                                     " WHERE s.id = %s AND sm.space_id = s.id AND sm.meter_id = m.id "
-                                     " AND m.cost_center_id = cc.id  ORDER BY meter_id ", (space_id,))
-
-        rows_meters = cursor_system_db.fetchall()
-        print(rows_meters)
-        if rows_meters is not None and len(rows_meters) > 0:
-            for row in rows_meters:
-                meter_dict[row[0]] = {"meter_name": row[1],
-                                      "uuid": row[2],
-                                      "energy_category_id": row[3],
-                                      "space_name": row[4],
-                                      "cost_center_name": row[5],
-                                      "values": list(),
-                                      "subtotal": None}
-                energy_category_set.add(row[3])
+                                     " FROM tbl_meters m, tbl_cost_centers cc "
+                                     " WHERE m.id IN ( " + ', '.join(map(str, meter_space_dict.keys())) + ") "
+                                     " AND m.cost_center_id = cc.id "
+                                     " ORDER BY m.id ", )
+            rows_meters = cursor_system_db.fetchall()
+            if rows_meters is not None and len(rows_meters) > 0:
+                for row in rows_meters:
+                    meter_dict[row[0]] = {"meter_name": row[1],
+                                          "uuid": row[2],
+                                          "energy_category_id": row[3],
+                                          "space_name": meter_space_dict[row[0]],
+                                          "cost_center_name": row[4],
+                                          "values": list(),
+                                          "subtotal": None}
+                    energy_category_set.add(row[3])
 
         ################################################################################################################
         # Step 4: query energy categories
@@ -212,24 +186,16 @@ class Reporting:
         ################################################################################################################
         # Step 5: query reporting period energy input
         ################################################################################################################
+        meter_subtotals = queryexecutor.fetch_entity_subtotals('myems_energy_db', 'tbl_meter_hourly',
+                                                               'meter_id', list(meter_dict.keys()),
+                                                               reporting_start_datetime_utc,
+                                                               reporting_end_datetime_utc)
         for meter_id in meter_dict:
-
-            cursor_energy_db.execute(" SELECT SUM(actual_value) "
-                                     " FROM tbl_meter_hourly "
-                                     " WHERE meter_id = %s "
-                                     "     AND start_datetime_utc >= %s "
-                                     "     AND start_datetime_utc < %s ",
-                                     (meter_id,
-                                      reporting_start_datetime_utc,
-                                      reporting_end_datetime_utc))
-            rows_meter_energy = cursor_energy_db.fetchall()
             for energy_category in energy_category_list:
                 subtotal = None
-                for row_meter_energy in rows_meter_energy:
-                    if energy_category['id'] == meter_dict[meter_id]['energy_category_id']:
-                        subtotal = row_meter_energy[0]
-                        meter_dict[meter_id]['subtotal'] = subtotal
-                        break
+                if energy_category['id'] == meter_dict[meter_id]['energy_category_id']:
+                    subtotal = meter_subtotals.get(meter_id)
+                    meter_dict[meter_id]['subtotal'] = subtotal
                 # append subtotal
                 # append None if energy category is not applicable
                 meter_dict[meter_id]['values'].append(subtotal)
@@ -262,7 +228,7 @@ class Reporting:
         result = {'meters': meter_list, 'energycategories': energy_category_list, "excel_bytes_base64": None}
 
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = \
                 excelexporters.meterbatch.export(result,
                                                  space_name,
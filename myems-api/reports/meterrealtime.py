@@ -2,8 +2,8 @@ import re
 from datetime import datetime, timedelta, timezone
 import falcon
 import mysql.connector
-import simplejson as json
 import config
+from core import downsampling, payloadencoding
 from core.useractivity import access_control, api_key_control
 
 
@@ -65,6 +65,8 @@ class Reporting:
                 str.lower(str.strip(quick_mode)) in ('true', 't', 'on', 'yes', 'y'):
             is_quick_mode = True
 
+        sample_count, sampling_method = downsampling.get_sampling(req)
+
         timezone_offset = int(config.utc_offset[1:3]) * 60 + int(config.utc_offset[4:6])
         if config.utc_offset[0] == '-':
             timezone_offset = -timezone_offset
@@ -145,15 +147,9 @@ class Reporting:
                 point_timestamps = []
                 if point['object_type'] == 'ENERGY_VALUE':
                     energy_value_data['name'] = point['name'] + ' (' + point['units'] + ')'
-                    query = (" SELECT utc_date_time, actual_value "
-                             " FROM tbl_energy_value "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time BETWEEN %s AND %s "
-                             " ORDER BY utc_date_time ")
-                    cursor_historical.execute(query, (point['id'],
-                                                      reporting_start_datetime_utc,
-                                                      reporting_end_datetime_utc))
-                    rows = cursor_historical.fetchall()
+                    rows = downsampling.fetch_point_values(cursor_historical, 'tbl_energy_value', point['id'],
+                                                           reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                           sample_count, sampling_method)
                     if rows is not None and len(rows) > 0:
                         for row in rows:
                             current_datetime_local = row[0].replace(tzinfo=timezone.utc) + \
@@ -163,15 +159,9 @@ class Reporting:
                             energy_value_data['values'].append(row[1])
                 elif point['object_type'] == 'ANALOG_VALUE':
 
-                    query = (" SELECT utc_date_time, actual_value "
-                             " FROM tbl_analog_value "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time BETWEEN %s AND %s "
-                             " ORDER BY utc_date_time ")
-                    cursor_historical.execute(query, (point['id'],
-                                                      reporting_start_datetime_utc,
-                                                      reporting_end_datetime_utc))
-                    rows = cursor_historical.fetchall()
+                    rows = downsampling.fetch_point_values(cursor_historical, 'tbl_analog_value', point['id'],
+                                                           reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                           sample_count, sampling_method)
 
                     if rows is not None and len(rows) > 0:
                         for row in rows:
@@ -185,15 +175,9 @@ class Reporting:
                     parameters_data['timestamps'].append(point_timestamps)
                     parameters_data['values'].append(point_values)
                 elif point['object_type'] == 'DIGITAL_VALUE':
-                    query = (" SELECT utc_date_time, actual_value "
-                             " FROM tbl_digital_value "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time BETWEEN %s AND %s "
-                             " ORDER BY utc_date_time ")
-                    cursor_historical.execute(query, (point['id'],
-                                                      reporting_start_datetime_utc,
-                                                      reporting_end_datetime_utc))
-                    rows = cursor_historical.fetchall()
+                    rows = downsampling.fetch_point_values(cursor_historical, 'tbl_digital_value', point['id'],
+                                                           reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                           sample_count, sampling_method)
 
                     if rows is not None and len(rows) > 0:
                         for row in rows:
@@ -236,4 +220,4 @@ class Reporting:
 
         }
 
-        resp.text = json.dumps(result)
+        resp.text = payloadencoding.dumps(req, result)
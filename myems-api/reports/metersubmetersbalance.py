@@ -3,10 +3,9 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import falcon
 import mysql.connector
-import simplejson as json
 import config
 import excelexporters.metersubmetersbalance
-from core import utilities
+from core import payloadencoding, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -382,7 +381,7 @@ class Reporting:
         }
 
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = \
                 excelexporters.metersubmetersbalance.export(result,
                                                             master_meter['name'],
@@ -391,4 +390,4 @@ class Reporting:
                                                             period_type,
                                                             language)
 
-        resp.text = json.dumps(result)
+        resp.text = payloadencoding.dumps(req, result)
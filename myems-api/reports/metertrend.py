@@ -2,10 +2,9 @@ import re
 from datetime import datetime, timedelta, timezone
 import falcon
 import mysql.connector
-import simplejson as json
 import config
 import excelexporters.metertrend
-from core import utilities
+from core import downsampling, payloadencoding, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -111,6 +110,10 @@ class Reporting:
                 str.lower(str.strip(quick_mode)) in ('true', 't', 'on', 'yes', 'y'):
             is_quick_mode = True
 
+        sample_count, sampling_method = downsampling.get_sampling(req)
+        # the Excel file contains all raw values, the series of the JSON report are downsampled after the export
+        fetch_sample_count = downsampling.get_fetch_sample_count(req, sample_count)
+
         trans = utilities.get_translation(language)
         trans.install()
         _ = trans.gettext
@@ -185,15 +188,9 @@ class Reporting:
             point_value_list = list()
             point_timestamp_list = list()
             if point['object_type'] == 'ENERGY_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_energy_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_energy_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       fetch_sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     for row in rows:
@@ -203,15 +200,9 @@ class Reporting:
                         point_timestamp_list.append(current_datetime)
                         point_value_list.append(row[1])
             elif point['object_type'] == 'ANALOG_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_analog_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_analog_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       fetch_sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     for row in rows:
@@ -221,15 +212,9 @@ class Reporting:
                         point_timestamp_list.append(current_datetime)
                         point_value_list.append(row[1])
             elif point['object_type'] == 'DIGITAL_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_digital_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_digital_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       fetch_sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     for row in rows:
@@ -302,7 +287,7 @@ class Reporting:
             "excel_bytes_base64": None
         }
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = excelexporters.metertrend.export(result,
                                                                             meter['name'],
                                                                             reporting_period_start_datetime_local,
@@ -310,4 +295,6 @@ class Reporting:
                                                                             None,
                                                                             language)
 
-        resp.text = json.dumps(result)
+        downsampling.downsample_result(result, sample_count, sampling_method)
+
+        resp.text = payloadencoding.dumps(req, result)
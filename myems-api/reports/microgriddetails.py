@@ -3,7 +3,7 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import falcon
 import mysql.connector
-import simplejson as json
+from core import downsampling, latestvalues, payloadencoding
 from core.useractivity import access_control, api_key_control
 import config
 
@@ -71,6 +71,7 @@ class Reporting:
 
         reporting_start_datetime_utc = datetime.utcnow() - timedelta(days=3)
         reporting_end_datetime_utc = datetime.utcnow()
+        sample_count, sampling_method = downsampling.get_sampling(req)
 
         ################################################################################################################
         # Step 2: Step 2: query the microgrid
@@ -180,30 +181,6 @@ class Reporting:
         # Step 3: query associated batteries
         ################################################################################################################
 
-        energy_value_latest_dict = dict()
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_energy_value_latest ")
-        cursor_historical.execute(query, )
-        energy_value_latest_rows = cursor_historical.fetchall()
-        for row in energy_value_latest_rows:
-            energy_value_latest_dict[row[0]] = row[1]
-
-        analog_value_latest_dict = dict()
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_analog_value_latest ")
-        cursor_historical.execute(query, )
-        analog_value_latest_rows = cursor_historical.fetchall()
-        for row in analog_value_latest_rows:
-            analog_value_latest_dict[row[0]] = row[1]
-
-        digital_value_latest_dict = dict()
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_digital_value_latest ")
-        cursor_historical.execute(query, )
-        digital_value_latest_rows = cursor_historical.fetchall()
-        for row in digital_value_latest_rows:
-            digital_value_latest_dict[row[0]] = row[1]
-
         cursor_system.execute(" SELECT battery_state_point_id "
                               " FROM tbl_microgrids_batteries "
                               " WHERE microgrid_id = %s "
@@ -214,8 +191,8 @@ class Reporting:
         if row_point is not None:
             battery_state_point_id = row_point[0]
 
-        if digital_value_latest_dict.get(battery_state_point_id) is not None:
-            battery_state_point_value = digital_value_latest_dict.get(battery_state_point_id)
+        if latestvalues.get_value('digital', battery_state_point_id) is not None:
+            battery_state_point_value = latestvalues.get_value('digital', battery_state_point_id)
 
         cursor_system.execute(" SELECT p.id, mb.name, p.units, p.object_type  "
                               " FROM tbl_microgrids_batteries mb, tbl_points p "
@@ -701,15 +678,9 @@ class Reporting:
             point_values = []
             point_timestamps = []
             if point['object_type'] == 'ENERGY_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_energy_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_energy_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     reporting_start_datetime_local = reporting_start_datetime_utc.replace(tzinfo=timezone.utc) + \
@@ -729,15 +700,9 @@ class Reporting:
                             point_values.append(rows[index][1])
                             current_datetime_local += timedelta(minutes=1)
             elif point['object_type'] == 'ANALOG_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_analog_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_analog_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     reporting_start_datetime_local = reporting_start_datetime_utc.replace(tzinfo=timezone.utc) + \
@@ -757,15 +722,9 @@ class Reporting:
                             point_values.append(rows[index][1])
                             current_datetime_local += timedelta(minutes=1)
             elif point['object_type'] == 'DIGITAL_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_digital_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_digital_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     reporting_start_datetime_local = reporting_start_datetime_utc.replace(tzinfo=timezone.utc) + \
@@ -848,5 +807,5 @@ class Reporting:
             "values": parameters_data['values']
         }
 
-        resp.text = json.dumps(result)
+        resp.text = payloadencoding.dumps(req, result)
 
@@ -2,6 +2,7 @@ import falcon
 from datetime import datetime, timedelta
 import mysql.connector
 import simplejson as json
+from core import latestvalues
 from core.useractivity import access_control
 import config
 
@@ -38,22 +39,12 @@ class Reporting:
         # Get all points latest values
         digital_value_latest_dict = dict()
         analog_value_latest_dict = dict()
-        cnx_historical_db = mysql.connector.connect(**config.myems_historical_db)
-        cursor_historical_db = cnx_historical_db.cursor()
-        query = (" SELECT point_id, utc_date_time, actual_value "
-                 " FROM tbl_digital_value_latest ")
-        cursor_historical_db.execute(query, )
-        rows = cursor_historical_db.fetchall()
+        rows = latestvalues.get_rows('digital')
         if rows is not None and len(rows) > 0:
             for row in rows:
                 digital_value_latest_dict[row[0]] = {"utc_date_time": row[1],
                                                      "actual_value": row[2]}
-        query = (" SELECT point_id, utc_date_time, actual_value "
-                 " FROM tbl_analog_value_latest ")
-        cursor_historical_db.execute(query,)
-        rows = cursor_historical_db.fetchall()
-        cursor_historical_db.close()
-        cnx_historical_db.close()
+        rows = latestvalues.get_rows('analog')
         if rows is not None and len(rows) > 0:
             for row in rows:
                 analog_value_latest_dict[row[0]] = {"utc_date_time": row[1],
@@ -3,10 +3,9 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import falcon
 import mysql.connector
-import simplejson as json
 import config
 import excelexporters.microgridreportingcarbon
-from core import utilities
+from core import downsampling, payloadencoding, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -167,6 +166,10 @@ class Reporting:
                 str.lower(str.strip(quick_mode)) in ('true', 't', 'on', 'yes', 'y'):
             is_quick_mode = True
 
+        sample_count, sampling_method = downsampling.get_sampling(req)
+        # the Excel file contains all raw values, the series of the JSON report are downsampled after the export
+        fetch_sample_count = downsampling.get_fetch_sample_count(req, sample_count)
+
         trans = utilities.get_translation(language)
         trans.install()
         _ = trans.gettext
@@ -517,15 +520,9 @@ class Reporting:
             point_values = []
             point_timestamps = []
             if point['object_type'] == 'ENERGY_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_energy_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_energy_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       fetch_sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     reporting_start_datetime_local = reporting_start_datetime_utc.replace(tzinfo=timezone.utc) + \
@@ -545,15 +542,9 @@ class Reporting:
                             point_values.append(rows[index][1])
                             current_datetime_local += timedelta(minutes=1)
             elif point['object_type'] == 'ANALOG_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_analog_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_analog_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       fetch_sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     reporting_start_datetime_local = reporting_start_datetime_utc.replace(tzinfo=timezone.utc) + \
@@ -573,15 +564,9 @@ class Reporting:
                             point_values.append(rows[index][1])
                             current_datetime_local += timedelta(minutes=1)
             elif point['object_type'] == 'DIGITAL_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_digital_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_digital_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       fetch_sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     reporting_start_datetime_local = reporting_start_datetime_utc.replace(tzinfo=timezone.utc) + \
@@ -661,7 +646,7 @@ class Reporting:
                 result['reporting_period']['subtotals'].append(meter_report['subtotal'])
 
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = \
                 excelexporters.microgridreportingcarbon.\
                 export(result,
@@ -672,4 +657,6 @@ class Reporting:
                        base_period_end_datetime_local,
                        period_type,
                        language)
-        resp.text = json.dumps(result)
+        downsampling.downsample_result(result, sample_count, sampling_method)
+
+        resp.text = payloadencoding.dumps(req, result)
@@ -3,10 +3,9 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import falcon
 import mysql.connector
-import simplejson as json
 import config
 import excelexporters.microgridreportingrevenue
-from core import utilities
+from core import downsampling, payloadencoding, revenue, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -167,6 +166,10 @@ class Reporting:
                 str.lower(str.strip(quick_mode)) in ('true', 't', 'on', 'yes', 'y'):
             is_quick_mode = True
 
+        sample_count, sampling_method = downsampling.get_sampling(req)
+        # the Excel file contains all raw values, the series of the JSON report are downsampled after the export
+        fetch_sample_count = downsampling.get_fetch_sample_count(req, sample_count)
+
         trans = utilities.get_translation(language)
         trans.install()
         _ = trans.gettext
@@ -405,27 +408,19 @@ class Reporting:
         if config.utc_offset[0] == '-':
             timezone_offset = -timezone_offset
 
+        meter_series_dict = revenue.load_meter_series(cursor_billing,
+                                                      [meter['id'] for meter in meter_list],
+                                                      base_start_datetime_utc,
+                                                      base_end_datetime_utc)
         meter_base_list = list()
 
         for meter in meter_list:
-            cursor_billing.execute(" SELECT start_datetime_utc, actual_value "
-                                   " FROM tbl_meter_hourly "
-                                   " WHERE meter_id = %s "
-                                   "     AND start_datetime_utc >= %s "
-                                   "     AND start_datetime_utc < %s "
-                                   " ORDER BY start_datetime_utc ",
-                                   (meter['id'],
-                                    base_start_datetime_utc,
-                                    base_end_datetime_utc))
-            rows_meter_hourly = cursor_billing.fetchall()
-
-            if rows_meter_hourly is not None and len(rows_meter_hourly) > 0:
-                print('rows_meter_hourly:' + str(rows_meter_hourly))
-                rows_meter_periodically = utilities.aggregate_hourly_data_by_period(rows_meter_hourly,
-                                                                                    base_start_datetime_utc,
-                                                                                    base_end_datetime_utc,
-                                                                                    period_type)
-                print('rows_meter_periodically:' + str(rows_meter_periodically))
+            series = meter_series_dict.get(meter['id'])
+            if series is not None:
+                rows_meter_periodically = revenue.aggregate_by_period(series,
+                                                                      base_start_datetime_utc,
+                                                                      base_end_datetime_utc,
+                                                                      period_type)
                 meter_report = dict()
                 meter_report['timestamps'] = list()
                 meter_report['values'] = list()
@@ -445,7 +440,7 @@ class Reporting:
                     elif period_type == 'yearly':
                         current_datetime = current_datetime_local.isoformat()[0:4]
 
-                    actual_value = Decimal(0.0) if row_meter_periodically[1] is None else row_meter_periodically[1]
+                    actual_value = row_meter_periodically[1]
 
                     meter_report['timestamps'].append(current_datetime)
                     meter_report['values'].append(actual_value)
@@ -456,24 +451,19 @@ class Reporting:
 
                 meter_base_list.append(meter_report)
 
+        meter_series_dict = revenue.load_meter_series(cursor_billing,
+                                                      [meter['id'] for meter in meter_list],
+                                                      reporting_start_datetime_utc,
+                                                      reporting_end_datetime_utc)
         meter_reporting_list = list()
 
         for meter in meter_list:
-            cursor_billing.execute(" SELECT start_datetime_utc, actual_value "
-                                   " FROM tbl_meter_hourly "
-                                   " WHERE meter_id = %s "
-                                   "     AND start_datetime_utc >= %s "
-                                   "     AND start_datetime_utc < %s "
-                                   " ORDER BY start_datetime_utc ",
-                                   (meter['id'],
-                                    reporting_start_datetime_utc,
-                                    reporting_end_datetime_utc))
-            rows_meter_hourly = cursor_billing.fetchall()
-            if rows_meter_hourly is not None and len(rows_meter_hourly) > 0:
-                rows_meter_periodically = utilities.aggregate_hourly_data_by_period(rows_meter_hourly,
-                                                                                    reporting_start_datetime_utc,
-                                                                                    reporting_end_datetime_utc,
-                                                                                    period_type)
+            series = meter_series_dict.get(meter['id'])
+            if series is not None:
+                rows_meter_periodically = revenue.aggregate_by_period(series,
+                                                                      reporting_start_datetime_utc,
+                                                                      reporting_end_datetime_utc,
+                                                                      period_type)
                 meter_report = dict()
                 meter_report['timestamps'] = list()
                 meter_report['values'] = list()
@@ -493,7 +483,7 @@ class Reporting:
                     elif period_type == 'yearly':
                         current_datetime = current_datetime_local.isoformat()[0:4]
 
-                    actual_value = Decimal(0.0) if row_meter_periodically[1] is None else row_meter_periodically[1]
+                    actual_value = row_meter_periodically[1]
 
                     meter_report['timestamps'].append(current_datetime)
                     meter_report['values'].append(actual_value)
@@ -517,15 +507,9 @@ class Reporting:
             point_values = []
             point_timestamps = []
             if point['object_type'] == 'ENERGY_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_energy_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_energy_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       fetch_sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     reporting_start_datetime_local = reporting_start_datetime_utc.replace(tzinfo=timezone.utc) + \
@@ -545,15 +529,9 @@ class Reporting:
                             point_values.append(rows[index][1])
                             current_datetime_local += timedelta(minutes=1)
             elif point['object_type'] == 'ANALOG_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_analog_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_analog_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       fetch_sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     reporting_start_datetime_local = reporting_start_datetime_utc.replace(tzinfo=timezone.utc) + \
@@ -573,15 +551,9 @@ class Reporting:
                             point_values.append(rows[index][1])
                             current_datetime_local += timedelta(minutes=1)
             elif point['object_type'] == 'DIGITAL_VALUE':
-                query = (" SELECT utc_date_time, actual_value "
-                         " FROM tbl_digital_value "
-                         " WHERE point_id = %s "
-                         "       AND utc_date_time BETWEEN %s AND %s "
-                         " ORDER BY utc_date_time ")
-                cursor_historical.execute(query, (point['id'],
-                                                  reporting_start_datetime_utc,
-                                                  reporting_end_datetime_utc))
-                rows = cursor_historical.fetchall()
+                rows = downsampling.fetch_point_values(cursor_historical, 'tbl_digital_value', point['id'],
+                                                       reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                       fetch_sample_count, sampling_method)
 
                 if rows is not None and len(rows) > 0:
                     reporting_start_datetime_local = reporting_start_datetime_utc.replace(tzinfo=timezone.utc) + \
@@ -661,7 +633,7 @@ class Reporting:
                 result['reporting_period']['subtotals'].append(meter_report['subtotal'])
 
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = \
                 excelexporters.microgridreportingrevenue.\
                 export(result,
@@ -672,4 +644,6 @@ class Reporting:
                        base_period_end_datetime_local,
                        period_type,
                        language)
-        resp.text = json.dumps(result)
+        downsampling.downsample_result(result, sample_count, sampling_method)
+
+        resp.text = payloadencoding.dumps(req, result)
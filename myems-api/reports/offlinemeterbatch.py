@@ -2,9 +2,9 @@ from datetime import datetime, timedelta, timezone
 import falcon
 import mysql.connector
 import simplejson as json
-from anytree import AnyNode, LevelOrderIter
 import config
 import excelexporters.offlinemeterbatch
+from core import queryexecutor, topology, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -21,7 +21,7 @@ class Reporting:
     ####################################################################################################################
     # PROCEDURES
     # Step 1: valid parameters
-    # Step 2: build a space tree
+    # Step 2: get the offline meters in the space tree from the topology index
     # Step 3: query all offline meters in the space tree
     # Step 4: query energy categories
     # Step 5: query reporting period energy input
@@ -122,48 +122,33 @@ class Reporting:
             space_name = row[0]
 
         ################################################################################################################
-        # Step 2: build a space tree
+        # Step 2: get the offline meters in the space tree from the topology index
         ################################################################################################################
-
-        query = (" SELECT id, name, parent_space_id "
-                 " FROM tbl_spaces "
-                 " ORDER BY id ")
-        cursor_system_db.execute(query)
-        rows_spaces = cursor_system_db.fetchall()
-        node_dict = dict()
-        if rows_spaces is not None and len(rows_spaces) > 0:
-            for row in rows_spaces:
-                parent_node = node_dict[row[2]] if row[2] is not None else None
-                node_dict[row[0]] = AnyNode(id=row[0], parent=parent_node, name=row[1])
+        offline_meter_space_dict = topology.get_subtree_entities(space_id, 'offline_meter')
 
         ################################################################################################################
         # Step 3: query all offline meters in the space tree
         ################################################################################################################
         offline_meter_dict = dict()
-        space_dict = dict()
         energy_category_set = set()
 
-        for node in LevelOrderIter(node_dict[space_id]):
-            space_dict[node.id] = node.name
-
-        cursor_system_db.execute(" SELECT om.id, om.name AS offline_meter_name, om.energy_category_id, "
-                                 "        s.name AS space_name, "
-                                 "        cc.name AS cost_center_name"
-                                 " FROM tbl_spaces s, tbl_spaces_offline_meters som, "
-                                 "      tbl_offline_meters om, tbl_cost_centers cc "
-                                 " WHERE s.id IN ( " + ', '.join(map(str, space_dict.keys())) + ") "
-                                 " AND som.space_id = s.id AND som.offline_meter_id = om.id "
-                                 " AND om.cost_center_id = cc.id  ", )
-        rows_offline_meters = cursor_system_db.fetchall()
-        if rows_offline_meters is not None and len(rows_offline_meters) > 0:
-            for row in rows_offline_meters:
-                offline_meter_dict[row[0]] = {"offline_meter_name": row[1],
-                                              "energy_category_id": row[2],
-                                              "space_name": row[3],
-                                              "cost_center_name": row[4],
-                                              "values": list(),
-                                              "subtotal": None}
-                energy_category_set.add(row[2])
+        if len(offline_meter_space_dict) > 0:
+            cursor_system_db.execute(" SELECT om.id, om.name AS offline_meter_name, om.energy_category_id, "
+                                     "        cc.name AS cost_center_name"
+                                     " FROM tbl_offline_meters om, tbl_cost_centers cc "
+                                     " WHERE om.id IN ( " + ', '.join(map(str, offline_meter_space_dict.keys())) + ") "
+                                     " AND om.cost_center_id = cc.id "
+                                     " ORDER BY om.id ", )
+            rows_offline_meters = cursor_system_db.fetchall()
+            if rows_offline_meters is not None and len(rows_offline_meters) > 0:
+                for row in rows_offline_meters:
+                    offline_meter_dict[row[0]] = {"offline_meter_name": row[1],
+                                                  "energy_category_id": row[2],
+                                                  "space_name": offline_meter_space_dict[row[0]],
+                                                  "cost_center_name": row[3],
+                                                  "values": list(),
+                                                  "subtotal": None}
+                    energy_category_set.add(row[2])
 
         ################################################################################################################
         # Step 4: query energy categories
@@ -200,24 +185,17 @@ class Reporting:
         ################################################################################################################
         # Step 5: query reporting period energy input
         ################################################################################################################
+        offline_meter_subtotals = queryexecutor.fetch_entity_subtotals('myems_energy_db', 'tbl_offline_meter_hourly',
+                                                                       'offline_meter_id',
+                                                                       list(offline_meter_dict.keys()),
+                                                                       reporting_start_datetime_utc,
+                                                                       reporting_end_datetime_utc)
         for offline_meter_id in offline_meter_dict:
-
-            cursor_energy_db.execute(" SELECT SUM(actual_value) "
-                                     " FROM tbl_offline_meter_hourly "
-                                     " WHERE offline_meter_id = %s "
-                                     "     AND start_datetime_utc >= %s "
-                                     "     AND start_datetime_utc < %s ",
-                                     (offline_meter_id,
-                                      reporting_start_datetime_utc,
-                                      reporting_end_datetime_utc))
-            rows_offline_meter_energy = cursor_energy_db.fetchall()
             for energy_category in energy_category_list:
                 subtotal = None
-                for row_offline_meter_energy in rows_offline_meter_energy:
-                    if energy_category['id'] == offline_meter_dict[offline_meter_id]['energy_category_id']:
-                        subtotal = row_offline_meter_energy[0]
-                        offline_meter_dict[offline_meter_id]['subtotal'] = subtotal
-                        break
+                if energy_category['id'] == offline_meter_dict[offline_meter_id]['energy_category_id']:
+                    subtotal = offline_meter_subtotals.get(offline_meter_id)
+                    offline_meter_dict[offline_meter_id]['subtotal'] = subtotal
                 # append subtotal
                 # append None if energy category is not applicable
                 offline_meter_dict[offline_meter_id]['values'].append(subtotal)
@@ -250,7 +228,7 @@ class Reporting:
                   'excel_bytes_base64': None}
 
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = \
                 excelexporters.offlinemeterbatch.export(result,
                                                         space_name,
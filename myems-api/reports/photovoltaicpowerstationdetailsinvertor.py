@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 import falcon
 import mysql.connector
 import simplejson as json
+from core import latestvalues
 from core.useractivity import access_control, api_key_control
 import config
 
@@ -49,9 +50,6 @@ class Reporting:
         cnx_system = mysql.connector.connect(**config.myems_system_db)
         cursor_system = cnx_system.cursor()
 
-        cnx_historical = mysql.connector.connect(**config.myems_historical_db)
-        cursor_historical = cnx_historical.cursor()
-
         if photovoltaic_power_station_id is not None:
             query = (" SELECT id "
                      " FROM tbl_photovoltaic_power_stations "
@@ -65,41 +63,9 @@ class Reporting:
                                    description='API.PHOTOVOLTAIC_POWER_STATION_NOT_FOUND')
 
         ################################################################################################################
-        # Step 3: query analog points latest values
-        ################################################################################################################
-        latest_value_dict = dict()
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_analog_value_latest "
-                 " WHERE utc_date_time > %s ")
-        cursor_historical.execute(query, (datetime.utcnow() - timedelta(minutes=60),))
-        rows = cursor_historical.fetchall()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                latest_value_dict[row[0]] = row[1]
-
-        ################################################################################################################
-        # Step 4: query energy points latest values
-        ################################################################################################################
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_energy_value_latest "
-                 " WHERE utc_date_time > %s ")
-        cursor_historical.execute(query, (datetime.utcnow() - timedelta(minutes=60),))
-        rows = cursor_historical.fetchall()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                latest_value_dict[row[0]] = row[1]
-
-        ################################################################################################################
-        # Step 5: query digital points latest values
+        # Step 3: query points latest values
         ################################################################################################################
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_digital_value_latest "
-                 " WHERE utc_date_time > %s ")
-        cursor_historical.execute(query, (datetime.utcnow() - timedelta(minutes=60),))
-        rows = cursor_historical.fetchall()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                latest_value_dict[row[0]] = row[1]
+        since = datetime.utcnow() - timedelta(minutes=60)
 
         ################################################################################################################
         # Step 6: query the points of associated invertors
@@ -255,100 +221,100 @@ class Reporting:
                 current_invertor['model'] = row[3]
                 current_invertor['serial_number'] = row[4]
                 current_invertor['invertor_state'] = \
-                    invertor_state_dict.get(latest_value_dict.get(row[5], None), '未知')
+                    invertor_state_dict.get(latestvalues.get_point_value(row[5], since), '未知')
                 current_invertor['communication_state'] = \
-                    communication_state_dict.get(latest_value_dict.get(row[6], None), '未知')
-                current_invertor['total_energy'] = latest_value_dict.get(row[7], None)
-                current_invertor['today_energy'] = latest_value_dict.get(row[8], None)
-                current_invertor['efficiency'] = latest_value_dict.get(row[9], None)
-                current_invertor['temperature'] = latest_value_dict.get(row[10], None)
-                current_invertor['power_factor'] = latest_value_dict.get(row[11], None)
-                current_invertor['active_power'] = latest_value_dict.get(row[12], None)
-                current_invertor['reactive_power'] = latest_value_dict.get(row[13], None)
-                current_invertor['frequency'] = latest_value_dict.get(row[14], None)
-                current_invertor['uab'] = latest_value_dict.get(row[15], None)
-                current_invertor['ubc'] = latest_value_dict.get(row[16], None)
-                current_invertor['uca'] = latest_value_dict.get(row[17], None)
-                current_invertor['ua'] = latest_value_dict.get(row[18], None)
-                current_invertor['ub'] = latest_value_dict.get(row[19], None)
-                current_invertor['uc'] = latest_value_dict.get(row[20], None)
-                current_invertor['ia'] = latest_value_dict.get(row[21], None)
-                current_invertor['ib'] = latest_value_dict.get(row[22], None)
-                current_invertor['ic'] = latest_value_dict.get(row[23], None)
-                current_invertor['pv1_u'] = latest_value_dict.get(row[24], None)
-                current_invertor['pv1_i'] = latest_value_dict.get(row[25], None)
-                current_invertor['pv2_u'] = latest_value_dict.get(row[26], None)
-                current_invertor['pv2_i'] = latest_value_dict.get(row[27], None)
-                current_invertor['pv3_u'] = latest_value_dict.get(row[28], None)
-                current_invertor['pv3_i'] = latest_value_dict.get(row[29], None)
-                current_invertor['pv4_u'] = latest_value_dict.get(row[30], None)
-                current_invertor['pv4_i'] = latest_value_dict.get(row[31], None)
-                current_invertor['pv5_u'] = latest_value_dict.get(row[32], None)
-                current_invertor['pv5_i'] = latest_value_dict.get(row[33], None)
-                current_invertor['pv6_u'] = latest_value_dict.get(row[34], None)
-                current_invertor['pv6_i'] = latest_value_dict.get(row[35], None)
-                current_invertor['pv7_u'] = latest_value_dict.get(row[36], None)
-                current_invertor['pv7_i'] = latest_value_dict.get(row[37], None)
-                current_invertor['pv8_u'] = latest_value_dict.get(row[38], None)
-                current_invertor['pv8_i'] = latest_value_dict.get(row[39], None)
-                current_invertor['pv9_u'] = latest_value_dict.get(row[40], None)
-                current_invertor['pv9_i'] = latest_value_dict.get(row[41], None)
-                current_invertor['pv10_u'] = latest_value_dict.get(row[42], None)
-                current_invertor['pv10_i'] = latest_value_dict.get(row[43], None)
-                current_invertor['pv11_u'] = latest_value_dict.get(row[44], None)
-                current_invertor['pv11_i'] = latest_value_dict.get(row[45], None)
-                current_invertor['pv12_u'] = latest_value_dict.get(row[46], None)
-                current_invertor['pv12_i'] = latest_value_dict.get(row[47], None)
-                current_invertor['pv13_u'] = latest_value_dict.get(row[48], None)
-                current_invertor['pv13_i'] = latest_value_dict.get(row[49], None)
-                current_invertor['pv14_u'] = latest_value_dict.get(row[50], None)
-                current_invertor['pv14_i'] = latest_value_dict.get(row[51], None)
-                current_invertor['pv15_u'] = latest_value_dict.get(row[52], None)
-                current_invertor['pv15_i'] = latest_value_dict.get(row[53], None)
-                current_invertor['pv16_u'] = latest_value_dict.get(row[54], None)
-                current_invertor['pv16_i'] = latest_value_dict.get(row[55], None)
-                current_invertor['pv17_u'] = latest_value_dict.get(row[56], None)
-                current_invertor['pv17_i'] = latest_value_dict.get(row[57], None)
-                current_invertor['pv18_u'] = latest_value_dict.get(row[58], None)
-                current_invertor['pv18_i'] = latest_value_dict.get(row[59], None)
-                current_invertor['pv19_u'] = latest_value_dict.get(row[60], None)
-                current_invertor['pv19_i'] = latest_value_dict.get(row[61], None)
-                current_invertor['pv20_u'] = latest_value_dict.get(row[62], None)
-                current_invertor['pv20_i'] = latest_value_dict.get(row[63], None)
-                current_invertor['pv21_u'] = latest_value_dict.get(row[64], None)
-                current_invertor['pv21_i'] = latest_value_dict.get(row[65], None)
-                current_invertor['pv22_u'] = latest_value_dict.get(row[66], None)
-                current_invertor['pv22_i'] = latest_value_dict.get(row[67], None)
-                current_invertor['pv23_u'] = latest_value_dict.get(row[68], None)
-                current_invertor['pv23_i'] = latest_value_dict.get(row[69], None)
-                current_invertor['pv24_u'] = latest_value_dict.get(row[70], None)
-                current_invertor['pv24_i'] = latest_value_dict.get(row[71], None)
-                current_invertor['pv25_u'] = latest_value_dict.get(row[72], None)
-                current_invertor['pv25_i'] = latest_value_dict.get(row[73], None)
-                current_invertor['pv26_u'] = latest_value_dict.get(row[74], None)
-                current_invertor['pv26_i'] = latest_value_dict.get(row[75], None)
-                current_invertor['pv27_u'] = latest_value_dict.get(row[76], None)
-                current_invertor['pv27_i'] = latest_value_dict.get(row[77], None)
-                current_invertor['pv28_u'] = latest_value_dict.get(row[78], None)
-                current_invertor['pv28_i'] = latest_value_dict.get(row[79], None)
-                current_invertor['mppt_total_energy'] = latest_value_dict.get(row[80], None)
-                current_invertor['mppt_power'] = latest_value_dict.get(row[81], None)
-                current_invertor['mppt_1_energy'] = latest_value_dict.get(row[82], None)
-                current_invertor['mppt_2_energy'] = latest_value_dict.get(row[83], None)
-                current_invertor['mppt_3_energy'] = latest_value_dict.get(row[84], None)
-                current_invertor['mppt_4_energy'] = latest_value_dict.get(row[85], None)
-                current_invertor['mppt_5_energy'] = latest_value_dict.get(row[86], None)
-                current_invertor['mppt_6_energy'] = latest_value_dict.get(row[87], None)
-                current_invertor['mppt_7_energy'] = latest_value_dict.get(row[88], None)
-                current_invertor['mppt_8_energy'] = latest_value_dict.get(row[89], None)
-                current_invertor['mppt_9_energy'] = latest_value_dict.get(row[90], None)
-                current_invertor['mppt_10_energy'] = latest_value_dict.get(row[91], None)
-                startup_time = latest_value_dict.get(row[92], None)
+                    communication_state_dict.get(latestvalues.get_point_value(row[6], since), '未知')
+                current_invertor['total_energy'] = latestvalues.get_point_value(row[7], since)
+                current_invertor['today_energy'] = latestvalues.get_point_value(row[8], since)
+                current_invertor['efficiency'] = latestvalues.get_point_value(row[9], since)
+                current_invertor['temperature'] = latestvalues.get_point_value(row[10], since)
+                current_invertor['power_factor'] = latestvalues.get_point_value(row[11], since)
+                current_invertor['active_power'] = latestvalues.get_point_value(row[12], since)
+                current_invertor['reactive_power'] = latestvalues.get_point_value(row[13], since)
+                current_invertor['frequency'] = latestvalues.get_point_value(row[14], since)
+                current_invertor['uab'] = latestvalues.get_point_value(row[15], since)
+                current_invertor['ubc'] = latestvalues.get_point_value(row[16], since)
+                current_invertor['uca'] = latestvalues.get_point_value(row[17], since)
+                current_invertor['ua'] = latestvalues.get_point_value(row[18], since)
+                current_invertor['ub'] = latestvalues.get_point_value(row[19], since)
+                current_invertor['uc'] = latestvalues.get_point_value(row[20], since)
+                current_invertor['ia'] = latestvalues.get_point_value(row[21], since)
+                current_invertor['ib'] = latestvalues.get_point_value(row[22], since)
+                current_invertor['ic'] = latestvalues.get_point_value(row[23], since)
+                current_invertor['pv1_u'] = latestvalues.get_point_value(row[24], since)
+                current_invertor['pv1_i'] = latestvalues.get_point_value(row[25], since)
+                current_invertor['pv2_u'] = latestvalues.get_point_value(row[26], since)
+                current_invertor['pv2_i'] = latestvalues.get_point_value(row[27], since)
+                current_invertor['pv3_u'] = latestvalues.get_point_value(row[28], since)
+                current_invertor['pv3_i'] = latestvalues.get_point_value(row[29], since)
+                current_invertor['pv4_u'] = latestvalues.get_point_value(row[30], since)
+                current_invertor['pv4_i'] = latestvalues.get_point_value(row[31], since)
+                current_invertor['pv5_u'] = latestvalues.get_point_value(row[32], since)
+                current_invertor['pv5_i'] = latestvalues.get_point_value(row[33], since)
+                current_invertor['pv6_u'] = latestvalues.get_point_value(row[34], since)
+                current_invertor['pv6_i'] = latestvalues.get_point_value(row[35], since)
+                current_invertor['pv7_u'] = latestvalues.get_point_value(row[36], since)
+                current_invertor['pv7_i'] = latestvalues.get_point_value(row[37], since)
+                current_invertor['pv8_u'] = latestvalues.get_point_value(row[38], since)
+                current_invertor['pv8_i'] = latestvalues.get_point_value(row[39], since)
+                current_invertor['pv9_u'] = latestvalues.get_point_value(row[40], since)
+                current_invertor['pv9_i'] = latestvalues.get_point_value(row[41], since)
+                current_invertor['pv10_u'] = latestvalues.get_point_value(row[42], since)
+                current_invertor['pv10_i'] = latestvalues.get_point_value(row[43], since)
+                current_invertor['pv11_u'] = latestvalues.get_point_value(row[44], since)
+                current_invertor['pv11_i'] = latestvalues.get_point_value(row[45], since)
+                current_invertor['pv12_u'] = latestvalues.get_point_value(row[46], since)
+                current_invertor['pv12_i'] = latestvalues.get_point_value(row[47], since)
+                current_invertor['pv13_u'] = latestvalues.get_point_value(row[48], since)
+                current_invertor['pv13_i'] = latestvalues.get_point_value(row[49], since)
+                current_invertor['pv14_u'] = latestvalues.get_point_value(row[50], since)
+                current_invertor['pv14_i'] = latestvalues.get_point_value(row[51], since)
+                current_invertor['pv15_u'] = latestvalues.get_point_value(row[52], since)
+                current_invertor['pv15_i'] = latestvalues.get_point_value(row[53], since)
+                current_invertor['pv16_u'] = latestvalues.get_point_value(row[54], since)
+                current_invertor['pv16_i'] = latestvalues.get_point_value(row[55], since)
+                current_invertor['pv17_u'] = latestvalues.get_point_value(row[56], since)
+                current_invertor['pv17_i'] = latestvalues.get_point_value(row[57], since)
+                current_invertor['pv18_u'] = latestvalues.get_point_value(row[58], since)
+                current_invertor['pv18_i'] = latestvalues.get_point_value(row[59], since)
+                current_invertor['pv19_u'] = latestvalues.get_point_value(row[60], since)
+                current_invertor['pv19_i'] = latestvalues.get_point_value(row[61], since)
+                current_invertor['pv20_u'] = latestvalues.get_point_value(row[62], since)
+                current_invertor['pv20_i'] = latestvalues.get_point_value(row[63], since)
+                current_invertor['pv21_u'] = latestvalues.get_point_value(row[64], since)
+                current_invertor['pv21_i'] = latestvalues.get_point_value(row[65], since)
+                current_invertor['pv22_u'] = latestvalues.get_point_value(row[66], since)
+                current_invertor['pv22_i'] = latestvalues.get_point_value(row[67], since)
+                current_invertor['pv23_u'] = latestvalues.get_point_value(row[68], since)
+                current_invertor['pv23_i'] = latestvalues.get_point_value(row[69], since)
+                current_invertor['pv24_u'] = latestvalues.get_point_value(row[70], since)
+                current_invertor['pv24_i'] = latestvalues.get_point_value(row[71], since)
+                current_invertor['pv25_u'] = latestvalues.get_point_value(row[72], since)
+                current_invertor['pv25_i'] = latestvalues.get_point_value(row[73], since)
+                current_invertor['pv26_u'] = latestvalues.get_point_value(row[74], since)
+                current_invertor['pv26_i'] = latestvalues.get_point_value(row[75], since)
+                current_invertor['pv27_u'] = latestvalues.get_point_value(row[76], since)
+                current_invertor['pv27_i'] = latestvalues.get_point_value(row[77], since)
+                current_invertor['pv28_u'] = latestvalues.get_point_value(row[78], since)
+                current_invertor['pv28_i'] = latestvalues.get_point_value(row[79], since)
+                current_invertor['mppt_total_energy'] = latestvalues.get_point_value(row[80], since)
+                current_invertor['mppt_power'] = latestvalues.get_point_value(row[81], since)
+                current_invertor['mppt_1_energy'] = latestvalues.get_point_value(row[82], since)
+                current_invertor['mppt_2_energy'] = latestvalues.get_point_value(row[83], since)
+                current_invertor['mppt_3_energy'] = latestvalues.get_point_value(row[84], since)
+                current_invertor['mppt_4_energy'] = latestvalues.get_point_value(row[85], since)
+                current_invertor['mppt_5_energy'] = latestvalues.get_point_value(row[86], since)
+                current_invertor['mppt_6_energy'] = latestvalues.get_point_value(row[87], since)
+                current_invertor['mppt_7_energy'] = latestvalues.get_point_value(row[88], since)
+                current_invertor['mppt_8_energy'] = latestvalues.get_point_value(row[89], since)
+                current_invertor['mppt_9_energy'] = latestvalues.get_point_value(row[90], since)
+                current_invertor['mppt_10_energy'] = latestvalues.get_point_value(row[91], since)
+                startup_time = latestvalues.get_point_value(row[92], since)
                 current_invertor['startup_time'] = \
                     (datetime.utcfromtimestamp(int(startup_time) / 1000) + timedelta(minutes=timezone_offset))\
                     .isoformat()[0:19] \
                     if startup_time is not None else None
-                shutdown_time = latest_value_dict.get(row[93], None)
+                shutdown_time = latestvalues.get_point_value(row[93], since)
                 current_invertor['shutdown_time'] = \
                     (datetime.utcfromtimestamp(int(shutdown_time) / 1000) + timedelta(minutes=timezone_offset)) \
                     .isoformat()[0:19] \
@@ -360,10 +326,6 @@ class Reporting:
         if cnx_system:
             cnx_system.close()
 
-        if cursor_historical:
-            cursor_historical.close()
-        if cnx_historical:
-            cnx_historical.close()
         ################################################################################################################
         # Step 8: construct the report
         ################################################################################################################
@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 import falcon
 import mysql.connector
 import simplejson as json
+from core import latestvalues
 from core.useractivity import access_control, api_key_control
 import config
 
@@ -50,9 +51,6 @@ class Reporting:
         cnx_system = mysql.connector.connect(**config.myems_system_db)
         cursor_system = cnx_system.cursor()
 
-        cnx_historical = mysql.connector.connect(**config.myems_historical_db)
-        cursor_historical = cnx_historical.cursor()
-
         if photovoltaic_power_station_id is not None:
             query = (" SELECT name "
                      " FROM tbl_photovoltaic_power_stations "
@@ -68,41 +66,9 @@ class Reporting:
         else:
             photovoltaic_power_station_name = row[0]
         ################################################################################################################
-        # Step 4: query analog points latest values
-        ################################################################################################################
-        latest_value_dict = dict()
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_analog_value_latest "
-                 " WHERE utc_date_time > %s ")
-        cursor_historical.execute(query, (datetime.utcnow() - timedelta(minutes=60),))
-        rows = cursor_historical.fetchall()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                latest_value_dict[row[0]] = row[1]
-
-        ################################################################################################################
-        # Step 5: query energy points latest values
-        ################################################################################################################
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_energy_value_latest "
-                 " WHERE utc_date_time > %s ")
-        cursor_historical.execute(query, (datetime.utcnow() - timedelta(minutes=60),))
-        rows = cursor_historical.fetchall()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                latest_value_dict[row[0]] = row[1]
-
-        ################################################################################################################
-        # Step 6: query digital points latest values
+        # Step 4: query points latest values
         ################################################################################################################
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_digital_value_latest "
-                 " WHERE utc_date_time > %s ")
-        cursor_historical.execute(query, (datetime.utcnow() - timedelta(minutes=60),))
-        rows = cursor_historical.fetchall()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                latest_value_dict[row[0]] = row[1]
+        since = datetime.utcnow() - timedelta(minutes=60)
 
         ################################################################################################################
         # Step 7: query the points of meters
@@ -139,22 +105,22 @@ class Reporting:
                 current_grid_meter['id'] = row[0]
                 current_grid_meter['name'] = photovoltaic_power_station_name + '-' + row[1]
                 current_grid_meter['uuid'] = row[2]
-                current_grid_meter['total_active_power_point'] = latest_value_dict.get(row[3], None)
-                current_grid_meter['active_power_a_point'] = latest_value_dict.get(row[4], None)
-                current_grid_meter['active_power_b_point'] = latest_value_dict.get(row[5], None)
-                current_grid_meter['active_power_c_point'] = latest_value_dict.get(row[6], None)
-                current_grid_meter['total_reactive_power_point'] = latest_value_dict.get(row[7], None)
-                current_grid_meter['reactive_power_a_point'] = latest_value_dict.get(row[8], None)
-                current_grid_meter['reactive_power_b_point'] = latest_value_dict.get(row[9], None)
-                current_grid_meter['reactive_power_c_point'] = latest_value_dict.get(row[10], None)
-                current_grid_meter['total_apparent_power_point'] = latest_value_dict.get(row[11], None)
-                current_grid_meter['apparent_power_a_point'] = latest_value_dict.get(row[12], None)
-                current_grid_meter['apparent_power_b_point'] = latest_value_dict.get(row[13], None)
-                current_grid_meter['apparent_power_c_point'] = latest_value_dict.get(row[14], None)
-                current_grid_meter['total_power_factor_point'] = latest_value_dict.get(row[15], None)
-                current_grid_meter['active_energy_import_point'] = latest_value_dict.get(row[16], None)
-                current_grid_meter['active_energy_export_point'] = latest_value_dict.get(row[17], None)
-                current_grid_meter['active_energy_net_point'] = latest_value_dict.get(row[18], None)
+                current_grid_meter['total_active_power_point'] = latestvalues.get_point_value(row[3], since)
+                current_grid_meter['active_power_a_point'] = latestvalues.get_point_value(row[4], since)
+                current_grid_meter['active_power_b_point'] = latestvalues.get_point_value(row[5], since)
+                current_grid_meter['active_power_c_point'] = latestvalues.get_point_value(row[6], since)
+                current_grid_meter['total_reactive_power_point'] = latestvalues.get_point_value(row[7], since)
+                current_grid_meter['reactive_power_a_point'] = latestvalues.get_point_value(row[8], since)
+                current_grid_meter['reactive_power_b_point'] = latestvalues.get_point_value(row[9], since)
+                current_grid_meter['reactive_power_c_point'] = latestvalues.get_point_value(row[10], since)
+                current_grid_meter['total_apparent_power_point'] = latestvalues.get_point_value(row[11], since)
+                current_grid_meter['apparent_power_a_point'] = latestvalues.get_point_value(row[12], since)
+                current_grid_meter['apparent_power_b_point'] = latestvalues.get_point_value(row[13], since)
+                current_grid_meter['apparent_power_c_point'] = latestvalues.get_point_value(row[14], since)
+                current_grid_meter['total_power_factor_point'] = latestvalues.get_point_value(row[15], since)
+                current_grid_meter['active_energy_import_point'] = latestvalues.get_point_value(row[16], since)
+                current_grid_meter['active_energy_export_point'] = latestvalues.get_point_value(row[17], since)
+                current_grid_meter['active_energy_net_point'] = latestvalues.get_point_value(row[18], since)
                 meter_list.append(current_grid_meter)
 
         # query load meter parameters
@@ -186,22 +152,22 @@ class Reporting:
                 current_load_meter['id'] = row[0]
                 current_load_meter['name'] = photovoltaic_power_station_name + '-' + row[1]
                 current_load_meter['uuid'] = row[2]
-                current_load_meter['total_active_power_point'] = latest_value_dict.get(row[3], None)
-                current_load_meter['active_power_a_point'] = latest_value_dict.get(row[4], None)
-                current_load_meter['active_power_b_point'] = latest_value_dict.get(row[5], None)
-                current_load_meter['active_power_c_point'] = latest_value_dict.get(row[6], None)
-                current_load_meter['total_reactive_power_point'] = latest_value_dict.get(row[7], None)
-                current_load_meter['reactive_power_a_point'] = latest_value_dict.get(row[8], None)
-                current_load_meter['reactive_power_b_point'] = latest_value_dict.get(row[9], None)
-                current_load_meter['reactive_power_c_point'] = latest_value_dict.get(row[10], None)
-                current_load_meter['total_apparent_power_point'] = latest_value_dict.get(row[11], None)
-                current_load_meter['apparent_power_a_point'] = latest_value_dict.get(row[12], None)
-                current_load_meter['apparent_power_b_point'] = latest_value_dict.get(row[13], None)
-                current_load_meter['apparent_power_c_point'] = latest_value_dict.get(row[14], None)
-                current_load_meter['total_power_factor_point'] = latest_value_dict.get(row[15], None)
-                current_load_meter['active_energy_import_point'] = latest_value_dict.get(row[16], None)
-                current_load_meter['active_energy_export_point'] = latest_value_dict.get(row[17], None)
-                current_load_meter['active_energy_net_point'] = latest_value_dict.get(row[18], None)
+                current_load_meter['total_active_power_point'] = latestvalues.get_point_value(row[3], since)
+                current_load_meter['active_power_a_point'] = latestvalues.get_point_value(row[4], since)
+                current_load_meter['active_power_b_point'] = latestvalues.get_point_value(row[5], since)
+                current_load_meter['active_power_c_point'] = latestvalues.get_point_value(row[6], since)
+                current_load_meter['total_reactive_power_point'] = latestvalues.get_point_value(row[7], since)
+                current_load_meter['reactive_power_a_point'] = latestvalues.get_point_value(row[8], since)
+                current_load_meter['reactive_power_b_point'] = latestvalues.get_point_value(row[9], since)
+                current_load_meter['reactive_power_c_point'] = latestvalues.get_point_value(row[10], since)
+                current_load_meter['total_apparent_power_point'] = latestvalues.get_point_value(row[11], since)
+                current_load_meter['apparent_power_a_point'] = latestvalues.get_point_value(row[12], since)
+                current_load_meter['apparent_power_b_point'] = latestvalues.get_point_value(row[13], since)
+                current_load_meter['apparent_power_c_point'] = latestvalues.get_point_value(row[14], since)
+                current_load_meter['total_power_factor_point'] = latestvalues.get_point_value(row[15], since)
+                current_load_meter['active_energy_import_point'] = latestvalues.get_point_value(row[16], since)
+                current_load_meter['active_energy_export_point'] = latestvalues.get_point_value(row[17], since)
+                current_load_meter['active_energy_net_point'] = latestvalues.get_point_value(row[18], since)
                 meter_list.append(current_load_meter)
 
         if cursor_system:
@@ -209,10 +175,6 @@ class Reporting:
         if cnx_system:
             cnx_system.close()
 
-        if cursor_historical:
-            cursor_historical.close()
-        if cnx_historical:
-            cnx_historical.close()
         ################################################################################################################
         # Step 8: construct the report
         ################################################################################################################
@@ -2,6 +2,7 @@ import falcon
 from datetime import datetime, timedelta, timezone
 import mysql.connector
 import simplejson as json
+from core import fleetindex, latestvalues
 from core.useractivity import access_control
 from decimal import Decimal
 import config
@@ -36,31 +37,28 @@ class Reporting:
                                    title='API.BAD_REQUEST',
                                    description='API.INVALID_PRIVILEGE')
         user_id = row[0]
-        # Get all points latest values
-        digital_value_latest_dict = dict()
-        analog_value_latest_dict = dict()
-        cnx_historical_db = mysql.connector.connect(**config.myems_historical_db)
-        cursor_historical_db = cnx_historical_db.cursor()
-        query = (" SELECT point_id, utc_date_time, actual_value "
-                 " FROM tbl_digital_value_latest ")
-        cursor_historical_db.execute(query, )
-        rows = cursor_historical_db.fetchall()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                digital_value_latest_dict[row[0]] = {"utc_date_time": row[1],
-                                                     "actual_value": row[2]}
-        query = (" SELECT point_id, utc_date_time, actual_value "
-                 " FROM tbl_analog_value_latest ")
-        cursor_historical_db.execute(query,)
-        rows = cursor_historical_db.fetchall()
-        cursor_historical_db.close()
-        cnx_historical_db.close()
-        if rows is not None and len(rows) > 0:
-            for row in rows:
-                analog_value_latest_dict[row[0]] = {"utc_date_time": row[1],
-                                                    "actual_value": row[2]}
-
-        # get generation hourly data today
+        # get photovoltaic power stations
+        cnx_system_db = mysql.connector.connect(**config.myems_system_db)
+        cursor_system_db = cnx_system_db.cursor()
+        query = (" SELECT m.id, m.name, m.uuid, "
+                 "        m.address, m.latitude, m.longitude, m.rated_capacity, m.rated_power, "
+                 "        m.description, m.phase_of_lifecycle "
+                 " FROM tbl_photovoltaic_power_stations m, tbl_photovoltaic_power_stations_users mu "
+                 " WHERE m.id = mu.photovoltaic_power_station_id AND mu.user_id = %s "
+                 " ORDER BY m.phase_of_lifecycle, m.id ")
+        cursor_system_db.execute(query, (user_id, ))
+        rows_photovoltaic_power_stations = cursor_system_db.fetchall()
+        cursor_system_db.close()
+        cnx_system_db.close()
+        if rows_photovoltaic_power_stations is None or len(rows_photovoltaic_power_stations) == 0:
+            resp.text = json.dumps(list())
+            return
+        station_ids = [row[0] for row in rows_photovoltaic_power_stations]
+
+        # get the points of the stations from the fleet index
+        station_points_dict = fleetindex.get_photovoltaic_power_station_points(station_ids)
+
+        # get generation hourly data today of the stations
         timezone_offset = int(config.utc_offset[1:3]) * 60 + int(config.utc_offset[4:6])
         if config.utc_offset[0] == '-':
             timezone_offset = -timezone_offset
@@ -77,11 +75,12 @@ class Reporting:
 
         cursor_energy_db.execute(" SELECT photovoltaic_power_station_id, start_datetime_utc, actual_value "
                                  " FROM tbl_photovoltaic_power_station_generation_hourly "
-                                 " WHERE start_datetime_utc >= %s "
+                                 " WHERE photovoltaic_power_station_id IN (" +
+                                 ', '.join(['%s'] * len(station_ids)) + ") "
+                                 "     AND start_datetime_utc >= %s "
                                  "     AND start_datetime_utc < %s "
                                  " ORDER BY photovoltaic_power_station_id, start_datetime_utc ",
-                                 (reporting_start_datetime_utc,
-                                  reporting_end_datetime_utc))
+                                 tuple(station_ids) + (reporting_start_datetime_utc, reporting_end_datetime_utc))
         rows_hourly = cursor_energy_db.fetchall()
         if rows_hourly is not None and len(rows_hourly) > 0:
             for row_hourly in rows_hourly:
@@ -107,100 +106,59 @@ class Reporting:
             default_value_list.append(Decimal(0.0))
             current_datetime_local = current_datetime_local + timedelta(hours=1)
 
-        # get photovoltaic power stations
-        cnx_system_db = mysql.connector.connect(**config.myems_system_db)
-        cursor_system_db = cnx_system_db.cursor()
-        query = (" SELECT m.id, m.name, m.uuid, "
-                 "        m.address, m.latitude, m.longitude, m.rated_capacity, m.rated_power, "
-                 "        m.description, m.phase_of_lifecycle "
-                 " FROM tbl_photovoltaic_power_stations m, tbl_photovoltaic_power_stations_users mu "
-                 " WHERE m.id = mu.photovoltaic_power_station_id AND mu.user_id = %s "
-                 " ORDER BY m.phase_of_lifecycle, m.id ")
-        cursor_system_db.execute(query, (user_id, ))
-        rows_photovoltaic_power_stations = cursor_system_db.fetchall()
-
         result = list()
-        if rows_photovoltaic_power_stations is not None and len(rows_photovoltaic_power_stations) > 0:
-            for row in rows_photovoltaic_power_stations:
-                photovoltaic_power_station_id = row[0]
-                # todo: get data source latest seen datetime to determine if it is online
-
-                is_online = False
-                row_datetime = list()
-                row_datetime.append(datetime.utcnow())
-                if row_datetime is not None and len(row_datetime) > 0:
-                    if isinstance(row_datetime[0], datetime):
-                        if row_datetime[0] + timedelta(minutes=10) > datetime.utcnow():
-                            is_online = True
-
-                # get invertor run state point
-                invertor_run_state_point_value = None
-                if is_online:
-                    query = (" SELECT invertor_state_point_id "
-                             " FROM tbl_photovoltaic_power_stations_invertors "
-                             " WHERE photovoltaic_power_station_id  = %s "
-                             " LIMIT 1 ")
-                    cursor_system_db.execute(query, (photovoltaic_power_station_id,))
-                    row_point = cursor_system_db.fetchone()
-                    if row_point is not None and len(row_point) > 0:
-                        if digital_value_latest_dict.get(row_point[0]) is not None:
-                            invertor_run_state_point_value = digital_value_latest_dict.get(row_point[0])['actual_value']
-
-                # 0：关闭 Shutdown
-                # 1：软启动中 Soft Starting
-                # 2：并网充电 On Grid Charging
-                # 3：并网放电 On Grid DisCharging
-                # 4：离网放电 Off Grid DisCharging
-                # 5：降额并网 Derating On Grid
-                # 6：待机 Standby
-                # 7：离网充电 Off Grid Charging
-
-                if invertor_run_state_point_value is None:
-                    invertor_run_state = 'Unknown'
-                elif invertor_run_state_point_value == 0:
-                    invertor_run_state = 'Shutdown'
-                elif invertor_run_state_point_value == 1:
-                    invertor_run_state = 'Running'
-                elif invertor_run_state_point_value == 2:
-                    invertor_run_state = 'Running'
-                elif invertor_run_state_point_value == 3:
-                    invertor_run_state = 'Running'
-                elif invertor_run_state_point_value == 4:
-                    invertor_run_state = 'Running'
-                elif invertor_run_state_point_value == 5:
-                    invertor_run_state = 'Running'
-                elif invertor_run_state_point_value == 6:
-                    invertor_run_state = 'Standby'
-                elif invertor_run_state_point_value == 7:
-                    invertor_run_state = 'Running'
-                else:
-                    invertor_run_state = 'Running'
-                    
-                # complete the generation_report_dict
-                if photovoltaic_power_station_id not in generation_report_dict.keys():
-                    generation_report_dict[photovoltaic_power_station_id] = dict()
-                    generation_report_dict[photovoltaic_power_station_id]['times'] = default_time_list
-                    generation_report_dict[photovoltaic_power_station_id]['values'] = default_value_list
-
-                meta_result = {"id": photovoltaic_power_station_id,
-                               "name": row[1],
-                               "uuid": row[2],
-                               "address": row[3],
-                               "latitude": row[4],
-                               "longitude": row[5],
-                               "rated_capacity": row[6],
-                               "rated_power": row[7],
-                               "description": row[8],
-                               "phase_of_lifecycle": row[9],
-                               "qrcode": 'energystoragepowerstation:' + row[2],
-                               "is_online": is_online,
-                               "invertor_run_state": invertor_run_state,
-                               "times": generation_report_dict[photovoltaic_power_station_id]['times'],
-                               "values": generation_report_dict[photovoltaic_power_station_id]['values']
-                               }
-
-                result.append(meta_result)
+        for row in rows_photovoltaic_power_stations:
+            photovoltaic_power_station_id = row[0]
+            # todo: get data source latest seen datetime to determine if it is online
+            is_online = True
+
+            # get invertor run state point
+            invertor_run_state_point_value = None
+            if is_online:
+                points = station_points_dict.get(photovoltaic_power_station_id, dict())
+                invertor_run_state_point_value = latestvalues.get_value('digital',
+                                                                        points.get('invertor_state_point_id'))
+
+            # 0：关闭 Shutdown
+            # 1：软启动中 Soft Starting
+            # 2：并网充电 On Grid Charging
+            # 3：并网放电 On Grid DisCharging
+            # 4：离网放电 Off Grid DisCharging
+            # 5：降额并网 Derating On Grid
+            # 6：待机 Standby
+            # 7：离网充电 Off Grid Charging
+            if invertor_run_state_point_value is None:
+                invertor_run_state = 'Unknown'
+            elif invertor_run_state_point_value == 0:
+                invertor_run_state = 'Shutdown'
+            elif invertor_run_state_point_value == 6:
+                invertor_run_state = 'Standby'
+            else:
+                invertor_run_state = 'Running'
+
+            # complete the generation_report_dict
+            if photovoltaic_power_station_id not in generation_report_dict.keys():
+                generation_report_dict[photovoltaic_power_station_id] = dict()
+                generation_report_dict[photovoltaic_power_station_id]['times'] = default_time_list
+                generation_report_dict[photovoltaic_power_station_id]['values'] = default_value_list
+
+            meta_result = {"id": photovoltaic_power_station_id,
+                           "name": row[1],
+                           "uuid": row[2],
+                           "address": row[3],
+                           "latitude": row[4],
+                           "longitude": row[5],
+                           "rated_capacity": row[6],
+                           "rated_power": row[7],
+                           "description": row[8],
+                           "phase_of_lifecycle": row[9],
+                           "qrcode": 'energystoragepowerstation:' + row[2],
+                           "is_online": is_online,
+                           "invertor_run_state": invertor_run_state,
+                           "times": generation_report_dict[photovoltaic_power_station_id]['times'],
+                           "values": generation_report_dict[photovoltaic_power_station_id]['values']
+                           }
+
+            result.append(meta_result)
 
-        cursor_system_db.close()
-        cnx_system_db.close()
         resp.text = json.dumps(result)
@@ -1,9 +1,8 @@
 from datetime import datetime, timedelta
 import falcon
-import mysql.connector
 import simplejson as json
+from core import latestvalues
 from core.useractivity import access_control, api_key_control
-import config
 
 
 class Reporting:
@@ -38,18 +37,10 @@ class Reporting:
         reporting_start_datetime_utc = datetime.utcnow() - timedelta(minutes=60)
 
         latest_value_data = list()
-        cnx_historical = mysql.connector.connect(**config.myems_historical_db)
-        cursor_historical = cnx_historical.cursor()
-
         ################################################################################################################
         # Step 2: query analog points latest values
         ################################################################################################################
-
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_analog_value_latest "
-                 " WHERE utc_date_time > %s ")
-        cursor_historical.execute(query, (reporting_start_datetime_utc,))
-        rows = cursor_historical.fetchall()
+        rows = latestvalues.get_values('analog', reporting_start_datetime_utc)
         if rows is not None and len(rows) > 0:
             for row in rows:
                 current_value = dict()
@@ -60,11 +51,7 @@ class Reporting:
         ################################################################################################################
         # Step 3: query energy points latest values
         ################################################################################################################
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_energy_value_latest "
-                 " WHERE utc_date_time > %s ")
-        cursor_historical.execute(query, (reporting_start_datetime_utc,))
-        rows = cursor_historical.fetchall()
+        rows = latestvalues.get_values('energy', reporting_start_datetime_utc)
         if rows is not None and len(rows) > 0:
             for row in rows:
                 current_value = dict()
@@ -75,12 +62,7 @@ class Reporting:
         ################################################################################################################
         # Step 4: query digital points latest values
         ################################################################################################################
-
-        query = (" SELECT point_id, actual_value "
-                 " FROM tbl_digital_value_latest "
-                 " WHERE utc_date_time > %s ")
-        cursor_historical.execute(query, (reporting_start_datetime_utc,))
-        rows = cursor_historical.fetchall()
+        rows = latestvalues.get_values('digital', reporting_start_datetime_utc)
         if rows is not None and len(rows) > 0:
             for row in rows:
                 current_value = dict()
@@ -92,9 +74,5 @@ class Reporting:
         # Step 5: construct the report
         ################################################################################################################
 
-        if cursor_historical:
-            cursor_historical.close()
-        if cnx_historical:
-            cnx_historical.close()
 
         resp.text = json.dumps(latest_value_data)
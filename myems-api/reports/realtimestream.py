@@ -0,0 +1,305 @@
+import threading
+import time
+from datetime import timedelta, timezone
+import falcon
+import mysql.connector
+import simplejson as json
+import config
+from core import latestvalues
+from core.useractivity import access_control, api_key_control
+
+
+########################################################################################################################
+# Realtime stream of point, meter and station values as Server-Sent Events
+# A client subscribes once with the ids of points, meters, energy storage power stations and microgrids, receives a
+# snapshot event with the current values, and then only delta events with the values changed since the last event.
+# All connections of an API worker read the shared snapshot of core/latestvalues.py, so the latest value tables are
+# queried once per refresh interval whatever the number of connections (fan-out).
+# Each connection wakes up every config.realtime_stream_coalescing_interval_in_seconds and compares the snapshot with
+# the values it already sent, so changes in between are coalesced into one event. A slow client blocks only its own
+# writes and receives the latest values when it catches up, nothing is queued for it (backpressure).
+# A stream ends after config.realtime_stream_max_duration_in_seconds, and the client reconnects. Every stream holds a
+# worker thread, so gunicorn runs threaded workers (--worker-class gthread --threads 32 in myems-api.service, Dockerfile
+# and run.sh), and config.realtime_stream_max_connections leaves threads of each worker for the other requests.
+########################################################################################################################
+OBJECT_VALUE_TYPES = {
+    'ANALOG_VALUE': 'analog',
+    'DIGITAL_VALUE': 'digital',
+    'ENERGY_VALUE': 'energy',
+}
+
+# device table, device points table and device id column of energy storage containers
+ENERGY_STORAGE_CONTAINER_POINT_TABLES = [
+    ('tbl_energy_storage_containers_batteries', 'tbl_energy_storage_containers_bmses_points', 'bms_id'),
+    ('tbl_energy_storage_containers_dcdcs', 'tbl_energy_storage_containers_dcdcs_points', 'dcdc_id'),
+    ('tbl_energy_storage_containers_firecontrols', 'tbl_energy_storage_containers_firecontrols_points',
+     'firecontrol_id'),
+    ('tbl_energy_storage_containers_grids', 'tbl_energy_storage_containers_grids_points', 'grid_id'),
+    ('tbl_energy_storage_containers_hvacs', 'tbl_energy_storage_containers_hvacs_points', 'hvac_id'),
+    ('tbl_energy_storage_containers_loads', 'tbl_energy_storage_containers_loads_points', 'load_id'),
+    ('tbl_energy_storage_containers_power_conversion_systems', 'tbl_energy_storage_containers_pcses_points',
+     'pcs_id'),
+    ('tbl_energy_storage_containers_stses', 'tbl_energy_storage_containers_stses_points', 'sts_id'),
+]
+
+# device table, device points table and device id column of microgrids
+MICROGRID_POINT_TABLES = [
+    ('tbl_microgrids_batteries', 'tbl_microgrids_bmses_points', 'bms_id'),
+    ('tbl_microgrids_evchargers', 'tbl_microgrids_evchargers_points', 'evcharger_id'),
+    ('tbl_microgrids_generators', 'tbl_microgrids_generators_points', 'generator_id'),
+    ('tbl_microgrids_grids', 'tbl_microgrids_grids_points', 'grid_id'),
+    ('tbl_microgrids_heatpumps', 'tbl_microgrids_heatpumps_points', 'heatpump_id'),
+    ('tbl_microgrids_loads', 'tbl_microgrids_loads_points', 'load_id'),
+    ('tbl_microgrids_power_conversion_systems', 'tbl_microgrids_pcses_points', 'pcs_id'),
+    ('tbl_microgrids_photovoltaics', 'tbl_microgrids_pvs_points', 'pv_id'),
+]
+
+_connections_lock = threading.Lock()
+_connections = {'count': 0}
+
+
+def _parse_id_list(value, description):
+    if value is None or len(str.strip(value)) == 0:
+        return list()
+    id_list = list()
+    for item in str.strip(value).split(','):
+        item = str.strip(item)
+        if not item.isdigit() or int(item) <= 0:
+            raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST', description=description)
+        if int(item) not in id_list:
+            id_list.append(int(item))
+    return id_list
+
+
+def _in_list(values):
+    return '(' + ', '.join(['%s'] * len(values)) + ')'
+
+
+def _query_owner_points(cursor, owner_ids, query):
+    """
+    Query the points of owners, for example meters
+    :return: dict of owner id and sorted list of point ids
+    """
+    result = {owner_id: list() for owner_id in owner_ids}
+    if len(owner_ids) == 0:
+        return result
+    cursor.execute(query, tuple(owner_ids))
+    for row in cursor.fetchall():
+        if row[1] not in result[row[0]]:
+            result[row[0]].append(row[1])
+    for point_id_list in result.values():
+        point_id_list.sort()
+    return result
+
+
+def _format_timestamp(utc_date_time, timezone_offset):
+    return (utc_date_time.replace(tzinfo=timezone.utc) + timedelta(minutes=timezone_offset)).isoformat()[0:19]
+
+
+def _format_event(event, data):
+    return ('event: ' + event + '\n' + 'data: ' + json.dumps(data) + '\n\n').encode('utf-8')
+
+
+def _release_connection():
+    with _connections_lock:
+        _connections['count'] -= 1
+
+
+def _generate_events(point_types, timezone_offset, initial_data):
+    """
+    Generate the events of a stream
+    :param point_types: dict of point id and value type of latestvalues
+    :param timezone_offset: timezone offset in minutes of timestamps
+    :param initial_data: data of the snapshot event without values
+    """
+    started_at = time.monotonic()
+    last_event_at = started_at
+    sent = dict()
+
+    def changed_values():
+        values = list()
+        snapshots = dict()
+        for point_id, value_type in point_types.items():
+            if value_type not in snapshots:
+                snapshots[value_type] = latestvalues.get_snapshot(value_type)
+            item = snapshots[value_type].get(point_id)
+            # refreshes rebuild the (utc_date_time, actual_value) tuples of the rows they read again,
+            # so a value is new only if it differs from the one sent
+            if item is not None and item != sent.get(point_id):
+                sent[point_id] = item
+                values.append({'point_id': point_id,
+                               'value': item[1],
+                               'timestamp': _format_timestamp(item[0], timezone_offset)})
+        return values
+
+    yield ('retry: ' + str(config.realtime_stream_retry_in_milliseconds) + '\n\n').encode('utf-8')
+    initial_data['values'] = changed_values()
+    yield _format_event('snapshot', initial_data)
+
+    while True:
+        time.sleep(config.realtime_stream_coalescing_interval_in_seconds)
+        now = time.monotonic()
+        if now - started_at >= config.realtime_stream_max_duration_in_seconds:
+            yield _format_event('end', {})
+            break
+        values = changed_values()
+        if len(values) > 0:
+            last_event_at = now
+            yield _format_event('delta', {'values': values})
+        elif now - last_event_at >= config.realtime_stream_heartbeat_interval_in_seconds:
+            last_event_at = now
+            # comment lines keep proxies and load balancers from closing idle connections
+            yield b': heartbeat\n\n'
+
+
+class _Stream:
+    """
+    Response stream releasing its connection slot when the WSGI server closes it,
+    which also happens when the client disconnects before the first event
+    """
+    def __init__(self, point_types, timezone_offset, initial_data):
+        self._events = _generate_events(point_types, timezone_offset, initial_data)
+        self._is_closed = False
+
+    def __iter__(self):
+        return self._events
+
+    def close(self):
+        if not self._is_closed:
+            self._is_closed = True
+            self._events.close()
+            _release_connection()
+
+
+class Reporting:
+    def __init__(self):
+        """"Initializes Reporting"""
+        pass
+
+    @staticmethod
+    def on_options(req, resp):
+        _ = req
+        resp.status = falcon.HTTP_200
+
+    ####################################################################################################################
+    # PROCEDURES
+    # Step 1: valid parameters
+    # Step 2: query points of meters and stations
+    # Step 3: query object types of points
+    # Step 4: start the stream
+    ####################################################################################################################
+    @staticmethod
+    def on_get(req, resp):
+        if 'API-KEY' not in req.headers or \
+                not isinstance(req.headers['API-KEY'], str) or \
+                len(str.strip(req.headers['API-KEY'])) == 0:
+            access_control(req)
+        else:
+            api_key_control(req)
+        print(req.params)
+        ################################################################################################################
+        # Step 1: valid parameters
+        ################################################################################################################
+        point_ids = _parse_id_list(req.params.get('pointids'), 'API.INVALID_POINT_ID')
+        meter_ids = _parse_id_list(req.params.get('meterids'), 'API.INVALID_METER_ID')
+        energy_storage_power_station_ids = _parse_id_list(req.params.get('energystoragepowerstationids'),
+                                                          'API.INVALID_ENERGY_STORAGE_POWER_STATION_ID')
+        microgrid_ids = _parse_id_list(req.params.get('microgridids'), 'API.INVALID_MICROGRID_ID')
+
+        if len(point_ids) + len(meter_ids) + len(energy_storage_power_station_ids) + len(microgrid_ids) == 0:
+            raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                                   description='API.INVALID_POINT_ID')
+
+        timezone_offset = int(config.utc_offset[1:3]) * 60 + int(config.utc_offset[4:6])
+        if config.utc_offset[0] == '-':
+            timezone_offset = -timezone_offset
+
+        ################################################################################################################
+        # Step 2: query points of meters and stations
+        ################################################################################################################
+        cnx_system = mysql.connector.connect(**config.myems_system_db)
+        cursor_system = cnx_system.cursor()
+        try:
+            meter_points = _query_owner_points(cursor_system, meter_ids,
+                                               " SELECT meter_id, point_id "
+                                               " FROM tbl_meters_points "
+                                               " WHERE meter_id IN " + _in_list(meter_ids))
+
+            energy_storage_power_station_points = {station_id: list()
+                                                   for station_id in energy_storage_power_station_ids}
+            for device_table, points_table, device_column in ENERGY_STORAGE_CONTAINER_POINT_TABLES:
+                owner_points = _query_owner_points(
+                    cursor_system, energy_storage_power_station_ids,
+                    " SELECT espsc.energy_storage_power_station_id, dp.point_id "
+                    " FROM tbl_energy_storage_power_stations_containers espsc, "
+                    "      " + device_table + " d, " + points_table + " dp "
+                    " WHERE espsc.energy_storage_power_station_id IN " +
+                    _in_list(energy_storage_power_station_ids) +
+                    "       AND d.energy_storage_container_id = espsc.energy_storage_container_id "
+                    "       AND dp." + device_column + " = d.id ")
+                for station_id, point_id_list in owner_points.items():
+                    energy_storage_power_station_points[station_id].extend(point_id_list)
+
+            microgrid_points = {microgrid_id: list() for microgrid_id in microgrid_ids}
+            for device_table, points_table, device_column in MICROGRID_POINT_TABLES:
+                owner_points = _query_owner_points(
+                    cursor_system, microgrid_ids,
+                    " SELECT d.microgrid_id, dp.point_id "
+                    " FROM " + device_table + " d, " + points_table + " dp "
+                    " WHERE d.microgrid_id IN " + _in_list(microgrid_ids) +
+                    "       AND dp." + device_column + " = d.id ")
+                for microgrid_id, point_id_list in owner_points.items():
+                    microgrid_points[microgrid_id].extend(point_id_list)
+
+            all_point_ids = set(point_ids)
+            for owner_points in (meter_points, energy_storage_power_station_points, microgrid_points):
+                for point_id_list in owner_points.values():
+                    all_point_ids.update(point_id_list)
+
+            if len(all_point_ids) > config.realtime_stream_max_points:
+                raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
+                                       description='API.TOO_MANY_POINTS')
+
+            ############################################################################################################
+            # Step 3: query object types of points
+            ############################################################################################################
+            point_types = dict()
+            point_list = list()
+            if len(all_point_ids) > 0:
+                cursor_system.execute(" SELECT id, name, units, object_type "
+                                      " FROM tbl_points "
+                                      " WHERE id IN " + _in_list(all_point_ids) +
+                                      " ORDER BY id ", tuple(all_point_ids))
+                for row in cursor_system.fetchall():
+                    if row[3] in OBJECT_VALUE_TYPES:
+                        point_types[row[0]] = OBJECT_VALUE_TYPES[row[3]]
+                        point_list.append({'id': row[0], 'name': row[1], 'units': row[2], 'object_type': row[3]})
+        finally:
+            cursor_system.close()
+            cnx_system.close()
+
+        ################################################################################################################
+        # Step 4: start the stream
+        ################################################################################################################
+        with _connections_lock:
+            if _connections['count'] >= config.realtime_stream_max_connections:
+                raise falcon.HTTPError(status=falcon.HTTP_503, title='API.SERVICE_UNAVAILABLE',
+                                       description='API.TOO_MANY_REALTIME_STREAMS')
+            _connections['count'] += 1
+
+        initial_data = dict()
+        initial_data['points'] = point_list
+        initial_data['meters'] = [{'id': meter_id, 'point_ids': point_id_list}
+                                  for meter_id, point_id_list in meter_points.items()]
+        initial_data['energy_storage_power_stations'] = \
+            [{'id': station_id, 'point_ids': sorted(set(point_id_list))}
+             for station_id, point_id_list in energy_storage_power_station_points.items()]
+        initial_data['microgrids'] = [{'id': microgrid_id, 'point_ids': sorted(set(point_id_list))}
+                                      for microgrid_id, point_id_list in microgrid_points.items()]
+
+        resp.status = falcon.HTTP_200
+        resp.content_type = 'text/event-stream'
+        resp.set_header('Cache-Control', 'no-cache')
+        # disable response buffering of nginx, which proxies the API in myems-web
+        resp.set_header('X-Accel-Buffering', 'no')
+        resp.stream = _Stream(point_types, timezone_offset, initial_data)
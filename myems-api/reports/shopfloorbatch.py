@@ -3,9 +3,9 @@ from decimal import Decimal
 import falcon
 import mysql.connector
 import simplejson as json
-from anytree import AnyNode, LevelOrderIter
 import config
 import excelexporters.shopfloorbatch
+from core import queryexecutor, topology, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -22,7 +22,7 @@ class Reporting:
     ####################################################################################################################
     # PROCEDURES
     # Step 1: valid parameters
-    # Step 2: build a space tree
+    # Step 2: get the shopfloors in the space tree from the topology index
     # Step 3: query all shopfloors in the space tree
     # Step 4: query energy categories
     # Step 5: query reporting period energy input
@@ -123,46 +123,33 @@ class Reporting:
             space_name = row[0]
 
         ################################################################################################################
-        # Step 2: build a space tree
+        # Step 2: get the shopfloors in the space tree from the topology index
         ################################################################################################################
-
-        query = (" SELECT id, name, parent_space_id "
-                 " FROM tbl_spaces "
-                 " ORDER BY id ")
-        cursor_system_db.execute(query)
-        rows_spaces = cursor_system_db.fetchall()
-        node_dict = dict()
-        if rows_spaces is not None and len(rows_spaces) > 0:
-            for row in rows_spaces:
-                parent_node = node_dict[row[2]] if row[2] is not None else None
-                node_dict[row[0]] = AnyNode(id=row[0], parent=parent_node, name=row[1])
+        shopfloor_space_dict = topology.get_subtree_entities(space_id, 'shopfloor')
 
         ################################################################################################################
         # Step 3: query all shopfloors in the space tree
         ################################################################################################################
         shopfloor_dict = dict()
-        space_dict = dict()
-
-        for node in LevelOrderIter(node_dict[space_id]):
-            space_dict[node.id] = node.name
 
-        cursor_system_db.execute(" SELECT shopfloor.id, shopfloor.name AS shopfloor_name, "
-                                 "        shopfloor.uuid AS shopfloor_uuid, s.name AS space_name, "
-                                 "        cc.name AS cost_center_name, shopfloor.description "
-                                 " FROM tbl_spaces s, tbl_spaces_shopfloors ss,"
-                                 " tbl_shopfloors shopfloor, tbl_cost_centers cc "
-                                 " WHERE s.id IN ( " + ', '.join(map(str, space_dict.keys())) + ") "
-                                 "       AND ss.space_id = s.id AND ss.shopfloor_id = shopfloor.id "
-                                 "       AND shopfloor.cost_center_id = cc.id  ", )
-        rows_shopfloors = cursor_system_db.fetchall()
-        if rows_shopfloors is not None and len(rows_shopfloors) > 0:
-            for row in rows_shopfloors:
-                shopfloor_dict[row[0]] = {"shopfloor_name": row[1],
-                                          "shopfloor_uuid": row[2],
-                                          "space_name": row[3],
-                                          "cost_center_name": row[4],
-                                          "description": row[5],
-                                          "values": list()}
+        if len(shopfloor_space_dict) > 0:
+            cursor_system_db.execute(" SELECT shopfloor.id, shopfloor.name AS shopfloor_name, "
+                                     "        shopfloor.uuid AS shopfloor_uuid, "
+                                     "        cc.name AS cost_center_name, shopfloor.description "
+                                     " FROM tbl_shopfloors shopfloor, tbl_cost_centers cc "
+                                     " WHERE shopfloor.id IN ( " + ', '.join(map(str, shopfloor_space_dict.keys())) +
+                                     ") "
+                                     "       AND shopfloor.cost_center_id = cc.id "
+                                     " ORDER BY shopfloor.id ", )
+            rows_shopfloors = cursor_system_db.fetchall()
+            if rows_shopfloors is not None and len(rows_shopfloors) > 0:
+                for row in rows_shopfloors:
+                    shopfloor_dict[row[0]] = {"shopfloor_name": row[1],
+                                              "shopfloor_uuid": row[2],
+                                              "space_name": shopfloor_space_dict[row[0]],
+                                              "cost_center_name": row[3],
+                                              "description": row[4],
+                                              "values": list()}
 
         ################################################################################################################
         # Step 4: query energy categories
@@ -210,24 +197,16 @@ class Reporting:
         ################################################################################################################
         # Step 5: query reporting period energy input
         ################################################################################################################
+        shopfloor_aggregates = \
+            queryexecutor.fetch_category_aggregates('myems_energy_db', 'tbl_shopfloor_input_category_hourly',
+                                                    'shopfloor_id', list(shopfloor_dict.keys()),
+                                                    reporting_start_datetime_utc, reporting_end_datetime_utc)
         for shopfloor_id in shopfloor_dict:
-
-            cursor_energy_db.execute(" SELECT energy_category_id, SUM(actual_value) "
-                                     " FROM tbl_shopfloor_input_category_hourly "
-                                     " WHERE shopfloor_id = %s "
-                                     "     AND start_datetime_utc >= %s "
-                                     "     AND start_datetime_utc < %s "
-                                     " GROUP BY energy_category_id ",
-                                     (shopfloor_id,
-                                      reporting_start_datetime_utc,
-                                      reporting_end_datetime_utc))
-            rows_shopfloor_energy = cursor_energy_db.fetchall()
             for energy_category in energy_category_list:
                 subtotal = Decimal(0.0)
-                for row_shopfloor_energy in rows_shopfloor_energy:
-                    if energy_category['id'] == row_shopfloor_energy[0]:
-                        subtotal = row_shopfloor_energy[1]
-                        break
+                aggregates = shopfloor_aggregates.get((shopfloor_id, energy_category['id']))
+                if aggregates is not None:
+                    subtotal = aggregates[0]
                 shopfloor_dict[shopfloor_id]['values'].append(subtotal)
 
         if cursor_system_db:
@@ -258,7 +237,7 @@ class Reporting:
         result = {'shopfloors': shopfloor_list, 'energycategories': energy_category_list, 'excel_bytes_base64': None}
 
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = excelexporters.shopfloorbatch.export(result,
                                                                                 space_name,
                                                                                 reporting_period_start_datetime_local,
@@ -3,11 +3,16 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import falcon
 import mysql.connector
-import simplejson as json
 import config
 import excelexporters.spaceenergycategory
-from core import utilities
-from core.useractivity import access_control, api_key_control
+from core import calendarindex, downsampling, payloadencoding, queryexecutor, reportcache, utilities
+
+
+def _cache_watermarks(req):
+    # the parameters data are read from the raw point values, which change every minute
+    if not reportcache.is_quick_mode(req):
+        return None
+    return [('myems_energy_db', 'tbl_space_input_category_hourly', 'id')]
 
 
 class Reporting:
@@ -37,13 +42,9 @@ class Reporting:
     # Step 13: construct the report
     ####################################################################################################################
     @staticmethod
+    @reportcache.cached('spaceenergycategory', _cache_watermarks)
     def on_get(req, resp):
-        if 'API-KEY' not in req.headers or \
-                not isinstance(req.headers['API-KEY'], str) or \
-                len(str.strip(req.headers['API-KEY'])) == 0:
-            access_control(req)
-        else:
-            api_key_control(req)
+        reportcache.check_access(req)
         print(req.params)
         space_id = req.params.get('spaceid')
         space_uuid = req.params.get('spaceuuid')
@@ -96,7 +97,6 @@ class Reporting:
             base_period_start_datetime_local = str.strip(base_period_start_datetime_local)
             try:
                 base_start_datetime_utc = datetime.strptime(base_period_start_datetime_local, '%Y-%m-%dT%H:%M:%S')
-                base_start_datetime_non_working_day = str(base_period_start_datetime_local).split('T')[0]
 
             except ValueError:
                 raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
@@ -114,7 +114,6 @@ class Reporting:
             base_period_end_datetime_local = str.strip(base_period_end_datetime_local)
             try:
                 base_end_datetime_utc = datetime.strptime(base_period_end_datetime_local, '%Y-%m-%dT%H:%M:%S')
-                base_end_datetime_non_working_day = str(base_period_end_datetime_local).split('T')[0]
 
             except ValueError:
                 raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
@@ -135,7 +134,6 @@ class Reporting:
             try:
                 reporting_start_datetime_utc = datetime.strptime(reporting_period_start_datetime_local,
                                                                  '%Y-%m-%dT%H:%M:%S')
-                reporting_start_datetime_non_working_day = str(reporting_period_start_datetime_local).split('T')[0]
 
             except ValueError:
                 raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
@@ -157,7 +155,6 @@ class Reporting:
                 reporting_end_datetime_utc = datetime.strptime(reporting_period_end_datetime_local,
                                                                '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc) - \
                     timedelta(minutes=timezone_offset)
-                reporting_end_datetime_non_working_day = str(reporting_period_end_datetime_local).split('T')[0]
             except ValueError:
                 raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
                                        description="API.INVALID_REPORTING_PERIOD_END_DATETIME")
@@ -173,6 +170,10 @@ class Reporting:
                 str.lower(str.strip(quick_mode)) in ('true', 't', 'on', 'yes', 'y'):
             is_quick_mode = True
 
+        sample_count, sampling_method = downsampling.get_sampling(req)
+        # the Excel file contains all raw values, the series of the JSON report are downsampled after the export
+        fetch_sample_count = downsampling.get_fetch_sample_count(req, sample_count)
+
         trans = utilities.get_translation(language)
         trans.install()
         _ = trans.gettext
@@ -314,14 +315,17 @@ class Reporting:
         # Step 6: query associated working calendars
         ################################################################################################################
         working_calendar_list = list()
-        cursor_system.execute(" SELECT swc.id "
+        working_calendar_ids = list()
+        cursor_system.execute(" SELECT swc.id, swc.working_calendar_id "
                               " FROM tbl_spaces sp, tbl_spaces_working_calendars swc "
                               " WHERE sp.id = %s AND sp.id = swc.space_id "
                               , (space['id'], ))
         rows = cursor_system.fetchall()
         if rows is not None and len(rows) > 0:
             for row in rows:
-                working_calendar_list.append(row[0])        
+                working_calendar_list.append(row[0])
+                working_calendar_ids.append(row[1])
+        non_working_days = calendarindex.get_non_working_days(working_calendar_ids)
 
         ################################################################################################################
         # Step 7: query child spaces
@@ -336,28 +340,26 @@ class Reporting:
             for row in rows_child_spaces:
                 child_space_list.append({"id": row[0], "name": row[1]})
 
+        ################################################################################################################
+        # query hourly data of all energy categories and child spaces with grouped queries in parallel
+        ################################################################################################################
+        grouped = queryexecutor.run_in_parallel({
+            'base': (queryexecutor.fetch_hourly_rows, 'myems_energy_db', 'tbl_space_input_category_hourly',
+                     'space_id', [space['id']], energy_category_set,
+                     base_start_datetime_utc, base_end_datetime_utc),
+            'reporting': (queryexecutor.fetch_hourly_rows, 'myems_energy_db', 'tbl_space_input_category_hourly',
+                          'space_id', [space['id']], energy_category_set,
+                          reporting_start_datetime_utc, reporting_end_datetime_utc),
+            'child_spaces': (queryexecutor.fetch_subtotals, 'myems_energy_db', 'tbl_space_input_category_hourly',
+                             'space_id', [child_space['id'] for child_space in child_space_list],
+                             energy_category_set, reporting_start_datetime_utc, reporting_end_datetime_utc),
+        })
+
         ################################################################################################################
         # Step 8: query base period energy input
         ################################################################################################################
         base = dict()
-        base['non_working_days'] = list()
         if energy_category_set is not None and len(energy_category_set) > 0:
-            if base_start_datetime_utc is not None and base_end_datetime_utc is not None:
-                cursor_system.execute(" SELECT nwd.date_local "
-                                      " FROM tbl_spaces sp, tbl_spaces_working_calendars spwc, "
-                                      "      tbl_working_calendars_non_working_days nwd "
-                                      " WHERE sp.id = %s AND "
-                                      "       sp.id = spwc.space_id AND "
-                                      "       spwc.working_calendar_id = nwd.working_calendar_id AND"
-                                      "       nwd.date_local >= %s AND"
-                                      "       nwd.date_local <= %s ",
-                                      (space['id'],
-                                       base_start_datetime_non_working_day,
-                                       base_end_datetime_non_working_day))
-                rows = cursor_system.fetchall()
-                for row in rows:
-                    row_datetime = row[0].isoformat()[0:10]
-                    base['non_working_days'].append(row_datetime)
             for energy_category_id in energy_category_set:
                 kgce = energy_category_dict[energy_category_id]['kgce']
                 kgco2e = energy_category_dict[energy_category_id]['kgco2e']
@@ -368,21 +370,8 @@ class Reporting:
                 base[energy_category_id]['subtotal'] = Decimal(0.0)
                 base[energy_category_id]['subtotal_in_kgce'] = Decimal(0.0)
                 base[energy_category_id]['subtotal_in_kgco2e'] = Decimal(0.0)
-                base[energy_category_id]['non_working_days_subtotal'] = Decimal(0.0)
-                base[energy_category_id]['working_days_subtotal'] = Decimal(0.0)
-
-                cursor_energy.execute(" SELECT start_datetime_utc, actual_value "
-                                      " FROM tbl_space_input_category_hourly "
-                                      " WHERE space_id = %s "
-                                      "     AND energy_category_id = %s "
-                                      "     AND start_datetime_utc >= %s "
-                                      "     AND start_datetime_utc < %s "
-                                      " ORDER BY start_datetime_utc ",
-                                      (space['id'],
-                                       energy_category_id,
-                                       base_start_datetime_utc,
-                                       base_end_datetime_utc))
-                rows_space_hourly = cursor_energy.fetchall()
+
+                rows_space_hourly = grouped['base'].get((space['id'], energy_category_id), list())
 
                 rows_space_periodically = utilities.aggregate_hourly_data_by_period(rows_space_hourly,
                                                                                     base_start_datetime_utc,
@@ -408,32 +397,16 @@ class Reporting:
                     base[energy_category_id]['subtotal'] += actual_value
                     base[energy_category_id]['subtotal_in_kgce'] += actual_value * kgce
                     base[energy_category_id]['subtotal_in_kgco2e'] += actual_value * kgco2e
-                    if current_datetime in base['non_working_days']:
-                        base[energy_category_id]['non_working_days_subtotal'] += actual_value
-                    else:
-                        base[energy_category_id]['working_days_subtotal'] += actual_value
+                working_days_subtotal, non_working_days_subtotal = \
+                    non_working_days.split_subtotals(rows_space_hourly, timezone_offset)
+                base[energy_category_id]['working_days_subtotal'] = working_days_subtotal
+                base[energy_category_id]['non_working_days_subtotal'] = non_working_days_subtotal
             
         ################################################################################################################
         # Step 9: query reporting period energy input
         ################################################################################################################
         reporting = dict()
-        reporting['non_working_days'] = list()
         if energy_category_set is not None and len(energy_category_set) > 0:
-            cursor_system.execute(" SELECT nwd.date_local "
-                                  " FROM tbl_spaces sp, tbl_spaces_working_calendars spwc, "
-                                  " tbl_working_calendars_non_working_days nwd "
-                                  " WHERE sp.id = %s AND "
-                                  " sp.id = spwc.space_id AND "
-                                  " spwc.working_calendar_id = nwd.working_calendar_id AND"
-                                  " nwd.date_local >= %s AND"
-                                  " nwd.date_local <= %s ",
-                                  (space['id'],
-                                   reporting_start_datetime_non_working_day,
-                                   reporting_end_datetime_non_working_day))
-            rows = cursor_system.fetchall()
-            for row in rows:
-                row_datetime = row[0].isoformat()[0:10]
-                reporting['non_working_days'].append(row_datetime)
             for energy_category_id in energy_category_set:
                 kgce = energy_category_dict[energy_category_id]['kgce']
                 kgco2e = energy_category_dict[energy_category_id]['kgco2e']
@@ -449,21 +422,8 @@ class Reporting:
                 reporting[energy_category_id]['midpeak'] = Decimal(0.0)
                 reporting[energy_category_id]['offpeak'] = Decimal(0.0)
                 reporting[energy_category_id]['deep'] = Decimal(0.0)
-                reporting[energy_category_id]['non_working_days_subtotal'] = Decimal(0.0)
-                reporting[energy_category_id]['working_days_subtotal'] = Decimal(0.0)
-
-                cursor_energy.execute(" SELECT start_datetime_utc, actual_value "
-                                      " FROM tbl_space_input_category_hourly "
-                                      " WHERE space_id = %s "
-                                      "     AND energy_category_id = %s "
-                                      "     AND start_datetime_utc >= %s "
-                                      "     AND start_datetime_utc < %s "
-                                      " ORDER BY start_datetime_utc ",
-                                      (space['id'],
-                                       energy_category_id,
-                                       reporting_start_datetime_utc,
-                                       reporting_end_datetime_utc))
-                rows_space_hourly = cursor_energy.fetchall()
+
+                rows_space_hourly = grouped['reporting'].get((space['id'], energy_category_id), list())
 
                 rows_space_periodically = utilities.aggregate_hourly_data_by_period(rows_space_hourly,
                                                                                     reporting_start_datetime_utc,
@@ -489,10 +449,10 @@ class Reporting:
                     reporting[energy_category_id]['subtotal'] += actual_value
                     reporting[energy_category_id]['subtotal_in_kgce'] += actual_value * kgce
                     reporting[energy_category_id]['subtotal_in_kgco2e'] += actual_value * kgco2e
-                    if current_datetime in reporting['non_working_days']:
-                        reporting[energy_category_id]['non_working_days_subtotal'] += actual_value
-                    else:
-                        reporting[energy_category_id]['working_days_subtotal'] += actual_value
+                working_days_subtotal, non_working_days_subtotal = \
+                    non_working_days.split_subtotals(rows_space_hourly, timezone_offset)
+                reporting[energy_category_id]['working_days_subtotal'] = working_days_subtotal
+                reporting[energy_category_id]['non_working_days_subtotal'] = non_working_days_subtotal
 
                 energy_category_tariff_dict = utilities.get_energy_category_peak_types(space['cost_center_id'],
                                                                                        energy_category_id,
@@ -545,15 +505,9 @@ class Reporting:
                 point_values = []
                 point_timestamps = []
                 if point['object_type'] == 'ENERGY_VALUE':
-                    query = (" SELECT utc_date_time, actual_value "
-                             " FROM tbl_energy_value "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time BETWEEN %s AND %s "
-                             " ORDER BY utc_date_time ")
-                    cursor_historical.execute(query, (point['id'],
-                                                      reporting_start_datetime_utc,
-                                                      reporting_end_datetime_utc))
-                    rows = cursor_historical.fetchall()
+                    rows = downsampling.fetch_point_values(cursor_historical, 'tbl_energy_value', point['id'],
+                                                           reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                           fetch_sample_count, sampling_method)
 
                     if rows is not None and len(rows) > 0:
                         for row in rows:
@@ -563,15 +517,9 @@ class Reporting:
                             point_timestamps.append(current_datetime)
                             point_values.append(row[1])
                 elif point['object_type'] == 'ANALOG_VALUE':
-                    query = (" SELECT utc_date_time, actual_value "
-                             " FROM tbl_analog_value "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time BETWEEN %s AND %s "
-                             " ORDER BY utc_date_time ")
-                    cursor_historical.execute(query, (point['id'],
-                                                      reporting_start_datetime_utc,
-                                                      reporting_end_datetime_utc))
-                    rows = cursor_historical.fetchall()
+                    rows = downsampling.fetch_point_values(cursor_historical, 'tbl_analog_value', point['id'],
+                                                           reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                           fetch_sample_count, sampling_method)
 
                     if rows is not None and len(rows) > 0:
                         for row in rows:
@@ -581,15 +529,9 @@ class Reporting:
                             point_timestamps.append(current_datetime)
                             point_values.append(row[1])
                 elif point['object_type'] == 'DIGITAL_VALUE':
-                    query = (" SELECT utc_date_time, actual_value "
-                             " FROM tbl_digital_value "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time BETWEEN %s AND %s "
-                             " ORDER BY utc_date_time ")
-                    cursor_historical.execute(query, (point['id'],
-                                                      reporting_start_datetime_utc,
-                                                      reporting_end_datetime_utc))
-                    rows = cursor_historical.fetchall()
+                    rows = downsampling.fetch_point_values(cursor_historical, 'tbl_digital_value', point['id'],
+                                                           reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                           fetch_sample_count, sampling_method)
 
                     if rows is not None and len(rows) > 0:
                         for row in rows:
@@ -620,19 +562,7 @@ class Reporting:
                 for child_space in child_space_list:
                     child_space_data[energy_category_id]['child_space_names'].append(child_space['name'])
 
-                    cursor_energy.execute(" SELECT SUM(actual_value) "
-                                          " FROM tbl_space_input_category_hourly "
-                                          " WHERE space_id = %s "
-                                          "     AND energy_category_id = %s "
-                                          "     AND start_datetime_utc >= %s "
-                                          "     AND start_datetime_utc < %s ",
-                                          (child_space['id'],
-                                           energy_category_id,
-                                           reporting_start_datetime_utc,
-                                           reporting_end_datetime_utc))
-                    row_subtotal = cursor_energy.fetchone()
-
-                    subtotal = Decimal(0.0) if (row_subtotal is None or row_subtotal[0] is None) else row_subtotal[0]
+                    subtotal = grouped['child_spaces'].get((child_space['id'], energy_category_id), Decimal(0.0))
                     child_space_data[energy_category_id]['subtotals'].append(subtotal)
                     child_space_data[energy_category_id]['subtotals_in_kgce'].append(subtotal * kgce)
                     child_space_data[energy_category_id]['subtotals_in_kgco2e'].append(subtotal * kgco2e)
@@ -820,7 +750,7 @@ class Reporting:
                 result['child_space']['subtotals_in_kgco2e_array'].append(
                     child_space_data[energy_category_id]['subtotals_in_kgco2e'])
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = \
                 excelexporters.spaceenergycategory.export(result,
                                                           space['name'],
@@ -831,4 +761,6 @@ class Reporting:
                                                           period_type,
                                                           language)
 
-        resp.text = json.dumps(result)
+        downsampling.downsample_result(result, sample_count, sampling_method)
+
+        resp.text = payloadencoding.dumps(req, result)
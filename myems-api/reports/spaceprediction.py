@@ -3,10 +3,9 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import falcon
 import mysql.connector
-import simplejson as json
 import config
 # import excelexporters.spaceenergyprediction
-from core import utilities
+from core import payloadencoding, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -582,4 +581,4 @@ class Reporting:
         #                                                     period_type,
         #                                                     language)
 
-        resp.text = json.dumps(result)
+        resp.text = payloadencoding.dumps(req, result)
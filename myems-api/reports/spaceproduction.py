@@ -2,9 +2,8 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import falcon
 import mysql.connector
-import simplejson as json
 import config
-from core import utilities
+from core import payloadencoding, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -649,4 +648,4 @@ class Reporting:
         result['base_result_values'] = base_result_values
         result['base_total_production'] = base_period_total_production
         result['product'] = product_dict
-        resp.text = json.dumps(result)
+        resp.text = payloadencoding.dumps(req, result)
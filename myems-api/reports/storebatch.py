@@ -3,9 +3,9 @@ from decimal import Decimal
 import falcon
 import mysql.connector
 import simplejson as json
-from anytree import AnyNode, LevelOrderIter
 import config
 import excelexporters.storebatch
+from core import queryexecutor, topology, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -22,7 +22,7 @@ class Reporting:
     ####################################################################################################################
     # PROCEDURES
     # Step 1: valid parameters
-    # Step 2: build a space tree
+    # Step 2: get the stores in the space tree from the topology index
     # Step 3: query all stores in the space tree
     # Step 4: query energy categories
     # Step 5: query reporting period energy input
@@ -123,44 +123,31 @@ class Reporting:
             space_name = row[0]
 
         ################################################################################################################
-        # Step 2: build a space tree
+        # Step 2: get the stores in the space tree from the topology index
         ################################################################################################################
-
-        query = (" SELECT id, name, parent_space_id "
-                 " FROM tbl_spaces "
-                 " ORDER BY id ")
-        cursor_system_db.execute(query)
-        rows_spaces = cursor_system_db.fetchall()
-        node_dict = dict()
-        if rows_spaces is not None and len(rows_spaces) > 0:
-            for row in rows_spaces:
-                parent_node = node_dict[row[2]] if row[2] is not None else None
-                node_dict[row[0]] = AnyNode(id=row[0], parent=parent_node, name=row[1])
+        store_space_dict = topology.get_subtree_entities(space_id, 'store')
 
         ################################################################################################################
         # Step 3: query all stores in the space tree
         ################################################################################################################
         store_dict = dict()
-        space_dict = dict()
-
-        for node in LevelOrderIter(node_dict[space_id]):
-            space_dict[node.id] = node.name
 
-        cursor_system_db.execute(" SELECT store.id, store.name AS store_name, store.uuid AS store_uuid, "
-                                 " s.name AS space_name, cc.name AS cost_center_name, store.description "
-                                 " FROM tbl_spaces s, tbl_spaces_stores ss, tbl_stores store, tbl_cost_centers cc "
-                                 " WHERE s.id IN ( " + ', '.join(map(str, space_dict.keys())) + ") "
-                                 "       AND ss.space_id = s.id AND ss.store_id = store.id "
-                                 "       AND store.cost_center_id = cc.id  ", )
-        rows_stores = cursor_system_db.fetchall()
-        if rows_stores is not None and len(rows_stores) > 0:
-            for row in rows_stores:
-                store_dict[row[0]] = {"store_name": row[1],
-                                      "store_uuid": row[2],
-                                      "space_name": row[3],
-                                      "cost_center_name": row[4],
-                                      "description": row[5],
-                                      "values": list()}
+        if len(store_space_dict) > 0:
+            cursor_system_db.execute(" SELECT store.id, store.name AS store_name, store.uuid AS store_uuid, "
+                                     "        cc.name AS cost_center_name, store.description "
+                                     " FROM tbl_stores store, tbl_cost_centers cc "
+                                     " WHERE store.id IN ( " + ', '.join(map(str, store_space_dict.keys())) + ") "
+                                     "       AND store.cost_center_id = cc.id "
+                                     " ORDER BY store.id ", )
+            rows_stores = cursor_system_db.fetchall()
+            if rows_stores is not None and len(rows_stores) > 0:
+                for row in rows_stores:
+                    store_dict[row[0]] = {"store_name": row[1],
+                                          "store_uuid": row[2],
+                                          "space_name": store_space_dict[row[0]],
+                                          "cost_center_name": row[3],
+                                          "description": row[4],
+                                          "values": list()}
 
         ################################################################################################################
         # Step 4: query energy categories
@@ -208,24 +195,16 @@ class Reporting:
         ################################################################################################################
         # Step 5: query reporting period energy input
         ################################################################################################################
+        store_aggregates = queryexecutor.fetch_category_aggregates('myems_energy_db', 'tbl_store_input_category_hourly',
+                                                                   'store_id', list(store_dict.keys()),
+                                                                   reporting_start_datetime_utc,
+                                                                   reporting_end_datetime_utc)
         for store_id in store_dict:
-
-            cursor_energy_db.execute(" SELECT energy_category_id, SUM(actual_value) "
-                                     " FROM tbl_store_input_category_hourly "
-                                     " WHERE store_id = %s "
-                                     "     AND start_datetime_utc >= %s "
-                                     "     AND start_datetime_utc < %s "
-                                     " GROUP BY energy_category_id ",
-                                     (store_id,
-                                      reporting_start_datetime_utc,
-                                      reporting_end_datetime_utc))
-            rows_store_energy = cursor_energy_db.fetchall()
             for energy_category in energy_category_list:
                 subtotal = Decimal(0.0)
-                for row_store_energy in rows_store_energy:
-                    if energy_category['id'] == row_store_energy[0]:
-                        subtotal = row_store_energy[1]
-                        break
+                aggregates = store_aggregates.get((store_id, energy_category['id']))
+                if aggregates is not None:
+                    subtotal = aggregates[0]
                 store_dict[store_id]['values'].append(subtotal)
 
         if cursor_system_db:
@@ -257,7 +236,7 @@ class Reporting:
                   'energycategories': energy_category_list}
 
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = excelexporters.storebatch.export(result,
                                                                             space_name,
                                                                             reporting_period_start_datetime_local,
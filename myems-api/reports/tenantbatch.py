@@ -3,9 +3,9 @@ from decimal import Decimal
 import falcon
 import mysql.connector
 import simplejson as json
-from anytree import AnyNode, LevelOrderIter
 import config
 import excelexporters.tenantbatch
+from core import queryexecutor, topology, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -22,7 +22,7 @@ class Reporting:
     ####################################################################################################################
     # PROCEDURES
     # Step 1: valid parameters
-    # Step 2: build a space tree
+    # Step 2: get the tenants in the space tree from the topology index
     # Step 3: query all tenants in the space tree
     # Step 4: query energy categories
     # Step 5: query reporting period energy input
@@ -123,45 +123,32 @@ class Reporting:
             space_name = row[0]
 
         ################################################################################################################
-        # Step 2: build a space tree
+        # Step 2: get the tenants in the space tree from the topology index
         ################################################################################################################
-
-        query = (" SELECT id, name, parent_space_id "
-                 " FROM tbl_spaces "
-                 " ORDER BY id ")
-        cursor_system_db.execute(query)
-        rows_spaces = cursor_system_db.fetchall()
-        node_dict = dict()
-        if rows_spaces is not None and len(rows_spaces) > 0:
-            for row in rows_spaces:
-                parent_node = node_dict[row[2]] if row[2] is not None else None
-                node_dict[row[0]] = AnyNode(id=row[0], parent=parent_node, name=row[1])
+        tenant_space_dict = topology.get_subtree_entities(space_id, 'tenant')
 
         ################################################################################################################
         # Step 3: query all tenants in the space tree
         ################################################################################################################
         tenant_dict = dict()
-        space_dict = dict()
-
-        for node in LevelOrderIter(node_dict[space_id]):
-            space_dict[node.id] = node.name
 
-        cursor_system_db.execute(" SELECT t.id, t.name AS tenant_name, t.uuid AS tenant_uuid, s.name AS space_name, "
-                                 "        cc.name AS cost_center_name, t.description "
-                                 " FROM tbl_spaces s, tbl_spaces_tenants st, tbl_tenants t, tbl_cost_centers cc "
-                                 " WHERE s.id IN ( " + ', '.join(map(str, space_dict.keys())) + ") "
-                                 "       AND st.space_id = s.id AND st.tenant_id = t.id "
-                                 "       AND t.cost_center_id = cc.id  ", )
-        rows_tenants = cursor_system_db.fetchall()
-        if rows_tenants is not None and len(rows_tenants) > 0:
-            for row in rows_tenants:
-                tenant_dict[row[0]] = {"tenant_name": row[1],
-                                       "tenant_uuid": row[2],
-                                       "space_name": row[3],
-                                       "cost_center_name": row[4],
-                                       "description": row[5],
-                                       "values": list(),
-                                       "maximum": list()}
+        if len(tenant_space_dict) > 0:
+            cursor_system_db.execute(" SELECT t.id, t.name AS tenant_name, t.uuid AS tenant_uuid, "
+                                     "        cc.name AS cost_center_name, t.description "
+                                     " FROM tbl_tenants t, tbl_cost_centers cc "
+                                     " WHERE t.id IN ( " + ', '.join(map(str, tenant_space_dict.keys())) + ") "
+                                     "       AND t.cost_center_id = cc.id "
+                                     " ORDER BY t.id ", )
+            rows_tenants = cursor_system_db.fetchall()
+            if rows_tenants is not None and len(rows_tenants) > 0:
+                for row in rows_tenants:
+                    tenant_dict[row[0]] = {"tenant_name": row[1],
+                                           "tenant_uuid": row[2],
+                                           "space_name": tenant_space_dict[row[0]],
+                                           "cost_center_name": row[3],
+                                           "description": row[4],
+                                           "values": list(),
+                                           "maximum": list()}
 
         ################################################################################################################
         # Step 4: query energy categories
@@ -209,25 +196,18 @@ class Reporting:
         ################################################################################################################
         # Step 5: query reporting period energy input
         ################################################################################################################
+        tenant_aggregates = \
+            queryexecutor.fetch_category_aggregates('myems_energy_db', 'tbl_tenant_input_category_hourly',
+                                                    'tenant_id', list(tenant_dict.keys()),
+                                                    reporting_start_datetime_utc, reporting_end_datetime_utc)
         for tenant_id in tenant_dict:
-            cursor_energy_db.execute(" SELECT energy_category_id, SUM(actual_value), MAX(actual_value)"
-                                     " FROM tbl_tenant_input_category_hourly "
-                                     " WHERE tenant_id = %s "
-                                     "     AND start_datetime_utc >= %s "
-                                     "     AND start_datetime_utc < %s "
-                                     " GROUP BY energy_category_id ",
-                                     (tenant_id,
-                                      reporting_start_datetime_utc,
-                                      reporting_end_datetime_utc))
-            rows_tenant_energy = cursor_energy_db.fetchall()
             for energy_category in energy_category_list:
                 subtotal = Decimal(0.0)
                 maximum = Decimal(0.0)
-                for row_tenant_energy in rows_tenant_energy:
-                    if energy_category['id'] == row_tenant_energy[0]:
-                        subtotal = row_tenant_energy[1]
-                        maximum = row_tenant_energy[2] * Decimal(60 / config.minutes_to_count)
-                        break
+                aggregates = tenant_aggregates.get((tenant_id, energy_category['id']))
+                if aggregates is not None:
+                    subtotal = aggregates[0]
+                    maximum = aggregates[1] * Decimal(60 / config.minutes_to_count)
                 tenant_dict[tenant_id]['values'].append(subtotal)
                 tenant_dict[tenant_id]['maximum'].append(maximum)
 
@@ -261,7 +241,7 @@ class Reporting:
                   'energycategories': energy_category_list}
 
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = excelexporters.tenantbatch.export(result,
                                                                              space_name,
                                                                              reporting_period_start_datetime_local,
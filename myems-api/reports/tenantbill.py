@@ -3,11 +3,13 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import falcon
 import mysql.connector
-import simplejson as json
 import config
 import excelexporters.tenantbill
-from core import utilities
-from core.useractivity import access_control, api_key_control
+from core import payloadencoding, reportcache, utilities
+
+
+_cache_watermarks = [('myems_energy_db', 'tbl_tenant_input_category_hourly', 'id'),
+                     ('myems_billing_db', 'tbl_tenant_input_category_hourly', 'id')]
 
 
 class Reporting:
@@ -31,13 +33,9 @@ class Reporting:
     # Step 7: construct the report
     ####################################################################################################################
     @staticmethod
+    @reportcache.cached('tenantbill', _cache_watermarks)
     def on_get(req, resp):
-        if 'API-KEY' not in req.headers or \
-                not isinstance(req.headers['API-KEY'], str) or \
-                len(str.strip(req.headers['API-KEY'])) == 0:
-            access_control(req)
-        else:
-            api_key_control(req)
+        reportcache.check_access(req)
         print(req.params)
         tenant_id = req.params.get('tenantid')
         tenant_uuid = req.params.get('tenantuuid')
@@ -390,11 +388,12 @@ class Reporting:
         }
 
         # export result to Excel file and then encode the file to base64 string
-        result['excel_bytes_base64'] = excelexporters.tenantbill.export(result,
-                                                                        tenant['name'],
-                                                                        reporting_period_start_datetime_local,
-                                                                        reporting_period_end_datetime_local,
-                                                                        period_type,
-                                                                        language)
-
-        resp.text = json.dumps(result)
+        if utilities.is_excel_inline(req):
+            result['excel_bytes_base64'] = excelexporters.tenantbill.export(result,
+                                                                            tenant['name'],
+                                                                            reporting_period_start_datetime_local,
+                                                                            reporting_period_end_datetime_local,
+                                                                            period_type,
+                                                                            language)
+
+        resp.text = payloadencoding.dumps(req, result)
@@ -3,10 +3,9 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import falcon
 import mysql.connector
-import simplejson as json
 import config
 import excelexporters.tenantenergycategory
-from core import utilities
+from core import calendarindex, downsampling, payloadencoding, utilities
 from core.useractivity import access_control, api_key_control
 
 
@@ -94,7 +93,6 @@ class Reporting:
             base_period_start_datetime_local = str.strip(base_period_start_datetime_local)
             try:
                 base_start_datetime_utc = datetime.strptime(base_period_start_datetime_local, '%Y-%m-%dT%H:%M:%S')
-                base_start_datetime_non_working_day = str(base_period_start_datetime_local).split('T')[0]
             except ValueError:
                 raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
                                        description="API.INVALID_BASE_PERIOD_START_DATETIME")
@@ -111,7 +109,6 @@ class Reporting:
             base_period_end_datetime_local = str.strip(base_period_end_datetime_local)
             try:
                 base_end_datetime_utc = datetime.strptime(base_period_end_datetime_local, '%Y-%m-%dT%H:%M:%S')
-                base_end_datetime_non_working_day = str(base_period_end_datetime_local).split('T')[0]
             except ValueError:
                 raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
                                        description="API.INVALID_BASE_PERIOD_END_DATETIME")
@@ -131,7 +128,6 @@ class Reporting:
             try:
                 reporting_start_datetime_utc = datetime.strptime(reporting_period_start_datetime_local,
                                                                  '%Y-%m-%dT%H:%M:%S')
-                reporting_start_datetime_non_working_day = str(reporting_period_start_datetime_local).split('T')[0]
             except ValueError:
                 raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
                                        description="API.INVALID_REPORTING_PERIOD_START_DATETIME")
@@ -152,7 +148,6 @@ class Reporting:
                 reporting_end_datetime_utc = datetime.strptime(reporting_period_end_datetime_local,
                                                                '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc) - \
                                              timedelta(minutes=timezone_offset)
-                reporting_end_datetime_non_working_day = str(reporting_period_end_datetime_local).split('T')[0]
             except ValueError:
                 raise falcon.HTTPError(status=falcon.HTTP_400, title='API.BAD_REQUEST',
                                        description="API.INVALID_REPORTING_PERIOD_END_DATETIME")
@@ -168,6 +163,10 @@ class Reporting:
                 str.lower(str.strip(quick_mode)) in ('true', 't', 'on', 'yes', 'y'):
             is_quick_mode = True
 
+        sample_count, sampling_method = downsampling.get_sampling(req)
+        # the Excel file contains all raw values, the series of the JSON report are downsampled after the export
+        fetch_sample_count = downsampling.get_fetch_sample_count(req, sample_count)
+
         trans = utilities.get_translation(language)
         trans.install()
         _ = trans.gettext
@@ -308,37 +307,23 @@ class Reporting:
         # Step 6: query associated working calendars
         ################################################################################################################
         working_calendar_list = list()
-        cursor_system.execute(" SELECT twc.id "
+        working_calendar_ids = list()
+        cursor_system.execute(" SELECT twc.id, twc.working_calendar_id "
                               " FROM tbl_tenants t, tbl_tenants_working_calendars twc "
                               " WHERE t.id = %s AND t.id = twc.tenant_id "
                               , (tenant['id'], ))
         rows = cursor_system.fetchall()
         if rows is not None and len(rows) > 0:
             for row in rows:
-                working_calendar_list.append(row[0])        
+                working_calendar_list.append(row[0])
+                working_calendar_ids.append(row[1])
+        non_working_days = calendarindex.get_non_working_days(working_calendar_ids)
 
         ################################################################################################################
         # Step 7: query base period energy input
         ################################################################################################################
         base = dict()
-        base['non_working_days'] = list()
         if energy_category_set is not None and len(energy_category_set) > 0:
-            if base_start_datetime_utc is not None and base_end_datetime_utc is not None:
-                cursor_system.execute(" SELECT nwd.date_local "
-                                      " FROM tbl_tenants t, tbl_tenants_working_calendars twc, "
-                                      "      tbl_working_calendars_non_working_days nwd "
-                                      " WHERE t.id = %s AND "
-                                      "       t.id = twc.tenant_id AND "
-                                      "       twc.working_calendar_id = nwd.working_calendar_id AND"
-                                      "       nwd.date_local >= %s AND"
-                                      "       nwd.date_local <= %s ",
-                                      (tenant['id'],
-                                       base_start_datetime_non_working_day,
-                                       base_end_datetime_non_working_day))
-                rows = cursor_system.fetchall()
-                for row in rows:
-                    row_datetime = row[0].isoformat()[0:10]
-                    base['non_working_days'].append(row_datetime)
             for energy_category_id in energy_category_set:
                 kgce = energy_category_dict[energy_category_id]['kgce']
                 kgco2e = energy_category_dict[energy_category_id]['kgco2e']
@@ -349,8 +334,6 @@ class Reporting:
                 base[energy_category_id]['subtotal'] = Decimal(0.0)
                 base[energy_category_id]['subtotal_in_kgce'] = Decimal(0.0)
                 base[energy_category_id]['subtotal_in_kgco2e'] = Decimal(0.0)
-                base[energy_category_id]['non_working_days_subtotal'] = Decimal(0.0)
-                base[energy_category_id]['working_days_subtotal'] = Decimal(0.0)
 
                 cursor_energy.execute(" SELECT start_datetime_utc, actual_value "
                                       " FROM tbl_tenant_input_category_hourly "
@@ -389,32 +372,16 @@ class Reporting:
                     base[energy_category_id]['subtotal'] += actual_value
                     base[energy_category_id]['subtotal_in_kgce'] += actual_value * kgce
                     base[energy_category_id]['subtotal_in_kgco2e'] += actual_value * kgco2e
-                    if current_datetime in base['non_working_days']:
-                        base[energy_category_id]['non_working_days_subtotal'] += actual_value
-                    else:
-                        base[energy_category_id]['working_days_subtotal'] += actual_value
+                working_days_subtotal, non_working_days_subtotal = \
+                    non_working_days.split_subtotals(rows_tenant_hourly, timezone_offset)
+                base[energy_category_id]['working_days_subtotal'] = working_days_subtotal
+                base[energy_category_id]['non_working_days_subtotal'] = non_working_days_subtotal
             
         ################################################################################################################
         # Step 8: query reporting period energy input
         ################################################################################################################
         reporting = dict()
-        reporting['non_working_days'] = list()
         if energy_category_set is not None and len(energy_category_set) > 0:
-            cursor_system.execute(" SELECT nwd.date_local "
-                                  " FROM tbl_tenants t, tbl_tenants_working_calendars twc, "
-                                  " tbl_working_calendars_non_working_days nwd "
-                                  " WHERE t.id = %s AND "
-                                  " t.id = twc.tenant_id AND "
-                                  " twc.working_calendar_id = nwd.working_calendar_id AND"
-                                  " nwd.date_local >= %s AND"
-                                  " nwd.date_local <= %s ",
-                                  (tenant['id'],
-                                   reporting_start_datetime_non_working_day,
-                                   reporting_end_datetime_non_working_day))
-            rows = cursor_system.fetchall()
-            for row in rows:
-                row_datetime = row[0].isoformat()[0:10]
-                reporting['non_working_days'].append(row_datetime)
             for energy_category_id in energy_category_set:
                 kgce = energy_category_dict[energy_category_id]['kgce']
                 kgco2e = energy_category_dict[energy_category_id]['kgco2e']
@@ -430,8 +397,6 @@ class Reporting:
                 reporting[energy_category_id]['midpeak'] = Decimal(0.0)
                 reporting[energy_category_id]['offpeak'] = Decimal(0.0)
                 reporting[energy_category_id]['deep'] = Decimal(0.0)
-                reporting[energy_category_id]['non_working_days_subtotal'] = Decimal(0.0)
-                reporting[energy_category_id]['working_days_subtotal'] = Decimal(0.0)
 
                 cursor_energy.execute(" SELECT start_datetime_utc, actual_value "
                                       " FROM tbl_tenant_input_category_hourly "
@@ -470,10 +435,10 @@ class Reporting:
                     reporting[energy_category_id]['subtotal'] += actual_value
                     reporting[energy_category_id]['subtotal_in_kgce'] += actual_value * kgce
                     reporting[energy_category_id]['subtotal_in_kgco2e'] += actual_value * kgco2e
-                    if current_datetime in reporting['non_working_days']:
-                        reporting[energy_category_id]['non_working_days_subtotal'] += actual_value
-                    else:
-                        reporting[energy_category_id]['working_days_subtotal'] += actual_value
+                working_days_subtotal, non_working_days_subtotal = \
+                    non_working_days.split_subtotals(rows_tenant_hourly, timezone_offset)
+                reporting[energy_category_id]['working_days_subtotal'] = working_days_subtotal
+                reporting[energy_category_id]['non_working_days_subtotal'] = non_working_days_subtotal
 
                 energy_category_tariff_dict = utilities.get_energy_category_peak_types(tenant['cost_center_id'],
                                                                                        energy_category_id,
@@ -526,15 +491,9 @@ class Reporting:
                 point_values = []
                 point_timestamps = []
                 if point['object_type'] == 'ENERGY_VALUE':
-                    query = (" SELECT utc_date_time, actual_value "
-                             " FROM tbl_energy_value "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time BETWEEN %s AND %s "
-                             " ORDER BY utc_date_time ")
-                    cursor_historical.execute(query, (point['id'],
-                                                      reporting_start_datetime_utc,
-                                                      reporting_end_datetime_utc))
-                    rows = cursor_historical.fetchall()
+                    rows = downsampling.fetch_point_values(cursor_historical, 'tbl_energy_value', point['id'],
+                                                           reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                           fetch_sample_count, sampling_method)
 
                     if rows is not None and len(rows) > 0:
                         for row in rows:
@@ -544,15 +503,9 @@ class Reporting:
                             point_timestamps.append(current_datetime)
                             point_values.append(row[1])
                 elif point['object_type'] == 'ANALOG_VALUE':
-                    query = (" SELECT utc_date_time, actual_value "
-                             " FROM tbl_analog_value "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time BETWEEN %s AND %s "
-                             " ORDER BY utc_date_time ")
-                    cursor_historical.execute(query, (point['id'],
-                                                      reporting_start_datetime_utc,
-                                                      reporting_end_datetime_utc))
-                    rows = cursor_historical.fetchall()
+                    rows = downsampling.fetch_point_values(cursor_historical, 'tbl_analog_value', point['id'],
+                                                           reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                           fetch_sample_count, sampling_method)
 
                     if rows is not None and len(rows) > 0:
                         for row in rows:
@@ -562,15 +515,9 @@ class Reporting:
                             point_timestamps.append(current_datetime)
                             point_values.append(row[1])
                 elif point['object_type'] == 'DIGITAL_VALUE':
-                    query = (" SELECT utc_date_time, actual_value "
-                             " FROM tbl_digital_value "
-                             " WHERE point_id = %s "
-                             "       AND utc_date_time BETWEEN %s AND %s "
-                             " ORDER BY utc_date_time ")
-                    cursor_historical.execute(query, (point['id'],
-                                                      reporting_start_datetime_utc,
-                                                      reporting_end_datetime_utc))
-                    rows = cursor_historical.fetchall()
+                    rows = downsampling.fetch_point_values(cursor_historical, 'tbl_digital_value', point['id'],
+                                                           reporting_start_datetime_utc, reporting_end_datetime_utc,
+                                                           fetch_sample_count, sampling_method)
 
                     if rows is not None and len(rows) > 0:
                         for row in rows:
@@ -734,7 +681,7 @@ class Reporting:
         }
 
         # export result to Excel file and then encode the file to base64 string
-        if not is_quick_mode:
+        if not is_quick_mode and utilities.is_excel_inline(req):
             result['excel_bytes_base64'] = \
                 excelexporters.tenantenergycategory.export(result,
                                                            tenant['name'],
@@ -745,4 +692,6 @@ class Reporting:
                                                            period_type,
                                                            language)
 
-        resp.text = json.dumps(result)
+        downsampling.downsample_result(result, sample_count, sampling_method)
+
+        resp.text = payloadencoding.dumps(req, result)
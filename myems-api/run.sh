@@ -1 +1 @@
-gunicorn -b 0.0.0.0:8000 --pid pid --timeout 600 --workers=4 app:api
\ No newline at end of file
+gunicorn -b 0.0.0.0:8000 --pid pid --timeout 600 --workers=4 --worker-class gthread --threads 32 app:api
\ No newline at end of file
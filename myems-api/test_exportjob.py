@@ -0,0 +1,45 @@
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+import config
+from reports import exportjob
+
+# Run an export job of the meter energy report synchronously against the configured databases
+# Run in the myems-api folder: python test_exportjob.py <user uuid> <token> <meter id>
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Usage: python test_exportjob.py <user uuid> <token> <meter id>")
+        sys.exit(1)
+    user_uuid, token, meter_id = sys.argv[1:4]
+
+    reporting_end_datetime = datetime.now().replace(minute=0, second=0, microsecond=0)
+    reporting_start_datetime = reporting_end_datetime - timedelta(days=7)
+    params = {'meterid': meter_id,
+              'periodtype': 'daily',
+              'reportingperiodstartdatetime': reporting_start_datetime.isoformat()[0:19],
+              'reportingperiodenddatetime': reporting_end_datetime.isoformat()[0:19],
+              'language': 'en',
+              'quickmode': 'false',
+              'excel': 'true'}
+    headers = {'USER-UUID': user_uuid, 'TOKEN': token}
+
+    os.makedirs(config.export_path, exist_ok=True)
+    job_id = uuid.uuid4().hex
+    exportjob._write_status({'id': job_id,
+                             'owner': user_uuid,
+                             'report': 'meterenergy',
+                             'status': 'queued',
+                             'error': None,
+                             'created_datetime_utc': datetime.utcnow().isoformat()[0:19],
+                             'finished_datetime_utc': None})
+    exportjob._run_job(job_id, 'meterenergy', params, headers)
+
+    status = exportjob._read_status(job_id)
+    print("The export job status is : ", status)
+    excel_file_name = exportjob._excel_file_name(job_id)
+    if status['status'] == 'done' and os.path.getsize(excel_file_name) > 0:
+        print("The export job is done, the Excel file is : ", excel_file_name)
+    else:
+        print("The export job failed")
+        sys.exit(1)
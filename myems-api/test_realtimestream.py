@@ -0,0 +1,58 @@
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+import simplejson as json
+import config
+from core import latestvalues
+from reports import realtimestream
+
+
+def set_snapshot(value_type, values):
+    # a refreshed snapshot as built by latestvalues._refresh, with new tuples for every row read again
+    snapshot_values = {point_id: (item[0], item[1]) for point_id, item in values.items()}
+    latestvalues._snapshots[value_type] = {'values': snapshot_values,
+                                           'watermark': max(item[0] for item in values.values()),
+                                           'refreshed_at': time.monotonic(),
+                                           'reloaded_at': time.monotonic()}
+
+
+def parse_event(chunk):
+    lines = chunk.decode('utf-8').strip().split('\n')
+    return lines[0][len('event: '):], json.loads(lines[1][len('data: '):])
+
+
+# Check that a realtime stream sends only the values which changed, without databases
+# Run in the myems-api folder: python test_realtimestream.py
+if __name__ == "__main__":
+    config.latest_value_snapshot_refresh_seconds = 3600
+    config.realtime_stream_coalescing_interval_in_seconds = 0
+    config.realtime_stream_heartbeat_interval_in_seconds = 0
+    config.realtime_stream_max_duration_in_seconds = 3600
+
+    utc_date_time = datetime(2026, 1, 1, 0, 0, 0)
+    values = {1: (utc_date_time, Decimal('1.5')), 2: (utc_date_time, Decimal('2.5'))}
+    set_snapshot('analog', values)
+    events = realtimestream._generate_events({1: 'analog', 2: 'analog'}, 0, {})
+
+    next(events)
+    event, data = parse_event(next(events))
+    if event != 'snapshot' or len(data['values']) != 2:
+        print("The snapshot event is wrong: ", event, data)
+        sys.exit(1)
+
+    # a refresh or reload of unchanged values
+    set_snapshot('analog', values)
+    chunk = next(events)
+    if chunk != b': heartbeat\n\n':
+        print("An unchanged snapshot produced an event: ", chunk)
+        sys.exit(1)
+
+    values[2] = (datetime(2026, 1, 1, 0, 1, 0), Decimal('3.5'))
+    set_snapshot('analog', values)
+    event, data = parse_event(next(events))
+    if event != 'delta' or [value['point_id'] for value in data['values']] != [2]:
+        print("The delta event is wrong: ", event, data)
+        sys.exit(1)
+    events.close()
+    print("The realtime stream sends only changed values")
@@ -0,0 +1,57 @@
+from decouple import config
+
+
+myems_system_db = {
+    'host': config('MYEMS_SYSTEM_DB_HOST', default='127.0.0.1'),
+    'port': config('MYEMS_SYSTEM_DB_PORT', default=3306, cast=int),
+    'database': config('MYEMS_SYSTEM_DB_DATABASE', default='myems_system_db'),
+    'user': config('MYEMS_SYSTEM_DB_USER', default='root'),
+    'password': config('MYEMS_SYSTEM_DB_PASSWORD', default='!MyEMS1'),
+}
+
+myems_energy_db = {
+    'host': config('MYEMS_ENERGY_DB_HOST', default='127.0.0.1'),
+    'port': config('MYEMS_ENERGY_DB_PORT', default=3306, cast=int),
+    'database': config('MYEMS_ENERGY_DB_DATABASE', default='myems_energy_db'),
+    'user': config('MYEMS_ENERGY_DB_USER', default='root'),
+    'password': config('MYEMS_ENERGY_DB_PASSWORD', default='!MyEMS1'),
+}
+
+myems_historical_db = {
+    'host': config('MYEMS_HISTORICAL_DB_HOST', default='127.0.0.1'),
+    'port': config('MYEMS_HISTORICAL_DB_PORT', default=3306, cast=int),
+    'database': config('MYEMS_HISTORICAL_DB_DATABASE', default='myems_historical_db'),
+    'user': config('MYEMS_HISTORICAL_DB_USER', default='root'),
+    'password': config('MYEMS_HISTORICAL_DB_PASSWORD', default='!MyEMS1'),
+}
+
+myems_fdd_db = {
+    'host': config('MYEMS_FDD_DB_HOST', default='127.0.0.1'),
+    'port': config('MYEMS_FDD_DB_PORT', default=3306, cast=int),
+    'database': config('MYEMS_FDD_DB_DATABASE', default='myems_fdd_db'),
+    'user': config('MYEMS_FDD_DB_USER', default='root'),
+    'password': config('MYEMS_FDD_DB_PASSWORD', default='!MyEMS1'),
+}
+
+myems_user_db = {
+    'host': config('MYEMS_USER_DB_HOST', default='127.0.0.1'),
+    'port': config('MYEMS_USER_DB_PORT', default=3306, cast=int),
+    'database': config('MYEMS_USER_DB_DATABASE', default='myems_user_db'),
+    'user': config('MYEMS_USER_DB_USER', default='root'),
+    'password': config('MYEMS_USER_DB_PASSWORD', default='!MyEMS1'),
+}
+
+# indicates the project's time zone offset from UTC
+utc_offset = config('UTC_OFFSET', default='+08:00')
+
+# indicates in how many seconds to read the new values and hourly rows and evaluate the rules referencing them
+evaluation_interval_in_seconds = config('EVALUATION_INTERVAL_IN_SECONDS', default=10, cast=int)
+
+# indicates in how many seconds to reload the rules, only new and changed rules are compiled again
+rule_reload_interval_in_seconds = config('RULE_RELOAD_INTERVAL_IN_SECONDS', default=60, cast=int)
+
+# indicates in how many minutes to run a periodic rule if its expression does not set interval_in_minutes
+default_run_interval_in_minutes = config('DEFAULT_RUN_INTERVAL_IN_MINUTES', default=60, cast=int)
+
+# the maximum number of rows read from a value table in one query
+fetch_batch_size = config('FETCH_BATCH_SIZE', default=10000, cast=int)
@@ -0,0 +1,279 @@
+import time
+from datetime import datetime, timedelta, timezone
+from string import Template
+import mysql.connector
+import config
+import outbox
+import streams
+from rules import RuleIndex, CATEGORY_OBJECT_TABLES
+from timingwheel import TimingWheel
+
+# the timing wheel covers one day with the default evaluation interval, longer intervals take several revolutions
+_WHEEL_SLOT_COUNT = 8640
+
+# ids per IN list
+_BATCH_SIZE = 1000
+
+
+def _chunks(items):
+    items = list(items)
+    for i in range(0, len(items), _BATCH_SIZE):
+        yield items[i:i + _BATCH_SIZE]
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _to_timestamp(datetime_utc):
+    return datetime_utc.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _query_dict(database_config, query_prefix, ids):
+    """
+    Query rows by ids in batches in a database
+    :return: dict of the first column and the other columns
+    """
+    result = dict()
+    if len(ids) == 0:
+        return result
+    cnx = None
+    cursor = None
+    try:
+        cnx = mysql.connector.connect(**database_config)
+        cursor = cnx.cursor()
+        for chunk in _chunks(ids):
+            cursor.execute(query_prefix + " WHERE id IN (" + ', '.join(['%s'] * len(chunk)) + ") ", tuple(chunk))
+            for row in cursor.fetchall():
+                result[row[0]] = row[1:]
+    finally:
+        if cursor:
+            cursor.close()
+        if cnx:
+            cnx.close()
+    return result
+
+
+########################################################################################################################
+# PROCEDURES:
+# Step 1: Reload the rules, compile the new and changed ones, and index their checks by point, meter or object
+# Step 2: Read the values and hourly rows written since the last cycle and evaluate the checks of their sources
+# Step 3: Run the periodic rules which are due in the timing wheel
+# Step 4: Write the messages to the outboxes and the run datetimes to the rules in bulk
+########################################################################################################################
+class Engine:
+    def __init__(self, logger):
+        self.logger = logger
+        self.index = RuleIndex()
+        self.wheel = TimingWheel(config.evaluation_interval_in_seconds, _WHEEL_SLOT_COUNT, time.time())
+        self.streams = streams.get_streams()
+        # the datetime of the latest value of every referenced source
+        self.last_datetimes = dict()
+        # the names of the referenced objects by (category, id), and the recipients by user id
+        self.object_names = dict()
+        self.users = dict()
+        self.reloaded_at = None
+        self.messages = list()
+        self.evaluated_rule_ids = set()
+        self.next_runs = dict()
+
+    def _add_message(self, check, value, limit, datetime_utc):
+        rule = check.rule
+        name = self.object_names.get((rule.category, check.object_id), str(check.object_id))
+        timezone_offset = int(config.utc_offset[1:3]) * 60 + int(config.utc_offset[4:6])
+        if config.utc_offset[0] == '-':
+            timezone_offset = -timezone_offset
+        local_datetime = (datetime_utc + timedelta(minutes=timezone_offset)).isoformat(timespec='seconds')
+        value = '' if value is None else str(value)
+        limit = '' if limit is None else str(round(limit, 6))
+        message = Template(rule.message_template).safe_substitute(name=name, value=value, limit=limit,
+                                                                  datetime=local_datetime,
+                                                                  s1=name, s2=value, s3=limit, s4=local_datetime)
+        self.messages.append({'check': check,
+                              'subject': rule.name[:128],
+                              'message': message,
+                              'datetime_utc': datetime_utc})
+
+    ####################################################################################################################
+    # Step 1: Reload the rules
+    ####################################################################################################################
+    def reload(self, cursor_fdd_db, cursor_historical_db, cursor_energy_db):
+        cursor_fdd_db.execute(" SELECT id, name, category, fdd_code, priority, channel, expression, "
+                              "        message_template, next_run_datetime_utc, is_run_immediately "
+                              " FROM tbl_rules "
+                              " WHERE is_enabled = 1 ")
+        columns = [column[0] for column in cursor_fdd_db.description]
+        rows = [dict(zip(columns, row)) for row in cursor_fdd_db.fetchall()]
+        changed, removed = self.index.update(rows, config.default_run_interval_in_minutes, self.logger)
+
+        now = time.time()
+        for rule_id in removed:
+            self.wheel.cancel(rule_id)
+        for rule in changed:
+            if rule.is_periodic:
+                due = _to_timestamp(rule.next_run_datetime_utc) if rule.next_run_datetime_utc is not None else now
+                self.wheel.schedule(rule.id, due)
+            else:
+                self.wheel.cancel(rule.id)
+
+        run_immediately_ids = [row['id'] for row in rows
+                               if row['is_run_immediately'] and row['id'] in self.index.rules]
+        for rule_id in run_immediately_ids:
+            # current faults are reported again
+            for check in self.index.rules[rule_id].checks:
+                check.reset()
+            self.wheel.schedule(rule_id, now)
+        for chunk in _chunks(run_immediately_ids):
+            cursor_fdd_db.execute(" UPDATE tbl_rules "
+                                  " SET is_run_immediately = 0 "
+                                  " WHERE id IN (" + ', '.join(['%s'] * len(chunk)) + ") ", tuple(chunk))
+
+        # load the names, recipients and latest datetimes only for new references
+        new_objects = dict()
+        new_user_ids = set()
+        for rule in changed:
+            for check in rule.checks:
+                if (rule.category, check.object_id) not in self.object_names:
+                    new_objects.setdefault(rule.category, set()).add(check.object_id)
+                for recipient in check.recipients:
+                    if isinstance(recipient, dict) and str(recipient.get('user_id', '')).isdigit() and \
+                            int(recipient['user_id']) not in self.users:
+                        new_user_ids.add(int(recipient['user_id']))
+        for category, object_ids in new_objects.items():
+            names = _query_dict(config.myems_system_db,
+                                " SELECT id, name FROM " + CATEGORY_OBJECT_TABLES[category], object_ids)
+            for object_id, row in names.items():
+                self.object_names[(category, object_id)] = row[0]
+        self.users.update(_query_dict(config.myems_user_db, " SELECT id, display_name, email FROM tbl_users ",
+                                      new_user_ids))
+        new_source_keys = [source_key for source_key in self.index.checks_by_source
+                           if source_key not in self.last_datetimes]
+        self.last_datetimes.update(streams.get_last_datetimes(cursor_historical_db, cursor_energy_db,
+                                                              new_source_keys))
+
+        if self.reloaded_at is None:
+            for stream in self.streams:
+                stream.start(cursor_historical_db if stream.database == 'historical' else cursor_energy_db)
+        self.reloaded_at = time.monotonic()
+        print("Compiled " + str(len(changed)) + " rules, " + str(len(self.index.rules)) + " rules are enabled")
+
+    ####################################################################################################################
+    # Step 2: Evaluate the new values
+    ####################################################################################################################
+    def evaluate_streams(self, cursor_historical_db, cursor_energy_db):
+        checks_by_source = self.index.checks_by_source
+        for stream in self.streams:
+            cursor = cursor_historical_db if stream.database == 'historical' else cursor_energy_db
+            for rows in stream.read(cursor, config.fetch_batch_size):
+                for source_key, datetime_utc, actual_value in rows:
+                    checks = checks_by_source.get(source_key)
+                    if checks is None:
+                        continue
+                    last_datetime = self.last_datetimes.get(source_key)
+                    if last_datetime is None or datetime_utc > last_datetime:
+                        self.last_datetimes[source_key] = datetime_utc
+                    for check in checks:
+                        self.evaluated_rule_ids.add(check.rule.id)
+                        limit = check.evaluate(actual_value)
+                        if limit is not None:
+                            self._add_message(check, actual_value, limit, datetime_utc)
+
+    ####################################################################################################################
+    # Step 3: Run the periodic rules
+    ####################################################################################################################
+    def run_due_rules(self):
+        now = time.time()
+        now_utc = _utcnow()
+        for rule_id in self.wheel.advance(now):
+            rule = self.index.rules.get(rule_id)
+            if rule is None:
+                continue
+            for check in rule.checks:
+                limit = check.evaluate_staleness(self.last_datetimes.get(check.source_key), now_utc)
+                if limit is not None:
+                    self._add_message(check, None, limit, now_utc)
+            self.evaluated_rule_ids.add(rule_id)
+            if rule.is_periodic:
+                next_run_datetime_utc = now_utc + timedelta(minutes=rule.interval_in_minutes)
+                self.wheel.schedule(rule_id, now + rule.interval_in_minutes * 60)
+                self.next_runs[rule_id] = next_run_datetime_utc
+
+    ####################################################################################################################
+    # Step 4: Write the results
+    ####################################################################################################################
+    def write_results(self, cursor_fdd_db):
+        now_utc = _utcnow()
+        count = outbox.write_messages(cursor_fdd_db, self.messages, self.users, now_utc, self.logger)
+        for chunk in _chunks(self.evaluated_rule_ids):
+            cursor_fdd_db.execute(" UPDATE tbl_rules "
+                                  " SET last_run_datetime_utc = %s "
+                                  " WHERE id IN (" + ', '.join(['%s'] * len(chunk)) + ") ", (now_utc,) + tuple(chunk))
+        next_run_rows = [(next_run_datetime_utc, rule_id) for rule_id, next_run_datetime_utc in self.next_runs.items()]
+        for chunk in _chunks(next_run_rows):
+            cursor_fdd_db.executemany(" UPDATE tbl_rules "
+                                      " SET next_run_datetime_utc = %s "
+                                      " WHERE id = %s ", chunk)
+        if count > 0:
+            print("Wrote " + str(count) + " messages")
+        self.messages = list()
+        self.evaluated_rule_ids = set()
+        self.next_runs = dict()
+
+    def cycle(self, cnx_fdd_db, cnx_historical_db, cnx_energy_db):
+        cursor_fdd_db = cnx_fdd_db.cursor()
+        cursor_historical_db = cnx_historical_db.cursor()
+        cursor_energy_db = cnx_energy_db.cursor()
+        try:
+            if self.reloaded_at is None or \
+                    time.monotonic() - self.reloaded_at >= config.rule_reload_interval_in_seconds:
+                self.reload(cursor_fdd_db, cursor_historical_db, cursor_energy_db)
+            self.evaluate_streams(cursor_historical_db, cursor_energy_db)
+            self.run_due_rules()
+            self.write_results(cursor_fdd_db)
+            cnx_fdd_db.commit()
+        finally:
+            cursor_fdd_db.close()
+            cursor_historical_db.close()
+            cursor_energy_db.close()
+
+
+def run(logger):
+    engine = Engine(logger)
+    while True:
+        # the outermost while loop to reconnect server if there is a connection error
+        cnx_fdd_db = None
+        cnx_historical_db = None
+        cnx_energy_db = None
+        try:
+            cnx_fdd_db = mysql.connector.connect(**config.myems_fdd_db)
+            # the value tables are read without transactions, so that every cycle sees the new rows
+            cnx_historical_db = mysql.connector.connect(autocommit=True, **config.myems_historical_db)
+            cnx_energy_db = mysql.connector.connect(autocommit=True, **config.myems_energy_db)
+        except Exception as e:
+            logger.error("Error in step 0 of fdd engine " + str(e))
+            for cnx in (cnx_fdd_db, cnx_historical_db, cnx_energy_db):
+                if cnx:
+                    cnx.close()
+            # sleep and continue the outer loop to reconnect the database
+            time.sleep(60)
+            continue
+
+        print("Connected to MyEMS FDD, Historical and Energy Databases")
+
+        try:
+            while True:
+                started = time.monotonic()
+                engine.cycle(cnx_fdd_db, cnx_historical_db, cnx_energy_db)
+                time.sleep(max(config.evaluation_interval_in_seconds - (time.monotonic() - started), 0))
+        except Exception as e:
+            logger.error("Error in fdd engine " + str(e))
+            # the messages of the failed cycle are discarded, the faults are reported again by the next values
+            for message in engine.messages:
+                message['check'].reset()
+            engine.messages = list()
+            # sleep and continue the outer loop to reconnect the database
+            time.sleep(60)
+        finally:
+            for cnx in (cnx_fdd_db, cnx_historical_db, cnx_energy_db):
+                if cnx:
+                    cnx.close()
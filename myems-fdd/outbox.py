@@ -0,0 +1,87 @@
+import json
+
+# rows per multi-row insert
+_BATCH_SIZE = 1000
+
+
+def _insert_many(cursor, query, rows):
+    # executemany sends an INSERT ... VALUES statement as one multi-row insert
+    for i in range(0, len(rows), _BATCH_SIZE):
+        cursor.executemany(query, rows[i:i + _BATCH_SIZE])
+
+
+########################################################################################################################
+# Bulk writing of messages to the outboxes of myems_fdd_db
+# Each evaluation cycle collects its messages, which are written with one multi-row insert per outbox table.
+########################################################################################################################
+def write_messages(cursor, messages, users, now_utc, logger):
+    """
+    :param cursor: cursor of myems_fdd_db
+    :param messages: list of dicts of check, subject, message and datetime_utc
+    :param users: dict of user id and tuple of (display name, email)
+    :param now_utc: created datetime of the messages
+    :param logger: logger
+    :return: number of written rows
+    """
+    web_rows = list()
+    email_rows = list()
+    text_rows = list()
+    wechat_rows = list()
+    for message in messages:
+        check = message['check']
+        rule = check.rule
+        for recipient in check.recipients:
+            if not isinstance(recipient, dict):
+                continue
+            if rule.channel in ('WEB', 'EMAIL'):
+                try:
+                    user_id = int(recipient.get('user_id'))
+                except (TypeError, ValueError):
+                    logger.error("Invalid user_id of recipient in rule " + str(rule.id))
+                    continue
+                if user_id not in users:
+                    logger.error("User " + str(user_id) + " of rule " + str(rule.id) + " not found")
+                    continue
+                if rule.channel == 'WEB':
+                    web_rows.append((rule.id, user_id, message['subject'], rule.category, rule.priority,
+                                     message['message'], now_utc, message['datetime_utc'], 'new',
+                                     'POINT' if rule.category == 'REALTIME' else rule.category, check.object_id))
+                else:
+                    email_rows.append((rule.id, users[user_id][0], users[user_id][1], message['subject'],
+                                       message['message'], now_utc, now_utc, 'new'))
+            elif rule.channel == 'SMS':
+                if recipient.get('mobile') is None:
+                    logger.error("Invalid mobile of recipient in rule " + str(rule.id))
+                    continue
+                text_rows.append((rule.id, str(recipient.get('name', '')), str(recipient['mobile']),
+                                  message['message'], now_utc, now_utc, 'new'))
+            elif rule.channel == 'WECHAT':
+                if recipient.get('openid') is None or recipient.get('message_template_id') is None:
+                    logger.error("Invalid openid or message_template_id of recipient in rule " + str(rule.id))
+                    continue
+                wechat_rows.append((rule.id, str(recipient.get('name', '')), str(recipient['openid']),
+                                    str(recipient['message_template_id']),
+                                    json.dumps({'subject': message['subject'], 'message': message['message']}),
+                                    now_utc, now_utc, 'new'))
+
+    _insert_many(cursor,
+                 " INSERT INTO tbl_web_messages "
+                 "             (rule_id, user_id, subject, category, priority, message, created_datetime_utc, "
+                 "              start_datetime_utc, status, belong_to_object_type, belong_to_object_id) "
+                 " VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) ", web_rows)
+    _insert_many(cursor,
+                 " INSERT INTO tbl_email_messages "
+                 "             (rule_id, recipient_name, recipient_email, subject, message, created_datetime_utc, "
+                 "              scheduled_datetime_utc, status) "
+                 " VALUES (%s, %s, %s, %s, %s, %s, %s, %s) ", email_rows)
+    _insert_many(cursor,
+                 " INSERT INTO tbl_text_messages_outbox "
+                 "             (rule_id, recipient_name, recipient_mobile, message, created_datetime_utc, "
+                 "              scheduled_datetime_utc, status) "
+                 " VALUES (%s, %s, %s, %s, %s, %s, %s) ", text_rows)
+    _insert_many(cursor,
+                 " INSERT INTO tbl_wechat_messages_outbox "
+                 "             (rule_id, recipient_name, recipient_openid, message_template_id, message_data, "
+                 "              created_datetime_utc, scheduled_datetime_utc, status) "
+                 " VALUES (%s, %s, %s, %s, %s, %s, %s, %s) ", wechat_rows)
+    return len(web_rows) + len(email_rows) + len(text_rows) + len(wechat_rows)
@@ -0,0 +1,233 @@
+import json
+from collections import deque
+from decimal import Decimal
+
+
+########################################################################################################################
+# Compilation of the rules in myems_fdd_db.tbl_rules
+# The expression of a rule is a JSON list of items (a single item is accepted too), for example
+#   [{"object_id": 1, "high_limit": 1000.0, "recipients": [{"user_id": 1}]}]
+# object_id is the point of a REALTIME rule, the meter of a METER rule, or the space, equipment, combined equipment,
+# shopfloor, store or tenant of the other categories, which also set energy_category_id. The conditions of an item are
+#   high_limit (or limit), low_limit: the value is above or below the limit
+#   deviation, window: the value deviates by more than the ratio deviation from the mean of the previous window values
+#   stale_minutes: no value for more than stale_minutes, checked periodically every interval_in_minutes
+#   count: the number of consecutive faulty values before a message is sent, 1 by default
+# A message is sent when an item becomes faulty, and once more only after it was normal again.
+# Recipients are {"user_id": 1} for WEB and EMAIL rules, {"name": "...", "mobile": "..."} for SMS rules and
+# {"name": "...", "openid": "...", "message_template_id": "..."} for WECHAT rules.
+# The message template supports $-substitutions of $name, $value, $limit and $datetime, also as $s1, $s2, $s3, $s4.
+########################################################################################################################
+
+# the value table and the key columns of the hourly rows of each category
+# REALTIME rules read the value tables of their points, which depend on the object type of the point
+CATEGORY_SOURCES = {
+    'METER': ('tbl_meter_hourly', 'meter_id'),
+    'SPACE': ('tbl_space_input_category_hourly', 'space_id'),
+    'EQUIPMENT': ('tbl_equipment_input_category_hourly', 'equipment_id'),
+    'COMBINEDEQUIPMENT': ('tbl_combined_equipment_input_category_hourly', 'combined_equipment_id'),
+    'SHOPFLOOR': ('tbl_shopfloor_input_category_hourly', 'shopfloor_id'),
+    'STORE': ('tbl_store_input_category_hourly', 'store_id'),
+    'TENANT': ('tbl_tenant_input_category_hourly', 'tenant_id'),
+}
+
+# the system table of the objects of each category, for the names in messages
+CATEGORY_OBJECT_TABLES = {
+    'REALTIME': 'tbl_points',
+    'METER': 'tbl_meters',
+    'SPACE': 'tbl_spaces',
+    'EQUIPMENT': 'tbl_equipments',
+    'COMBINEDEQUIPMENT': 'tbl_combined_equipments',
+    'SHOPFLOOR': 'tbl_shopfloors',
+    'STORE': 'tbl_stores',
+    'TENANT': 'tbl_tenants',
+}
+
+CHANNELS = ('WEB', 'EMAIL', 'SMS', 'WECHAT')
+
+
+def _to_number(value, name):
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, Decimal, str)):
+        raise ValueError('invalid ' + name)
+    return float(value)
+
+
+class Check:
+    """
+    One compiled item of a rule expression, with its evaluation state
+    """
+    def __init__(self, rule, item):
+        if not isinstance(item, dict):
+            raise ValueError('expression item must be an object')
+        self.rule = rule
+        self.object_id = int(item['object_id'])
+        if rule.category == 'REALTIME':
+            self.source_key = ('REALTIME', self.object_id)
+        elif rule.category == 'METER':
+            self.source_key = ('METER', self.object_id)
+        else:
+            self.source_key = (rule.category, self.object_id, int(item['energy_category_id']))
+        self.high_limit = _to_number(item.get('high_limit', item.get('limit')), 'high_limit')
+        self.low_limit = _to_number(item.get('low_limit'), 'low_limit')
+        self.deviation = _to_number(item.get('deviation'), 'deviation')
+        self.stale_minutes = _to_number(item.get('stale_minutes'), 'stale_minutes')
+        self.count = int(item.get('count', 1))
+        if self.high_limit is None and self.low_limit is None and self.deviation is None and \
+                self.stale_minutes is None:
+            raise ValueError('expression item has no condition')
+        self.recipients = item.get('recipients', list())
+        if not isinstance(self.recipients, list):
+            raise ValueError('recipients must be a list')
+        # the previous values for the deviation, with their running sum
+        self.window = deque(maxlen=int(item.get('window', 24))) if self.deviation is not None else None
+        self.window_sum = 0.0
+        self.fault_count = 0
+        self.is_faulty = False
+        self.is_stale = False
+
+    def reset(self):
+        """
+        Forget the reported faults, so that current faults are reported again
+        """
+        self.fault_count = 0
+        self.is_faulty = False
+        self.is_stale = False
+
+    def _get_fault(self, value):
+        """
+        :return: the violated limit, or None if the value is normal
+        """
+        if self.high_limit is not None and value > self.high_limit:
+            return self.high_limit
+        if self.low_limit is not None and value < self.low_limit:
+            return self.low_limit
+        if self.deviation is not None and self.window.maxlen > 0 and len(self.window) == self.window.maxlen:
+            mean = self.window_sum / len(self.window)
+            if abs(value - mean) > abs(mean) * self.deviation:
+                return mean
+        return None
+
+    def _update(self, fault):
+        """
+        Update the state with a result
+        :return: True if a message is due
+        """
+        if fault is None:
+            self.fault_count = 0
+            self.is_faulty = False
+            return False
+        self.fault_count += 1
+        if not self.is_faulty and self.fault_count >= self.count:
+            self.is_faulty = True
+            return True
+        return False
+
+    def evaluate(self, value):
+        """
+        Evaluate a new value of the source
+        :return: the violated limit if a message is due, otherwise None
+        """
+        if self.high_limit is None and self.low_limit is None and self.deviation is None:
+            return None
+        value = float(value)
+        fault = self._get_fault(value)
+        if self.window is not None and self.window.maxlen > 0:
+            if len(self.window) == self.window.maxlen:
+                self.window_sum -= self.window[0]
+            self.window.append(value)
+            self.window_sum += value
+        return fault if self._update(fault) else None
+
+    def evaluate_staleness(self, last_datetime_utc, now_utc):
+        """
+        Check that the source has a value within stale_minutes
+        :return: the limit in minutes if a message is due, otherwise None
+        """
+        if self.stale_minutes is None:
+            return None
+        is_stale = last_datetime_utc is None or \
+            (now_utc - last_datetime_utc).total_seconds() > self.stale_minutes * 60
+        # the staleness has its own state, the limits of the values are not reset by a periodic run
+        is_due = is_stale and not self.is_stale
+        self.is_stale = is_stale
+        return self.stale_minutes if is_due else None
+
+
+class Rule:
+    """
+    A compiled rule
+    """
+    def __init__(self, row, default_interval_in_minutes):
+        self.id = row['id']
+        self.name = row['name']
+        self.category = row['category']
+        self.fdd_code = row['fdd_code']
+        self.priority = row['priority']
+        self.channel = row['channel']
+        self.message_template = row['message_template']
+        self.next_run_datetime_utc = row['next_run_datetime_utc']
+        self.signature = signature(row)
+        if self.category != 'REALTIME' and self.category not in CATEGORY_SOURCES:
+            raise ValueError('unsupported category ' + str(self.category))
+        if self.channel not in CHANNELS:
+            raise ValueError('unsupported channel ' + str(self.channel))
+        expression = json.loads(row['expression'])
+        if isinstance(expression, dict):
+            expression = [expression]
+        if not isinstance(expression, list) or len(expression) == 0:
+            raise ValueError('expression must be a list of items')
+        self.interval_in_minutes = default_interval_in_minutes
+        for item in expression:
+            if isinstance(item, dict) and item.get('interval_in_minutes') is not None:
+                self.interval_in_minutes = max(float(item['interval_in_minutes']), 1.0)
+        self.checks = [Check(self, item) for item in expression]
+        # rules with staleness conditions run periodically, the other ones only when new values arrive
+        self.is_periodic = any(check.stale_minutes is not None for check in self.checks)
+
+
+def signature(row):
+    """
+    The columns of a rule row which require compiling it again when they change
+    """
+    return (row['name'], row['category'], row['fdd_code'], row['priority'], row['channel'], row['expression'],
+            row['message_template'])
+
+
+class RuleIndex:
+    """
+    The enabled rules and their checks indexed by source
+    """
+    def __init__(self):
+        self.rules = dict()
+        self.checks_by_source = dict()
+
+    def update(self, rows, default_interval_in_minutes, logger):
+        """
+        Replace the rules, compiling only new and changed rules, unchanged rules keep their state
+        :param rows: list of dicts of the enabled rules
+        :return: tuple of (list of new or changed rules, list of removed rule ids)
+        """
+        rules = dict()
+        changed = list()
+        for row in rows:
+            rule = self.rules.get(row['id'])
+            if rule is None or rule.signature != signature(row):
+                try:
+                    rule = Rule(row, default_interval_in_minutes)
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.error("Error in compiling rule " + str(row['id']) + " " + str(e))
+                    continue
+                changed.append(rule)
+            rules[rule.id] = rule
+        removed = [rule_id for rule_id in self.rules if rule_id not in rules]
+        self.rules = rules
+        self.checks_by_source = dict()
+        for rule in rules.values():
+            for check in rule.checks:
+                self.checks_by_source.setdefault(check.source_key, list()).append(check)
+        return changed, removed
+
+    def get_source_keys(self, category):
+        return [source_key for source_key in self.checks_by_source if source_key[0] == category]
@@ -0,0 +1,114 @@
+from rules import CATEGORY_SOURCES
+
+# the value tables of points and their tables of latest values
+POINT_VALUE_TABLES = {
+    'tbl_analog_value': 'tbl_analog_value_latest',
+    'tbl_energy_value': 'tbl_energy_value_latest',
+    'tbl_digital_value': 'tbl_digital_value_latest',
+}
+
+# ids per IN list
+_BATCH_SIZE = 1000
+
+
+def _chunks(items):
+    items = list(items)
+    for i in range(0, len(items), _BATCH_SIZE):
+        yield items[i:i + _BATCH_SIZE]
+
+
+########################################################################################################################
+# Incremental reading of value tables
+# Every stream remembers the largest id it has read, and reads the rows written since then in id order, which is a
+# range scan on the primary key, however many rules reference the rows. A stream starts at the end of its table, rows
+# written while the service is stopped are not evaluated.
+########################################################################################################################
+class TableStream:
+    def __init__(self, database, table, category, key_columns, datetime_column):
+        """
+        :param database: 'historical' or 'energy'
+        :param table: the value table
+        :param category: the rule category reading the table
+        :param key_columns: the columns identifying the source, for example ('meter_id',)
+        :param datetime_column: 'utc_date_time' or 'start_datetime_utc'
+        """
+        self.database = database
+        self.table = table
+        self.category = category
+        self.key_columns = key_columns
+        self.datetime_column = datetime_column
+        self.watermark = None
+
+    def start(self, cursor):
+        cursor.execute(" SELECT MAX(id) FROM " + self.table)
+        row = cursor.fetchone()
+        self.watermark = row[0] if row is not None and row[0] is not None else 0
+
+    def read(self, cursor, batch_size):
+        """
+        Read the rows written since the last read
+        :return: generator of lists of (source_key, datetime_utc, actual_value)
+        """
+        while True:
+            cursor.execute(" SELECT id, " + ', '.join(self.key_columns) + ", " +
+                           self.datetime_column + ", actual_value "
+                           " FROM " + self.table +
+                           " WHERE id > %s "
+                           " ORDER BY id "
+                           " LIMIT %s ", (self.watermark, batch_size))
+            rows = cursor.fetchall()
+            if len(rows) == 0:
+                break
+            self.watermark = rows[-1][0]
+            yield [((self.category,) + tuple(row[1:-2]), row[-2], row[-1]) for row in rows]
+            if len(rows) < batch_size:
+                break
+
+
+def get_streams():
+    """
+    :return: list of the streams of all value tables
+    """
+    streams = [TableStream('historical', table, 'REALTIME', ('point_id',), 'utc_date_time')
+               for table in POINT_VALUE_TABLES]
+    for category, (table, key_column) in CATEGORY_SOURCES.items():
+        key_columns = (key_column,) if category == 'METER' else (key_column, 'energy_category_id')
+        streams.append(TableStream('energy', table, category, key_columns, 'start_datetime_utc'))
+    return streams
+
+
+def get_last_datetimes(cursor_historical_db, cursor_energy_db, source_keys):
+    """
+    Get the datetime of the latest value of sources, for the staleness conditions
+    :param source_keys: list of source keys
+    :return: dict of source key and datetime in utc
+    """
+    result = dict()
+    point_ids = [source_key[1] for source_key in source_keys if source_key[0] == 'REALTIME']
+    for table in POINT_VALUE_TABLES.values():
+        for chunk in _chunks(point_ids):
+            cursor_historical_db.execute(" SELECT point_id, MAX(utc_date_time) "
+                                         " FROM " + table +
+                                         " WHERE point_id IN (" + ', '.join(['%s'] * len(chunk)) + ") "
+                                         " GROUP BY point_id ", tuple(chunk))
+            for row in cursor_historical_db.fetchall():
+                result[('REALTIME', row[0])] = row[1]
+
+    for category, (table, key_column) in CATEGORY_SOURCES.items():
+        object_ids = {source_key[1] for source_key in source_keys if source_key[0] == category}
+        for chunk in _chunks(object_ids):
+            if category == 'METER':
+                cursor_energy_db.execute(" SELECT meter_id, MAX(start_datetime_utc) "
+                                         " FROM tbl_meter_hourly "
+                                         " WHERE meter_id IN (" + ', '.join(['%s'] * len(chunk)) + ") "
+                                         " GROUP BY meter_id ", tuple(chunk))
+                for row in cursor_energy_db.fetchall():
+                    result[('METER', row[0])] = row[1]
+            else:
+                cursor_energy_db.execute(" SELECT " + key_column + ", energy_category_id, MAX(start_datetime_utc) "
+                                         " FROM " + table +
+                                         " WHERE " + key_column + " IN (" + ', '.join(['%s'] * len(chunk)) + ") "
+                                         " GROUP BY " + key_column + ", energy_category_id ", tuple(chunk))
+                for row in cursor_energy_db.fetchall():
+                    result[(category, row[0], row[1])] = row[2]
+    return result
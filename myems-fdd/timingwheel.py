@@ -0,0 +1,64 @@
+import math
+
+
+########################################################################################################################
+# Hashed timing wheel for periodic rules
+# The wheel has slot_count slots of tick_seconds each. A rule due in d seconds is put in the slot (current + d / tick)
+# modulo slot_count, with the number of full revolutions to wait, so scheduling and cancelling are O(1) and each tick
+# only visits the rules of one slot, however many rules are scheduled.
+########################################################################################################################
+class TimingWheel:
+    def __init__(self, tick_seconds, slot_count, start_timestamp):
+        """
+        :param tick_seconds: duration of a slot in seconds
+        :param slot_count: number of slots
+        :param start_timestamp: POSIX timestamp of the first tick
+        """
+        self.tick_seconds = tick_seconds
+        self.slot_count = slot_count
+        self.slots = [dict() for _ in range(slot_count)]
+        # the tick number of the next slot to expire
+        self.tick = int(start_timestamp // tick_seconds)
+        # the slot of every scheduled key
+        self.positions = dict()
+
+    def schedule(self, key, due_timestamp):
+        """
+        Schedule a key, replacing its previous schedule
+        :param key: the key, for example the rule id
+        :param due_timestamp: POSIX timestamp when the key is due, past timestamps are due on the next tick
+        """
+        self.cancel(key)
+        due_tick = max(int(math.ceil(due_timestamp / self.tick_seconds)), self.tick)
+        index = due_tick % self.slot_count
+        self.slots[index][key] = due_tick
+        self.positions[key] = index
+
+    def cancel(self, key):
+        index = self.positions.pop(key, None)
+        if index is not None:
+            self.slots[index].pop(key, None)
+
+    def advance(self, now_timestamp):
+        """
+        Advance the wheel to now
+        :param now_timestamp: current POSIX timestamp
+        :return: list of the keys which are due, they are no longer scheduled
+        """
+        result = list()
+        now_tick = int(now_timestamp // self.tick_seconds)
+        # after a long pause every slot is visited once
+        last_tick = min(now_tick, self.tick + self.slot_count - 1)
+        while self.tick <= last_tick:
+            slot = self.slots[self.tick % self.slot_count]
+            due_keys = [key for key, due_tick in slot.items() if due_tick <= now_tick]
+            for key in due_keys:
+                del slot[key]
+                del self.positions[key]
+            result.extend(due_keys)
+            self.tick += 1
+        self.tick = max(self.tick, now_tick + 1)
+        return result
+
+    def __len__(self):
+        return len(self.positions)